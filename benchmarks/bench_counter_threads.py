@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Multi-thread scaling benchmark for log_call_counter.
+
+Runs a decorated no-op function from 1, 2, 4, ... threads and prints the
+aggregate throughput next to a reference wrapper that guards a shared dict
+with one global lock (the implementation before the per-function counters).
+Each counter numbers calls from one ``itertools.count`` and keeps the last
+number per thread in a shard of its own, aggregated when the count is read.
+On a GIL build the numbers stay flat as threads are added. On a
+free-threaded build the draw takes the counter's own lock, which is only
+contended between threads calling the same function.
+
+Usage:
+    python benchmarks/bench_counter_threads.py --max-threads 32 --calls 200000
+"""
+import argparse
+import logging
+import os
+import threading
+import time
+from functools import wraps
+
+from py_debug import log_call_counter, get_call_count, reset_call_counters
+
+
+def locked_counter(func):
+    """Reference wrapper: one module-wide lock and a string-keyed dict."""
+    counters = {}
+    lock = threading.Lock()
+    name = f'{func.__module__}.{func.__name__}'
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        with lock:
+            counters[name] = counters.get(name, 0) + 1
+        return func(*args, **kwargs)
+
+    wrapper.counters = counters
+    return wrapper
+
+
+def run(func, threads: int, calls: int) -> float:
+    """Call func `calls` times from each of `threads` threads and return calls/s."""
+    barrier = threading.Barrier(threads + 1)
+
+    def worker():
+        barrier.wait()
+        for _ in range(calls):
+            func()
+
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    for worker_thread in workers:
+        worker_thread.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for worker_thread in workers:
+        worker_thread.join()
+    return threads * calls / (time.perf_counter() - start)
+
+
+def main():
+    """Print a throughput table for increasing thread counts."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--max-threads', type=int, default=os.cpu_count() or 4)
+    parser.add_argument('--calls', type=int, default=100_000, help='calls per thread')
+    options = parser.parse_args()
+
+    # Keep the log schedule out of the measurement
+    logging.getLogger().addHandler(logging.NullHandler())
+
+    @log_call_counter(mute_after=0, log_every=10 ** 12)
+    def counted():
+        pass
+
+    @locked_counter
+    def locked():
+        pass
+
+    print(f'{"threads":>8} {"counted calls/s":>18} {"locked calls/s":>16}')
+    threads = 1
+    while threads <= options.max_threads:
+        reset_call_counters()
+        counted_rate = run(counted, threads, options.calls)
+        assert get_call_count(counted) == threads * options.calls
+        locked_rate = run(locked, threads, options.calls)
+        print(f'{threads:>8} {counted_rate:>18,.0f} {locked_rate:>16,.0f}')
+        threads *= 2
+
+
+if __name__ == '__main__':
+    main()
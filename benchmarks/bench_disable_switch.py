@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Cost of the py_debug decorators when they are switched off.
+
+Compares an undecorated call with the same function decorated while
+set_enabled(False, unwrap=True) is in effect, which must be the very same
+function object, and with wrappers switched off at runtime by
+set_enabled(False), which cost one attribute check on top of the wrapper
+call. DEBUG is enabled throughout, so the switch is what keeps the
+decorators quiet.
+
+Usage:
+    python benchmarks/bench_disable_switch.py --repeat 7
+"""
+import argparse
+import logging
+import timeit
+
+from py_debug import log_running_time, log_args, log_call_counter, set_enabled
+
+
+def measure(func, repeat: int) -> float:
+    """Return the best ns/call for func over `repeat` timing runs."""
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=repeat, number=number)) / number * 1e9
+
+
+def main():
+    """Print ns/call for a bare call and for each switched off decorator."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--repeat', type=int, default=5)
+    options = parser.parse_args()
+
+    logging.getLogger().addHandler(logging.NullHandler())
+    logging.getLogger().setLevel(logging.DEBUG)
+
+    def noop():
+        pass
+
+    decorators = [
+        ('log_running_time', log_running_time()),
+        ('log_args', log_args()),
+        ('log_call_counter', log_call_counter()),
+    ]
+
+    set_enabled(False, unwrap=True)
+    cases = [('bare call', noop)]
+    for name, decorator in decorators:
+        unwrapped = decorator(noop)
+        assert unwrapped is noop, f'{name} wrapped a function while unwrap was on'
+        cases.append((f'{name}, unwrapped', unwrapped))
+    set_enabled(True)
+    wrapped = [(f'{name}, switched off', decorator(noop)) for name, decorator in decorators]
+    set_enabled(False)
+    cases += wrapped
+
+    bare = None
+    print(f'{"case":<32} {"ns/call":>10} {"overhead":>10}')
+    for name, func in cases:
+        ns = measure(func, options.repeat)
+        bare = ns if bare is None else bare
+        print(f'{name:<32} {ns:>10.1f} {ns - bare:>10.1f}')
+
+
+if __name__ == '__main__':
+    main()
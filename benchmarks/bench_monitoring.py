@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Per-call cost of the sys.monitoring backend against the decorators.
+
+Times a small function bare, wrapped by log_call_counter and by
+log_running_time(aggregate=True), and selected in a Monitor that counts,
+times, or both, and prints ns/call plus the overhead over the bare call.
+The monitored cases call the undecorated function, so the difference is
+what the sys.monitoring callbacks cost instead of a wrapper frame. Needs
+Python 3.12 or later.
+
+Usage:
+    python benchmarks/bench_monitoring.py --repeat 7
+"""
+import argparse
+import logging
+import sys
+import timeit
+
+from py_debug import log_call_counter, log_running_time, Monitor
+
+
+def measure(func, repeat: int) -> float:
+    """Return the best ns/call for func over `repeat` timing runs."""
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=repeat, number=number)) / number * 1e9
+
+
+def measure_monitored(func, repeat: int, **options) -> float:
+    """Return the best ns/call for func while a Monitor built with `options` watches it."""
+    monitor = Monitor(**options)
+    monitor.add(func)
+    with monitor:
+        return measure(func, repeat)
+
+
+def main():
+    """Print ns/call for a bare call, each decorator and each monitor mode."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--repeat', type=int, default=5)
+    options = parser.parse_args()
+    if not hasattr(sys, 'monitoring'):
+        parser.exit(1, 'sys.monitoring needs Python 3.12 or later\n')
+
+    # DEBUG records are dropped by the root logger, as in production
+    logging.getLogger().addHandler(logging.NullHandler())
+    logging.getLogger().setLevel(logging.WARNING)
+
+    def work():
+        return 1
+
+    cases = [
+        ('bare call', lambda: measure(work, options.repeat)),
+        ('log_call_counter', lambda: measure(log_call_counter(mute_after=0, log_every=10 ** 12)(work),
+                                             options.repeat)),
+        ('log_running_time, aggregate', lambda: measure(log_running_time(aggregate=True)(work), options.repeat)),
+        ('Monitor, count', lambda: measure_monitored(work, options.repeat, timing=False)),
+        ('Monitor, timing', lambda: measure_monitored(work, options.repeat, count=False)),
+        ('Monitor, count and timing', lambda: measure_monitored(work, options.repeat)),
+    ]
+
+    bare = None
+    print(f'{"case":<30} {"ns/call":>10} {"overhead":>10}')
+    for name, run in cases:
+        ns = run()
+        bare = ns if bare is None else bare
+        print(f'{name:<30} {ns:>10.1f} {ns - bare:>10.1f}')
+
+
+if __name__ == '__main__':
+    main()
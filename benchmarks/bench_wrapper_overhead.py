@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Per-call overhead benchmark for the py_debug decorators.
+
+Times a no-op function bare and wrapped by each decorator, with the
+decorator level below the root logger level so no record is emitted
+(or, with --enabled, with every record emitted into a NullHandler),
+and prints ns/call plus the overhead over the bare call. The large
+argument case shows that a disabled log_args never formats its
+arguments. Run it against two checkouts to compare before and after a
+change.
+
+Usage:
+    python benchmarks/bench_wrapper_overhead.py --repeat 7
+"""
+import argparse
+import logging
+import timeit
+from functools import partial
+
+from py_debug import log_running_time, log_args, log_call_counter, OneInN, QueuedEmitter
+
+
+def measure(func, repeat: int) -> float:
+    """Return the best ns/call for func over `repeat` timing runs."""
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=repeat, number=number)) / number * 1e9
+
+
+def main():
+    """Print ns/call for a bare call and for each decorator."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--enabled', action='store_true',
+                        help='enable DEBUG, emitting every record into a NullHandler')
+    options = parser.parse_args()
+
+    # DEBUG records are dropped by the root logger, as in production
+    logging.getLogger().addHandler(logging.NullHandler())
+    logging.getLogger().setLevel(logging.WARNING)
+    if options.enabled:
+        logging.getLogger().setLevel(logging.DEBUG)
+
+    def noop(*args):
+        pass
+
+    large = list(range(100_000))
+    cases = [
+        ('bare call', noop),
+        ('log_running_time', log_running_time()(noop)),
+        ('log_running_time, aggregate', log_running_time(aggregate=True)(noop)),
+        ('log_running_time, queued', log_running_time(emitter=QueuedEmitter(overflow='block'))(noop)),
+        ('log_args', log_args()(noop)),
+        ('log_args, large arg', partial(log_args()(noop), large)),
+        ('log_args, 1 in 100', log_args(sample=OneInN(100))(noop)),
+        ('log_call_counter', log_call_counter(mute_after=0, log_every=10 ** 12)(noop)),
+    ]
+
+    bare = None
+    print(f'{"case":<30} {"ns/call":>10} {"overhead":>10}')
+    for name, func in cases:
+        ns = measure(func, options.repeat)
+        bare = ns if bare is None else bare
+        print(f'{name:<30} {ns:>10.1f} {ns - bare:>10.1f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -2,15 +2,64 @@
     Py-debug: Simple logging decorators for Python functions.
     Functions for logging function calls, execution time, and call counts.
 """
+import inspect
 import logging
+import os
+import sys
+import threading
 import time
-from functools import wraps
-from typing import Callable, Any, Dict, Optional
-from threading import Lock
+from contextvars import ContextVar
+from functools import partial, wraps
+from typing import IO, Callable, Any, List, NamedTuple, Optional, Tuple, Union
 
-# Thread-safe call counter storage
-_call_counters: Dict[str, int] = {}
-_counter_lock = Lock()
+from ._aio import StepTimer, wrap_async_gen
+from ._counter import CallCounter
+from ._generator import TimedGenerator
+from .calltree import CallTreeNode, Hotspot, format_hotspots, hotspots
+from ._registry import (
+    _get_call_counter, _find_call_counter, _named_call_counters,
+    _rate_windows, _memory_aggregates, _call_tree, _timing_histograms,
+    _cpu_histograms, _off_cpu_histograms, _timing_lock, _get_timing_histogram,
+    _error_counters, _get_error_counter, _governors, _get_qualified_name,
+    _resolve_name,
+)
+from .emitter import QueuedEmitter
+from .events import Event, EventSink, make_event, read_events
+from .governor import (
+    COUNTED, COUNTING, FULL, INSTRUMENTED, LEVELS, OFF, PROBE, SAMPLED,
+    Downgrade, Governor, Overhead,
+)
+from .histogram import Histogram, TimingStats
+from .instrument import Instrumentation, instrument
+from .memory import MemoryAggregate, MemoryProbe, MemoryStats, MemoryUsage
+from .metrics import render_openmetrics, serve_metrics
+from .monitoring import Monitor
+from .rate import RateStats, RateWindow
+from .render import ArgRenderer
+from .sampling import Sampler, OneInN, TokenBucket, Head, Tail
+from .schedules import Schedule, Exponential, Interval, Budget
+from .shared import SharedCounters
+from .thresholds import Threshold, Fixed, Percentile, as_threshold
+
+
+class _Switch:
+    """
+    Process-wide on/off state of the decorators.
+
+    ``wrap`` is read once per decoration: when it is off, the decorators
+    return the function itself. ``on`` is read once per call: when it is off,
+    wrappers go straight to the function.
+    """
+
+    __slots__ = ('on', 'wrap')
+
+    def __init__(self, enabled: bool) -> None:
+        self.on = enabled
+        self.wrap = enabled
+
+
+_switch = _Switch(os.environ.get('PY_DEBUG_DISABLED', '').strip().lower()
+                  not in ('1', 'true', 'yes', 'on'))
 
 
 def _is_valid_log_level(level: int) -> bool:
@@ -24,53 +73,1975 @@ def _is_valid_log_level(level: int) -> bool:
         True if the level is valid, False otherwise.
     """
     try:
-        # Try to get the level name - if it's a valid level, it won't start with 'Level '
+        # Try to get the level name - if it's a valid level, it won't start
+        # with 'Level '
         level_name = logging.getLevelName(level)
         return not level_name.startswith('Level ')
     except (TypeError, AttributeError):
         return False
 
 
-def _get_function_name(func: Callable) -> str:
+def _get_function_name(func: Callable) -> str:
+    """
+    Get the full qualified name of a function.
+
+    Args:
+        func: The function to get the name for.
+
+    Returns:
+        The full qualified name (module.function_name).
+    """
+    return f'{func.__module__}.{func.__name__}'
+
+
+# Renders arguments for log_args calls without a renderer of their own
+_default_renderer = ArgRenderer()
+
+
+def _format_args_info(
+        args: tuple,
+        kwargs: dict,
+        renderer: Optional[ArgRenderer] = None,
+) -> str:
+    """
+    Format function arguments for logging.
+
+    Args:
+        args: Positional arguments.
+        kwargs: Keyword arguments.
+        renderer: The renderer bounding the output (default: the default
+            ``ArgRenderer``).
+
+    Returns:
+        A formatted string describing the arguments.
+    """
+    if not args and not kwargs:
+        return 'without args'
+    args_text, kwargs_text = (renderer or _default_renderer).render_call(
+        args, kwargs)
+    if not kwargs:
+        return f'with args = {args_text}'
+    elif not args:
+        return f'with kwargs = {kwargs_text}'
+    else:
+        return f'args = {args_text} and kwargs = {kwargs_text}'
+
+
+class _ArgsInfo:
+    """
+    Lazily formatted description of call arguments.
+
+    Passed as a %-style logging argument, so the arguments are only repr'd
+    if a handler actually formats the record.
+    """
+
+    __slots__ = ('args', 'kwargs', 'renderer')
+
+    def __init__(
+            self,
+            args: tuple,
+            kwargs: dict,
+            renderer: Optional[ArgRenderer] = None,
+    ) -> None:
+        self.args = args
+        self.kwargs = kwargs
+        self.renderer = renderer
+
+    def __str__(self) -> str:
+        return _format_args_info(self.args, self.kwargs, self.renderer)
+
+
+def _get_logger(
+        func: Callable,
+        logger: Optional[logging.Logger],
+) -> logging.Logger:
+    """
+    Get the logger a decorated function reports to.
+
+    Args:
+        func: The decorated function.
+        logger: An explicitly injected logger, or None.
+
+    Returns:
+        The injected logger, or the logger named after the function's module.
+    """
+    if logger is not None:
+        return logger
+    return logging.getLogger(func.__module__)
+
+
+def _always_enabled(level: int) -> bool:
+    """
+    Stand-in for ``Logger.isEnabledFor`` when every call must report, as for
+    sinks, which have no level.
+    """
+    return True
+
+
+def _extra(
+        full_name: str,
+        kind: str,
+        duration_ns: Optional[int] = None,
+        count: Optional[int] = None,
+        error: Optional[BaseException] = None,
+) -> dict:
+    """
+    Build the ``extra`` of a record, carrying its event as the ``py_debug``
+    attribute.
+    """
+    return {'py_debug': make_event(full_name, kind, duration_ns, count, error)}
+
+
+def _get_emitter(
+        func_logger: logging.Logger,
+        level: int,
+        full_name: str,
+        emitter: Optional[QueuedEmitter] = None,
+        sink: Optional[EventSink] = None,
+) -> Tuple[Callable, Callable]:
+    """
+    Resolve how a wrapper checks for and emits its records.
+
+    Args:
+        func_logger: The logger the decorated function reports to.
+        level: The configured log level.
+        full_name: The full qualified name of the decorated function.
+        emitter: The queue records are handed to instead of the logger, or
+            None.
+        sink: The sink events are written to instead of logging, or None.
+
+    Returns:
+        An ``(is_enabled, log)`` pair with the signatures of
+        ``Logger.isEnabledFor`` and ``Logger.log``. For an invalid level
+        every record is replaced by a warning about the level.
+    """
+    if sink is not None:
+        return _always_enabled, sink.log
+    if _is_valid_log_level(level):
+        return func_logger.isEnabledFor, (
+            func_logger.log if emitter is None else emitter.bind(func_logger))
+    warning = (func_logger.warning if emitter is None
+               else partial(emitter.bind(func_logger), logging.WARNING))
+
+    def warn(_level: int, *_args: Any, **_kwargs: Any) -> None:
+        warning('Invalid log level %s for function %s.', level, full_name)
+
+    return _always_enabled, warn
+
+
+def _sampled(
+        is_enabled: Callable[[int], bool],
+        sampler: Optional[Sampler],
+) -> Callable[[int], bool]:
+    """
+    Put a sampling policy in front of a level check.
+
+    Args:
+        is_enabled: The level check, with the signature of
+            ``Logger.isEnabledFor``.
+        sampler: The sampling policy, or None.
+
+    Returns:
+        A check with the same signature that consults the policy first, so it
+        counts every call, or ``is_enabled`` itself without a policy.
+    """
+    if sampler is None:
+        return is_enabled
+
+    def is_sampled(level: int) -> bool:
+        return sampler() and is_enabled(level)
+
+    return is_sampled
+
+
+def _reject_tail_sampler(sampler: Optional[Sampler]) -> None:
+    """Raise ValueError for a tail policy on a decorator without outcomes."""
+    if sampler is not None and sampler.tail:
+        raise ValueError("tail sampling needs the call outcome; only "
+                         "log_running_time supports it")
+
+
+def _reject_emitter_with_sink(
+        emitter: Optional[QueuedEmitter],
+        sink: Optional[EventSink],
+) -> None:
+    """Raise ValueError when a decorator gets both an emitter and a sink."""
+    if emitter is not None and sink is not None:
+        raise ValueError("emitter and sink cannot be combined")
+
+
+def _tree_tracked(func: Callable, full_name: str) -> Callable:
+    """
+    Wrap a function so that its calls are recorded in the call tree.
+
+    Args:
+        func: A plain or coroutine function.
+        full_name: The full qualified name of the function.
+
+    Returns:
+        The wrapper, of the same kind as the function.
+    """
+    enter, leave = _call_tree.enter, _call_tree.leave
+
+    if inspect.iscoroutinefunction(func):
+        @wraps(func)
+        async def async_tree_wrapper(*args: Any, **kwargs: Any) -> Any:
+            if not _switch.on:
+                return await func(*args, **kwargs)
+            token = enter(full_name)
+            try:
+                return await func(*args, **kwargs)
+            finally:
+                leave(token)
+
+        return async_tree_wrapper
+
+    @wraps(func)
+    def tree_wrapper(*args: Any, **kwargs: Any) -> Any:
+        if not _switch.on:
+            return func(*args, **kwargs)
+        token = enter(full_name)
+        try:
+            return func(*args, **kwargs)
+        finally:
+            leave(token)
+
+    return tree_wrapper
+
+
+def _slow_async_gen_wrapper(
+        func: Callable,
+        begin: Callable[[], int],
+        report_slow: Callable,
+        is_active: Callable[[int], bool],
+        level: int,
+) -> Callable:
+    """
+    Wrap an async generator function for ``log_running_time(threshold=...)``,
+    timing it from the start of iteration until it ends.
+
+    Args:
+        func: An async generator function.
+        begin: Reads the clock at the start of a call.
+        report_slow: Called with the start, the exception raised, if any,
+            and the arguments of each timed call.
+        is_active: Decides whether a call is timed.
+        level: The configured log level.
+
+    Returns:
+        The wrapper.
+    """
+    def start(args: tuple, kwargs: dict) -> Optional[Tuple[int, tuple, dict]]:
+        if _switch.on and is_active(level):
+            return begin(), args, kwargs
+        return None
+
+    def finish(
+            state: Optional[Tuple[int, tuple, dict]],
+            error: Optional[BaseException],
+    ) -> None:
+        if state is not None and (error is None
+                                  or isinstance(error, Exception)):
+            report_slow(state[0], error, state[1], state[2])
+
+    return wrap_async_gen(func, start, finish)
+
+
+def _slow_coroutine_wrapper(
+        func: Callable,
+        begin: Callable[[], int],
+        report_slow: Callable,
+        is_active: Callable[[int], bool],
+        level: int,
+) -> Callable:
+    """
+    Wrap a coroutine function for ``log_running_time(threshold=...)``,
+    timing it until the awaited call completes.
+
+    Args:
+        func: A coroutine function.
+        begin: Reads the clock at the start of a call.
+        report_slow: Called with the start, the exception raised, if any,
+            and the arguments of each timed call.
+        is_active: Decides whether a call is timed.
+        level: The configured log level.
+
+    Returns:
+        The wrapper.
+    """
+    @wraps(func)
+    async def async_slow_wrapper(*args: Any, **kwargs: Any) -> Any:
+        if not _switch.on or not is_active(level):
+            return await func(*args, **kwargs)
+
+        start_time = begin()
+        try:
+            result = await func(*args, **kwargs)
+        except Exception as e:
+            report_slow(start_time, e, args, kwargs)
+            raise
+        report_slow(start_time, None, args, kwargs)
+        return result
+
+    return async_slow_wrapper
+
+
+def _slow_call_wrapper(
+        func: Callable,
+        begin: Callable[[], int],
+        report_slow: Callable,
+        is_active: Callable[[int], bool],
+        level: int,
+) -> Callable:
+    """
+    Wrap a function for ``log_running_time(threshold=...)``, keeping the
+    arguments of each call for its report.
+
+    Args:
+        func: A plain, coroutine or async generator function.
+        begin: Reads the clock at the start of a call.
+        report_slow: Called with the start, the exception raised, if any,
+            and the arguments of each timed call.
+        is_active: Decides whether a call is timed.
+        level: The configured log level.
+
+    Returns:
+        The wrapper, of the same kind as the function.
+    """
+    if inspect.isasyncgenfunction(func):
+        return _slow_async_gen_wrapper(func, begin, report_slow, is_active,
+                                       level)
+
+    if inspect.iscoroutinefunction(func):
+        return _slow_coroutine_wrapper(func, begin, report_slow, is_active,
+                                       level)
+
+    @wraps(func)
+    def slow_wrapper(*args: Any, **kwargs: Any) -> Any:
+        if not _switch.on or not is_active(level):
+            return func(*args, **kwargs)
+
+        start_time = begin()
+        try:
+            result = func(*args, **kwargs)
+        except Exception as e:
+            report_slow(start_time, e, args, kwargs)
+            raise
+        report_slow(start_time, None, args, kwargs)
+        return result
+
+    return slow_wrapper
+
+
+class _Timing(NamedTuple):
+    """How ``log_running_time`` times the calls of one function."""
+
+    #: Reads the clock at the start of a call
+    begin: Callable[[], Any]
+    #: Called with what ``begin`` read and the exception raised, if any
+    report: Callable[[Any, Optional[BaseException]], object]
+    #: The clock generators are timed by
+    clock: Callable[[], Any]
+    #: Called with a generator that finished and the exception it raised, if
+    #: any
+    finish_generator: Callable[[TimedGenerator, Optional[BaseException]], None]
+
+
+def _check_timing_options(
+        measure_suspension: bool,
+        aggregate: bool,
+        summary_every: Optional[int],
+        summary_interval: Optional[float],
+        sample: Optional[Sampler],
+        cpu: bool,
+        threshold: Union[float, str, Threshold, None],
+) -> None:
+    """
+    Raise ValueError for options of ``log_running_time`` that do not go
+    together.
+    """
+    if not aggregate and (summary_every is not None
+                          or summary_interval is not None):
+        raise ValueError(
+            "summary_every and summary_interval require aggregate=True")
+    if summary_every is not None and summary_every < 1:
+        raise ValueError("summary_every must be positive")
+    if summary_interval is not None and summary_interval <= 0:
+        raise ValueError("summary_interval must be positive")
+    tail = sample is not None and sample.tail
+    if aggregate and tail:
+        raise ValueError(
+            "tail sampling cannot be combined with aggregate=True")
+    if cpu and measure_suspension:
+        raise ValueError("measure_suspension cannot be combined with cpu=True")
+    if threshold is not None and (aggregate or cpu or measure_suspension
+                                  or tail):
+        raise ValueError("threshold cannot be combined with aggregate, cpu, "
+                         "measure_suspension or tail sampling")
+
+
+def _timing_summary(
+        full_name: str,
+        registered_name: str,
+        cpu: bool,
+        log: Callable,
+        level: int,
+) -> Callable[[], None]:
+    """
+    Resolve how an aggregating timer logs the summary of a function.
+
+    Args:
+        full_name: The full qualified name of the function.
+        registered_name: The name the histograms are registered under.
+        cpu: Whether the summary includes the CPU and off-CPU histograms.
+        log: The log function of the wrapper.
+        level: The configured log level.
+
+    Returns:
+        A function logging the summary.
+    """
+    histogram = _get_timing_histogram(registered_name)
+    if cpu:
+        cpu_histogram = _get_timing_histogram(registered_name,
+                                              _cpu_histograms)
+        off_cpu_histogram = _get_timing_histogram(registered_name,
+                                                  _off_cpu_histograms)
+
+        def summarize() -> None:
+            stats = histogram.timing_stats()
+            cpu_stats = cpu_histogram.timing_stats()
+            off_cpu_stats = off_cpu_histogram.timing_stats()
+            log(level, 'Timing of [%s] over %d calls: min %.6f, mean %.6f, '
+                       'p50 %.6f, p90 %.6f, p99 %.6f, p99.9 %.6f, max %.6f '
+                       'seconds; CPU mean %.6f, p99 %.6f, off CPU mean '
+                       '%.6f, p99 %.6f seconds.',
+                full_name, stats.count, stats.min, stats.mean, stats.p50,
+                stats.p90, stats.p99, stats.p999, stats.max, cpu_stats.mean,
+                cpu_stats.p99, off_cpu_stats.mean, off_cpu_stats.p99,
+                extra=_extra(full_name, 'summary', int(stats.mean * 1e9),
+                             stats.count))
+    else:
+        def summarize() -> None:
+            stats = histogram.timing_stats()
+            log(level, 'Timing of [%s] over %d calls: min %.6f, mean %.6f, '
+                       'p50 %.6f, p90 %.6f, p99 %.6f, p99.9 %.6f, max %.6f '
+                       'seconds.',
+                full_name, stats.count, stats.min, stats.mean, stats.p50,
+                stats.p90, stats.p99, stats.p999, stats.max,
+                extra=_extra(full_name, 'summary', int(stats.mean * 1e9),
+                             stats.count))
+
+    return summarize
+
+
+def _aggregate_timing(
+        full_name: str,
+        registered_name: str,
+        cpu: bool,
+        summary_every: Optional[int],
+        summary_interval: Optional[float],
+        is_enabled: Callable[[int], bool],
+        log: Callable,
+        level: int,
+) -> _Timing:
+    """
+    Resolve how ``log_running_time(aggregate=True)`` records the calls of a
+    function into its histograms.
+
+    Args:
+        full_name: The full qualified name of the function.
+        registered_name: The name the histograms and the failed call counter
+            are registered under.
+        cpu: Also record CPU and off-CPU times; generators are timed by the
+            wall clock alone.
+        summary_every: Log a summary every N calls, or None.
+        summary_interval: Log a summary at most every this many seconds, or
+            None.
+        is_enabled: The level check of the wrapper.
+        log: The log function of the wrapper.
+        level: The configured log level.
+
+    Returns:
+        The timing, recording durations whether or not the level is enabled.
+    """
+    clock = time.perf_counter_ns
+    histogram = _get_timing_histogram(registered_name)
+    errors = _get_error_counter(registered_name)
+    summarize = _timing_summary(full_name, registered_name, cpu, log, level)
+    interval_ns = (None if summary_interval is None
+                   else int(summary_interval * 1e9))
+    next_summary = [0 if interval_ns is None else clock() + interval_ns]
+
+    def report_wall(start_time: int, error: Optional[BaseException]) -> int:
+        now = clock()
+        elapsed = now - start_time
+        calls = histogram.record(elapsed)
+        if error is not None:
+            errors.increment()
+        due = summary_every is not None and calls % summary_every == 0
+        if interval_ns is not None and now >= next_summary[0]:
+            next_summary[0] = now + interval_ns
+            due = True
+        if due and is_enabled(level):
+            summarize()
+        return elapsed
+
+    def finish_generator(
+            generator: TimedGenerator,
+            error: Optional[BaseException],
+    ) -> None:
+        # Shift the start so that the recorded duration is the active time
+        report_wall(clock() - generator.active, error)
+
+    if not cpu:
+        return _Timing(clock, report_wall, clock, finish_generator)
+
+    thread_clock = time.thread_time_ns
+    cpu_histogram = _get_timing_histogram(registered_name, _cpu_histograms)
+    off_cpu_histogram = _get_timing_histogram(registered_name,
+                                              _off_cpu_histograms)
+
+    def begin() -> Tuple[int, int]:
+        return clock(), thread_clock()
+
+    def report(start: Tuple[int, int], error: Optional[BaseException]) -> int:
+        cpu_time = thread_clock() - start[1]
+        cpu_histogram.record(cpu_time)
+        elapsed = report_wall(start[0], error)
+        off_cpu_histogram.record(max(elapsed - cpu_time, 0))
+        return elapsed
+
+    return _Timing(begin, report, clock, finish_generator)
+
+
+def _generator_report(
+        full_name: str,
+        keep: Optional[Callable[[float, Optional[BaseException]], bool]],
+        exceeded: Optional[Callable[[int], Optional[int]]],
+        log: Callable,
+        level: int,
+) -> Callable[[TimedGenerator, Optional[BaseException]], None]:
+    """
+    Resolve how ``log_running_time`` logs a generator that finished, timed by
+    ``time.perf_counter``.
+
+    Args:
+        full_name: The full qualified name of the generator function.
+        keep: The decision of a tail sampling policy, or None.
+        exceeded: The bound check of a threshold, or None.
+        log: The log function of the wrapper.
+        level: The configured log level.
+
+    Returns:
+        A function reporting a generator and the exception it raised, if any.
+    """
+    clock = time.perf_counter
+
+    def finish_generator(
+            generator: TimedGenerator,
+            error: Optional[BaseException],
+    ) -> None:
+        active = generator.active
+        if keep is not None and not keep(active, error):
+            return
+        if exceeded is not None and exceeded(int(active * 1e9)) is None:
+            return
+        extra = _extra(full_name, 'generator', int(active * 1e9),
+                       generator.items, error)
+        if error is None:
+            log(level, 'The generator [%s] produced %d items in %.6f seconds '
+                       'active (first item after %.6f, %.1f items/s, %.6f '
+                       'seconds in total).',
+                full_name, generator.items, active, generator.first or 0.0,
+                generator.items / active if active else 0.0,
+                clock() - generator.started, extra=extra)
+        else:
+            log(level, 'The generator [%s] failed after %d items and %.6f '
+                       'seconds active: %s: %s',
+                full_name, generator.items, active, type(error).__name__,
+                error, extra=extra)
+
+    return finish_generator
+
+
+def _cpu_timing(
+        full_name: str,
+        keep: Optional[Callable[[float, Optional[BaseException]], bool]],
+        log: Callable,
+        level: int,
+) -> _Timing:
+    """
+    Resolve how ``log_running_time(cpu=True)`` times and logs the calls of a
+    function.
+
+    Args:
+        full_name: The full qualified name of the function.
+        keep: The decision of a tail sampling policy, or None.
+        log: The log function of the wrapper.
+        level: The configured log level.
+
+    Returns:
+        The timing; generators are timed by the wall clock alone.
+    """
+    wall_clock = time.perf_counter_ns
+    thread_clock = time.thread_time_ns
+    process_clock = time.process_time_ns
+
+    # Read in the same order at the start and the end of a call
+    def begin() -> Tuple[int, int, int]:
+        return wall_clock(), thread_clock(), process_clock()
+
+    def report(
+            start: Tuple[int, int, int],
+            error: Optional[BaseException],
+    ) -> None:
+        elapsed_ns = wall_clock() - start[0]
+        cpu_time = (thread_clock() - start[1]) / 1e9
+        process_time = (process_clock() - start[2]) / 1e9
+        elapsed_time = elapsed_ns / 1e9
+        if keep is not None and not keep(elapsed_time, error):
+            return
+        extra = _extra(full_name, 'call', elapsed_ns, error=error)
+        off_cpu_time = max(elapsed_time - cpu_time, 0.0)
+        if error is None:
+            log(level, 'The call [%s] is completed in %.6f seconds '
+                       '(%.6f CPU, %.6f off CPU, %.6f CPU in the process).',
+                full_name, elapsed_time, cpu_time, off_cpu_time, process_time,
+                extra=extra)
+        else:
+            log(level, 'The call [%s] failed after %.6f seconds '
+                       '(%.6f CPU, %.6f off CPU, %.6f CPU in the process): '
+                       '%s: %s',
+                full_name, elapsed_time, cpu_time, off_cpu_time, process_time,
+                type(error).__name__, error, extra=extra)
+
+    return _Timing(begin, report, time.perf_counter,
+                   _generator_report(full_name, keep, None, log, level))
+
+
+def _call_timing(
+        full_name: str,
+        keep: Optional[Callable[[float, Optional[BaseException]], bool]],
+        exceeded: Optional[Callable[[int], Optional[int]]],
+        log: Callable,
+        level: int,
+) -> _Timing:
+    """
+    Resolve how ``log_running_time`` times and logs the calls of a function
+    by the wall clock.
+
+    Args:
+        full_name: The full qualified name of the function.
+        keep: The decision of a tail sampling policy, or None.
+        exceeded: The bound check of a threshold, which applies to
+            generators here, or None.
+        log: The log function of the wrapper.
+        level: The configured log level.
+
+    Returns:
+        The timing.
+    """
+    clock = time.perf_counter
+
+    def report(start_time: float, error: Optional[BaseException]) -> None:
+        elapsed_time = clock() - start_time
+        if keep is not None and not keep(elapsed_time, error):
+            return
+        extra = _extra(full_name, 'call', int(elapsed_time * 1e9), error=error)
+        if error is None:
+            log(level, 'The call [%s] is completed in %.6f seconds.',
+                full_name, elapsed_time, extra=extra)
+        else:
+            log(level, 'The call [%s] failed after %.6f seconds: %s: %s',
+                full_name, elapsed_time, type(error).__name__, error,
+                extra=extra)
+
+    return _Timing(clock, report, clock,
+                   _generator_report(full_name, keep, exceeded, log, level))
+
+
+def _slow_call_report(
+        full_name: str,
+        exceeded: Callable[[int], Optional[int]],
+        renderer: Optional[ArgRenderer],
+        log: Callable,
+        level: int,
+) -> Callable[[int, Optional[BaseException], tuple, dict], None]:
+    """
+    Resolve how ``log_running_time(threshold=...)`` logs the calls of a
+    function, timed by ``time.perf_counter_ns``.
+
+    Args:
+        full_name: The full qualified name of the function.
+        exceeded: The bound check of the threshold.
+        renderer: The ``ArgRenderer`` of the arguments, or None.
+        log: The log function of the wrapper.
+        level: The configured log level.
+
+    Returns:
+        A function for ``_slow_call_wrapper``, logging the calls over the
+        threshold.
+    """
+    clock = time.perf_counter_ns
+
+    def report_slow(
+            start: int,
+            error: Optional[BaseException],
+            args: tuple,
+            kwargs: dict,
+    ) -> None:
+        elapsed_ns = clock() - start
+        limit_ns = exceeded(elapsed_ns)
+        if limit_ns is None:
+            return
+        extra = _extra(full_name, 'call', elapsed_ns, error=error)
+        thread = threading.current_thread().name
+        args_info = _ArgsInfo(args, kwargs, renderer)
+        if error is None:
+            log(level, 'The call [%s] took %.6f seconds, over the threshold '
+                       'of %.6f, in thread %s, %s.',
+                full_name, elapsed_ns / 1e9, limit_ns / 1e9, thread,
+                args_info, extra=extra)
+        else:
+            log(level, 'The call [%s] failed after %.6f seconds, over the '
+                       'threshold of %.6f, in thread %s, %s: %s: %s',
+                full_name, elapsed_ns / 1e9, limit_ns / 1e9, thread,
+                args_info, type(error).__name__, error, extra=extra)
+
+    return report_slow
+
+
+def _timed_call_wrapper(
+        func: Callable,
+        timing: _Timing,
+        is_active: Callable[[int], bool],
+        level: int,
+) -> Callable:
+    """
+    Wrap a function for ``log_running_time``, reporting each timed call.
+
+    Args:
+        func: A plain or coroutine function.
+        timing: How the calls are timed and reported.
+        is_active: Decides whether a call is timed.
+        level: The configured log level.
+
+    Returns:
+        The wrapper, of the same kind as the function.
+    """
+    begin, report = timing.begin, timing.report
+
+    if inspect.iscoroutinefunction(func):
+        @wraps(func)
+        async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+            if not _switch.on or not is_active(level):
+                return await func(*args, **kwargs)
+
+            start_time = begin()
+            try:
+                result = await func(*args, **kwargs)
+            except Exception as e:
+                report(start_time, e)
+                raise
+            report(start_time, None)
+            return result
+
+        return async_wrapper
+
+    @wraps(func)
+    def reporting_wrapper(*args: Any, **kwargs: Any) -> Any:
+        if not _switch.on or not is_active(level):
+            return func(*args, **kwargs)
+
+        start_time = begin()
+        try:
+            result = func(*args, **kwargs)
+        except Exception as e:
+            report(start_time, e)
+            raise
+        report(start_time, None)
+        return result
+
+    return reporting_wrapper
+
+
+def _timed_async_gen_wrapper(
+        func: Callable,
+        timing: _Timing,
+        is_active: Callable[[int], bool],
+        level: int,
+) -> Callable:
+    """
+    Wrap an async generator function for ``log_running_time``, timing each
+    generator from the start of iteration until it is exhausted or closed.
+
+    Args:
+        func: An async generator function.
+        timing: How the generators are timed and reported.
+        is_active: Decides whether a generator is timed.
+        level: The configured log level.
+
+    Returns:
+        The wrapper, an async generator function.
+    """
+    begin, report = timing.begin, timing.report
+
+    def start(args: tuple, kwargs: dict) -> Any:
+        return begin() if _switch.on and is_active(level) else None
+
+    def finish(start_time: Any, error: Optional[BaseException]) -> None:
+        if start_time is not None and (error is None
+                                       or isinstance(error, Exception)):
+            report(start_time, error)
+
+    return wrap_async_gen(func, start, finish)
+
+
+def _timed_generator_wrapper(
+        func: Callable,
+        timing: _Timing,
+        is_active: Callable[[int], bool],
+        level: int,
+) -> Callable:
+    """
+    Wrap a generator function for ``log_running_time``, timing the active
+    time of each generator.
+
+    Args:
+        func: A generator function.
+        timing: How the generators are timed and reported.
+        is_active: Decides whether a generator is timed.
+        level: The configured log level.
+
+    Returns:
+        The wrapper, returning the generators of the function wrapped.
+    """
+    clock, finish_generator = timing.clock, timing.finish_generator
+
+    @wraps(func)
+    def generator_wrapper(*args: Any, **kwargs: Any) -> Any:
+        if not _switch.on or not is_active(level):
+            return func(*args, **kwargs)
+        return TimedGenerator(func(*args, **kwargs), clock, finish_generator)
+
+    return generator_wrapper
+
+
+def _suspension_wrapper(
+        func: Callable,
+        full_name: str,
+        timing: _Timing,
+        keep: Optional[Callable[[float, Optional[BaseException]], bool]],
+        is_active: Callable[[int], bool],
+        log: Callable,
+        level: int,
+) -> Callable:
+    """
+    Wrap a coroutine function for
+    ``log_running_time(measure_suspension=True)``.
+
+    Args:
+        func: A coroutine function.
+        full_name: The full qualified name of the function.
+        timing: The wall clock timing of the function, reporting failed calls.
+        keep: The decision of a tail sampling policy, or None.
+        is_active: Decides whether a call is timed.
+        log: The log function of the wrapper.
+        level: The configured log level.
+
+    Returns:
+        The wrapper, a coroutine function.
+    """
+    clock, report = timing.clock, timing.report
+
+    @wraps(func)
+    async def suspension_wrapper(*args: Any, **kwargs: Any) -> Any:
+        if not _switch.on or not is_active(level):
+            return await func(*args, **kwargs)
+
+        timer = StepTimer(func(*args, **kwargs), clock)
+        start_time = clock()
+        try:
+            result = await timer
+        except Exception as e:
+            report(start_time, e)
+            raise
+        elapsed_time = clock() - start_time
+        if keep is None or keep(elapsed_time, None):
+            log(level, 'The call [%s] is completed in %.6f seconds '
+                       '(%.6f running, %.6f suspended).',
+                full_name, elapsed_time, timer.running,
+                elapsed_time - timer.running,
+                extra=_extra(full_name, 'call', int(elapsed_time * 1e9)))
+        return result
+
+    return suspension_wrapper
+
+
+def _plain_timing_wrapper(
+        func: Callable,
+        full_name: str,
+        is_enabled: Callable[[int], bool],
+        log: Callable,
+        level: int,
+) -> Callable:
+    """
+    Wrap a plain function for ``log_running_time`` without options, logging
+    every call while the level is enabled.
+
+    Args:
+        func: A plain function.
+        full_name: The full qualified name of the function.
+        is_enabled: The level check of the wrapper.
+        log: The log function of the wrapper.
+        level: The configured log level.
+
+    Returns:
+        The wrapper.
+    """
+    clock = time.perf_counter
+
+    @wraps(func)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        # Nothing would be emitted, so don't even read the clock
+        if not _switch.on or not is_enabled(level):
+            return func(*args, **kwargs)
+
+        start_time = clock()
+        try:
+            result = func(*args, **kwargs)
+        except Exception as e:
+            elapsed_time = clock() - start_time
+            log(level, 'The call [%s] failed after %.6f seconds: %s: %s',
+                full_name, elapsed_time, type(e).__name__, e,
+                extra=_extra(full_name, 'call', int(elapsed_time * 1e9),
+                             error=e))
+            raise
+        elapsed_time = clock() - start_time
+        log(level, 'The call [%s] is completed in %.6f seconds.',
+            full_name, elapsed_time,
+            extra=_extra(full_name, 'call', int(elapsed_time * 1e9)))
+        return result
+
+    return wrapper
+
+
+def log_running_time(
+        level: int = logging.DEBUG,
+        logger: Optional[logging.Logger] = None,
+        measure_suspension: bool = False,
+        aggregate: bool = False,
+        summary_every: Optional[int] = None,
+        summary_interval: Optional[float] = None,
+        sample: Optional[Sampler] = None,
+        emitter: Optional[QueuedEmitter] = None,
+        sink: Optional[EventSink] = None,
+        cpu: bool = False,
+        call_tree: bool = False,
+        threshold: Union[float, str, Threshold, None] = None,
+        renderer: Optional[ArgRenderer] = None,
+) -> Callable:
+    """
+    Decorator to log the execution time of a function.
+
+    Coroutine functions are timed until the awaited call completes, and async
+    generator functions from the start of iteration until the generator is
+    exhausted or closed.
+
+    Generator functions are timed only while the generator runs, not while
+    the consumer handles its items. When the generator is exhausted, fails,
+    is closed or is garbage collected, the line reports that active time
+    with the item count, the throughput and the time to the first item.
+
+    In aggregate mode no line is logged per call. Every duration is recorded
+    into a fixed-memory histogram for the function instead, which
+    ``get_timing_stats`` reads, and a summary line is logged every
+    ``summary_every`` calls and/or every ``summary_interval`` seconds.
+
+    With ``cpu``, the CPU time of the calling thread is measured as well,
+    which splits the wall time into time on the CPU and time off it:
+    blocked on I/O, sleeping or waiting for the GIL. Lines also give the CPU
+    time of the whole process, and in aggregate mode the CPU and off-CPU
+    times go into histograms of their own, which
+    ``get_timing_stats(func, clock=...)`` reads.
+
+    With ``call_tree``, calls are also recorded in a tree of call paths,
+    whether or not the level is enabled: each node is one function called
+    from one path of the decorated functions, with the time spent in the
+    calls (inclusive) and that time minus the time of the decorated
+    functions they called (exclusive, or self time). ``get_call_tree`` reads
+    the tree and ``print_hotspots`` ranks the functions by self time.
+    Threads start at the root of the tree, and asyncio tasks under the call
+    that created them.
+
+    With ``threshold``, fast calls are timed but not logged. A call slower
+    than the threshold logs its duration, the threshold, the thread it ran
+    in and its arguments, rendered only if the record is formatted. The
+    threshold is fixed, in seconds, or follows a percentile of the
+    function's recent calls, like ``'p99'``; see ``py_debug.thresholds``.
+    Generator functions are checked on their active time, without
+    arguments.
+
+    Every record also carries its numbers as an ``Event`` in the
+    ``py_debug`` attribute; with ``sink``, only the events are written.
+
+    Args:
+        level: The logging level to use (default: logging.DEBUG).
+        logger: The logger to report to (default: the logger named after the
+            decorated function's module).
+        measure_suspension: For coroutine functions, also report how much of
+            the time the call was running on the event loop and how much it
+            was suspended (default: False). Ignored in aggregate mode.
+        aggregate: Record durations into a histogram instead of logging each
+            call (default: False).
+        summary_every: In aggregate mode, log a summary every N calls
+            (default: None, never).
+        summary_interval: In aggregate mode, log a summary at most every this
+            many seconds, checked when a call completes (default: None, never).
+        sample: A sampling policy from ``py_debug.sampling`` deciding which
+            calls are timed (default: None, all of them). ``Tail`` policies
+            decide after the call and cannot be combined with aggregate mode.
+        emitter: A ``QueuedEmitter`` that formats and handles the records on
+            a background thread (default: None, log in the calling thread).
+        sink: An ``EventSink`` the structured events are written to instead
+            of logging them (default: None). The level does not apply to it.
+        cpu: Also measure CPU time (default: False). Cannot be combined with
+            ``measure_suspension``, and ignored for generator functions. For
+            coroutine functions the thread's CPU time includes the other
+            tasks the event loop ran in the meantime.
+        call_tree: Record the calls in the call tree (default: False).
+            Ignored for generator and async generator functions.
+        threshold: Only log calls slower than this, in seconds, as a
+            percentile string such as ``'p99.9'``, or as a ``Threshold``
+            (default: None, log every call). Cannot be combined with
+            aggregate mode, ``cpu``, ``measure_suspension`` or ``Tail``
+            policies.
+        renderer: The ``ArgRenderer`` limiting how the arguments of slow
+            calls are rendered (default: one with its default limits).
+
+    Returns:
+        A decorator function.
+
+    Example:
+        >>> import logging
+        >>> logging.basicConfig(level=logging.DEBUG)
+        >>>
+        >>> @log_running_time()
+        ... def my_function():
+        ...     time.sleep(0.1)
+        ...     return 42
+        >>>
+        >>> result = my_function()  # Logs execution time
+    """
+    _check_timing_options(measure_suspension, aggregate, summary_every,
+                          summary_interval, sample, cpu, threshold)
+    _reject_emitter_with_sink(emitter, sink)
+    keep = sample.keep if sample is not None and sample.tail else None
+    slow = None if threshold is None else as_threshold(threshold)
+
+    def decorator(func: Callable) -> Callable:
+        if not _switch.wrap:
+            return func
+        # Everything that does not depend on the call is resolved once, here
+        full_name = _get_function_name(func)
+        is_enabled, log = _get_emitter(_get_logger(func, logger), level,
+                                       full_name, emitter, sink)
+        exceeded = None if slow is None else slow.bind()
+
+        if aggregate:
+            # Durations are recorded whether or not the level is enabled
+            is_active = _sampled(_always_enabled, sample)
+            timing = _aggregate_timing(full_name, _get_qualified_name(func),
+                                       cpu, summary_every, summary_interval,
+                                       is_enabled, log, level)
+        else:
+            is_active = _sampled(is_enabled, sample)
+            timing = (_cpu_timing(full_name, keep, log, level) if cpu
+                      else _call_timing(full_name, keep, exceeded, log, level))
+
+        if inspect.isgeneratorfunction(func):
+            return _timed_generator_wrapper(func, timing, is_active, level)
+        if call_tree and not inspect.isasyncgenfunction(func):
+            func = _tree_tracked(func, full_name)
+        if exceeded is not None:
+            report_slow = _slow_call_report(full_name, exceeded, renderer,
+                                            log, level)
+            return _slow_call_wrapper(func, time.perf_counter_ns, report_slow,
+                                      is_active, level)
+        if (inspect.iscoroutinefunction(func) and measure_suspension
+                and not aggregate):
+            return _suspension_wrapper(func, full_name, timing, keep,
+                                       is_active, log, level)
+        if inspect.isasyncgenfunction(func):
+            return _timed_async_gen_wrapper(func, timing, is_active, level)
+        if (aggregate or sample is not None or cpu
+                or inspect.iscoroutinefunction(func)):
+            return _timed_call_wrapper(func, timing, is_active, level)
+        return _plain_timing_wrapper(func, full_name, is_enabled, log, level)
+
+    return decorator
+
+
+def _async_args_wrapper(
+        func: Callable,
+        full_name: str,
+        renderer: Optional[ArgRenderer],
+        is_active: Callable[[int], bool],
+        log: Callable,
+        level: int,
+) -> Callable:
+    """
+    Wrap a coroutine or async generator function for ``log_args``, logging
+    when the call is awaited or iteration begins.
+
+    Args:
+        func: A coroutine or async generator function.
+        full_name: The full qualified name of the function.
+        renderer: The renderer bounding the output, or None for the default.
+        is_active: The level check of the wrapper, with its sampler.
+        log: The log function of the wrapper.
+        level: The configured log level.
+
+    Returns:
+        The wrapper, of the same kind as the function.
+    """
+    def log_call(args: tuple, kwargs: dict) -> None:
+        if _switch.on and is_active(level):
+            log(level, 'Function %s has been called %s.', full_name,
+                _ArgsInfo(args, kwargs, renderer),
+                extra=_extra(full_name, 'args'))
+
+    if inspect.isasyncgenfunction(func):
+        return wrap_async_gen(func, log_call)
+
+    @wraps(func)
+    async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+        log_call(args, kwargs)
+        return await func(*args, **kwargs)
+
+    return async_wrapper
+
+
+def log_args(
+        level: int = logging.DEBUG,
+        logger: Optional[logging.Logger] = None,
+        sample: Optional[Sampler] = None,
+        emitter: Optional[QueuedEmitter] = None,
+        renderer: Optional[ArgRenderer] = None,
+        sink: Optional[EventSink] = None,
+) -> Callable:
+    """
+    Decorator to log the arguments passed to a function.
+
+    Coroutine functions are logged when the call is awaited, and async
+    generator functions when iteration begins. Arguments are rendered within
+    the length, depth and item limits of an ``ArgRenderer``, so large
+    payloads are summarized instead of repr'd in full. The ``Event`` of each
+    record, in its ``py_debug`` attribute, carries no arguments.
+
+    Args:
+        level: The logging level to use (default: logging.DEBUG).
+        logger: The logger to report to (default: the logger named after the
+            decorated function's module).
+        sample: A sampling policy from ``py_debug.sampling`` deciding which
+            calls are logged (default: None, all of them).
+        emitter: A ``QueuedEmitter`` that formats and handles the records on
+            a background thread (default: None, log in the calling thread).
+        renderer: The ``ArgRenderer`` limiting how arguments are rendered
+            (default: one with its default limits).
+        sink: An ``EventSink`` the structured events are written to instead
+            of logging them (default: None). The level does not apply to it.
+
+    Returns:
+        A decorator function.
+
+    Example:
+        >>> import logging
+        >>> logging.basicConfig(level=logging.DEBUG)
+        >>>
+        >>> @log_args()
+        ... def add(a, b):
+        ...     return a + b
+        >>>
+        >>> # Logs: Function add has been called with args = (1, 2).
+        >>> result = add(1, 2)
+    """
+    _reject_tail_sampler(sample)
+    _reject_emitter_with_sink(emitter, sink)
+
+    def decorator(func: Callable) -> Callable:
+        if not _switch.wrap:
+            return func
+        full_name = _get_function_name(func)
+        is_enabled, log = _get_emitter(_get_logger(func, logger), level,
+                                       full_name, emitter, sink)
+        is_active = _sampled(is_enabled, sample)
+
+        if (inspect.isasyncgenfunction(func)
+                or inspect.iscoroutinefunction(func)):
+            return _async_args_wrapper(func, full_name, renderer, is_active,
+                                       log, level)
+
+        @wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            if _switch.on and is_active(level):
+                log(level, 'Function %s has been called %s.', full_name,
+                    _ArgsInfo(args, kwargs, renderer),
+                    extra=_extra(full_name, 'args'))
+            return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def _rate_tracker(
+        func: Callable,
+        full_name: str,
+        buckets: int,
+        resolution: float,
+        threshold: Optional[float],
+        is_enabled: Callable[[int], bool],
+        log: Callable,
+        level: int,
+) -> Callable[[], object]:
+    """
+    Resolve how a counting wrapper records its calls in a rate window.
+
+    Args:
+        func: The decorated function.
+        full_name: The full qualified name of the decorated function.
+        buckets: The number of buckets of the window.
+        resolution: The duration of a bucket in seconds.
+        threshold: The calls/s to log crossings of, or None.
+        is_enabled: The level check of the wrapper.
+        log: The log function of the wrapper.
+        level: The configured log level.
+
+    Returns:
+        A function recording one call, which also logs threshold crossings.
+    """
+    window = _rate_windows.get(func, _get_qualified_name(func),
+                               partial(RateWindow, buckets, resolution))
+    if threshold is None:
+        return window.record
+    above = [False]
+
+    def track() -> None:
+        # The rate only changes when a bucket completes
+        if not window.record():
+            return
+        rate = window.rate()
+        if (rate > threshold) == above[0]:
+            return
+        above[0] = not above[0]
+        if is_enabled(level):
+            if above[0]:
+                log(level, 'The call rate of %s rose to %.1f calls/s, above '
+                           '%.1f.', full_name, rate, threshold,
+                    extra=_extra(full_name, 'rate', count=int(rate)))
+            else:
+                log(level, 'The call rate of %s fell to %.1f calls/s, below '
+                           '%.1f.', full_name, rate, threshold,
+                    extra=_extra(full_name, 'rate', count=int(rate)))
+
+    return track
+
+
+def _count_schedule(
+        full_name: str,
+        schedule: Optional[Schedule],
+        logged_first: int,
+        log_every: int,
+        log: Callable,
+        level: int,
+) -> Tuple[Callable[[int], bool], Callable[[int], None]]:
+    """
+    Resolve which calls of a counted function log a line, and the line.
+
+    Args:
+        full_name: The full qualified name of the function.
+        schedule: The log schedule, or None to log the first
+            ``logged_first`` calls, then every ``log_every``-th call.
+        logged_first: The number of initial calls logged.
+        log_every: Log every Nth call after the first ones.
+        log: The log function of the wrapper.
+        level: The configured log level.
+
+    Returns:
+        A check of whether a call number is due a line, and a function
+        logging the line of a call number.
+    """
+    if schedule is None:
+        def is_due(call_count: int) -> bool:
+            return call_count <= logged_first or call_count % log_every == 0
+
+        def report(call_count: int) -> None:
+            log(level, 'Function %s has been called %d times.',
+                full_name, call_count,
+                extra=_extra(full_name, 'count', count=call_count))
+
+        return is_due, report
+
+    last_line = [0]
+
+    def report_since(call_count: int) -> None:
+        log(level, 'Function %s has been called %d times, '
+                   '%d since the last line.',
+            full_name, call_count, call_count - last_line[0],
+            extra=_extra(full_name, 'count', count=call_count))
+        last_line[0] = call_count
+
+    return schedule.bind(), report_since
+
+
+def _call_counting(
+        counter: CallCounter,
+        publish: Optional[Callable[[], None]],
+        track: Optional[Callable[[], object]],
+        is_due: Callable[[int], bool],
+        report: Callable[[int], None],
+        is_active: Callable[[int], bool],
+        level: int,
+) -> Callable[..., bool]:
+    """
+    Resolve how a counting wrapper with options counts one call.
+
+    Args:
+        counter: The counter of the function.
+        publish: Counts the call in ``SharedCounters``, or None.
+        track: Records the call in a rate window, or None.
+        is_due: Whether a call number is due a line.
+        report: Logs the line of a call number.
+        is_active: The level check of the wrapper, with its sampler.
+        level: The configured log level.
+
+    Returns:
+        A function counting one call, which also takes the arguments
+        ``wrap_async_gen`` passes to it. It returns False if the call was
+        counted without logging a line.
+    """
+    def count_call(args: tuple = (), kwargs: Optional[dict] = None) -> bool:
+        if not _switch.on:
+            return True
+        if publish is not None:
+            publish()
+        if track is not None:
+            track()
+        call_count = counter.increment()
+        if is_due(call_count) and is_active(level):
+            report(call_count)
+            return True
+        return False
+
+    return count_call
+
+
+def _counting_wrapper(
+        func: Callable,
+        count_call: Callable[..., bool],
+) -> Callable:
+    """
+    Wrap a function of any kind so that it counts its calls.
+
+    Args:
+        func: The decorated function; coroutine functions are counted when
+            the call is awaited, and async generator functions when
+            iteration begins.
+        count_call: Counts one call.
+
+    Returns:
+        The wrapper, of the same kind as the function.
+    """
+    if inspect.isasyncgenfunction(func):
+        return wrap_async_gen(func, count_call)
+
+    if inspect.iscoroutinefunction(func):
+        @wraps(func)
+        async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+            count_call()
+            return await func(*args, **kwargs)
+
+        return async_wrapper
+
+    @wraps(func)
+    def counting_wrapper(*args: Any, **kwargs: Any) -> Any:
+        count_call()
+        return func(*args, **kwargs)
+
+    return counting_wrapper
+
+
+def _invalid_level_coroutine_wrapper(
+        func: Callable,
+        count_call: Callable[..., bool],
+        finish: Callable[[bool, Optional[BaseException]], None],
+) -> Callable:
+    """
+    Wrap a coroutine function for ``log_call_counter`` with an invalid level.
+
+    Args:
+        func: A coroutine function.
+        count_call: Counts one call, returning False if it logged no line.
+        finish: Called with the result of ``count_call`` and the exception
+            the call raised.
+
+    Returns:
+        The wrapper, a coroutine function.
+    """
+    @wraps(func)
+    async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+        warned = count_call()
+        try:
+            return await func(*args, **kwargs)
+        except Exception as e:
+            finish(warned, e)
+            raise
+
+    return async_wrapper
+
+
+def _invalid_level_count_wrapper(
+        func: Callable,
+        count_call: Callable[..., bool],
+        warn: Callable[[], None],
+) -> Callable:
+    """
+    Wrap a function of any kind for ``log_call_counter`` with an invalid
+    level: the warning about the level replaces the lines the calls are due,
+    and is also given for a call that fails with an exception without being
+    due a line.
+
+    Args:
+        func: The decorated function.
+        count_call: Counts one call, returning False if it logged no line.
+        warn: Warns about the invalid level.
+
+    Returns:
+        The wrapper, of the same kind as the function.
+    """
+    def finish(warned: bool, error: Optional[BaseException]) -> None:
+        if not warned and isinstance(error, Exception):
+            warn()
+
+    if inspect.isasyncgenfunction(func):
+        return wrap_async_gen(func, count_call, finish)
+
+    if inspect.iscoroutinefunction(func):
+        return _invalid_level_coroutine_wrapper(func, count_call, finish)
+
+    @wraps(func)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        warned = count_call()
+        try:
+            return func(*args, **kwargs)
+        except Exception as e:
+            finish(warned, e)
+            raise
+
+    return wrapper
+
+
+def _shared_count_wrapper(
+        func: Callable,
+        full_name: str,
+        counter: CallCounter,
+        publish: Callable[[], None],
+        logged_first: int,
+        log_every: int,
+        is_active: Callable[[int], bool],
+        log: Callable,
+        level: int,
+) -> Callable:
+    """
+    Wrap a plain function for ``log_call_counter(shared=...)`` without a
+    rate window or schedule.
+
+    Args:
+        func: A plain function.
+        full_name: The full qualified name of the function.
+        counter: The counter of the function.
+        publish: Counts the call in ``SharedCounters``.
+        logged_first: The number of initial calls logged.
+        log_every: Log every Nth call after the first ones.
+        is_active: The level check of the wrapper, with its sampler.
+        log: The log function of the wrapper.
+        level: The configured log level.
+
+    Returns:
+        The wrapper.
+    """
+    @wraps(func)
+    def shared_wrapper(*args: Any, **kwargs: Any) -> Any:
+        if not _switch.on:
+            return func(*args, **kwargs)
+
+        publish()
+        call_count = counter.increment()
+        if ((call_count <= logged_first or call_count % log_every == 0)
+                and is_active(level)):
+            log(level, 'Function %s has been called %d times.',
+                full_name, call_count,
+                extra=_extra(full_name, 'count', count=call_count))
+        return func(*args, **kwargs)
+
+    return shared_wrapper
+
+
+def _plain_count_wrapper(
+        func: Callable,
+        full_name: str,
+        counter: CallCounter,
+        logged_first: int,
+        log_every: int,
+        is_active: Callable[[int], bool],
+        log: Callable,
+        level: int,
+) -> Callable:
+    """
+    Wrap a plain function for ``log_call_counter`` without a rate window,
+    schedule or shared counters.
+
+    Args:
+        func: A plain function.
+        full_name: The full qualified name of the function.
+        counter: The counter of the function.
+        logged_first: The number of initial calls logged.
+        log_every: Log every Nth call after the first ones.
+        is_active: The level check of the wrapper, with its sampler.
+        log: The log function of the wrapper.
+        level: The configured log level.
+
+    Returns:
+        The wrapper.
+    """
+    @wraps(func)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        if not _switch.on:
+            return func(*args, **kwargs)
+
+        # Thread-safe counter increment, lock-free on GIL builds
+        call_count = counter.increment()
+
+        # Log the first mute_after calls, then every log_every-th call
+        if ((call_count <= logged_first or call_count % log_every == 0)
+                and is_active(level)):
+            log(level, 'Function %s has been called %d times.',
+                full_name, call_count,
+                extra=_extra(full_name, 'count', count=call_count))
+
+        return func(*args, **kwargs)
+
+    return wrapper
+
+
+def log_call_counter(
+        level: int = logging.DEBUG,
+        mute_after: int = 5,
+        log_every: int = 10,
+        logger: Optional[logging.Logger] = None,
+        sample: Optional[Sampler] = None,
+        emitter: Optional[QueuedEmitter] = None,
+        shared: Optional[SharedCounters] = None,
+        rate_window: Optional[int] = None,
+        rate_resolution: float = 1.0,
+        rate_threshold: Optional[float] = None,
+        schedule: Optional[Schedule] = None,
+        sink: Optional[EventSink] = None,
+) -> Callable:
+    """
+    Decorator to log the number of times a function has been called.
+
+    Coroutine functions are counted when the call is awaited, and async
+    generator functions when iteration begins. The logged numbers and
+    ``get_call_count`` cover the current process; with ``shared``, calls
+    are also counted in ``SharedCounters`` that every process can read.
+
+    With ``rate_window``, calls are also counted in a sliding window of
+    ``rate_window`` buckets of ``rate_resolution`` seconds each, which
+    ``get_call_rate`` reads as the current and peak calls/s and their moving
+    average. With ``rate_threshold`` as well, a line is logged whenever a
+    completed bucket takes the rate above the threshold, and again when it
+    falls back; the check runs once per bucket, not per call. Every record
+    also carries its numbers as an ``Event`` in the ``py_debug`` attribute.
+
+    Args:
+        level: The logging level to use (default: logging.DEBUG).
+        mute_after: Number of initial calls to log before muting (default: 5).
+        log_every: Log every Nth call after muting (default: 10).
+        logger: The logger to report to (default: the logger named after the
+            decorated function's module).
+        sample: A sampling policy from ``py_debug.sampling`` deciding which
+            of the scheduled lines are logged (default: None, all of them).
+            Calls are counted either way.
+        emitter: A ``QueuedEmitter`` that formats and handles the records on
+            a background thread (default: None, log in the calling thread).
+        shared: ``SharedCounters`` that also count the calls of all
+            processes (default: None, count in this process only).
+        rate_window: The number of buckets of the call rate window
+            (default: None, no window).
+        rate_resolution: The duration of a window bucket in seconds
+            (default: 1.0).
+        rate_threshold: The calls/s to log crossings of (default: None,
+            never log the rate). Requires ``rate_window``.
+        schedule: A log schedule from ``py_debug.schedules`` deciding which
+            calls log a line, replacing ``mute_after`` and ``log_every``
+            (default: None). Its lines also give the calls since the last line.
+        sink: An ``EventSink`` the structured events are written to instead
+            of logging them (default: None). The level does not apply to it.
+
+    Returns:
+        A decorator function.
+
+    Example:
+        >>> import logging
+        >>> logging.basicConfig(level=logging.DEBUG)
+        >>>
+        >>> @log_call_counter(mute_after=2, log_every=5)
+        ... def my_function():
+        ...     return True
+        >>>
+        >>> for i in range(20):
+        ...     my_function()  # Logs first 2 calls, then every 5th call
+    """
+    if mute_after < 0:
+        raise ValueError("mute_after must be non-negative")
+    if log_every < 1:
+        raise ValueError("log_every must be positive")
+    if rate_window is None and rate_threshold is not None:
+        raise ValueError("rate_threshold requires rate_window")
+    _reject_tail_sampler(sample)
+    _reject_emitter_with_sink(emitter, sink)
+
+    def decorator(func: Callable) -> Callable:
+        if not _switch.wrap:
+            return func
+        full_name = _get_function_name(func)
+        registered_name = _get_qualified_name(func)
+        counter = _get_call_counter(func, registered_name)
+        is_enabled, log = _get_emitter(_get_logger(func, logger), level,
+                                       full_name, emitter, sink)
+        is_active = _sampled(is_enabled, sample)
+        publish = None if shared is None else shared.publisher(registered_name)
+        track = None if rate_window is None else _rate_tracker(
+            func, full_name, rate_window, rate_resolution, rate_threshold,
+            is_enabled, log, level)
+
+        invalid_level = sink is None and is_enabled is _always_enabled
+        if (invalid_level or track is not None or schedule is not None
+                or inspect.iscoroutinefunction(func)
+                or inspect.isasyncgenfunction(func)):
+            is_due, report = _count_schedule(
+                full_name, schedule, mute_after, log_every, log, level)
+            count_call = _call_counting(
+                counter, publish, track, is_due, report, is_active, level)
+            if invalid_level:
+                return _invalid_level_count_wrapper(func, count_call,
+                                                    partial(log, level))
+            return _counting_wrapper(func, count_call)
+        if publish is not None:
+            return _shared_count_wrapper(
+                func, full_name, counter, publish, mute_after, log_every,
+                is_active, log, level)
+        return _plain_count_wrapper(
+            func, full_name, counter, mute_after, log_every,
+            is_active, log, level)
+
+    return decorator
+
+
+def _memory_summary(
+        func: Callable,
+        full_name: str,
+        summary_every: Optional[int],
+        is_enabled: Callable[[int], bool],
+        log: Callable,
+        level: int,
+) -> Callable[[MemoryUsage, Optional[BaseException]], None]:
+    """
+    Resolve how ``log_memory_usage(aggregate=True)`` adds a call to the
+    totals of a function.
+
+    Args:
+        func: The decorated function.
+        full_name: The full qualified name of the function.
+        summary_every: Log a summary every N calls, or None.
+        is_enabled: The level check of the wrapper.
+        log: The log function of the wrapper.
+        level: The configured log level.
+
+    Returns:
+        A function recording the usage of one call.
+    """
+    totals = _memory_aggregates.get(
+        func, _get_qualified_name(func), MemoryAggregate)
+
+    def report(usage: MemoryUsage, error: Optional[BaseException]) -> None:
+        calls = totals.record(usage)
+        if (summary_every is not None and calls % summary_every == 0
+                and is_enabled(level)):
+            stats = totals.stats()
+            log(level, 'Memory of [%s] over %d calls: net mean %.1f, '
+                       'max %d bytes; peak max %d bytes; '
+                       'RSS %+d bytes in total.',
+                full_name, stats.count, stats.net_mean, stats.net_max,
+                stats.peak_max, stats.rss_total,
+                extra=_extra(full_name, 'summary', count=stats.count))
+
+    return report
+
+
+def _memory_line(
+        full_name: str,
+        log: Callable,
+        level: int,
+) -> Callable[[MemoryUsage, Optional[BaseException]], None]:
+    """
+    Resolve how ``log_memory_usage`` logs the usage of one call.
+
+    Args:
+        full_name: The full qualified name of the function.
+        log: The log function of the wrapper.
+        level: The configured log level.
+
+    Returns:
+        A function logging the usage of one call.
+    """
+    def report(usage: MemoryUsage, error: Optional[BaseException]) -> None:
+        used = usage.rss if usage.net is None else usage.net
+        extra = _extra(full_name, 'memory', count=used, error=error)
+        if error is None:
+            log(level, 'The call [%s] used memory: %s.',
+                full_name, usage, extra=extra)
+        else:
+            log(level, 'The call [%s] failed: %s: %s (memory: %s).',
+                full_name, type(error).__name__, error, usage, extra=extra)
+
+    return report
+
+
+def _measured_async_gen(
+        func: Callable,
+        probe: MemoryProbe,
+        report: Callable[[MemoryUsage, Optional[BaseException]], None],
+        is_active: Callable[[int], bool],
+        level: int,
+) -> Callable:
+    """
+    Wrap an async generator function for ``log_memory_usage``, measuring
+    from the start of iteration until it ends.
+
+    Args:
+        func: An async generator function.
+        probe: Measures the memory of a call.
+        report: Reports the usage of a measured call.
+        is_active: The level check of the wrapper, with its sampler.
+        level: The configured log level.
+
+    Returns:
+        The wrapper.
+    """
+    def start(args: tuple, kwargs: dict) -> Any:
+        if _switch.on and is_active(level):
+            return probe.begin()
+        return None
+
+    def finish(state: Any, error: Optional[BaseException]) -> None:
+        if state is None:
+            return
+        usage = probe.end(state)
+        if error is None or isinstance(error, Exception):
+            report(usage, error)
+
+    return wrap_async_gen(func, start, finish)
+
+
+def _measured_generator(
+        func: Callable,
+        probe: MemoryProbe,
+        report: Callable[[MemoryUsage, Optional[BaseException]], None],
+        is_active: Callable[[int], bool],
+        level: int,
+) -> Callable:
+    """
+    Wrap a generator function for ``log_memory_usage``, measuring from the
+    start of iteration until the generator is exhausted or closed.
+
+    Args:
+        func: A generator function.
+        probe: Measures the memory of a call.
+        report: Reports the usage of a measured call.
+        is_active: The level check of the wrapper, with its sampler.
+        level: The configured log level.
+
+    Returns:
+        The wrapper.
+    """
+    @wraps(func)
+    def generator_wrapper(*args: Any, **kwargs: Any) -> Any:
+        if not _switch.on or not is_active(level):
+            return (yield from func(*args, **kwargs))
+
+        state = probe.begin()
+        try:
+            result = yield from func(*args, **kwargs)
+        except Exception as e:
+            report(probe.end(state), e)
+            raise
+        except GeneratorExit:
+            # Closed early, which is no failure
+            report(probe.end(state), None)
+            raise
+        except BaseException:
+            probe.end(state)
+            raise
+        report(probe.end(state), None)
+        return result
+
+    return generator_wrapper
+
+
+def _measured_coroutine(
+        func: Callable,
+        probe: MemoryProbe,
+        report: Callable[[MemoryUsage, Optional[BaseException]], None],
+        is_active: Callable[[int], bool],
+        level: int,
+) -> Callable:
     """
-    Get the full qualified name of a function.
+    Wrap a coroutine function for ``log_memory_usage``, measuring until the
+    awaited call completes.
 
     Args:
-        func: The function to get the name for.
+        func: A coroutine function.
+        probe: Measures the memory of a call.
+        report: Reports the usage of a measured call.
+        is_active: The level check of the wrapper, with its sampler.
+        level: The configured log level.
 
     Returns:
-        The full qualified name (module.function_name).
+        The wrapper.
     """
-    return f'{func.__module__}.{func.__name__}'
+    @wraps(func)
+    async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+        if not _switch.on or not is_active(level):
+            return await func(*args, **kwargs)
+
+        state = probe.begin()
+        try:
+            result = await func(*args, **kwargs)
+        except Exception as e:
+            report(probe.end(state), e)
+            raise
+        except BaseException:
+            # Cancelled or interrupted: end the measurement, report nothing
+            probe.end(state)
+            raise
+        report(probe.end(state), None)
+        return result
+
+    return async_wrapper
 
 
-def _format_args_info(args: tuple, kwargs: dict) -> str:
+def _measured_call(
+        func: Callable,
+        probe: MemoryProbe,
+        report: Callable[[MemoryUsage, Optional[BaseException]], None],
+        is_active: Callable[[int], bool],
+        level: int,
+) -> Callable:
     """
-    Format function arguments for logging.
+    Wrap a plain function for ``log_memory_usage``.
 
     Args:
-        args: Positional arguments.
-        kwargs: Keyword arguments.
+        func: A plain function.
+        probe: Measures the memory of a call.
+        report: Reports the usage of a measured call.
+        is_active: The level check of the wrapper, with its sampler.
+        level: The configured log level.
 
     Returns:
-        A formatted string describing the arguments.
+        The wrapper.
     """
-    if not args and not kwargs:
-        return 'without args'
-    elif args and not kwargs:
-        return f'with {args = }'
-    elif not args and kwargs:
-        return f'with {kwargs = }'
-    else:
-        return f'{args = } and {kwargs = }'
+    @wraps(func)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        if not _switch.on or not is_active(level):
+            return func(*args, **kwargs)
 
+        state = probe.begin()
+        try:
+            result = func(*args, **kwargs)
+        except Exception as e:
+            report(probe.end(state), e)
+            raise
+        except BaseException:
+            probe.end(state)
+            raise
+        report(probe.end(state), None)
+        return result
 
-def log_running_time(level: int = logging.DEBUG) -> Callable:
+    return wrapper
+
+
+def log_memory_usage(
+        level: int = logging.DEBUG,
+        logger: Optional[logging.Logger] = None,
+        trace: bool = True,
+        rss: bool = True,
+        aggregate: bool = False,
+        summary_every: Optional[int] = None,
+        sample: Optional[Sampler] = None,
+        emitter: Optional[QueuedEmitter] = None,
+        sink: Optional[EventSink] = None,
+) -> Callable:
     """
-    Decorator to log the execution time of a function.
+    Decorator to log the memory a function uses.
+
+    Each measured call reports the bytes it allocated and still holds at its
+    end (net), the highest traced memory during the call above that at its
+    start (peak), and the change of the process' resident set size (RSS).
+    Allocations are traced with ``tracemalloc``, which is started for the
+    measured calls only and stopped when none is in flight, unless it was
+    already tracing. Calls running in other threads at the same time are
+    counted in the numbers as well. The RSS is the current one on Linux and
+    the peak one on other Unix systems.
+
+    Every measured call resets the traced peak with ``tracemalloc.reset_peak``,
+    so a peak read by your own code through ``tracemalloc`` only covers the
+    time since the last measured call started. Python 3.8 has no
+    ``reset_peak``: the peak there counts from when tracing started, and a
+    call reports a peak reached before it, e.g. by an earlier sibling.
+
+    Tracing slows down every allocation while it is on, so on hot functions
+    pass ``sample`` to measure only some calls, leaving the others at full
+    speed, or ``trace=False`` to only read the RSS.
+
+    Coroutine functions are measured until the awaited call completes, which
+    includes the other tasks of the loop, and generator functions from the
+    start of iteration until the generator is exhausted or closed.
+
+    In aggregate mode no line is logged per call. The usage is added to the
+    totals of the function instead, which ``get_memory_stats`` reads, and a
+    summary line is logged every ``summary_every`` calls.
 
     Args:
         level: The logging level to use (default: logging.DEBUG).
+        logger: The logger to report to (default: the logger named after the
+            decorated function's module).
+        trace: Measure net and peak allocations with tracemalloc
+            (default: True).
+        rss: Measure the RSS change, where the platform reports the RSS
+            (default: True).
+        aggregate: Add the usage to per-function totals instead of logging
+            each call (default: False).
+        summary_every: In aggregate mode, log a summary every N calls
+            (default: None, never).
+        sample: A sampling policy from ``py_debug.sampling`` deciding which
+            calls are measured (default: None, all of them).
+        emitter: A ``QueuedEmitter`` that formats and handles the records on
+            a background thread (default: None, log in the calling thread).
+        sink: An ``EventSink`` the structured events are written to instead
+            of logging them (default: None). The level does not apply to it.
 
     Returns:
         A decorator function.
@@ -79,160 +2050,488 @@ def log_running_time(level: int = logging.DEBUG) -> Callable:
         >>> import logging
         >>> logging.basicConfig(level=logging.DEBUG)
         >>>
-        >>> @log_running_time()
-        ... def my_function():
-        ...     time.sleep(0.1)
-        ...     return 42
-        >>>
-        >>> result = my_function()  # Logs execution time
+        >>> @log_memory_usage(sample=OneInN(100))
+        ... def build_index(rows):
+        ...     return {row.id: row for row in rows}
     """
+    if not aggregate and summary_every is not None:
+        raise ValueError("summary_every requires aggregate=True")
+    if summary_every is not None and summary_every < 1:
+        raise ValueError("summary_every must be positive")
+    _reject_tail_sampler(sample)
+    _reject_emitter_with_sink(emitter, sink)
+    probe = MemoryProbe(trace, rss)
 
     def decorator(func: Callable) -> Callable:
+        if not _switch.wrap:
+            return func
+        full_name = _get_function_name(func)
+        is_enabled, log = _get_emitter(_get_logger(func, logger), level,
+                                       full_name, emitter, sink)
+
+        if aggregate:
+            # Usage is recorded whether or not the level is enabled
+            is_active = _sampled(_always_enabled, sample)
+            report = _memory_summary(
+                func, full_name, summary_every, is_enabled, log, level)
+        else:
+            is_active = _sampled(is_enabled, sample)
+            report = _memory_line(full_name, log, level)
+
+        if inspect.isasyncgenfunction(func):
+            return _measured_async_gen(func, probe, report, is_active, level)
+        if inspect.isgeneratorfunction(func):
+            return _measured_generator(func, probe, report, is_active, level)
+        if inspect.iscoroutinefunction(func):
+            return _measured_coroutine(func, probe, report, is_active, level)
+        return _measured_call(func, probe, report, is_active, level)
+
+    return decorator
+
+
+def _probe_timed(
+        func: Callable,
+        probe: 'ContextVar[Optional[List[int]]]',
+) -> Callable:
+    """
+    Wrap a governed function so that probes time it under its decorators.
+
+    Args:
+        func: A plain or coroutine function.
+        probe: Holds the list a probe collects the duration in, or None
+            outside of probes.
+
+    Returns:
+        The wrapper, of the same kind as the function.
+    """
+    clock = time.perf_counter_ns
+
+    if inspect.iscoroutinefunction(func):
         @wraps(func)
-        def wrapper(*args: Any, **kwargs: Any) -> Any:
-            full_name = _get_function_name(func)
-            start_time = time.perf_counter()
+        async def async_probe_wrapper(*args: Any, **kwargs: Any) -> Any:
+            durations = probe.get()
+            if durations is None:
+                return await func(*args, **kwargs)
+            # Calls made by this one are not part of the probe
+            probe.set(None)
+            start = clock()
+            result = await func(*args, **kwargs)
+            durations.append(clock() - start)
+            return result
+
+        return async_probe_wrapper
+
+    @wraps(func)
+    def probe_wrapper(*args: Any, **kwargs: Any) -> Any:
+        durations = probe.get()
+        if durations is None:
+            return func(*args, **kwargs)
+        # Calls made by this one are not part of the probe
+        probe.set(None)
+        start = clock()
+        result = func(*args, **kwargs)
+        durations.append(clock() - start)
+        return result
+
+    return probe_wrapper
+
+
+def _step_down_report(
+        full_name: str,
+        governor: Governor,
+        is_enabled: Callable[[int], bool],
+        log: Callable,
+        level: int,
+) -> Callable[[int, int], None]:
+    """
+    Resolve how a governed wrapper records a probe and logs a step down.
+
+    Args:
+        full_name: The full qualified name of the function.
+        governor: The governor of the function.
+        is_enabled: The level check of the wrapper.
+        log: The log function of the wrapper.
+        level: The configured log level.
+
+    Returns:
+        A function taking the duration of the function alone and of the
+        whole instrumented call, in nanoseconds.
+    """
+    def record(bare_ns: int, instrumented_ns: int) -> None:
+        stepped_down = governor.record(bare_ns, instrumented_ns)
+        overhead = governor.last
+        if not stepped_down or overhead is None or not is_enabled(level):
+            return
+        log(level, 'Instrumentation of %s stepped down to %s: it added '
+                   '%.0f ns to calls of %.0f ns (%.1f%%), over the budget '
+                   'of %.1f%%.',
+            full_name, LEVELS[governor.step], overhead.overhead * 1e9,
+            overhead.run_time * 1e9, overhead.share * 100,
+            governor.budget * 100,
+            extra=_extra(full_name, 'governor', int(overhead.overhead * 1e9),
+                         governor.calls.value))
+
+    return record
+
+
+def _governed_wrapper(
+        func: Callable,
+        instrumented: Callable,
+        governor: Governor,
+        probe: 'ContextVar[Optional[List[int]]]',
+        record: Callable[[int, int], None],
+        counter: Optional[CallCounter],
+) -> Callable:
+    """
+    Wrap a plain function for ``govern``.
+
+    Args:
+        func: The governed function.
+        instrumented: The function under its decorators, probe-timed.
+        governor: Routes each call.
+        probe: Holds the list a probe collects the duration in.
+        record: Records a probe.
+        counter: The call counter ticked by the calls that skip the
+            decorators, or None if none of them counts calls.
+
+    Returns:
+        The wrapper.
+    """
+    clock = time.perf_counter_ns
 
+    @wraps(func)
+    def governed_wrapper(*args: Any, **kwargs: Any) -> Any:
+        if not _switch.on:
+            return func(*args, **kwargs)
+        route = governor.route()
+        if route == INSTRUMENTED:
+            return instrumented(*args, **kwargs)
+        if route == PROBE:
+            durations: List[int] = []
+            token = probe.set(durations)
             try:
-                result = func(*args, **kwargs)
-                elapsed_time = time.perf_counter() - start_time
-
-                if _is_valid_log_level(level):
-                    logging.log(
-                        level,
-                        f'The call [{full_name}] is completed in {elapsed_time:.6f} seconds.'
-                    )
-                else:
-                    logging.warning(f'Invalid log level {level} for function {full_name}.')
-
-                return result
-            except Exception as e:
-                elapsed_time = time.perf_counter() - start_time
-                if _is_valid_log_level(level):
-                    logging.log(
-                        level,
-                        f'The call [{full_name}] failed after {elapsed_time:.6f} seconds: {type(e).__name__}: {e}'
-                    )
-                else:
-                    logging.warning(f'Invalid log level {level} for function {full_name}.')
-                raise
+                start = clock()
+                result = instrumented(*args, **kwargs)
+                elapsed = clock() - start
+            finally:
+                probe.reset(token)
+            if durations:
+                record(durations[0], elapsed)
+            return result
+        if route == COUNTED and counter is not None:
+            counter.increment()
+        return func(*args, **kwargs)
 
-        return wrapper
+    return governed_wrapper
 
-    return decorator
 
+def _governed_async_wrapper(
+        func: Callable,
+        instrumented: Callable,
+        governor: Governor,
+        probe: 'ContextVar[Optional[List[int]]]',
+        record: Callable[[int, int], None],
+        counter: Optional[CallCounter],
+) -> Callable:
+    """
+    Wrap a coroutine function for ``govern``, timing probes until the
+    awaited call completes.
+
+    Args:
+        func: The governed coroutine function.
+        instrumented: The function under its decorators, probe-timed.
+        governor: Routes each call.
+        probe: Holds the list a probe collects the duration in.
+        record: Records a probe.
+        counter: The call counter ticked by the calls that skip the
+            decorators, or None if none of them counts calls.
 
-def log_args(level: int = logging.DEBUG) -> Callable:
+    Returns:
+        The wrapper.
     """
-    Decorator to log the arguments passed to a function.
+    clock = time.perf_counter_ns
+
+    @wraps(func)
+    async def async_governed_wrapper(*args: Any, **kwargs: Any) -> Any:
+        if not _switch.on:
+            return await func(*args, **kwargs)
+        route = governor.route()
+        if route == INSTRUMENTED:
+            return await instrumented(*args, **kwargs)
+        if route == PROBE:
+            durations: List[int] = []
+            token = probe.set(durations)
+            try:
+                start = clock()
+                result = await instrumented(*args, **kwargs)
+                elapsed = clock() - start
+            finally:
+                probe.reset(token)
+            if durations:
+                record(durations[0], elapsed)
+            return result
+        if route == COUNTED and counter is not None:
+            counter.increment()
+        return await func(*args, **kwargs)
+
+    return async_governed_wrapper
+
+
+def govern(
+        *decorators: Callable,
+        budget: float = 0.05,
+        sample_every: int = 100,
+        probe_every: int = 64,
+        probes: int = 16,
+        level: int = logging.INFO,
+        logger: Optional[logging.Logger] = None,
+) -> Callable:
+    """
+    Decorator to apply other decorators within an overhead budget.
+
+    The decorators are applied as if stacked in the given order, outermost
+    first. Every ``probe_every``-th call is timed as a whole and, under the
+    decorators, in the function alone, so probes keep their instrumentation.
+    When the instrumentation adds more than ``budget`` of the function's
+    run time, it is stepped down: to one call in ``sample_every``, then to
+    only counting calls, then off. Calls that skip the decorators still
+    tick the counter of a ``log_call_counter`` among them, except when off.
+    Each step down is logged, and ``get_downgrades`` lists the functions
+    stepped down. See ``py_debug.governor`` for how the overhead is measured.
+
+    Coroutine functions are timed until they complete, so time spent
+    suspended counts as run time. Generator and async generator functions
+    are decorated but not governed.
 
     Args:
-        level: The logging level to use (default: logging.DEBUG).
+        *decorators: The decorators to govern, such as ``log_args()``.
+        budget: The most overhead allowed, as a share of the function's run
+            time (default: 0.05, 5%).
+        sample_every: Instrument one call in this many once stepped down
+            to sampling (default: 100).
+        probe_every: Time one call in this many (default: 64).
+        probes: The number of calls timed per check (default: 16).
+        level: The logging level of the step-down lines (default:
+            logging.INFO).
+        logger: The logger to report to (default: the logger named after the
+            decorated function's module).
 
     Returns:
         A decorator function.
 
     Example:
-        >>> import logging
-        >>> logging.basicConfig(level=logging.DEBUG)
-        >>>
-        >>> @log_args()
-        ... def add(a, b):
+        >>> @govern(log_args(), log_call_counter(), budget=0.1)
+        ... def tiny(a, b):
         ...     return a + b
         >>>
-        >>> result = add(1, 2)  # Logs: Function add has been called with args = (1, 2).
+        >>> for i in range(100_000):
+        ...     # Logs: Instrumentation of tiny stepped down to counting: ...
+        ...     tiny(i, 1)
     """
+    if not decorators:
+        raise ValueError("govern needs at least one decorator")
+    # Reject invalid budgets when decorating, not at the first check
+    Governor(budget, sample_every, probes, probe_every=probe_every)
 
     def decorator(func: Callable) -> Callable:
-        @wraps(func)
-        def wrapper(*args: Any, **kwargs: Any) -> Any:
-            full_name = _get_function_name(func)
-
-            if _is_valid_log_level(level):
-                args_info = _format_args_info(args, kwargs)
-                logging.log(level, f'Function {full_name} has been called {args_info}.')
-            else:
-                logging.warning(f'Invalid log level {level} for function {full_name}.')
-
-            return func(*args, **kwargs)
+        if not _switch.wrap:
+            return func
+        generator = (inspect.isgeneratorfunction(func)
+                     or inspect.isasyncgenfunction(func))
+        # Holds the list a probe collects the function's own duration in
+        probe: ContextVar[Optional[List[int]]] = ContextVar(
+            'py_debug_probe', default=None)
+        instrumented = func if generator else _probe_timed(func, probe)
+        for inner in reversed(decorators):
+            instrumented = inner(instrumented)
+        if generator:
+            return instrumented
+        full_name = _get_function_name(func)
+        is_enabled, log = _get_emitter(_get_logger(func, logger), level,
+                                       full_name)
+        governor = Governor(budget, sample_every, probes,
+                            probe_every=probe_every)
+        record = _step_down_report(full_name, governor, is_enabled, log, level)
+        # Ticked by the calls that skip the decorators, unless none counts
+        counter = _find_call_counter(instrumented)
+        wrap = (_governed_async_wrapper if inspect.iscoroutinefunction(func)
+                else _governed_wrapper)
+        wrapper = wrap(func, instrumented, governor, probe, record, counter)
 
+        # Lookups by the wrapper find the data the decorators keep under the
+        # probe wrapper
+        wrapper.__wrapped__ = instrumented  # type: ignore[attr-defined]
+        _governors.get(wrapper, _get_qualified_name(func), lambda: governor)
         return wrapper
 
     return decorator
 
 
-def log_call_counter(level: int = logging.DEBUG, mute_after: int = 5, log_every: int = 10) -> Callable:
+class BlockTimer:
     """
-    Decorator to log the number of times a function has been called.
+    Times blocks of code that cannot be decorated, under a name.
+
+    Durations go into the timing histogram of the name, the one
+    ``log_running_time(aggregate=True)`` records a function of that full
+    qualified name (``module.qualname``) into, so ``get_timing_stats``, the
+    metrics and the summaries read blocks and functions alike. A block that
+    raises an exception is timed and counted as a failed call. Nothing is
+    logged.
+
+    A timer is reused from block to block, as a context manager or with
+    ``start`` and ``stop``: timing a block allocates nothing but the clock
+    reading. It keeps a stack of start times, so it nests in itself, but it
+    belongs to one thread; ``timed`` gives each thread its own timers. A
+    block that awaits can interleave with other tasks using the same timer,
+    so time coroutines with ``log_running_time`` instead.
+
+    Example:
+        >>> row_timer = BlockTimer('parse.rows')
+        >>> for row in rows:
+        ...     with row_timer:
+        ...         parse(row)
+        >>>
+        >>> row_timer.start()
+        >>> flush(rows)
+        >>> elapsed = row_timer.stop()
+    """
+
+    __slots__ = ('name', '_record', '_errors', '_starts')
+
+    def __init__(self, name: str) -> None:
+        """
+        Args:
+            name: The name the durations are recorded under, like
+                ``'module.function.rows'``.
+        """
+        self.name = name
+        self._record = _get_timing_histogram(name).record
+        self._errors = _get_error_counter(name)
+        # None for blocks started while the decorators were switched off
+        self._starts: List[Optional[int]] = []
+
+    def start(self) -> None:
+        """Start timing a block."""
+        self._starts.append(time.perf_counter_ns() if _switch.on else None)
+
+    def stop(self, failed: bool = False) -> Optional[float]:
+        """
+        Stop timing the block started last and record its duration.
+
+        Args:
+            failed: Also count the block as a failed call (default: False).
+
+        Returns:
+            The duration of the block in seconds, or None if it was started
+            while the decorators were switched off.
+        """
+        now = time.perf_counter_ns()
+        try:
+            start = self._starts.pop()
+        except IndexError:
+            raise RuntimeError(
+                f"timer {self.name!r} stopped without being started") from None
+        if start is None:
+            return None
+        elapsed = now - start
+        self._record(elapsed)
+        if failed:
+            self._errors.increment()
+        return elapsed / 1e9
+
+    # The context manager repeats start and stop inline, saving two calls per
+    # block
+    def __enter__(self) -> 'BlockTimer':
+        self._starts.append(time.perf_counter_ns() if _switch.on else None)
+        return self
+
+    def __exit__(
+            self,
+            exc_type: Optional[type],
+            exc_value: Optional[BaseException],
+            traceback: Any,
+    ) -> None:
+        now = time.perf_counter_ns()
+        start = self._starts.pop()
+        if start is not None:
+            self._record(now - start)
+            if exc_type is not None and issubclass(exc_type, Exception):
+                self._errors.increment()
+
+
+# The timers of timed(), by name, in a dictionary per thread
+_block_timers = threading.local()
+
+
+def timed(name: str) -> BlockTimer:
+    """
+    Get the calling thread's ``BlockTimer`` for a name.
+
+    The timer is made on the first use of the name in the thread and
+    returned again after that, so timing a block inside a loop costs a
+    dictionary lookup, not a new object.
 
     Args:
-        level: The logging level to use (default: logging.DEBUG).
-        mute_after: Number of initial calls to log before muting (default: 5).
-        log_every: Log every Nth call after muting (default: 10).
+        name: The name the durations are recorded under.
 
     Returns:
-        A decorator function.
+        The timer, to use as a context manager or with ``start`` and ``stop``.
 
     Example:
-        >>> import logging
-        >>> logging.basicConfig(level=logging.DEBUG)
-        >>>
-        >>> @log_call_counter(mute_after=2, log_every=5)
-        ... def my_function():
-        ...     return True
+        >>> for row in rows:
+        ...     with timed('parse.rows'):
+        ...         parse(row)
         >>>
-        >>> for i in range(20):
-        ...     my_function()  # Logs first 2 calls, then every 5th call
+        >>> print(get_timing_stats('parse.rows').p99)
     """
-    if mute_after < 0:
-        raise ValueError("mute_after must be non-negative")
-    if log_every < 1:
-        raise ValueError("log_every must be positive")
+    try:
+        timers = _block_timers.by_name
+    except AttributeError:
+        timers = _block_timers.by_name = {}
+    timer = timers.get(name)
+    if timer is None:
+        timer = timers[name] = BlockTimer(name)
+    return timer
 
-    def decorator(func: Callable) -> Callable:
-        @wraps(func)
-        def wrapper(*args: Any, **kwargs: Any) -> Any:
-            full_name = _get_function_name(func)
-
-            # Thread-safe counter increment
-            with _counter_lock:
-                if full_name in _call_counters:
-                    _call_counters[full_name] += 1
-                else:
-                    _call_counters[full_name] = 1
-                call_count = _call_counters[full_name]
-
-            # Determine if we should log this call
-            should_log = (
-                    (call_count - 1) < mute_after or  # First mute_after calls
-                    call_count % log_every == 0  # Every log_every calls
-            )
-
-            if should_log:
-                if _is_valid_log_level(level):
-                    logging.log(
-                        level,
-                        f'Function {full_name} has been called {call_count} times.'
-                    )
-                else:
-                    logging.warning(f'Invalid log level {level} for function {full_name}.')
 
-            try:
-                return func(*args, **kwargs)
-            except Exception:
-                # If log level is invalid, log warning even if should_log is False
-                if not _is_valid_log_level(level) and not should_log:
-                    logging.warning(f'Invalid log level {level} for function {full_name}.')
-                raise
+def set_enabled(enabled: bool, unwrap: bool = False) -> None:
+    """
+    Switch all py_debug decorators on or off.
 
-        return wrapper
+    Switched off, existing wrappers call straight through to the decorated
+    function after a single attribute check: nothing is logged, counted or
+    timed. With ``unwrap``, functions decorated from then on are not wrapped
+    at all, so they cost exactly nothing, but switching back on does not
+    instrument them. Setting the ``PY_DEBUG_DISABLED`` environment variable
+    to ``1`` is the same as calling ``set_enabled(False, unwrap=True)`` at
+    import time.
 
-    return decorator
+    Args:
+        enabled: Whether the decorators do their work.
+        unwrap: When switching off, also return functions decorated later
+            unchanged (default: False).
+
+    Example:
+        >>> from py_debug import set_enabled
+        >>> set_enabled(False)  # Wrappers now only call through
+    """
+    _switch.on = enabled
+    _switch.wrap = enabled or not unwrap
+
+
+def get_enabled() -> bool:
+    """
+    Check whether the py_debug decorators are switched on.
+
+    Returns:
+        False after ``set_enabled(False)`` or with ``PY_DEBUG_DISABLED`` set.
+    """
+    return _switch.on
 
 
 def reset_call_counters() -> None:
     """
-    Reset all function call counters.
+    Reset all function call counters and call rate windows.
 
     This is useful for testing or when you want to reset the counters
     without restarting the application.
@@ -241,16 +2540,29 @@ def reset_call_counters() -> None:
         >>> from py_debug import reset_call_counters
         >>> reset_call_counters()  # Clears all counters
     """
-    with _counter_lock:
-        _call_counters.clear()
+    for _, counter in _named_call_counters():
+        counter.reset()
+    for _, window in _rate_windows.named():
+        window.reset()
 
 
-def get_call_count(func: Callable) -> int:
+def get_call_count(func: Union[Callable, str]) -> int:
     """
     Get the current call count for a function.
 
+    Every decorated function has a counter of its own, which its wrappers
+    update directly and which goes away with the function. Counters are
+    registered under ``module.qualname``, so methods of different classes
+    and functions nested in different scopes are reported apart; closures
+    made by one ``def`` share that name, and looking them up by it adds up
+    their counts.
+
     Args:
-        func: The function to get the count for.
+        func: The function, or a wrapper around it, to get the count for; or
+            the full qualified name (``module.qualname``) to get the total of
+            all live functions of that name. As a fallback for names of
+            earlier versions, ``module.function_name`` adds up every function
+            of that name whose qualified name is not looked up as such.
 
     Returns:
         The number of times the function has been called, or 0 if never called.
@@ -264,17 +2576,299 @@ def get_call_count(func: Callable) -> int:
         >>> my_func()
         >>> print(get_call_count(my_func))  # Output: 2
     """
-    full_name = _get_function_name(func)
-    with _counter_lock:
-        return _call_counters.get(full_name, 0)
+    if isinstance(func, str):
+        counters = _named_call_counters()
+        names = set(_resolve_name(func, (name for name, _ in counters)))
+        return sum(counter.value for name, counter in counters
+                   if name in names)
+    counter = _find_call_counter(func)
+    return 0 if counter is None else counter.value
+
+
+def get_call_rate(func: Callable) -> Optional[RateStats]:
+    """
+    Get the call rates of a function.
+
+    Args:
+        func: The function, or a wrapper around it, to get the rates for.
+
+    Returns:
+        The rate of the last complete bucket, the peak rate in the window,
+        the moving average and the calls in the window, or None if the
+        function is not decorated with ``log_call_counter(rate_window=...)``.
+
+    Example:
+        >>> @log_call_counter(rate_window=60)
+        ... def my_func():
+        ...     pass
+        >>>
+        >>> my_func()
+        >>> print(get_call_rate(my_func).calls)  # Output: 1
+    """
+    window = _rate_windows.find(func)
+    return None if window is None else window.stats()
+
+
+def reset_timing_stats() -> None:
+    """
+    Reset the durations and failed call counts aggregated by
+    ``log_running_time(aggregate=True)`` and the block timers.
+
+    Example:
+        >>> from py_debug import reset_timing_stats
+        >>> reset_timing_stats()  # Clears all timing histograms
+    """
+    with _timing_lock:
+        for histograms in (_timing_histograms, _cpu_histograms,
+                           _off_cpu_histograms):
+            for histogram in histograms.values():
+                histogram.reset()
+        for counter in _error_counters.values():
+            counter.reset()
+
+
+_histograms_by_clock = {'wall': _timing_histograms, 'cpu': _cpu_histograms,
+                        'off_cpu': _off_cpu_histograms}
+
+
+def get_timing_stats(
+        func: Union[Callable, str],
+        clock: str = 'wall',
+) -> Optional[TimingStats]:
+    """
+    Get the aggregated durations of a function or of timed blocks.
+
+    Args:
+        func: The function to get the statistics for, or the full qualified
+            name (``module.qualname``) of a function or the name of a
+            ``BlockTimer``. As a fallback for names of earlier versions,
+            ``module.function_name`` is accepted when it stands for a single
+            function.
+        clock: ``'wall'`` for the wall time, ``'cpu'`` for the CPU time of
+            the calling thread or ``'off_cpu'`` for the difference, the
+            latter two recorded with ``cpu=True`` (default: 'wall').
+
+    Returns:
+        The call count, minimum, maximum, mean and p50/p90/p99/p99.9 durations
+        in seconds, or None if the function is not decorated with
+        ``log_running_time(aggregate=True)``, or not with ``cpu=True`` for
+        the CPU clocks, and no block was timed under the name.
+
+    Example:
+        >>> @log_running_time(aggregate=True)
+        ... def my_func():
+        ...     pass
+        >>>
+        >>> my_func()
+        >>> print(get_timing_stats(my_func).count)  # Output: 1
+    """
+    if clock not in _histograms_by_clock:
+        raise ValueError("clock must be 'wall', 'cpu' or 'off_cpu'")
+    histograms = _histograms_by_clock[clock]
+    if isinstance(func, str):
+        with _timing_lock:
+            names = _resolve_name(func, list(histograms))
+        histogram = histograms[names[0]] if len(names) == 1 else None
+    else:
+        histogram = histograms.get(_get_qualified_name(func))
+    return None if histogram is None else histogram.timing_stats()
+
+
+def reset_memory_stats() -> None:
+    """
+    Reset the memory totals aggregated by ``log_memory_usage(aggregate=True)``.
+
+    Example:
+        >>> from py_debug import reset_memory_stats
+        >>> reset_memory_stats()  # Clears all memory totals
+    """
+    for _, totals in _memory_aggregates.named():
+        totals.reset()
+
+
+def get_memory_stats(func: Callable) -> Optional[MemoryStats]:
+    """
+    Get the aggregated memory usage of a function.
+
+    Args:
+        func: The function, or a wrapper around it, to get the totals for.
+
+    Returns:
+        The call count, the total, mean and largest net bytes, the largest
+        peak and the total RSS change in bytes, or None if the function is
+        not decorated with ``log_memory_usage(aggregate=True)``.
+
+    Example:
+        >>> @log_memory_usage(aggregate=True)
+        ... def my_func():
+        ...     return [0] * 1000
+        >>>
+        >>> _ = my_func()
+        >>> print(get_memory_stats(my_func).count)  # Output: 1
+    """
+    totals = _memory_aggregates.find(func)
+    return None if totals is None else totals.stats()
+
+
+def reset_governors() -> None:
+    """
+    Put every function governed by ``govern`` back to full instrumentation.
+
+    Example:
+        >>> from py_debug import reset_governors
+        >>> reset_governors()  # Forgets all step-downs and probes
+    """
+    for _, governor in _governors.named():
+        governor.reset()
+
+
+def get_downgrades() -> List[Downgrade]:
+    """
+    List the functions whose instrumentation ``govern`` stepped down.
+
+    Returns:
+        For each function below full instrumentation: its level, one of
+        ``'sampled'``, ``'counting'`` or ``'off'``, the overhead measured
+        at its last check, and the calls the governor has seen.
+
+    Example:
+        >>> for downgrade in get_downgrades():
+        ...     print(downgrade.function, downgrade.level,
+        ...           f'{downgrade.overhead.share:.0%}')
+        app.tiny counting 1250%
+    """
+    return [Downgrade(name, LEVELS[governor.step], governor.last,
+                      governor.calls.value)
+            for name, governor in _governors.named()
+            if governor.step != FULL and governor.last is not None]
+
+
+def reset_call_tree() -> None:
+    """
+    Reset the call tree recorded by ``log_running_time(call_tree=True)``.
+
+    Example:
+        >>> from py_debug import reset_call_tree
+        >>> reset_call_tree()  # Clears the call tree
+    """
+    _call_tree.reset()
+
+
+def get_call_tree() -> CallTreeNode:
+    """
+    Get the call tree recorded by ``log_running_time(call_tree=True)``.
+
+    The tree holds at most 10000 call paths; calls on further paths are not
+    recorded, though their time is still excluded from their caller's self
+    time.
+
+    Returns:
+        The root of the tree, whose children are the top-level calls. Every
+        node gives the calls along its path and their inclusive and
+        exclusive times in seconds, its children sorted by inclusive time.
+
+    Example:
+        >>> @log_running_time(call_tree=True)
+        ... def my_func():
+        ...     pass
+        >>>
+        >>> my_func()
+        >>> print(get_call_tree().children[0].calls)  # Output: 1
+    """
+    return _call_tree.snapshot()
+
+
+def get_hotspots(limit: Optional[int] = 10) -> List[Hotspot]:
+    """
+    Rank the functions of the call tree by self time.
+
+    Args:
+        limit: The most functions to return, or None for all (default: 10).
+
+    Returns:
+        The calls, self time, total time and share of all self time of each
+        function over all its call paths, highest self time first.
+    """
+    return hotspots(_call_tree.snapshot(), limit)
+
+
+def print_hotspots(
+        limit: Optional[int] = 10,
+        file: Optional[IO[str]] = None,
+) -> None:
+    """
+    Print the functions of the call tree with the most self time.
+
+    Args:
+        limit: The most functions to print, or None for all (default: 10).
+        file: The file to print to (default: None, stdout).
+
+    Example:
+        >>> from py_debug import print_hotspots
+        >>> print_hotspots(5)
+              self s  self %      total s      calls  function
+            1.204233   61.3%     1.204233        120  app.parse
+    """
+    print(format_hotspots(get_hotspots(limit), _call_tree.dropped), end='',
+          file=file)
 
 
 __all__ = [
     "log_running_time",
     "log_args",
     "log_call_counter",
+    "log_memory_usage",
+    "govern",
+    "timed",
+    "BlockTimer",
+    "set_enabled",
+    "get_enabled",
     "reset_call_counters",
     "get_call_count",
+    "get_call_rate",
+    "reset_timing_stats",
+    "get_timing_stats",
+    "reset_memory_stats",
+    "get_memory_stats",
+    "reset_call_tree",
+    "get_call_tree",
+    "get_hotspots",
+    "print_hotspots",
+    "reset_governors",
+    "get_downgrades",
+    "Histogram",
+    "TimingStats",
+    "MemoryUsage",
+    "MemoryStats",
+    "CallTreeNode",
+    "Hotspot",
+    "Overhead",
+    "Downgrade",
+    "RateWindow",
+    "RateStats",
+    "Sampler",
+    "OneInN",
+    "TokenBucket",
+    "Head",
+    "Tail",
+    "Threshold",
+    "Fixed",
+    "Percentile",
+    "Schedule",
+    "Exponential",
+    "Interval",
+    "Budget",
+    "QueuedEmitter",
+    "Event",
+    "EventSink",
+    "read_events",
+    "ArgRenderer",
+    "SharedCounters",
+    "render_openmetrics",
+    "serve_metrics",
+    "Monitor",
+    "instrument",
+    "Instrumentation",
 ]
 
 __version__ = "0.1.1"
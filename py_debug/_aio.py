@@ -0,0 +1,105 @@
+"""
+    Helpers for wrapping coroutine and async generator functions.
+"""
+from functools import wraps
+from typing import Any, Awaitable, Callable, Generator, Optional
+
+
+class StepTimer:
+    """
+    Awaitable that drives another awaitable one step at a time.
+
+    Every resumption of the inner awaitable is timed, so ``running`` is the
+    time it actually spent executing on the event loop; the rest of the wall
+    time between start and finish it spent suspended.
+    """
+
+    __slots__ = ('awaitable', 'clock', 'running')
+
+    def __init__(
+            self,
+            awaitable: Awaitable,
+            clock: Callable[[], float],
+    ) -> None:
+        self.awaitable = awaitable
+        self.clock = clock
+        self.running = 0.0
+
+    def __await__(self) -> Generator[Any, Any, Any]:
+        iterator = self.awaitable.__await__()
+        clock = self.clock
+        value = None
+        error: Optional[BaseException] = None
+        while True:
+            start = clock()
+            try:
+                if error is None:
+                    yielded = iterator.send(value)
+                else:
+                    yielded = iterator.throw(error)
+            except StopIteration as stop:
+                return stop.value
+            finally:
+                self.running += clock() - start
+            value, error = None, None
+            try:
+                value = yield yielded
+            except GeneratorExit:
+                iterator.close()
+                raise
+            except BaseException as e:
+                error = e
+
+
+def wrap_async_gen(
+        func: Callable,
+        before: Callable[[tuple, dict], Any],
+        after: Optional[Callable[[Any, Optional[BaseException]], None]] = None,
+) -> Callable:
+    """
+    Wrap an async generator function, forwarding everything sent or thrown in.
+
+    Args:
+        func: The async generator function to wrap.
+        before: Called with the call arguments when iteration begins; its
+            result is passed on to ``after``.
+        after: Called once the generator is exhausted, closed or fails, with
+            the result of ``before`` and the exception raised, if any.
+            Closing the generator early is not treated as a failure.
+
+    Returns:
+        An async generator function.
+    """
+
+    @wraps(func)
+    async def async_gen_wrapper(*args: Any, **kwargs: Any) -> Any:
+        state = before(args, kwargs)
+        agen = func(*args, **kwargs)
+        failure: Optional[BaseException] = None
+        try:
+            value = None
+            error: Optional[BaseException] = None
+            while True:
+                step = (agen.asend(value) if error is None
+                        else agen.athrow(error))
+                try:
+                    item = await step
+                except StopAsyncIteration:
+                    return
+                value, error = None, None
+                try:
+                    value = yield item
+                except GeneratorExit:
+                    await agen.aclose()
+                    raise
+                except BaseException as e:
+                    error = e
+        except BaseException as e:
+            # Closing early is no failure
+            failure = None if isinstance(e, GeneratorExit) else e
+            raise
+        finally:
+            if after is not None:
+                after(state, failure)
+
+    return async_gen_wrapper
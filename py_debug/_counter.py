@@ -0,0 +1,62 @@
+"""
+    Call counters shared by the decorators and sampling policies.
+"""
+import sys
+from itertools import count
+from threading import Lock, get_ident
+from typing import Dict, Iterator, Optional, Tuple
+
+# Without the GIL, advancing one shared iterator from several threads is not
+# atomic
+_GIL = getattr(sys, '_is_gil_enabled', lambda: True)()
+
+
+class CallCounter:
+    """
+    Counter that numbers the calls made concurrently from many threads.
+
+    Each increment draws the next number from an ``itertools.count``, which
+    gives the exact order the logging schedules need and never runs out.
+    Drawing it is a single C-level step, so on GIL builds callers never take
+    a lock; on free-threaded builds, where nothing makes the step atomic,
+    the draw falls back to a lock.
+
+    The count itself cannot be read back from the iterator, so every thread
+    keeps the last number it drew in a shard of its own, keyed by thread.
+    The numbers are unique and consecutive, so the total is the highest
+    number in the shards, aggregated only when someone asks; it is exact
+    once the calls in flight have returned.
+    """
+
+    __slots__ = ('_state', '_lock')
+
+    def __init__(self) -> None:
+        self._state: Tuple[Iterator[int], Dict[int, int]] = (count(1), {})
+        self._lock: Optional[Lock] = None if _GIL else Lock()
+
+    def increment(self) -> int:
+        """
+        Count one call.
+
+        Returns:
+            The number of the call, counting from one.
+        """
+        tickets, shards = self._state
+        if self._lock is None:
+            ticket = next(tickets)
+        else:
+            with self._lock:
+                ticket = next(tickets)
+        shards[get_ident()] = ticket
+        return ticket
+
+    @property
+    def value(self) -> int:
+        """The number of increments counted so far."""
+        return max(self._state[1].copy().values(), default=0)
+
+    def reset(self) -> None:
+        """Start counting from zero again."""
+        # Tickets and shards are replaced together, so a draw from the old
+        # iterator cannot land in the new shards
+        self._state = (count(1), {})
@@ -0,0 +1,97 @@
+"""
+    Helpers for wrapping generator functions.
+"""
+import sys
+from collections.abc import Generator
+from typing import Any, Callable, Optional
+
+
+class TimedGenerator(Generator):
+    """
+    Generator that times the generator it forwards to.
+
+    Only the time spent inside the inner generator counts as ``active``;
+    the time the consumer spends between items does not. ``finish`` is called
+    once, when the generator is exhausted, fails with an ``Exception``, is
+    closed or is garbage collected, provided it was ever started; not when
+    it is interrupted by another ``BaseException`` or collected at
+    interpreter shutdown.
+    """
+
+    __slots__ = ('generator', 'clock', 'finish', 'started', 'first', 'active',
+                 'items', 'done')
+
+    def __init__(
+            self,
+            generator: Generator,
+            clock: Callable[[], Any],
+            finish: Callable[
+                ['TimedGenerator', Optional[BaseException]], None],
+    ) -> None:
+        self.generator = generator
+        self.clock = clock
+        self.finish = finish
+        #: Clock reading when the generator was first resumed, None before
+        self.started: Any = None
+        #: Time from the first resumption to the first item
+        self.first = None
+        self.active = 0
+        self.items = 0
+        self.done = False
+
+    def _resume(self, method: Callable, *args: Any) -> Any:
+        """Resume the inner generator through one of its methods, timed."""
+        clock = self.clock
+        start = clock()
+        if self.started is None:
+            self.started = start
+        try:
+            item = method(*args)
+        except StopIteration:
+            self.active += clock() - start
+            self._finish(None)
+            raise
+        except BaseException as e:
+            self.active += clock() - start
+            if isinstance(e, Exception):
+                self._finish(e)
+            elif isinstance(e, GeneratorExit):
+                # Thrown in by the consumer, which is closing it early
+                self._finish(None)
+            else:
+                # Interrupted, like a call that is not reported either
+                self.done = True
+            raise
+        end = clock()
+        self.active += end - start
+        self.items += 1
+        if self.first is None:
+            self.first = end - self.started
+        return item
+
+    def __next__(self) -> Any:
+        return self._resume(self.generator.__next__)
+
+    def send(self, value: Any) -> Any:
+        return self._resume(self.generator.send, value)
+
+    def throw(self, *args: Any) -> Any:
+        return self._resume(self.generator.throw, *args)
+
+    def close(self) -> None:
+        try:
+            self.generator.close()
+        finally:
+            self._finish(None)
+
+    def _finish(self, error: Optional[BaseException]) -> None:
+        """Report once, if the generator was ever started."""
+        if not self.done:
+            self.done = True
+            if self.started is not None:
+                self.finish(self, error)
+
+    def __del__(self) -> None:
+        # Logging may already be torn down while the interpreter shuts down
+        if not self.done and not sys.is_finalizing():
+            self.close()
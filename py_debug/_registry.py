@@ -0,0 +1,267 @@
+"""
+    Process-wide registries of the data the decorators collect.
+"""
+import weakref
+from threading import Lock
+from typing import (
+    Any, Callable, Dict, Generic, Iterable, List, NamedTuple, Optional, Tuple,
+    TypeVar,
+)
+
+from ._counter import CallCounter
+from .calltree import CallTree
+from .governor import Governor
+from .histogram import Histogram, HistogramSnapshot
+from .memory import MemoryAggregate
+from .rate import RateWindow
+
+T = TypeVar('T')
+
+# The ``module.name`` spelling of every name registered, for lookups by it
+_short_names: Dict[str, str] = {}
+
+
+def _get_qualified_name(func: Callable) -> str:
+    """
+    Get the name the data of a function is registered and reported under.
+
+    Args:
+        func: The decorated function.
+
+    Returns:
+        The full qualified name (module.qualname), which tells apart methods
+        of different classes and functions nested in different scopes.
+    """
+    module, name = func.__module__, func.__name__
+    full_name = f'{module}.{getattr(func, "__qualname__", name)}'
+    _short_names[full_name] = f'{module}.{name}'
+    return full_name
+
+
+def _resolve_name(name: str, registered: Iterable[str]) -> List[str]:
+    """
+    Find the registered names a name looked up by the user stands for.
+
+    Args:
+        name: A full qualified name (module.qualname), or, as a fallback,
+            the ``module.name`` spelling that earlier versions registered
+            functions under.
+        registered: The names registered.
+
+    Returns:
+        The name itself if it is registered, or else every registered name
+        spelled that way without the enclosing classes and functions.
+    """
+    names = set(registered)
+    if name in names:
+        return [name]
+    return [full_name for full_name in names
+            if _short_names.get(full_name) == name]
+
+
+class _FunctionRegistry(Generic[T]):
+    """
+    Per-function data, with the name each is reported under.
+
+    Entries are keyed by the decorated function and go away with it.
+    Callables that cannot be weakly referenced are kept alive in a table by
+    id instead. The lock only guards registration and reading.
+    """
+
+    def __init__(self) -> None:
+        self._entries: 'weakref.WeakKeyDictionary[Callable, Tuple[str, T]]'
+        self._entries = weakref.WeakKeyDictionary()
+        self._pinned: Dict[int, Tuple[Callable, str, T]] = {}
+        self._lock = Lock()
+
+    def get(
+            self,
+            func: Callable,
+            full_name: str,
+            factory: Callable[[], T],
+    ) -> T:
+        """
+        Get the data of a function, creating it on first use.
+
+        Args:
+            func: The decorated function; wrappers of the same function
+                object share its data, while functions that only share a
+                name do not.
+            full_name: The full qualified name the data is reported under.
+            factory: Creates the data.
+
+        Returns:
+            The data shared by all wrappers of that function.
+        """
+        with self._lock:
+            try:
+                entry = self._entries.get(func)
+                if entry is None:
+                    entry = self._entries[func] = (full_name, factory())
+                return entry[1]
+            except TypeError:
+                pinned = self._pinned.get(id(func))
+                if pinned is None:
+                    pinned = (func, full_name, factory())
+                    self._pinned[id(func)] = pinned
+                return pinned[2]
+
+    def find(self, func: Callable) -> Optional[T]:
+        """
+        Find the data of a function or of the functions it wraps.
+
+        Args:
+            func: A decorated function, a wrapper around one (followed
+                through ``__wrapped__``), or a bound method of either.
+
+        Returns:
+            The first data found, or None.
+        """
+        current: Optional[Any] = getattr(func, '__func__', func)
+        seen = set()
+        while current is not None and id(current) not in seen:
+            seen.add(id(current))
+            try:
+                entry = self._entries.get(current)
+            except TypeError:
+                entry = None
+            if entry is not None:
+                return entry[1]
+            pinned = self._pinned.get(id(current))
+            if pinned is not None:
+                return pinned[2]
+            current = getattr(current, '__wrapped__', None)
+        return None
+
+    def named(self) -> List[Tuple[str, T]]:
+        """List the data of every live function with its reported name."""
+        with self._lock:
+            return ([(name, data) for name, data in self._entries.values()]
+                    + [(name, data)
+                       for _, name, data in self._pinned.values()])
+
+
+# Call counters of log_call_counter
+_call_counters: _FunctionRegistry[CallCounter] = _FunctionRegistry()
+
+
+def _get_call_counter(func: Callable, full_name: str) -> CallCounter:
+    """Get the counter of a function, creating it on first use."""
+    return _call_counters.get(func, full_name, CallCounter)
+
+
+def _find_call_counter(func: Callable) -> Optional[CallCounter]:
+    """Find the counter of a function or of the functions it wraps."""
+    return _call_counters.find(func)
+
+
+def _named_call_counters() -> List[Tuple[str, CallCounter]]:
+    """List every call counter with the name it is reported under."""
+    return _call_counters.named()
+
+
+# Call rate windows of log_call_counter(rate_window=...)
+_rate_windows: _FunctionRegistry[RateWindow] = _FunctionRegistry()
+
+# Call paths of log_running_time(call_tree=True)
+_call_tree = CallTree()
+
+# Memory totals of log_memory_usage(aggregate=True)
+_memory_aggregates: _FunctionRegistry[MemoryAggregate] = _FunctionRegistry()
+
+# Overhead governors of govern(), by governed wrapper
+_governors: _FunctionRegistry[Governor] = _FunctionRegistry()
+
+
+# Duration histograms of log_running_time(aggregate=True), by function name
+_timing_histograms: Dict[str, Histogram] = {}
+_timing_lock = Lock()
+
+# CPU and off-CPU time histograms of log_running_time(aggregate=True,
+# cpu=True); guarded by _timing_lock
+_cpu_histograms: Dict[str, Histogram] = {}
+_off_cpu_histograms: Dict[str, Histogram] = {}
+
+
+def _get_timing_histogram(
+        full_name: str,
+        histograms: Dict[str, Histogram] = _timing_histograms,
+) -> Histogram:
+    """
+    Get the duration histogram for a function name, creating it on first use.
+
+    Args:
+        full_name: The full qualified name of the function.
+        histograms: The registry of the clock measured (default: the wall
+            time histograms).
+
+    Returns:
+        The histogram shared by all aggregating wrappers of that name.
+    """
+    with _timing_lock:
+        histogram = histograms.get(full_name)
+        if histogram is None:
+            histogram = histograms[full_name] = Histogram()
+        return histogram
+
+
+# Failed calls of log_running_time(aggregate=True), by function name; guarded
+# by _timing_lock
+_error_counters: Dict[str, CallCounter] = {}
+
+
+def _get_error_counter(full_name: str) -> CallCounter:
+    """
+    Get the failed call counter for a function name, creating it on first use.
+
+    Args:
+        full_name: The full qualified name of the function.
+
+    Returns:
+        The counter shared by all aggregating wrappers of that name.
+    """
+    with _timing_lock:
+        counter = _error_counters.get(full_name)
+        if counter is None:
+            counter = _error_counters[full_name] = CallCounter()
+        return counter
+
+
+class RegistrySnapshot(NamedTuple):
+    """The collected data of every instrumented function, by full name."""
+
+    calls: Dict[str, int]
+    errors: Dict[str, int]
+    timings: Dict[str, HistogramSnapshot]
+    cpu_timings: Dict[str, HistogramSnapshot]
+    off_cpu_timings: Dict[str, HistogramSnapshot]
+
+
+def snapshot() -> RegistrySnapshot:
+    """
+    Read all registries at once.
+
+    Returns:
+        The call counts of ``log_call_counter``, and the failed call counts
+        and wall, CPU and off-CPU time histograms of
+        ``log_running_time(aggregate=True)``.
+    """
+    calls: Dict[str, int] = {}
+    # Functions that share a name are reported together
+    for name, counter in _named_call_counters():
+        calls[name] = calls.get(name, 0) + counter.value
+    with _timing_lock:
+        histograms = list(_timing_histograms.items())
+        cpu_histograms = list(_cpu_histograms.items())
+        off_cpu_histograms = list(_off_cpu_histograms.items())
+        errors = list(_error_counters.items())
+    return RegistrySnapshot(
+        calls=calls,
+        errors={name: counter.value for name, counter in errors},
+        timings={name: histogram.snapshot()
+                 for name, histogram in histograms},
+        cpu_timings={name: histogram.snapshot()
+                     for name, histogram in cpu_histograms},
+        off_cpu_timings={name: histogram.snapshot()
+                         for name, histogram in off_cpu_histograms},
+    )
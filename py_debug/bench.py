@@ -0,0 +1,402 @@
+"""
+    Per-call overhead benchmark suite for the decorators.
+
+    Run it with ``python -m py_debug.bench``. Every case times a no-op
+    function wrapped in one decorator configuration and reports ns/call and
+    the overhead over the bare function called from as many threads. Results
+    can be written as JSON and compared with an earlier run, failing on
+    regressions.
+"""
+import argparse
+import gc
+import json
+import logging
+import os
+import platform
+import re
+import sys
+import threading
+import time
+from fnmatch import fnmatchcase
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Sequence
+
+from . import (
+    log_running_time, log_args, log_call_counter, log_memory_usage,
+    set_enabled, get_enabled, OneInN, QueuedEmitter, EventSink, govern, timed,
+    BlockTimer,
+)
+
+# Records of the enabled cases are formatted and dropped; the disabled ones
+# are below the level
+_enabled_logger = logging.getLogger('py_debug.bench.enabled')
+_disabled_logger = logging.getLogger('py_debug.bench.disabled')
+
+
+class Case(NamedTuple):
+    """One benchmark configuration."""
+
+    name: str
+    #: Builds the function to time, which takes no arguments; only called
+    #: when the case runs, so cases left out create no emitter or sink
+    make: Callable[[], Callable[[], Any]]
+    threads: int = 1
+    #: Whether the decorators are switched on with ``set_enabled``
+    enabled: bool = True
+
+
+class Result(NamedTuple):
+    """The best time per call of a case, in nanoseconds."""
+
+    ns_per_call: float
+    overhead_ns: float
+
+
+def _noop(*args: Any, **kwargs: Any) -> None:
+    pass
+
+
+def _noop_for(case: str) -> Callable[..., None]:
+    """
+    Make a no-op function of a case's own, named after the case.
+
+    The registries key data such as timing histograms by function name, so
+    cases timing one shared function would add up into one entry.
+    """
+    def noop(*args: Any, **kwargs: Any) -> None:
+        pass
+
+    noop.__name__ = noop.__qualname__ = 'noop_' + re.sub(r'\W+', '_', case)
+    return noop
+
+
+def _bind(func: Callable, *args: Any) -> Callable[[], Any]:
+    """Make a no-argument callable that calls func with args."""
+    return lambda: func(*args)
+
+
+def default_cases(threads: int = 4) -> List[Case]:
+    """
+    Build the cases of the suite.
+
+    Args:
+        threads: The number of threads of the contended cases (default: 4).
+
+    Returns:
+        The cases, each bare case first for its thread count.
+    """
+    enabled, disabled = _enabled_logger, _disabled_logger
+    large = list(range(100_000))
+
+    def case(
+            name: str,
+            decorator: Callable[[Callable], Callable],
+            *args: Any,
+            threads: int = 1,
+    ) -> Case:
+        def make() -> Callable[[], Any]:
+            func = decorator(_noop_for(name))
+            return _bind(func, *args) if args else func
+
+        return Case(name, make, threads)
+
+    def stacked() -> Callable[[], Any]:
+        func = log_running_time(logger=disabled)(_noop_for('stacked'))
+        func = log_call_counter(logger=disabled)(func)
+        return log_args(logger=disabled)(func)
+
+    def reused_block() -> Callable[[], None]:
+        block_timer = BlockTimer('py_debug.bench.block')
+
+        def block() -> None:
+            with block_timer:
+                pass
+
+        return block
+
+    def looked_up_block() -> None:
+        with timed('py_debug.bench.block'):
+            pass
+
+    return [
+        Case('bare call', lambda: _noop),
+        case('log_running_time, disabled level',
+             log_running_time(logger=disabled)),
+        case('log_running_time, enabled', log_running_time(logger=enabled)),
+        case('log_running_time, aggregate',
+             log_running_time(logger=disabled, aggregate=True)),
+        case('log_running_time, call tree',
+             log_running_time(logger=disabled, call_tree=True)),
+        case('log_running_time, aggregate, cpu',
+             log_running_time(logger=disabled, aggregate=True, cpu=True)),
+        case('log_running_time, p99 threshold',
+             log_running_time(logger=enabled, threshold='p99')),
+        case('log_running_time, queued', lambda func: log_running_time(
+            logger=enabled, emitter=QueuedEmitter(overflow='block'))(func)),
+        case('log_running_time, binary sink', lambda func: log_running_time(
+            sink=EventSink(os.devnull, format='binary'))(func)),
+        Case('BlockTimer, reused', reused_block),
+        Case('timed, looked up', lambda: looked_up_block),
+        case('log_args, disabled level', log_args(logger=disabled)),
+        case('log_args, enabled', log_args(logger=enabled), 1, 'two'),
+        case('log_args, large arg, disabled level',
+             log_args(logger=disabled), large),
+        case('log_args, large arg, enabled', log_args(logger=enabled), large),
+        case('log_args, 1 in 100',
+             log_args(logger=enabled, sample=OneInN(100))),
+        case('log_call_counter, disabled level',
+             log_call_counter(logger=disabled)),
+        case('log_call_counter, muted', log_call_counter(
+            logger=enabled, mute_after=0, log_every=10 ** 12)),
+        case('log_call_counter, rate window', log_call_counter(
+            logger=enabled, mute_after=0, log_every=10 ** 12, rate_window=60)),
+        case('log_call_counter, enabled',
+             log_call_counter(logger=enabled, mute_after=10 ** 12)),
+        case('log_memory_usage, disabled level',
+             log_memory_usage(logger=disabled)),
+        case('log_memory_usage, traced, aggregate',
+             log_memory_usage(aggregate=True)),
+        case('log_memory_usage, RSS only, aggregate',
+             log_memory_usage(trace=False, aggregate=True)),
+        Case('stacked, disabled level', stacked),
+        Case('stacked, switched off', stacked, enabled=False),
+        case('log_args + log_call_counter, enabled',
+             lambda func: log_args(logger=enabled)(
+                 log_call_counter(logger=enabled, mute_after=10 ** 12)(func)),
+             1, 'two'),
+        case('log_args + log_call_counter, governed',
+             govern(log_args(logger=enabled),
+                    log_call_counter(logger=enabled, mute_after=10 ** 12),
+                    logger=disabled),
+             1, 'two'),
+        Case(f'bare call, {threads} threads', lambda: _noop, threads),
+        case(f'log_running_time, aggregate, {threads} threads',
+             log_running_time(logger=disabled, aggregate=True),
+             threads=threads),
+        case(f'log_call_counter, muted, {threads} threads',
+             log_call_counter(logger=enabled, mute_after=0,
+                              log_every=10 ** 12),
+             threads=threads),
+    ]
+
+
+def _run(func: Callable[[], Any], number: int, threads: int) -> float:
+    """
+    Call func number times in each of threads threads and return the seconds
+    taken.
+    """
+    if threads == 1:
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        return time.perf_counter() - start
+
+    barrier = threading.Barrier(threads + 1)
+
+    def worker() -> None:
+        barrier.wait()
+        for _ in range(number):
+            func()
+
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    for worker_thread in workers:
+        worker_thread.start()
+    start = time.perf_counter()
+    barrier.wait()
+    for worker_thread in workers:
+        worker_thread.join()
+    return time.perf_counter() - start
+
+
+def measure(
+        func: Callable[[], Any],
+        threads: int = 1,
+        repeat: int = 5,
+        min_time: float = 0.1,
+) -> float:
+    """
+    Time calls of a function.
+
+    The function is called 100 times to warm up, then the number of calls per
+    run is calibrated to take at least ``min_time`` seconds. The garbage
+    collector is switched off while timing and run between runs, so no run
+    pays for another's garbage.
+
+    Args:
+        func: The function to call without arguments.
+        threads: The number of threads calling it at once (default: 1).
+        repeat: The number of timed runs (default: 5).
+        min_time: The least duration of a run in seconds (default: 0.1).
+
+    Returns:
+        The best time per call over the runs, in nanoseconds of wall time
+        divided by all calls of all threads.
+    """
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        _run(func, 100, 1)
+        number = 1
+        while True:
+            elapsed = _run(func, number, threads)
+            if elapsed >= min_time:
+                break
+            number = max(number * 2,
+                         int(number * min_time / elapsed * 1.1)
+                         if elapsed else number * 10)
+        best = elapsed
+        for _ in range(repeat - 1):
+            gc.collect()
+            best = min(best, _run(func, number, threads))
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    return best / (number * threads) * 1e9
+
+
+def run(
+        cases: Sequence[Case],
+        repeat: int = 5,
+        min_time: float = 0.1,
+) -> Dict[str, Result]:
+    """
+    Run benchmark cases.
+
+    Args:
+        cases: The cases to run; the overhead of each is taken over the
+            first case named ``bare call...`` with the same thread count.
+        repeat: The number of timed runs per case (default: 5).
+        min_time: The least duration of a run in seconds (default: 0.1).
+
+    Returns:
+        The result of each case, by name, in the order they ran.
+    """
+    _enabled_logger.setLevel(logging.DEBUG)
+    _disabled_logger.setLevel(logging.WARNING)
+    propagated = [(bench_logger, bench_logger.propagate)
+                  for bench_logger in (_enabled_logger, _disabled_logger)]
+    for bench_logger, _ in propagated:
+        bench_logger.propagate = False
+        if not bench_logger.handlers:
+            bench_logger.addHandler(logging.NullHandler())
+    was_enabled = get_enabled()
+    bare: Dict[int, float] = {}
+    results = {}
+    try:
+        for case in cases:
+            # Built before switching, so switched off cases still time the
+            # wrappers
+            func = case.make()
+            set_enabled(case.enabled)
+            ns = measure(func, case.threads, repeat, min_time)
+            if case.name.startswith('bare call'):
+                bare.setdefault(case.threads, ns)
+            results[case.name] = Result(ns, ns - bare.get(case.threads, 0.0))
+    finally:
+        set_enabled(was_enabled)
+        for bench_logger, propagate in propagated:
+            bench_logger.propagate = propagate
+    return results
+
+
+def compare(
+        results: Dict[str, Result],
+        baseline: Dict[str, Any],
+        threshold: float = 0.25,
+) -> List[str]:
+    """
+    Find the cases that got slower than a stored baseline.
+
+    Args:
+        results: Results of ``run``.
+        baseline: A JSON report written by an earlier run.
+        threshold: The allowed slowdown, as a fraction of the baseline
+            ns/call (default: 0.25, 25%).
+
+    Returns:
+        A description of each regressed case; cases missing from either
+        side are not compared.
+    """
+    regressions = []
+    for name, result in results.items():
+        before = baseline.get('results', {}).get(name)
+        if before is None:
+            continue
+        limit = before['ns_per_call'] * (1 + threshold)
+        if result.ns_per_call > limit:
+            regressions.append(
+                f'{name}: {result.ns_per_call:.1f} ns/call, baseline '
+                f'{before["ns_per_call"]:.1f} (+{threshold:.0%} allows '
+                f'{limit:.1f})')
+    return regressions
+
+
+def report(results: Dict[str, Result]) -> Dict[str, Any]:
+    """Make the JSON report of results."""
+    return {
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'results': {name: result._asdict()
+                    for name, result in results.items()},
+    }
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """
+    Run the suite from the command line.
+
+    Returns:
+        The exit status: 1 if a case regressed against ``--baseline``, else
+        0.
+    """
+    parser = argparse.ArgumentParser(
+        prog='python -m py_debug.bench',
+        description=__doc__.splitlines()[1].strip())
+    parser.add_argument('--repeat', type=int, default=5,
+                        help='timed runs per case (default: 5)')
+    parser.add_argument('--min-time', type=float, default=0.1,
+                        help='least seconds per run (default: 0.1)')
+    parser.add_argument('--threads', type=int, default=4,
+                        help='threads of the contended cases (default: 4)')
+    parser.add_argument('--filter', action='append', metavar='GLOB',
+                        help='only run the cases matching a glob; bare calls '
+                             'always run')
+    parser.add_argument('--json', metavar='PATH',
+                        help="write the results as JSON, '-' for stdout")
+    parser.add_argument('--baseline', metavar='PATH',
+                        help='JSON results to compare against')
+    parser.add_argument('--threshold', type=float, default=0.25,
+                        help='allowed slowdown against the baseline '
+                             '(default: 0.25)')
+    options = parser.parse_args(argv)
+    if options.repeat < 1 or options.min_time <= 0 or options.threads < 1:
+        parser.error('--repeat, --min-time and --threads must be positive')
+
+    cases = [case for case in default_cases(options.threads)
+             if case.name.startswith('bare call') or not options.filter
+             or any(fnmatchcase(case.name, pattern)
+                    for pattern in options.filter)]
+    results = run(cases, options.repeat, options.min_time)
+
+    out = sys.stderr if options.json == '-' else sys.stdout
+    print(f'{"case":<45} {"ns/call":>10} {"overhead":>10}', file=out)
+    for name, result in results.items():
+        print(f'{name:<45} {result.ns_per_call:>10.1f} '
+              f'{result.overhead_ns:>10.1f}', file=out)
+    if options.json == '-':
+        json.dump(report(results), sys.stdout, indent=2)
+        print()
+    elif options.json:
+        with open(options.json, 'w') as file:
+            json.dump(report(results), file, indent=2)
+
+    if options.baseline:
+        with open(options.baseline) as file:
+            regressions = compare(results, json.load(file), options.threshold)
+        for regression in regressions:
+            print(f'REGRESSION {regression}', file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,260 @@
+"""
+    Aggregated call trees with inclusive and exclusive (self) times.
+"""
+import time
+from contextvars import ContextVar, Token
+from threading import Lock
+from typing import Callable, Dict, FrozenSet, List, NamedTuple, Optional, Tuple
+
+
+class CallTreeNode(NamedTuple):
+    """
+    One call path of the tree, aggregated over all calls along it; times in
+    seconds.
+    """
+
+    #: The full qualified name of the function, or '<root>' for the root
+    name: str
+    calls: int
+    #: Time from entering to leaving the function, its callees included
+    inclusive: float
+    #: Inclusive time minus the inclusive time of its callees
+    exclusive: float
+    children: List['CallTreeNode']
+
+
+class Hotspot(NamedTuple):
+    """
+    The times of one function over all the paths it was called on, in
+    seconds.
+    """
+
+    function: str
+    calls: int
+    #: Exclusive time
+    self_time: float
+    #: Inclusive time, not counting recursive calls twice
+    total_time: float
+    #: Share of the self time of all functions
+    self_share: float
+
+
+class _Node:
+    """A live node of the tree."""
+
+    __slots__ = ('name', 'children', 'calls', 'inclusive_ns', 'exclusive_ns')
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.children: Dict[str, '_Node'] = {}
+        self.calls = 0
+        self.inclusive_ns = 0
+        self.exclusive_ns = 0
+
+
+class _Frame:
+    """A call in flight: its node, start and the time its callees took."""
+
+    __slots__ = ('node', 'parent', 'start', 'children_ns')
+
+    def __init__(
+            self,
+            node: Optional[_Node],
+            parent: Optional['_Frame'],
+            start: int,
+    ) -> None:
+        self.node = node
+        self.parent = parent
+        self.start = start
+        self.children_ns = 0
+
+
+class CallTree:
+    """
+    Call tree of the instrumented functions, keyed by call path.
+
+    The calls in flight form a stack kept in a ``ContextVar``, so every
+    thread and every asyncio task has its own. A task starts from the call
+    that created it, and a thread from the root. Leaving a call adds its
+    time to its node and to the callee time of its caller, under one lock.
+
+    Memory is bounded by ``max_nodes``. Calls on paths that would need more
+    nodes are not recorded, and neither are their callees; ``dropped``
+    counts them, and their time still counts as callee time of the caller.
+
+    Callees running concurrently, like tasks gathered by the caller, can
+    add up to more than the caller's own time. Exclusive time is never
+    negative, so in that case it is 0.
+
+    Example:
+        >>> tree = CallTree()
+        >>> token = tree.enter('module.parent')
+        >>> tree.leave(tree.enter('module.child'))
+        >>> tree.leave(token)
+        >>> tree.snapshot().children[0].children[0].name
+        'module.child'
+    """
+
+    def __init__(
+            self,
+            max_nodes: int = 10_000,
+            clock: Callable[[], int] = time.perf_counter_ns,
+    ) -> None:
+        """
+        Args:
+            max_nodes: The most nodes the tree grows to (default: 10000).
+            clock: The clock in nanoseconds (default: time.perf_counter_ns).
+        """
+        if max_nodes < 1:
+            raise ValueError("max_nodes must be positive")
+        self.max_nodes = max_nodes
+        self._clock = clock
+        self._current: ContextVar[Optional[_Frame]] = ContextVar(
+            'py_debug_call_tree', default=None)
+        self._lock = Lock()
+        self._root = _Node('<root>')
+        self._nodes = 0
+        self.dropped = 0
+
+    def enter(self, name: str) -> Token:
+        """
+        Enter a call.
+
+        Args:
+            name: The full qualified name of the function called.
+
+        Returns:
+            The token to pass to ``leave`` when the call ends.
+        """
+        parent = self._current.get()
+        # Calls in flight across a reset keep recording into the old tree
+        parent_node = self._root if parent is None else parent.node
+        node = None
+        if parent_node is not None:
+            node = parent_node.children.get(name)
+            if node is None:
+                node = self._add(parent_node, name)
+        return self._current.set(_Frame(node, parent, self._clock()))
+
+    def _add(self, parent: _Node, name: str) -> Optional[_Node]:
+        """Add a child node, unless the tree is full."""
+        with self._lock:
+            node = parent.children.get(name)
+            if node is None and self._nodes < self.max_nodes:
+                node = parent.children[name] = _Node(name)
+                self._nodes += 1
+            return node
+
+    def leave(self, token: Token) -> None:
+        """
+        Leave the call ``enter`` returned the token for.
+
+        Args:
+            token: The token of the call.
+
+        Raises:
+            RuntimeError: If no call is in flight in this context.
+        """
+        frame = self._current.get()
+        if frame is None:
+            raise RuntimeError("leave() without a call in flight")
+        elapsed = self._clock() - frame.start
+        self._current.reset(token)
+        node, parent = frame.node, frame.parent
+        with self._lock:
+            if parent is not None:
+                parent.children_ns += elapsed
+            if node is None:
+                self.dropped += 1
+                return
+            node.calls += 1
+            node.inclusive_ns += elapsed
+            node.exclusive_ns += max(elapsed - frame.children_ns, 0)
+
+    def reset(self) -> None:
+        """Forget all recorded calls, including those in flight."""
+        with self._lock:
+            self._root = _Node('<root>')
+            self._nodes = 0
+            self.dropped = 0
+
+    def snapshot(self) -> CallTreeNode:
+        """
+        Copy the tree.
+
+        Returns:
+            The root, whose calls and times are the totals of the top-level
+            calls. Children are sorted by inclusive time, highest first. Paths
+            without a completed call are left out; a call still in flight,
+            like the one of a main function, shows with 0 calls if its
+            callees completed.
+        """
+        with self._lock:
+            root = self._root
+            children = self._copy_children(root)
+        return CallTreeNode(root.name, sum(child.calls for child in children),
+                            sum(child.inclusive for child in children),
+                            root.exclusive_ns / 1e9, children)
+
+    def _copy_children(self, node: _Node) -> List[CallTreeNode]:
+        children = [copy for copy in map(self._copy, node.children.values())
+                    if copy is not None]
+        children.sort(key=lambda child: child.inclusive, reverse=True)
+        return children
+
+    def _copy(self, node: _Node) -> Optional[CallTreeNode]:
+        children = self._copy_children(node)
+        if not node.calls and not children:
+            return None
+        return CallTreeNode(node.name, node.calls, node.inclusive_ns / 1e9,
+                            node.exclusive_ns / 1e9, children)
+
+
+def hotspots(root: CallTreeNode, limit: Optional[int] = 10) -> List[Hotspot]:
+    """
+    Rank the functions of a call tree by self time.
+
+    Args:
+        root: The root of a tree, from ``CallTree.snapshot``.
+        limit: The most functions to return, or None for all (default: 10).
+
+    Returns:
+        The functions with the most self time, highest first.
+    """
+    calls: Dict[str, int] = {}
+    self_time: Dict[str, float] = {}
+    total: Dict[str, float] = {}
+    pending: List[Tuple[CallTreeNode, FrozenSet[str]]] = [
+        (child, frozenset()) for child in root.children]
+    while pending:
+        node, ancestors = pending.pop()
+        name = node.name
+        calls[name] = calls.get(name, 0) + node.calls
+        self_time[name] = self_time.get(name, 0.0) + node.exclusive
+        # A recursive call is already part of its outermost call's total
+        if name not in ancestors:
+            total[name] = total.get(name, 0.0) + node.inclusive
+        inner: FrozenSet[str] = ancestors | {name}
+        pending.extend((child, inner) for child in node.children)
+    all_self = sum(self_time.values())
+    ranked = sorted(self_time, key=lambda function: self_time[function],
+                    reverse=True)
+    return [
+        Hotspot(function, calls[function], self_time[function],
+                total[function],
+                self_time[function] / all_self if all_self else 0.0)
+        for function in ranked[:limit]
+    ]
+
+
+def format_hotspots(spots: List[Hotspot], dropped: int = 0) -> str:
+    """Render hotspots as a table, noting calls the tree had no room for."""
+    lines = [f'{"self s":>12} {"self %":>7} {"total s":>12} {"calls":>10}  '
+             f'function']
+    lines += [f'{spot.self_time:12.6f} {spot.self_share * 100:6.1f}% '
+              f'{spot.total_time:12.6f} {spot.calls:10d}  {spot.function}'
+              for spot in spots]
+    if dropped:
+        lines.append(f'({dropped} calls beyond the node limit of the tree '
+                     f'were not recorded)')
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,213 @@
+"""
+    Off-thread emission of the records the py_debug decorators log.
+"""
+import atexit
+import logging
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Optional, Tuple
+
+from ._counter import CallCounter
+
+# (logger, level, msg, args, extra, created): everything a record is built from
+_Event = Tuple[
+    logging.Logger, int, str, tuple, Optional[Dict[str, Any]], float]
+
+# Reports the records that fail to be handled, the way a handler reports its
+# own errors: a traceback on stderr unless logging.raiseExceptions is off
+_error_handler = logging.Handler()
+
+
+def _handle(event: _Event) -> None:
+    """
+    Build the record of an event and pass it to its logger.
+
+    An exception from a filter, handler or formatter goes to
+    ``Handler.handleError`` instead of ending the emitter thread.
+    """
+    logger, level, msg, args, extra, created = event
+    record = None
+    try:
+        record = logger.makeRecord(logger.name, level, '(unknown file)', 0,
+                                   msg, args, None, extra=extra)
+        record.created = created
+        record.msecs = int((created - int(created)) * 1000) + 0.0
+        logger.handle(record)
+    except Exception:
+        if record is None:
+            record = logging.LogRecord(logger.name, level, '(unknown file)',
+                                       0, msg, args, None)
+        _error_handler.handleError(record)
+
+
+class QueuedEmitter:
+    """
+    Moves record formatting and handler I/O off the decorated call.
+
+    Decorators given ``emitter=`` push a raw event tuple onto a bounded queue
+    instead of calling ``Logger.log``. A background thread turns the events
+    into records in batches and passes them to ``Logger.handle``, so file
+    writes, sockets and argument reprs no longer add to the latency of the
+    caller. The level check still happens in the caller, so disabled levels
+    never reach the queue.
+
+    Records keep the time of the call, but their thread and source location
+    fields describe the emitter thread, and lazily formatted arguments are
+    rendered when the record is handled, after the call returned. A filter
+    or handler raising an exception is reported through
+    ``Handler.handleError``, and the emitter carries on with the next record.
+
+    When the queue is full, ``overflow='drop'`` discards the event and counts
+    it in ``dropped``, while ``overflow='block'`` makes the caller wait for
+    room. Pending events are flushed when the emitter is closed, which
+    happens at interpreter exit at the latest.
+
+    Example:
+        >>> emitter = QueuedEmitter(maxsize=10000, overflow='drop')
+        >>>
+        >>> @log_running_time(emitter=emitter)
+        ... def handler(request):
+        ...     pass
+    """
+
+    def __init__(
+            self,
+            maxsize: int = 10000,
+            overflow: str = 'drop',
+            batch_size: int = 256,
+            flush_interval: float = 0.1,
+    ) -> None:
+        """
+        Args:
+            maxsize: The most events waiting to be handled (default: 10000).
+                Concurrent callers may overshoot it by one event each.
+            overflow: ``'drop'`` to discard events when the queue is full, or
+                ``'block'`` to wait for room (default: 'drop').
+            batch_size: Number of queued events that wakes the emitter thread
+                before its next scheduled flush (default: 256).
+            flush_interval: The most seconds an event waits before it is
+                handled (default: 0.1).
+        """
+        if maxsize < 1:
+            raise ValueError("maxsize must be positive")
+        if overflow not in ('drop', 'block'):
+            raise ValueError("overflow must be 'drop' or 'block'")
+        if batch_size < 1:
+            raise ValueError("batch_size must be positive")
+        if flush_interval <= 0:
+            raise ValueError("flush_interval must be positive")
+        self.maxsize = maxsize
+        self.overflow = overflow
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue: Deque[_Event] = deque()
+        self._dropped = CallCounter()
+        self._wake = threading.Event()
+        self._room = threading.Condition()
+        self._drain_lock = threading.Lock()
+        self._closed = False
+        self._thread = threading.Thread(
+            target=self._run, name='py_debug-emitter', daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    @property
+    def dropped(self) -> int:
+        """The number of events discarded because the queue was full."""
+        return self._dropped.value
+
+    @property
+    def pending(self) -> int:
+        """The number of events waiting to be handled."""
+        return len(self._queue)
+
+    def bind(self, logger: logging.Logger) -> Callable[..., None]:
+        """
+        Get a replacement for ``logger.log`` that queues its records.
+
+        Args:
+            logger: The logger the records are eventually handled by.
+
+        Returns:
+            A function with the signature of ``Logger.log``, with ``extra``
+            as its only keyword argument.
+        """
+        queue = self._queue
+        maxsize, batch_size = self.maxsize, self.batch_size
+        wake = self._wake
+        drop = self.overflow == 'drop'
+        dropped = self._dropped.increment
+        clock = time.time
+
+        def log(
+                level: int,
+                msg: str,
+                *args: Any,
+                extra: Optional[Dict[str, Any]] = None,
+        ) -> None:
+            if self._closed:
+                # Nothing drains the queue any more, so emit synchronously
+                logger.log(level, msg, *args, extra=extra)
+                return
+            size = len(queue)
+            if size >= maxsize:
+                if drop:
+                    dropped()
+                    return
+                self._wait_for_room()
+            # deque.append is atomic, so producers take no lock
+            queue.append((logger, level, msg, args, extra, clock()))
+            if size + 1 >= batch_size:
+                wake.set()
+            if self._closed:
+                # Closed while appending; the final flush may have missed it
+                self.flush()
+
+        return log
+
+    def _wait_for_room(self) -> None:
+        """Block until the queue is below maxsize or the emitter is closed."""
+        with self._room:
+            while len(self._queue) >= self.maxsize and not self._closed:
+                self._wake.set()
+                self._room.wait(self.flush_interval)
+
+    def _run(self) -> None:
+        """Emitter thread: flush on every wake-up or interval until closed."""
+        while not self._closed:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.flush()
+
+    def flush(self) -> None:
+        """Handle every queued event now, in the calling thread."""
+        with self._drain_lock:
+            queue = self._queue
+            while queue:
+                # Events are only removed under the lock, so this many are
+                # there
+                size = min(len(queue), self.batch_size)
+                batch = [queue.popleft() for _ in range(size)]
+                for event in batch:
+                    _handle(event)
+                with self._room:
+                    self._room.notify_all()
+
+    def close(self) -> None:
+        """
+        Stop the emitter thread and flush what is left.
+
+        Records logged afterwards are emitted synchronously. Closing twice
+        does nothing.
+        """
+        if self._closed:
+            return
+        self._closed = True
+        atexit.unregister(self.close)
+        self._wake.set()
+        with self._room:
+            self._room.notify_all()
+        if self._thread is not threading.current_thread():
+            self._thread.join()
+        self.flush()
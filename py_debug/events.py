@@ -0,0 +1,264 @@
+"""
+    Structured events of the py_debug decorators, and a sink writing them in
+    bulk.
+"""
+import atexit
+import json
+import struct
+import threading
+import time
+from collections import deque
+from typing import IO, Any, Deque, Dict, Iterator, NamedTuple, Optional, Union
+
+#: The kinds of events, in the order of their binary codes
+KINDS = ('call', 'generator', 'summary', 'args', 'count', 'rate', 'memory',
+         'governor')
+
+# u32 payload length, then kind, flags, duration_ns, count, thread id,
+# timestamp_ns
+_PREFIX = struct.Struct('<I')
+_FIXED = struct.Struct('<BBqqQq')
+_LENGTH = struct.Struct('<H')
+_HAS_DURATION = 1
+_HAS_COUNT = 2
+
+
+class Event(NamedTuple):
+    """
+    One thing a decorator reported.
+
+    Every record a decorator logs carries its event as the ``py_debug``
+    attribute (passed as ``extra``), so handlers and filters can read the
+    numbers without parsing the message.
+    """
+
+    #: The full qualified name of the function
+    function: str
+    #: One of ``KINDS``
+    kind: str
+    #: The duration in nanoseconds: of the call, of a generator's active
+    #: time, the mean of a summary, or the overhead per instrumented call
+    #: that stepped a governed function down; None for other kinds
+    duration_ns: Optional[int]
+    #: The call number, the items of a generator, the calls of a summary,
+    #: the calls/s of a rate crossing or the net bytes a call allocated (its
+    #: RSS change if allocations were not traced) or the calls a governor
+    #: has seen; None for other kinds
+    # The field shadows tuple.count, which mypy reports; the name is public API
+    count: Optional[int]  # type: ignore[assignment]
+    #: The type name of the exception the call raised, or None
+    exception: Optional[str]
+    #: ``threading.get_ident()`` of the calling thread
+    thread_id: int
+    #: ``time.time_ns()`` when the event was reported
+    timestamp: int
+
+
+def make_event(
+        function: str,
+        kind: str,
+        duration_ns: Optional[int] = None,
+        count: Optional[int] = None,
+        error: Optional[BaseException] = None,
+) -> Event:
+    """Make an event of the calling thread at the current time."""
+    return Event(function, kind, duration_ns, count,
+                 None if error is None else type(error).__name__,
+                 threading.get_ident(), time.time_ns())
+
+
+def _encode_jsonl(event: Event) -> bytes:
+    text = json.dumps(event._asdict(), separators=(',', ':'))
+    return text.encode('utf-8') + b'\n'
+
+
+def _encode_field(text: str) -> bytes:
+    """Encode a string field, cut to the u16 limit on a character boundary."""
+    encoded = text.encode('utf-8')
+    if len(encoded) <= 0xFFFF:
+        return encoded
+    return encoded[:0xFFFF].decode('utf-8', 'ignore').encode('utf-8')
+
+
+def _encode_binary(event: Event) -> bytes:
+    flags = ((_HAS_DURATION if event.duration_ns is not None else 0)
+             | (_HAS_COUNT if event.count is not None else 0))
+    function = _encode_field(event.function)
+    exception = _encode_field(event.exception or '')
+    payload = b''.join((
+        _FIXED.pack(KINDS.index(event.kind), flags, event.duration_ns or 0,
+                    event.count or 0, event.thread_id, event.timestamp),
+        _LENGTH.pack(len(function)), function,
+        _LENGTH.pack(len(exception)), exception,
+    ))
+    return _PREFIX.pack(len(payload)) + payload
+
+
+def _decode_binary(payload: bytes) -> Event:
+    (kind, flags, duration_ns, count, thread_id,
+     timestamp) = _FIXED.unpack_from(payload)
+    offset = _FIXED.size
+    (length,) = _LENGTH.unpack_from(payload, offset)
+    offset += _LENGTH.size
+    function = payload[offset:offset + length].decode('utf-8')
+    offset += length
+    (length,) = _LENGTH.unpack_from(payload, offset)
+    offset += _LENGTH.size
+    exception = payload[offset:offset + length].decode('utf-8') or None
+    return Event(function, KINDS[kind],
+                 duration_ns if flags & _HAS_DURATION else None,
+                 count if flags & _HAS_COUNT else None, exception, thread_id,
+                 timestamp)
+
+
+_ENCODERS = {'jsonl': _encode_jsonl, 'binary': _encode_binary}
+
+
+class EventSink:
+    """
+    Writes decorator events to a file in bulk, instead of logging them.
+
+    Decorators given ``sink=`` build no message and no log record: each
+    reported call only appends its ``Event`` to a buffer. The buffer is
+    encoded and written in one ``write`` whenever it holds ``buffer_size``
+    events, and when the sink is flushed or closed, which happens at
+    interpreter exit at the latest. The logger level does not apply to
+    sinks; sampling policies do.
+
+    Two formats are supported. ``'jsonl'`` writes one JSON object per line.
+    ``'binary'`` writes each event as a little-endian u32 payload length
+    followed by the payload: u8 kind (index in ``KINDS``), u8 flags (1:
+    duration present, 2: count present), i64 duration_ns, i64 count, u64
+    thread id, i64 timestamp, then the function name and the exception type
+    name, each as a u16 length and UTF-8 bytes, cut to the last whole
+    character within 65535 bytes. ``read_events`` reads both.
+
+    Example:
+        >>> sink = EventSink('/tmp/events.bin', format='binary')
+        >>>
+        >>> @log_running_time(sink=sink)
+        ... def handler(request):
+        ...     pass
+    """
+
+    def __init__(
+            self,
+            file: Union[str, IO[bytes]],
+            format: str = 'jsonl',
+            buffer_size: int = 1024,
+    ) -> None:
+        """
+        Args:
+            file: A path to append to, or a binary file object to write to.
+            format: ``'jsonl'`` or ``'binary'`` (default: 'jsonl').
+            buffer_size: The number of buffered events that triggers a write
+                (default: 1024).
+        """
+        if format not in _ENCODERS:
+            raise ValueError("format must be 'jsonl' or 'binary'")
+        if buffer_size < 1:
+            raise ValueError("buffer_size must be positive")
+        self.format = format
+        self.buffer_size = buffer_size
+        self._encode = _ENCODERS[format]
+        self._owns_file = isinstance(file, str)
+        self._file: IO[bytes] = (
+            open(file, 'ab') if isinstance(file, str) else file)
+        self._buffer: Deque[Event] = deque()
+        self._lock = threading.Lock()
+        self._closed = False
+        atexit.register(self.close)
+
+    def write(self, event: Event) -> None:
+        """
+        Buffer one event.
+
+        Args:
+            event: The event to write.
+        """
+        # deque.append is atomic, so writers take no lock until the buffer is
+        # full
+        buffer = self._buffer
+        buffer.append(event)
+        if len(buffer) >= self.buffer_size or self._closed:
+            self.flush()
+
+    def log(
+            self,
+            level: int,
+            msg: str,
+            *args: Any,
+            extra: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        """
+        Stand-in for ``Logger.log`` that writes the event in ``extra`` and
+        ignores the message.
+        """
+        if extra is not None:
+            self.write(extra['py_debug'])
+
+    def flush(self) -> None:
+        """Encode and write every buffered event now."""
+        with self._lock:
+            buffer = self._buffer
+            # Events are only removed under the lock, so this many are there
+            batch = [buffer.popleft() for _ in range(len(buffer))]
+            if not batch or self._file.closed:
+                return
+            encode = self._encode
+            self._file.write(b''.join([encode(event) for event in batch]))
+            self._file.flush()
+
+    def close(self) -> None:
+        """
+        Write what is left and close the file if the sink opened it.
+
+        Events written afterwards are written at once, as long as the file
+        is open. Closing twice does nothing.
+        """
+        if self._closed:
+            return
+        self._closed = True
+        self.flush()
+        if self._owns_file:
+            self._file.close()
+        atexit.unregister(self.close)
+
+    def __enter__(self) -> 'EventSink':
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+
+def read_events(
+        file: Union[str, IO[bytes]],
+        format: str = 'jsonl',
+) -> Iterator[Event]:
+    """
+    Read the events an ``EventSink`` wrote.
+
+    Args:
+        file: A path, or a binary file object positioned at the first event.
+        format: ``'jsonl'`` or ``'binary'`` (default: 'jsonl').
+
+    Yields:
+        The events in the order they were written.
+    """
+    if format not in _ENCODERS:
+        raise ValueError("format must be 'jsonl' or 'binary'")
+    if isinstance(file, str):
+        with open(file, 'rb') as opened:
+            yield from read_events(opened, format)
+        return
+    if format == 'jsonl':
+        for line in file:
+            if line.strip():
+                yield Event(**json.loads(line))
+        return
+    while True:
+        prefix = file.read(_PREFIX.size)
+        if len(prefix) < _PREFIX.size:
+            return
+        (length,) = _PREFIX.unpack(prefix)
+        yield _decode_binary(file.read(length))
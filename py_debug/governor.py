@@ -0,0 +1,195 @@
+"""
+    Overhead budgets for instrumentation: step it down where it costs too much.
+"""
+import time
+from itertools import count
+from statistics import median
+from threading import Lock
+from typing import List, NamedTuple, Optional
+
+from ._counter import CallCounter
+
+#: The steps of a governed function, from the most instrumentation to none
+LEVELS = ('full', 'sampled', 'counting', 'off')
+FULL, SAMPLED, COUNTING, OFF = range(len(LEVELS))
+
+#: What ``Governor.route`` tells the wrapper to do with a call: call the
+#: function alone, time it as a probe, instrument it, or only count it
+BARE, PROBE, INSTRUMENTED, COUNTED = range(4)
+
+
+class Overhead(NamedTuple):
+    """The measured cost of the instrumentation of one function, in seconds."""
+
+    #: Median duration of the function alone, timed under the instrumentation
+    run_time: float
+    #: Median duration added by the instrumentation to an instrumented call
+    overhead: float
+    #: ``overhead`` relative to ``run_time``
+    share: float
+
+
+class Downgrade(NamedTuple):
+    """A function whose instrumentation a governor stepped down."""
+
+    function: str
+    #: One of ``LEVELS``
+    level: str
+    #: The measurement of the last check
+    overhead: Overhead
+    #: The calls the governor has seen, off calls excluded
+    calls: int
+
+
+_counting_ns: Optional[int] = None
+
+
+def counting_cost_ns() -> int:
+    """
+    Estimate what counting a call costs, in nanoseconds.
+
+    Measured once per process, over a few thousand counts, and kept.
+    """
+    global _counting_ns
+    if _counting_ns is None:
+        rounds = 10_000
+        ticket = count()
+        elapsed: List[int] = []
+        for _ in range(3):
+            start = time.perf_counter_ns()
+            for _ in range(rounds):
+                next(ticket)
+            middle = time.perf_counter_ns()
+            for _ in range(rounds):
+                pass
+            end = time.perf_counter_ns()
+            elapsed.append(max((middle - start) - (end - middle), 0))
+        _counting_ns = min(elapsed) // rounds
+    return _counting_ns
+
+
+class Governor:
+    """
+    Decides how much of the instrumentation of one function to keep.
+
+    The wrapper times a few instrumented calls, the probes, both as a whole
+    and, under the instrumentation, the function alone. Once there are
+    ``probes`` of them, the difference of the medians is the overhead of the
+    instrumentation, and its share of the bare run time is checked against
+    the budget. The function steps down to the first level that fits:
+
+    - ``full``: every call is instrumented;
+    - ``sampled``: one call in ``sample_every`` is, the others only counted;
+    - ``counting``: calls are only counted;
+    - ``off``: calls go straight to the function.
+
+    Steps only go down, until ``reset``; the probes start over after every
+    check that keeps the function instrumented. ``route`` applies the
+    current level to each call, probing one in ``probe_every`` while the
+    instrumentation is still run.
+
+    Example:
+        >>> governor = Governor(budget=0.1, probes=1)
+        >>> governor.record(100, 500)  # 400 ns over a 100 ns call
+        True
+        >>> LEVELS[governor.step]
+        'sampled'
+    """
+
+    def __init__(self, budget: float = 0.05, sample_every: int = 100,
+                 probes: int = 16, counting_ns: Optional[int] = None,
+                 probe_every: int = 64) -> None:
+        """
+        Args:
+            budget: The most overhead allowed, as a share of the function's
+                run time (default: 0.05, 5%).
+            sample_every: Instrument one call in this many at the ``sampled``
+                level (default: 100).
+            probes: The number of calls timed per check (default: 16).
+            counting_ns: What counting a call costs, in nanoseconds (default:
+                None, measured at the first check).
+            probe_every: Time one call in this many (default: 64).
+        """
+        if budget <= 0:
+            raise ValueError("budget must be positive")
+        if sample_every < 2:
+            raise ValueError("sample_every must be at least 2")
+        if probes < 1:
+            raise ValueError("probes must be positive")
+        if probe_every < 1:
+            raise ValueError("probe_every must be positive")
+        self.budget = budget
+        self.sample_every = sample_every
+        self.probes = probes
+        self.probe_every = probe_every
+        self._counting_ns = counting_ns
+        #: The calls of the function, counted at every level but ``off``
+        self.calls = CallCounter()
+        self._lock = Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        """Go back to full instrumentation and forget the probes and calls."""
+        self.calls.reset()
+        with self._lock:
+            self._bare: List[int] = []
+            self._instrumented: List[int] = []
+            #: The index of the current level in ``LEVELS``
+            self.step = FULL
+            #: The measurement of the last check, or None
+            self.last: Optional[Overhead] = None
+
+    def route(self) -> int:
+        """
+        Decide what to do with one call, and count it unless the function is
+        off.
+
+        Returns:
+            ``BARE``, ``PROBE``, ``INSTRUMENTED`` or ``COUNTED``.
+        """
+        step = self.step
+        if step == OFF:
+            return BARE
+        call = self.calls.increment()
+        if step != COUNTING and call % self.probe_every == 0:
+            return PROBE
+        if step == FULL or step == SAMPLED and call % self.sample_every == 0:
+            return INSTRUMENTED
+        return COUNTED
+
+    def record(self, bare_ns: int, instrumented_ns: int) -> bool:
+        """
+        Add a probe, and check the overhead once there are enough.
+
+        Args:
+            bare_ns: The duration of the function within the call, in
+                nanoseconds.
+            instrumented_ns: The duration of the whole instrumented call, in
+                nanoseconds.
+
+        Returns:
+            True if the function stepped down.
+        """
+        with self._lock:
+            self._bare.append(bare_ns)
+            self._instrumented.append(instrumented_ns)
+            if len(self._bare) < self.probes:
+                return False
+            bare, full = median(self._bare), median(self._instrumented)
+            self._bare, self._instrumented = [], []
+            overhead = max(full - bare, 0)
+            share = overhead / bare if bare else float('inf')
+            self.last = Overhead(bare / 1e9, overhead / 1e9, share)
+            if self._counting_ns is None:
+                self._counting_ns = counting_cost_ns()
+            costs = (
+                share,
+                share / self.sample_every,
+                self._counting_ns / bare if bare else float('inf'),
+            )
+            fitting = next((step for step, cost in enumerate(costs)
+                            if cost <= self.budget), OFF)
+            if fitting <= self.step:
+                return False
+            self.step = fitting
+            return True
@@ -0,0 +1,273 @@
+"""
+    Fixed-memory log-linear histograms for aggregating call durations.
+"""
+from collections import deque
+from itertools import count
+from threading import Lock
+from typing import Deque, Iterator, List, NamedTuple, Optional, Tuple
+
+
+class TimingStats(NamedTuple):
+    """Summary of the durations recorded for one function, in seconds."""
+
+    # The field shadows tuple.count, which mypy reports; the name is public API
+    count: int  # type: ignore[assignment]
+    min: float
+    max: float
+    mean: float
+    p50: float
+    p90: float
+    p99: float
+    p999: float
+
+
+class HistogramSnapshot(NamedTuple):
+    """Consistent copy of the state of a histogram."""
+
+    #: ``(highest value, count)`` of the non-empty buckets, in value order
+    buckets: List[Tuple[int, int]]
+    count: int  # type: ignore[assignment]
+    total: int
+
+
+class Histogram:
+    """
+    Log-linear (HDR-style) histogram of non-negative integer values.
+
+    Values below ``2 ** precision_bits`` get a bucket each. Above that, every
+    power of two is split into ``2 ** (precision_bits - 1)`` equal buckets, so
+    a recorded value is off by at most ``2 / 2 ** precision_bits`` of itself
+    (1.6% with the default 7 bits). Values wider than ``max_value_bits`` bits
+    share the last bucket, which keeps the memory fixed; ``min``, ``max`` and
+    the mean are tracked exactly regardless.
+
+    Recording only appends to a small buffer, which is folded into the
+    buckets every ``batch_size`` values or whenever the histogram is read,
+    so the hot path takes no lock.
+
+    Example:
+        >>> histogram = Histogram()
+        >>> for value in range(1, 1001):
+        ...     _ = histogram.record(value)
+        >>> histogram.percentile(50)  # 500, within 1.6%
+        503
+    """
+
+    def __init__(
+            self,
+            precision_bits: int = 7,
+            max_value_bits: int = 44,
+            batch_size: int = 256,
+    ) -> None:
+        """
+        Args:
+            precision_bits: Bits of each value kept exactly (default: 7).
+            max_value_bits: Width of the largest value with its own bucket
+                (default: 44, about 4.9 hours in nanoseconds).
+            batch_size: Number of buffered values that triggers folding them
+                into the buckets (default: 256).
+        """
+        if precision_bits < 1:
+            raise ValueError("precision_bits must be positive")
+        if max_value_bits <= precision_bits:
+            raise ValueError(
+                "max_value_bits must be greater than precision_bits")
+        if batch_size < 1:
+            raise ValueError("batch_size must be positive")
+        self._precision = precision_bits
+        self._linear = 1 << precision_bits
+        self._half = self._linear >> 1
+        self._max_exponent = max_value_bits - precision_bits
+        self._counts: List[int] = [0] * (
+            self._linear + self._max_exponent * self._half)
+        self._batch_size = batch_size
+        self._pending: Deque[int] = deque()
+        self._ticket = count(1)
+        self._lock = Lock()
+        self._count = 0
+        self._total = 0
+        self._min: Optional[int] = None
+        self._max: Optional[int] = None
+
+    @property
+    def count(self) -> int:
+        """The number of values recorded."""
+        self._fold()
+        return self._count
+
+    @property
+    def total(self) -> int:
+        """The sum of the values recorded."""
+        self._fold()
+        return self._total
+
+    @property
+    def min(self) -> Optional[int]:
+        """The smallest value recorded, or None."""
+        self._fold()
+        return self._min
+
+    @property
+    def max(self) -> Optional[int]:
+        """The largest value recorded, or None."""
+        self._fold()
+        return self._max
+
+    def _index(self, value: int) -> int:
+        """Get the bucket index of a value."""
+        if value < self._linear:
+            return value
+        exponent = value.bit_length() - self._precision
+        if exponent > self._max_exponent:
+            return len(self._counts) - 1
+        return (self._linear + (exponent - 1) * self._half
+                + (value >> exponent) - self._half)
+
+    def _bounds(self, index: int) -> Tuple[int, int]:
+        """Get the lowest and highest value that fall into a bucket."""
+        if index < self._linear:
+            return index, index
+        exponent, offset = divmod(index - self._linear, self._half)
+        exponent += 1
+        mantissa = offset + self._half
+        return mantissa << exponent, ((mantissa + 1) << exponent) - 1
+
+    def record(self, value: int) -> int:
+        """
+        Record one value.
+
+        Args:
+            value: A non-negative integer, e.g. a duration in nanoseconds.
+
+        Returns:
+            The number of values recorded so far, including this one.
+        """
+        # deque.append and next() on a count are atomic, so no lock is needed
+        pending = self._pending
+        pending.append(value)
+        if len(pending) >= self._batch_size:
+            self._fold()
+        return next(self._ticket)
+
+    def _fold(self) -> None:
+        """Move buffered values into the buckets."""
+        with self._lock:
+            # Values are only removed under the lock, so this many are there
+            pending = self._pending
+            batch = [pending.popleft() for _ in range(len(pending))]
+            if not batch:
+                return
+            counts = self._counts
+            linear, half, precision = self._linear, self._half, self._precision
+            max_exponent = self._max_exponent
+            for value in batch:
+                if value < linear:
+                    counts[value] += 1
+                    continue
+                exponent = value.bit_length() - precision
+                if exponent > max_exponent:
+                    counts[-1] += 1
+                else:
+                    index = (linear + (exponent - 1) * half
+                             + (value >> exponent) - half)
+                    counts[index] += 1
+            low, high = min(batch), max(batch)
+            if self._min is not None and self._max is not None:
+                low, high = min(low, self._min), max(high, self._max)
+            self._min, self._max = low, high
+            self._total += sum(batch)
+            self._count += len(batch)
+
+    def percentile(self, percent: float) -> int:
+        """
+        Get the value below or at which the given percentage of values fall.
+
+        Args:
+            percent: The percentile to compute, from 0 to 100.
+
+        Returns:
+            The highest value of the bucket holding that percentile, clamped
+            to the recorded range, or 0 if nothing has been recorded.
+        """
+        if not 0 <= percent <= 100:
+            raise ValueError("percent must be between 0 and 100")
+        self._fold()
+        with self._lock:
+            low, high = self._min, self._max
+            if low is None or high is None:
+                return 0
+            rank = max(1, -(-self._count * percent // 100))
+            seen = 0
+            for index, bucket_count in enumerate(self._counts):
+                seen += bucket_count
+                if seen >= rank:
+                    return max(low, min(high, self._bounds(index)[1]))
+            return high
+
+    def buckets(self) -> Iterator[Tuple[int, int]]:
+        """
+        Iterate over the non-empty buckets.
+
+        Yields:
+            ``(highest value, count)`` pairs in increasing value order.
+        """
+        self._fold()
+        with self._lock:
+            counts = list(self._counts)
+        for index, bucket_count in enumerate(counts):
+            if bucket_count:
+                yield self._bounds(index)[1], bucket_count
+
+    def snapshot(self) -> HistogramSnapshot:
+        """
+        Copy the buckets, count and total at one point in time.
+
+        Returns:
+            The non-empty buckets with the count and sum of the values they
+            hold.
+        """
+        self._fold()
+        with self._lock:
+            counts = list(self._counts)
+            count, total = self._count, self._total
+        buckets = [(self._bounds(index)[1], bucket_count)
+                   for index, bucket_count in enumerate(counts)
+                   if bucket_count]
+        return HistogramSnapshot(buckets, count, total)
+
+    def timing_stats(self, scale: float = 1e-9) -> TimingStats:
+        """
+        Summarize the recorded values.
+
+        Args:
+            scale: Factor converting recorded values to the reported unit
+                (default: 1e-9, nanoseconds to seconds).
+
+        Returns:
+            The count, minimum, maximum, mean and percentiles.
+        """
+        self._fold()
+        with self._lock:
+            count, total = self._count, self._total
+            low, high = self._min or 0, self._max or 0
+        return TimingStats(
+            count=count,
+            min=low * scale,
+            max=high * scale,
+            mean=total / count * scale if count else 0.0,
+            p50=self.percentile(50) * scale,
+            p90=self.percentile(90) * scale,
+            p99=self.percentile(99) * scale,
+            p999=self.percentile(99.9) * scale,
+        )
+
+    def reset(self) -> None:
+        """Forget all recorded values."""
+        with self._lock:
+            self._pending.clear()
+            self._ticket = count(1)
+            self._counts = [0] * len(self._counts)
+            self._count = 0
+            self._total = 0
+            self._min = None
+            self._max = None
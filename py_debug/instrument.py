@@ -0,0 +1,217 @@
+"""
+    Bulk decoration of the functions of a module or class.
+"""
+import inspect
+from fnmatch import fnmatchcase
+from types import FunctionType, ModuleType
+from typing import Any, Callable, List, Optional, Sequence, Set, Tuple, Union
+
+Patterns = Union[str, Sequence[str]]
+
+# Dunder methods that are worth instrumenting; the rest run implicitly and
+# often
+_DUNDERS = ('__init__', '__call__')
+
+
+def _patterns(patterns: Patterns) -> Tuple[str, ...]:
+    """Normalize one glob or a sequence of globs to a tuple."""
+    return (patterns,) if isinstance(patterns, str) else tuple(patterns)
+
+
+def _selector(include: Patterns, exclude: Patterns) -> Callable[[str], bool]:
+    """Build the check of whether a qualified name is selected by the globs."""
+    included, excluded = _patterns(include), _patterns(exclude)
+
+    def selected(qualname: str) -> bool:
+        return (any(fnmatchcase(qualname, pattern) for pattern in included)
+                and not any(fnmatchcase(qualname, pattern)
+                            for pattern in excluded))
+
+    return selected
+
+
+class Instrumentation:
+    """
+    Undo handle for the functions decorated by ``instrument``.
+
+    Also a context manager that undoes the instrumentation on exit.
+    """
+
+    def __init__(self) -> None:
+        #: ``(owner, attribute name, original value, replacement)``, in
+        #: decoration order
+        self._patches: List[Tuple[Any, str, Any, Any]] = []
+        #: Qualified names of the decorated functions, relative to the target
+        self.names: List[str] = []
+
+    def _patch(
+            self,
+            owner: Any,
+            name: str,
+            original: Any,
+            replacement: Any,
+            qualname: str,
+    ) -> None:
+        """Replace an attribute and remember how to put it back."""
+        setattr(owner, name, replacement)
+        self._patches.append((owner, name, original, replacement))
+        self.names.append(qualname)
+
+    def undo(self) -> None:
+        """
+        Put the original attributes back.
+
+        Attributes that were reassigned since are left alone. Calling ``undo``
+        again does nothing.
+        """
+        while self._patches:
+            owner, name, original, replacement = self._patches.pop()
+            if vars(owner).get(name) is replacement:
+                setattr(owner, name, original)
+        self.names = []
+
+    def __enter__(self) -> 'Instrumentation':
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.undo()
+
+
+def _decorated_member(
+        value: Any,
+        decorate: Callable[[Callable], Callable],
+) -> Optional[Any]:
+    """
+    Decorate a class attribute, if it is one ``instrument`` covers.
+
+    Args:
+        value: The attribute, as stored in the class ``__dict__``.
+        decorate: Applies the decorators to a function.
+
+    Returns:
+        The replacement, of the same kind as the attribute, or None.
+    """
+    if isinstance(value, FunctionType):
+        return decorate(value)
+    if isinstance(value, (staticmethod, classmethod)):
+        return type(value)(decorate(value.__func__))
+    if not isinstance(value, property):
+        return None
+    replacement = value
+    if value.fget is not None:
+        replacement = replacement.getter(decorate(value.fget))
+    if value.fset is not None:
+        replacement = replacement.setter(decorate(value.fset))
+    if value.fdel is not None:
+        replacement = replacement.deleter(decorate(value.fdel))
+    return replacement
+
+
+def _walk_class(
+        cls: type,
+        prefix: str,
+        selected: Callable[[str], bool],
+        decorate: Callable[[Callable], Callable],
+        instrumentation: Instrumentation,
+        seen: Set[type],
+) -> None:
+    """
+    Decorate the selected members of a class and of its nested classes.
+
+    Args:
+        cls: The class.
+        prefix: The qualified name of the class relative to the target,
+            with a trailing dot, or '' for the target itself.
+        selected: Whether a qualified name is selected.
+        decorate: Applies the decorators to a function.
+        instrumentation: Records the replacements.
+        seen: The classes walked already, which are skipped.
+    """
+    if cls in seen:
+        return
+    seen.add(cls)
+    for name, value in list(vars(cls).items()):
+        if (name.startswith('__') and name.endswith('__')
+                and name not in _DUNDERS):
+            continue
+        qualname = f'{prefix}{name}'
+        if inspect.isclass(value):
+            # Only classes defined in this one, not aliases of others
+            if value.__qualname__ == f'{cls.__qualname__}.{name}':
+                _walk_class(value, f'{qualname}.', selected, decorate,
+                            instrumentation, seen)
+            continue
+        replacement = (_decorated_member(value, decorate)
+                       if selected(qualname) else None)
+        if replacement is not None:
+            instrumentation._patch(cls, name, value, replacement, qualname)
+
+
+def instrument(
+        target: Union[ModuleType, type],
+        include: Patterns = '*',
+        exclude: Patterns = (),
+        decorators: Optional[Sequence[Callable]] = None,
+) -> Instrumentation:
+    """
+    Decorate the functions of a module or class in bulk.
+
+    A module contributes the functions and classes defined in it, not the ones
+    it imports. A class contributes its functions, static methods, class
+    methods, the accessors of its properties and its nested classes, but of
+    the dunder methods only ``__init__`` and ``__call__``. Each function is
+    selected by its qualified name relative to the target, such as ``func``
+    or ``Class.method``, and replaced in place, so code that looks the
+    function up on the module or class calls the decorated version; references
+    taken before, such as a ``from module import func``, are not affected.
+
+    Args:
+        target: The module or class to instrument.
+        include: A glob or sequence of globs that qualified names must match
+            (default: '*', all of them).
+        exclude: A glob or sequence of globs of qualified names to leave out
+            (default: none).
+        decorators: Decorators to apply, outermost first, as if stacked in
+            that order above each function (default: ``log_running_time()``).
+
+    Returns:
+        An ``Instrumentation`` handle whose ``undo`` restores the originals.
+
+    Example:
+        >>> import json
+        >>> from py_debug import instrument, log_call_counter
+        >>> with instrument(json, include='dump*',
+        ...                 decorators=[log_call_counter()]):
+        ...     # Logs: Function json.dumps has been called 1 times.
+        ...     json.dumps({})
+    """
+    if not isinstance(target, (ModuleType, type)):
+        raise TypeError(f"cannot instrument {target!r}: "
+                        f"expected a module or a class")
+    if decorators is None:
+        from . import log_running_time
+        decorators = [log_running_time()]
+    selected = _selector(include, exclude)
+
+    def decorate(func: Callable) -> Callable:
+        for decorator in reversed(decorators):
+            func = decorator(func)
+        return func
+
+    instrumentation = Instrumentation()
+    # Classes reachable twice, e.g. through an alias, are instrumented once
+    seen: Set[type] = set()
+
+    if isinstance(target, type):
+        _walk_class(target, '', selected, decorate, instrumentation, seen)
+        return instrumentation
+
+    for name, value in list(vars(target).items()):
+        if getattr(value, '__module__', None) != target.__name__:
+            continue
+        if inspect.isclass(value):
+            _walk_class(value, f'{name}.', selected, decorate,
+                        instrumentation, seen)
+        elif isinstance(value, FunctionType) and selected(name):
+            instrumentation._patch(target, name, value, decorate(value), name)
+    return instrumentation
@@ -0,0 +1,258 @@
+"""
+    Per-call memory measurements: traced allocations and resident set size.
+"""
+import os
+import sys
+import tracemalloc
+from threading import Lock
+from typing import Callable, NamedTuple, Optional, Set, Tuple
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None  # type: ignore[assignment]
+
+# Python 3.8 has no reset_peak; the peak then counts from when tracing started
+_reset_peak = getattr(tracemalloc, 'reset_peak', None)
+
+
+class MemoryUsage(NamedTuple):
+    """Memory one call used, in bytes; None for what was not measured."""
+
+    #: Traced bytes allocated during the call and still alive at its end
+    net: Optional[int]
+    #: Highest traced memory during the call, above the memory at its start
+    peak: Optional[int]
+    #: Change of the resident set size over the call
+    rss: Optional[int]
+
+    def __str__(self) -> str:
+        parts = []
+        if self.net is not None:
+            parts.append(f'{self.net} bytes net, {self.peak} bytes peak')
+        if self.rss is not None:
+            parts.append(f'RSS {self.rss:+d} bytes')
+        return ', '.join(parts)
+
+
+class MemoryStats(NamedTuple):
+    """Summary of the memory used by the calls of one function, in bytes."""
+
+    # The field shadows tuple.count, which mypy reports; the name is public API
+    count: int  # type: ignore[assignment]
+    net_total: int
+    net_mean: float
+    net_max: int
+    peak_max: int
+    rss_total: int
+
+
+class MemoryAggregate:
+    """
+    Running totals and maxima of the memory used by one function's calls.
+
+    Recording takes a lock, which is cheap next to the measurement itself.
+    """
+
+    def __init__(self) -> None:
+        self._lock = Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        """Forget all recorded calls."""
+        with self._lock:
+            self._count = 0
+            self._net_total = 0
+            self._net_max: Optional[int] = None
+            self._peak_max = 0
+            self._rss_total = 0
+
+    def record(self, usage: MemoryUsage) -> int:
+        """
+        Add one call.
+
+        Args:
+            usage: The memory the call used.
+
+        Returns:
+            The number of calls recorded so far, this one included.
+        """
+        with self._lock:
+            self._count += 1
+            if usage.net is not None:
+                self._net_total += usage.net
+                self._net_max = (usage.net if self._net_max is None
+                                 else max(self._net_max, usage.net))
+            if usage.peak is not None:
+                self._peak_max = max(self._peak_max, usage.peak)
+            if usage.rss is not None:
+                self._rss_total += usage.rss
+            return self._count
+
+    def stats(self) -> MemoryStats:
+        """Read the totals and maxima."""
+        with self._lock:
+            count = self._count
+            return MemoryStats(
+                count=count,
+                net_total=self._net_total,
+                net_mean=self._net_total / count if count else 0.0,
+                net_max=self._net_max or 0,
+                peak_max=self._peak_max,
+                rss_total=self._rss_total,
+            )
+
+
+class _Span:
+    """Traced memory at the start of a call in flight, and its peak so far."""
+
+    __slots__ = ('start', 'peak')
+
+    def __init__(self, start: int) -> None:
+        self.start = start
+        self.peak = start
+
+
+class _Tracer:
+    """
+    Scopes tracemalloc to the calls being measured.
+
+    Whether tracing was already on is recorded when a call begins: if it
+    was not, the tracer starts it, and stops it again when the last call in
+    flight ends. Tracing the tracer did not start is never stopped, and if
+    other code stops tracing during a call, the tracer gives up ownership
+    and reports no traced memory for that call. A ``tracemalloc.start()``
+    made while the tracer holds tracing on does nothing tracemalloc could
+    report, so start tracing before the first measured call to keep it on.
+
+    Every call resets the traced peak, after folding it into the other
+    calls in flight, so nested and overlapping calls each see their own
+    peak, at the expense of any peak tracked with tracemalloc outside of
+    py_debug. Allocations of other threads during a call are counted in it.
+
+    The numbers come from ``tracemalloc.get_traced_memory``, which reads two
+    running totals, rather than from comparing snapshots, which would copy
+    every live trace twice per call and cannot give the peak.
+    """
+
+    def __init__(self) -> None:
+        self._lock = Lock()
+        self._open: Set[_Span] = set()
+        # Whether this tracer started the tracing that is on
+        self._owned = False
+
+    def begin(self) -> _Span:
+        """Start measuring a call."""
+        with self._lock:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._owned = True
+            current, peak = tracemalloc.get_traced_memory()
+            if _reset_peak is not None:
+                for span in self._open:
+                    if peak > span.peak:
+                        span.peak = peak
+                _reset_peak()
+            span = _Span(current)
+            self._open.add(span)
+            return span
+
+    def end(self, span: _Span) -> Optional[Tuple[int, int]]:
+        """
+        Finish measuring a call.
+
+        Returns:
+            The net and peak bytes of the call, or None if tracing was
+            stopped during it.
+        """
+        with self._lock:
+            self._open.discard(span)
+            if not tracemalloc.is_tracing():
+                # Stopped by other code, which now decides when it runs
+                self._owned = False
+                return None
+            current, peak = tracemalloc.get_traced_memory()
+            if not self._open and self._owned:
+                tracemalloc.stop()
+                self._owned = False
+        return current - span.start, max(peak, span.peak) - span.start
+
+
+_tracer = _Tracer()
+
+
+# (pid, fd) of the open statm file; reopened in forked children, whose own
+# file it is not
+_statm = (-1, -1)
+_statm_lock = Lock()
+
+
+def _statm_rss() -> int:
+    """Read the current resident set size from procfs."""
+    global _statm
+    pid, fd = _statm
+    if pid != os.getpid():
+        with _statm_lock:
+            if _statm[0] != os.getpid():
+                _statm = (os.getpid(),
+                          os.open('/proc/self/statm', os.O_RDONLY))
+            pid, fd = _statm
+    return int(os.pread(fd, 128, 0).split()[1]) * _page_size
+
+
+def _maxrss() -> int:
+    """Read the peak resident set size, where procfs is missing."""
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Bytes on macOS, kilobytes elsewhere
+    return maxrss if sys.platform == 'darwin' else maxrss * 1024
+
+
+_page_size = os.sysconf('SC_PAGE_SIZE') if hasattr(os, 'sysconf') else 4096
+
+#: Reads the resident set size in bytes: the current one on Linux, the peak
+#: one on other Unix systems, and None where neither is available
+rss_bytes: Optional[Callable[[], int]] = (
+    _statm_rss if os.path.exists('/proc/self/statm')
+    else _maxrss if resource is not None
+    else None
+)
+
+
+class MemoryProbe:
+    """
+    Measures the memory of calls, as configured once per decorated function.
+
+    Example:
+        >>> probe = MemoryProbe(trace=True, rss=False)
+        >>> state = probe.begin()
+        >>> data = [0] * 1000
+        >>> probe.end(state).net > 0
+        True
+    """
+
+    def __init__(self, trace: bool = True, rss: bool = True) -> None:
+        """
+        Args:
+            trace: Measure traced allocations with tracemalloc (default: True).
+            rss: Measure the change of the resident set size, where the
+                platform reports it (default: True).
+        """
+        self._trace = trace
+        self._rss = rss_bytes if rss else None
+
+    def begin(self) -> Tuple[Optional[_Span], Optional[int]]:
+        """Start measuring a call; pass the result to ``end``."""
+        # The RSS is read outside the traced span, so reading it is not counted
+        rss = self._rss
+        rss_start = None if rss is None else rss()
+        return _tracer.begin() if self._trace else None, rss_start
+
+    def end(self, state: Tuple[Optional[_Span], Optional[int]]) -> MemoryUsage:
+        """Finish measuring a call."""
+        span, rss_start = state
+        traced = None if span is None else _tracer.end(span)
+        net, peak = (None, None) if traced is None else traced
+        rss = self._rss
+        rss_change = (None if rss is None or rss_start is None
+                      else rss() - rss_start)
+        return MemoryUsage(net, peak, rss_change)
@@ -0,0 +1,189 @@
+"""
+    OpenMetrics (Prometheus) exposition of the data the decorators collect.
+"""
+import threading
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Sequence
+
+from ._registry import snapshot
+from .histogram import HistogramSnapshot
+from .shared import SharedCounters
+
+#: Duration bucket bounds in seconds, from 1 microsecond to 10 seconds
+DEFAULT_BUCKETS = (
+    1e-6, 2.5e-6, 5e-6, 1e-5, 2.5e-5, 5e-5, 1e-4, 2.5e-4, 5e-4, 1e-3, 2.5e-3,
+    5e-3, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+CONTENT_TYPE = 'application/openmetrics-text; version=1.0.0; charset=utf-8'
+
+
+def _label(value: str) -> str:
+    """Escape a label value."""
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _counter_lines(name: str, values: Dict[str, int]) -> List[str]:
+    """Render one counter per function."""
+    return [f'{name}_total{{function="{_label(function)}"}} {value}'
+            for function, value in sorted(values.items())]
+
+
+def _histogram_lines(
+        name: str,
+        function: str,
+        histogram: HistogramSnapshot,
+        bounds_ns: List[int],
+        bucket_labels: List[str],
+) -> List[str]:
+    """
+    Render one duration histogram, folding its buckets into the exported
+    bounds.
+    """
+    counts = [0] * (len(bounds_ns) + 1)
+    for high, bucket_count in histogram.buckets:
+        counts[bisect_left(bounds_ns, high)] += bucket_count
+    lines = []
+    cumulative = 0
+    for le, bucket_count in zip(bucket_labels, counts):
+        cumulative += bucket_count
+        lines.append(f'{name}_bucket{{function="{function}",le="{le}"}} '
+                     f'{cumulative}')
+    lines.append(f'{name}_count{{function="{function}"}} {histogram.count}')
+    lines.append(f'{name}_sum{{function="{function}"}} '
+                 f'{histogram.total * 1e-9!r}')
+    return lines
+
+
+def render_openmetrics(
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+        namespace: str = 'py_debug',
+        shared: Optional[SharedCounters] = None,
+) -> str:
+    """
+    Render everything the decorators collected in OpenMetrics text format.
+
+    All metrics come from one snapshot of the registries, labelled with the
+    full name of the function:
+
+    - ``<namespace>_calls_total``: calls counted by ``log_call_counter``.
+    - ``<namespace>_call_errors_total``: calls timed by
+      ``log_running_time(aggregate=True)`` that raised.
+    - ``<namespace>_call_duration_seconds``: their duration histogram. Its
+      buckets are folded into ``buckets`` by their highest value, so values
+      up to 1.6% below a bound may only be counted at the next bound up;
+      values above a bound are never counted at it.
+    - ``<namespace>_call_cpu_seconds`` and
+      ``<namespace>_call_off_cpu_seconds``: the same for the CPU and off-CPU
+      times measured with ``cpu=True``.
+    - ``<namespace>_shared_calls_total``: the calls in all processes, when
+      ``shared`` counters are given.
+
+    Args:
+        buckets: Upper bounds of the exported duration buckets in seconds,
+            in increasing order (default: ``DEFAULT_BUCKETS``).
+        namespace: Prefix of the metric names (default: 'py_debug').
+        shared: ``SharedCounters`` to export as well (default: None).
+
+    Returns:
+        The exposition, ending with ``# EOF``.
+
+    Example:
+        >>> from py_debug import render_openmetrics
+        >>> text = render_openmetrics()  # '# TYPE py_debug_calls counter\n...'
+    """
+    if not buckets or list(buckets) != sorted(set(buckets)):
+        raise ValueError("buckets must be increasing")
+    data = snapshot()
+    bounds_ns = [int(bound * 1e9) for bound in buckets]
+    bucket_labels = [repr(float(bound)) for bound in buckets] + ['+Inf']
+
+    lines = [
+        f'# TYPE {namespace}_calls counter',
+        f'# HELP {namespace}_calls Calls counted by log_call_counter.',
+    ]
+    lines += _counter_lines(f'{namespace}_calls', data.calls)
+    lines += [
+        f'# TYPE {namespace}_call_errors counter',
+        f'# HELP {namespace}_call_errors Calls timed by log_running_time '
+        f'that raised.',
+    ]
+    lines += _counter_lines(f'{namespace}_call_errors', data.errors)
+    duration = f'{namespace}_call_duration_seconds'
+    lines += [
+        f'# TYPE {duration} histogram',
+        f'# UNIT {duration} seconds',
+        f'# HELP {duration} Durations aggregated by log_running_time.',
+    ]
+    for name, histogram in sorted(data.timings.items()):
+        lines += _histogram_lines(duration, _label(name), histogram,
+                                  bounds_ns, bucket_labels)
+    for suffix, what, timings in (
+            ('cpu', 'CPU times', data.cpu_timings),
+            ('off_cpu', 'Off-CPU times', data.off_cpu_timings)):
+        if not timings:
+            continue
+        metric = f'{namespace}_call_{suffix}_seconds'
+        lines += [
+            f'# TYPE {metric} histogram',
+            f'# UNIT {metric} seconds',
+            f'# HELP {metric} {what} aggregated by '
+            f'log_running_time(cpu=True).',
+        ]
+        for name, histogram in sorted(timings.items()):
+            lines += _histogram_lines(metric, _label(name), histogram,
+                                      bounds_ns, bucket_labels)
+    if shared is not None:
+        lines += [
+            f'# TYPE {namespace}_shared_calls counter',
+            f'# HELP {namespace}_shared_calls Calls counted by '
+            f'log_call_counter in all processes.',
+        ]
+        lines += _counter_lines(f'{namespace}_shared_calls', shared.totals())
+    lines.append('# EOF')
+    return '\n'.join(lines) + '\n'
+
+
+def serve_metrics(
+        port: int = 9464,
+        host: str = '127.0.0.1',
+        **options: Any,
+) -> ThreadingHTTPServer:
+    """
+    Serve ``render_openmetrics`` over HTTP from a background thread.
+
+    Every GET request is answered with a fresh rendering, whatever its path.
+
+    Args:
+        port: The port to listen on, or 0 for any free one (default: 9464).
+        host: The address to listen on (default: '127.0.0.1', local only).
+        **options: Passed on to ``render_openmetrics``.
+
+    Returns:
+        The running server; ``shutdown()`` stops it.
+
+    Example:
+        >>> # Scrape http://127.0.0.1:9464/metrics
+        >>> server = serve_metrics(9464)
+        >>> server.shutdown()
+    """
+    render_openmetrics(**options)  # Fail now on invalid options
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self) -> None:
+            body = render_openmetrics(**options).encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', CONTENT_TYPE)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format: str, *args: Any) -> None:
+            pass  # Scrapes are not worth a line on stderr each
+
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name='py_debug-metrics',
+                     daemon=True).start()
+    return server
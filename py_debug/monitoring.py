@@ -0,0 +1,309 @@
+"""
+    Call counting and timing through ``sys.monitoring`` (PEP 669), without
+    wrappers.
+"""
+import sys
+import threading
+import time
+from inspect import (
+    CO_ASYNC_GENERATOR, CO_COROUTINE, CO_GENERATOR, CO_ITERABLE_COROUTINE,
+    unwrap,
+)
+from types import CodeType
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from ._counter import CallCounter
+from ._registry import (
+    _get_call_counter, _get_error_counter, _get_qualified_name,
+    _get_timing_histogram,
+)
+from .histogram import Histogram
+
+# Code objects that suspend; PY_START to PY_RETURN would include the
+# suspensions
+_SUSPENDING = (CO_GENERATOR | CO_COROUTINE | CO_ASYNC_GENERATOR
+               | CO_ITERABLE_COROUTINE)
+
+# sys.monitoring came with Python 3.12; before it Monitor cannot be made
+_monitoring: Any = getattr(sys, 'monitoring', None)
+
+
+def _get_code(func: Any) -> Tuple[CodeType, Callable, str]:
+    """
+    Get the code object, the function and the full qualified name of a
+    function.
+
+    Args:
+        func: A function, a bound method, or a ``classmethod`` or
+            ``staticmethod`` object. Decorated functions are followed through
+            ``__wrapped__`` to the function they wrap.
+
+    Returns:
+        The code object executed by calls, the function it belongs to, and
+        the name the decorators would report the function under.
+    """
+    func = unwrap(getattr(func, '__func__', func))
+    code = getattr(func, '__code__', None)
+    if not isinstance(code, CodeType):
+        raise TypeError(
+            f"cannot monitor {func!r}: it has no Python code object")
+    return code, func, _get_qualified_name(func)
+
+
+def _counting_callback(counters: Dict[CodeType, CallCounter]) -> Callable:
+    """Build the PY_START callback of a monitor that only counts calls."""
+    def on_count(code: CodeType, offset: int) -> None:
+        counter = counters.get(code)
+        if counter is not None:
+            counter.increment()
+
+    return on_count
+
+
+class _TimingCallbacks:
+    """
+    The event callbacks of a monitor that counts and times calls.
+
+    Each instance has new per-thread stacks of start times.
+    """
+
+    def __init__(
+            self,
+            counters: Dict[CodeType, CallCounter],
+            timings: Dict[CodeType, Tuple[Histogram, CallCounter]],
+    ) -> None:
+        """
+        Args:
+            counters: The call counters, by code object.
+            timings: The duration histograms and failed call counters, by
+                code object.
+        """
+        self._counters = counters
+        self._timings = timings
+        self._local = threading.local()
+
+    def by_event(self) -> Dict[int, Callable]:
+        """The callbacks, by the event they are registered for."""
+        events = _monitoring.events
+        return {events.PY_START: self.on_start,
+                events.PY_RETURN: self.on_return,
+                events.PY_UNWIND: self.on_unwind}
+
+    def _pop_start(self, code: CodeType) -> Optional[int]:
+        """Take the start time of a call of a code object ending here."""
+        starts = getattr(self._local, 'stack', None)
+        # A call that started before enabling has no start time of its own
+        if starts and starts[-1][0] is code:
+            return starts.pop()[1]
+        return None
+
+    def on_start(self, code: CodeType, offset: int) -> None:
+        counter = self._counters.get(code)
+        if counter is not None:
+            counter.increment()
+        if code in self._timings:
+            try:
+                starts = self._local.stack
+            except AttributeError:
+                starts = self._local.stack = []
+            starts.append((code, time.perf_counter_ns()))
+
+    def on_return(self, code: CodeType, offset: int, value: Any) -> None:
+        timing = self._timings.get(code)
+        if timing is not None:
+            start = self._pop_start(code)
+            if start is not None:
+                timing[0].record(time.perf_counter_ns() - start)
+
+    def on_unwind(
+            self,
+            code: CodeType,
+            offset: int,
+            error: BaseException,
+    ) -> None:
+        timing = self._timings.get(code)
+        if timing is None:
+            return
+        start = self._pop_start(code)
+        # Like log_running_time, leave KeyboardInterrupt and SystemExit out
+        if start is not None and isinstance(error, Exception):
+            timing[0].record(time.perf_counter_ns() - start)
+            timing[1].increment()
+
+
+class Monitor:
+    """
+    Counts and times calls of selected functions through ``sys.monitoring``.
+
+    Instead of wrapping each function in a closure, the monitor asks the
+    interpreter for PY_START and PY_RETURN events on the functions' code
+    objects, and for PY_UNWIND events, which sys.monitoring can only deliver
+    for all code. Calls are counted into the same counters as
+    ``log_call_counter``, and durations recorded into the same histograms and
+    failed call counters as ``log_running_time(aggregate=True)``, so
+    ``get_call_count``, ``get_timing_stats`` and ``render_openmetrics`` report
+    them the same way. Nothing is logged.
+
+    Functions are selected with ``add`` and ``remove``, and the monitor is
+    switched with ``enable`` and ``disable`` at any time, also while the
+    functions are running; calls already under way when it is enabled are
+    not timed. Generator and coroutine functions are counted when they first
+    start, but not timed. Functions made by the same ``def``, such as
+    closures, share a code object and so are recorded together, under the
+    name of the first one added.
+
+    Each monitor holds a sys.monitoring tool id while enabled, so at most six
+    monitors can be enabled at once, fewer if debuggers, profilers or coverage
+    tools take ids of their own. Requires Python 3.12 or later.
+
+    Example:
+        >>> monitor = Monitor()
+        >>> monitor.add(my_function)
+        >>> with monitor:
+        ...     my_function()
+        >>> get_call_count(my_function)  # 1
+    """
+
+    def __init__(
+            self,
+            count: bool = True,
+            timing: bool = True,
+            tool_id: Optional[int] = None,
+    ) -> None:
+        """
+        Args:
+            count: Count the calls (default: True).
+            timing: Time the calls (default: True).
+            tool_id: The sys.monitoring tool id to use while enabled
+                (default: None, the first free one).
+        """
+        if _monitoring is None:
+            raise RuntimeError(
+                "Monitor needs sys.monitoring, which Python 3.12 added")
+        if not count and not timing:
+            raise ValueError(
+                "at least one of count and timing must be enabled")
+        if tool_id is not None and not 0 <= tool_id <= 5:
+            raise ValueError("tool_id must be between 0 and 5")
+        self._count = count
+        self._timing = timing
+        self._requested_tool_id = tool_id
+        self._tool_id: Optional[int] = None
+        self._lock = threading.Lock()
+        self._counters: Dict[CodeType, CallCounter] = {}
+        self._timings: Dict[CodeType, Tuple[Histogram, CallCounter]] = {}
+        self._events: Dict[CodeType, int] = {}
+
+    @property
+    def enabled(self) -> bool:
+        """Whether the monitor currently receives events."""
+        return self._tool_id is not None
+
+    def add(self, *funcs: Callable) -> None:
+        """
+        Select functions to count and time.
+
+        Args:
+            *funcs: Functions, bound methods, or ``classmethod`` or
+                ``staticmethod`` objects. Decorated functions are monitored
+                as the innermost function they wrap.
+        """
+        events = _monitoring.events
+        codes = [_get_code(func) for func in funcs]
+        with self._lock:
+            for code, func, full_name in codes:
+                if code in self._events:
+                    continue
+                local_events = 0
+                if self._count:
+                    self._counters[code] = _get_call_counter(func, full_name)
+                    local_events = events.PY_START
+                if self._timing and not code.co_flags & _SUSPENDING:
+                    self._timings[code] = (_get_timing_histogram(full_name),
+                                           _get_error_counter(full_name))
+                    local_events = events.PY_START | events.PY_RETURN
+                self._events[code] = local_events
+                if self._tool_id is not None:
+                    _monitoring.set_local_events(self._tool_id, code,
+                                                 local_events)
+
+    def remove(self, *funcs: Callable) -> None:
+        """
+        Stop counting and timing functions.
+
+        Args:
+            *funcs: Functions selected with ``add`` before.
+        """
+        codes = [_get_code(func)[0] for func in funcs]
+        with self._lock:
+            for code in codes:
+                if self._events.pop(code, None) is None:
+                    continue
+                self._counters.pop(code, None)
+                self._timings.pop(code, None)
+                if self._tool_id is not None:
+                    _monitoring.set_local_events(self._tool_id, code, 0)
+
+    def enable(self) -> None:
+        """
+        Start receiving events for the selected functions.
+
+        Raises:
+            ValueError: If the requested tool id is taken, or no tool id is
+                free.
+        """
+        monitoring = _monitoring
+        events = monitoring.events
+        with self._lock:
+            if self._tool_id is not None:
+                return
+            tool_id = self._requested_tool_id
+            if tool_id is None:
+                tool_id = next((candidate for candidate in range(6)
+                                if monitoring.get_tool(candidate) is None),
+                               None)
+                if tool_id is None:
+                    raise ValueError("no sys.monitoring tool id is free")
+            monitoring.use_tool_id(tool_id, 'py_debug')
+            for event, callback in self._callbacks().items():
+                monitoring.register_callback(tool_id, event, callback)
+            if self._timing:
+                monitoring.set_events(tool_id, events.PY_UNWIND)
+            for code, local_events in self._events.items():
+                monitoring.set_local_events(tool_id, code, local_events)
+            self._tool_id = tool_id
+
+    def disable(self) -> None:
+        """Stop receiving events and give the tool id back."""
+        monitoring = _monitoring
+        events = monitoring.events
+        with self._lock:
+            tool_id = self._tool_id
+            if tool_id is None:
+                return
+            self._tool_id = None
+            for code in self._events:
+                monitoring.set_local_events(tool_id, code, 0)
+            monitoring.set_events(tool_id, 0)
+            for event in (events.PY_START, events.PY_RETURN, events.PY_UNWIND):
+                monitoring.register_callback(tool_id, event, None)
+            monitoring.free_tool_id(tool_id)
+
+    def __enter__(self) -> 'Monitor':
+        self.enable()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.disable()
+
+    def _callbacks(self) -> Dict[int, Callable]:
+        """
+        Build the event callbacks.
+
+        Each enabling gets fresh per-thread stacks of start times, so calls
+        left running by an earlier disabling are never paired with a return.
+        """
+        events = _monitoring.events
+        if not self._timing:
+            return {events.PY_START: _counting_callback(self._counters)}
+        return _TimingCallbacks(self._counters, self._timings).by_event()
@@ -0,0 +1,145 @@
+"""
+    Fixed-memory sliding windows of call rates.
+"""
+import math
+import time
+from threading import Lock
+from typing import Callable, List, NamedTuple
+
+from ._counter import CallCounter
+
+
+class RateStats(NamedTuple):
+    """Call rates of one function, in calls per second."""
+
+    #: Rate over the last complete bucket
+    rate: float
+    #: Highest rate of any bucket in the window
+    peak: float
+    #: Exponentially weighted moving average of the bucket rates
+    ewma: float
+    #: Calls in the whole window, including the current bucket
+    calls: int
+
+
+class RateWindow:
+    """
+    Sliding window of call counts in equal time buckets.
+
+    The window is a ring of ``buckets`` counters, each covering ``width``
+    seconds. Recording a call advances the counter of the current bucket,
+    which takes no lock on GIL builds, like ``log_call_counter``'s own
+    counter; only the first call of a new bucket takes a lock, to retire
+    the buckets that have fallen out of the window. A call racing that
+    rotation may be counted in the bucket before. Memory is fixed, and each
+    call costs O(1): the rotation clears at most ``buckets`` counters, at
+    most once per bucket.
+
+    Example:
+        >>> window = RateWindow(buckets=60, width=1.0)
+        >>> _ = window.record()
+        >>> window.stats().calls
+        1
+    """
+
+    def __init__(
+            self,
+            buckets: int = 60,
+            width: float = 1.0,
+            ewma_period: float = 60.0,
+            clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """
+        Args:
+            buckets: The number of buckets in the window (default: 60).
+            width: The duration of a bucket in seconds (default: 1.0).
+            ewma_period: The time constant of the moving average in seconds;
+                a bucket's weight falls to 1/e after this long (default: 60.0).
+            clock: The monotonic clock in seconds (default: time.monotonic).
+        """
+        if buckets < 2:
+            raise ValueError("buckets must be at least 2")
+        if width <= 0:
+            raise ValueError("width must be positive")
+        if ewma_period <= 0:
+            raise ValueError("ewma_period must be positive")
+        self.width = width
+        self._clock = clock
+        self._counters: List[CallCounter] = [
+            CallCounter() for _ in range(buckets)]
+        self._decay = math.exp(-width / ewma_period)
+        self._lock = Lock()
+        self._tick = int(clock() / width)
+        self._current = self._counters[self._tick % buckets]
+        self._ewma = 0.0
+
+    def record(self) -> bool:
+        """
+        Count one call now.
+
+        Returns:
+            True if the call started a new bucket, so the rate of the last
+            complete bucket has just changed.
+        """
+        tick = int(self._clock() / self.width)
+        if tick == self._tick:
+            self._current.increment()
+            return False
+        rotated = self._advance(tick)
+        self._current.increment()
+        return rotated
+
+    def _advance(self, tick: int) -> bool:
+        """Retire the buckets before ``tick``; return if this call did it."""
+        with self._lock:
+            last = self._tick
+            if tick <= last:
+                return False
+            counters = self._counters
+            size = len(counters)
+            decay = self._decay
+            # The bucket that just completed, then one empty bucket per
+            # skipped tick
+            rate = counters[last % size].value / self.width
+            self._ewma = self._ewma * decay + rate * (1 - decay)
+            skipped = tick - last - 1
+            if skipped:
+                self._ewma *= decay ** skipped
+            for skipped_tick in range(max(last + 1, tick - size + 1),
+                                      tick + 1):
+                counters[skipped_tick % size].reset()
+            self._current = counters[tick % size]
+            self._tick = tick
+            return True
+
+    def rate(self) -> float:
+        """The rate over the last complete bucket, in calls per second."""
+        return self.stats().rate
+
+    def stats(self) -> RateStats:
+        """
+        Read the window.
+
+        Returns:
+            The rate of the last complete bucket, the peak and moving
+            average of the bucket rates, and the calls in the window.
+        """
+        self._advance(int(self._clock() / self.width))
+        with self._lock:
+            counters = self._counters
+            counts = [counter.value for counter in counters]
+            tick, ewma = self._tick, self._ewma
+        width = self.width
+        return RateStats(
+            rate=counts[(tick - 1) % len(counts)] / width,
+            peak=max(counts) / width,
+            ewma=ewma,
+            calls=sum(counts),
+        )
+
+    def reset(self) -> None:
+        """Forget all recorded calls."""
+        with self._lock:
+            for counter in self._counters:
+                counter.reset()
+            self._ewma = 0.0
@@ -0,0 +1,245 @@
+"""
+    Bounded rendering of call arguments for ``log_args``.
+"""
+import reprlib
+from itertools import islice
+from typing import Any, Iterable, Optional, Tuple
+
+
+class ArgRenderer(reprlib.Repr):
+    """
+    Renders call arguments within fixed length, depth and item budgets.
+
+    Containers show at most ``max_items`` elements and ``max_depth`` levels,
+    and those longer than ``max_items`` are summarized with their type and
+    length. Long ``bytes`` and ``bytearray`` values, ``memoryview`` objects,
+    very large integers and array-likes with ``shape`` and ``dtype`` (NumPy,
+    PyTorch, ...) are summarized without their repr being built. Objects of
+    other types are repr'd and cut to ``max_arg_length``; those with a length
+    above ``max_items`` are summarized instead. The work is bounded by the
+    budgets, not by the size of the arguments.
+
+    As a ``reprlib.Repr``, a subclass can add ``repr_<type name>`` methods
+    for its own types.
+
+    Example:
+        >>> ArgRenderer(max_items=3).render(list(range(1000)))
+        '<list len=1000: [0, 1, 2, ...]>'
+    """
+
+    #: Marks elements left out; ``reprlib.Repr`` only has it from Python 3.11
+    fillvalue = '...'
+
+    def __init__(
+            self,
+            max_arg_length: int = 200,
+            max_length: int = 1000,
+            max_depth: int = 3,
+            max_items: int = 10,
+    ) -> None:
+        """
+        Args:
+            max_arg_length: The longest rendering of one argument
+                (default: 200).
+            max_length: The longest rendering of all arguments together
+                (default: 1000).
+            max_depth: Container nesting levels shown (default: 3).
+            max_items: Elements shown per container (default: 10).
+        """
+        if max_arg_length < 8:
+            raise ValueError("max_arg_length must be at least 8")
+        if max_length < max_arg_length:
+            raise ValueError("max_length must be at least max_arg_length")
+        if max_depth < 1:
+            raise ValueError("max_depth must be positive")
+        if max_items < 1:
+            raise ValueError("max_items must be positive")
+        super().__init__()
+        self.max_arg_length = max_arg_length
+        self.max_length = max_length
+        self.maxlevel = max_depth
+        self.maxtuple = self.maxlist = self.maxarray = self.maxdict = max_items
+        self.maxset = self.maxfrozenset = self.maxdeque = max_items
+        self.maxstring = self.maxother = max_arg_length
+        self.maxlong = max_arg_length
+
+    def render(self, value: Any) -> str:
+        """
+        Render one argument.
+
+        Args:
+            value: The argument.
+
+        Returns:
+            Its bounded representation, at most ``max_arg_length`` long.
+        """
+        text = self.repr(value)
+        if len(text) > self.max_arg_length:
+            text = text[:self.max_arg_length - 3] + '...'
+        return text
+
+    def render_call(self, args: tuple, kwargs: dict) -> Tuple[str, str]:
+        """
+        Render the arguments of a call.
+
+        Once ``max_length`` is used up, the remaining arguments are replaced
+        by ``...`` without being looked at.
+
+        Args:
+            args: Positional arguments.
+            kwargs: Keyword arguments.
+
+        Returns:
+            The ``(args, kwargs)`` renderings, shaped like a tuple and a dict.
+        """
+        budget = [self.max_length]
+        args_text = self._render_items(((None, arg) for arg in args), budget)
+        kwargs_text = self._render_items(kwargs.items(), budget)
+        if len(args) == 1:
+            args_text += ','
+        return f'({args_text})', f'{{{kwargs_text}}}'
+
+    def _render_items(
+            self,
+            items: Iterable[Tuple[Any, Any]],
+            budget: list,
+    ) -> str:
+        """Render ``(name, value)`` pairs while the shared budget lasts."""
+        pieces = []
+        for name, value in items:
+            if budget[0] <= 0:
+                pieces.append('...')
+                break
+            text = self.render(value)
+            if name is not None:
+                text = f'{name!r}: {text}'
+            budget[0] -= len(text) + 2
+            pieces.append(text)
+        return ', '.join(pieces)
+
+    def _summary(self, x: Any, text: str, limit: int) -> str:
+        """Prefix a truncated container's rendering with type and length."""
+        if len(x) <= limit:
+            return text
+        return f'<{type(x).__name__} len={len(x)}: {text}>'
+
+    def _repr_truncated(
+            self,
+            x: Iterable,
+            level: int,
+            left: str,
+            right: str,
+            limit: int,
+    ) -> str:
+        """
+        Render the first ``limit`` elements of a longer container, in
+        iteration order.
+        """
+        pieces = ([self.repr1(elem, level - 1) for elem in islice(x, limit)]
+                  if level > 0 else [])
+        pieces.append(self.fillvalue)
+        return f'{left}{", ".join(pieces)}{right}'
+
+    def repr_tuple(self, x: tuple, level: int) -> str:
+        return self._summary(x, super().repr_tuple(x, level), self.maxtuple)
+
+    def repr_list(self, x: list, level: int) -> str:
+        return self._summary(x, super().repr_list(x, level), self.maxlist)
+
+    def repr_array(self, x: Any, level: int) -> str:
+        return self._summary(x, super().repr_array(x, level), self.maxarray)
+
+    def repr_deque(self, x: Any, level: int) -> str:
+        return self._summary(x, super().repr_deque(x, level), self.maxdeque)
+
+    def repr_set(self, x: set, level: int) -> str:
+        if len(x) <= self.maxset:
+            return super().repr_set(x, level)
+        # reprlib sorts sets first, which is too slow for large ones
+        text = self._repr_truncated(x, level, '{', '}', self.maxset)
+        return self._summary(x, text, self.maxset)
+
+    def repr_frozenset(self, x: frozenset, level: int) -> str:
+        if len(x) <= self.maxfrozenset:
+            return super().repr_frozenset(x, level)
+        text = self._repr_truncated(x, level, 'frozenset({', '})',
+                                    self.maxfrozenset)
+        return self._summary(x, text, self.maxfrozenset)
+
+    def repr_dict(self, x: dict, level: int) -> str:
+        if len(x) <= self.maxdict:
+            return super().repr_dict(x, level)
+        # reprlib sorts the keys first, which is too slow for large dicts
+        pieces = [
+            f'{self.repr1(key, level - 1)}: {self.repr1(value, level - 1)}'
+            for key, value in islice(x.items(), self.maxdict)
+        ] if level > 0 else []
+        pieces.append(self.fillvalue)
+        return self._summary(x, f'{{{", ".join(pieces)}}}', self.maxdict)
+
+    def repr_bytes(self, x: bytes, level: int) -> str:
+        if len(x) <= self.maxstring // 4:
+            return repr(x)
+        return f'<{type(x).__name__} len={len(x)}: {repr(x[:8])}...>'
+
+    repr_bytearray = repr_bytes
+
+    def repr_memoryview(self, x: memoryview, level: int) -> str:
+        try:
+            return (f'<memoryview nbytes={x.nbytes} format={x.format!r} '
+                    f'shape={x.shape}>')
+        except ValueError:
+            return '<released memoryview>'
+
+    def repr_int(self, x: int, level: int) -> str:
+        # Converting a huge integer to decimal is quadratic, or refused
+        # outright
+        if x.bit_length() > self.maxlong * 3:
+            return f'<int bits={x.bit_length()}>'
+        return super().repr_int(x, level)
+
+    def repr_instance(self, x: Any, level: int) -> str:
+        summary = self._array_summary(x)
+        if summary is not None:
+            return summary
+        for base in (tuple, list, dict, set, frozenset, str, bytes, bytearray):
+            if isinstance(x, base):
+                return self._repr_subclass(x, base, level)
+        try:
+            size = len(x)
+        except Exception:
+            size = None
+        if isinstance(size, int) and size > self.maxlist:
+            return f'<{type(x).__name__} len={size}>'
+        return super().repr_instance(x, level)
+
+    def _array_summary(self, x: Any) -> Optional[str]:
+        """
+        Summarize an array-like with more than ``max_items`` elements, or
+        return None.
+        """
+        try:
+            shape, dtype = getattr(x, 'shape', None), getattr(x, 'dtype', None)
+            if shape is None or dtype is None:
+                return None
+            size = getattr(x, 'size', None)
+            if isinstance(size, int) and size <= self.maxlist:
+                return None
+            return f'<{type(x).__name__} shape={tuple(shape)} dtype={dtype}>'
+        except Exception:
+            return None
+
+    def _repr_subclass(self, x: Any, base: type, level: int) -> str:
+        """Render an instance of a subclass of a builtin type like its base."""
+        if base is tuple and hasattr(x, '_fields'):
+            # A named tuple
+            pieces = [f'{name}={self.repr1(value, level - 1)}'
+                      for name, value in islice(zip(x._fields, x),
+                                                self.maxtuple)]
+            if len(x) > self.maxtuple:
+                pieces.append('...')
+            return f'{type(x).__name__}({", ".join(pieces)})'
+        text = getattr(self, 'repr_' + base.__name__)(x, level)
+        if base in (str, bytes, bytearray):
+            return text
+        return f'{type(x).__name__}({text})'
@@ -0,0 +1,270 @@
+"""
+    Sampling and rate-limiting policies for the py_debug decorators.
+
+    Pass a policy as ``sample=`` to ``log_running_time``, ``log_args`` or
+    ``log_call_counter``. It is consulted once per call, before the decorator
+    formats any argument or reads any clock, and calls it rejects cost little
+    more than the decision itself. Each policy counts the calls it has seen
+    and kept, so exact totals survive however few of them are logged.
+"""
+import random
+import time
+from abc import ABC, abstractmethod
+from threading import Lock
+from typing import Optional
+
+from ._counter import CallCounter
+
+
+class Sampler(ABC):
+    """
+    Base class of the sampling policies.
+
+    Subclasses implement ``_decide``, and tail policies ``keep`` as well.
+    Calling the sampler records the decision in ``seen`` and ``kept`` and
+    returns it.
+    """
+
+    #: Whether the policy decides after the call, from its outcome
+    tail = False
+
+    def __init__(self) -> None:
+        self._seen = CallCounter()
+        self._kept = CallCounter()
+
+    def __call__(self) -> bool:
+        """
+        Decide whether the current call is reported.
+
+        Returns:
+            True if the decorator should do its work for this call.
+        """
+        ordinal = self._seen.increment()
+        if self._decide(ordinal):
+            self._kept.increment()
+            return True
+        return False
+
+    @abstractmethod
+    def _decide(self, ordinal: int) -> bool:
+        """
+        Decide on one call.
+
+        Args:
+            ordinal: The number of calls seen so far, including this one.
+
+        Returns:
+            True to keep the call.
+        """
+
+    def keep(
+            self,
+            elapsed_time: float,
+            error: Optional[BaseException],
+    ) -> bool:
+        """
+        Decide on a completed call, for policies with ``tail`` set.
+
+        Other policies decided before the call, so they keep every call they
+        let through.
+
+        Args:
+            elapsed_time: The duration of the call in seconds.
+            error: The exception the call raised, if any.
+
+        Returns:
+            True if the call should be reported.
+        """
+        return True
+
+    @property
+    def seen(self) -> int:
+        """The number of calls the policy has decided on."""
+        return self._seen.value
+
+    @property
+    def kept(self) -> int:
+        """The number of calls the policy has kept."""
+        return self._kept.value
+
+    def reset(self) -> None:
+        """Forget all decisions."""
+        self._seen.reset()
+        self._kept.reset()
+
+
+class OneInN(Sampler):
+    """
+    Keep each call with probability 1/n.
+
+    Example:
+        >>> @log_args(sample=OneInN(100))
+        ... def handler(request):
+        ...     pass
+    """
+
+    def __init__(self, n: int, rng: Optional[random.Random] = None) -> None:
+        """
+        Args:
+            n: Keep one call in n on average.
+            rng: The random number generator to use (default: the ``random``
+                module's shared generator).
+        """
+        if n < 1:
+            raise ValueError("n must be positive")
+        super().__init__()
+        self.n = n
+        self._random = (rng or random).random
+
+    def _decide(self, ordinal: int) -> bool:
+        return self._random() * self.n < 1
+
+
+class TokenBucket(Sampler):
+    """
+    Keep at most ``rate`` calls per second, with bursts of up to ``burst``.
+
+    The bucket never blocks: a call that finds it busy in another thread is
+    simply not kept.
+
+    Example:
+        >>> @log_running_time(sample=TokenBucket(10))
+        ... def handler(request):
+        ...     pass
+    """
+
+    def __init__(self, rate: float, burst: Optional[float] = None) -> None:
+        """
+        Args:
+            rate: Calls kept per second on average.
+            burst: The most calls kept back to back (default: ``rate``, and at
+                least 1).
+        """
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        if burst is not None and burst < 1:
+            raise ValueError("burst must be at least 1")
+        super().__init__()
+        self.rate = rate
+        self.burst = max(1.0, rate) if burst is None else burst
+        self._tokens = self.burst
+        self._last = time.monotonic()
+        self._lock = Lock()
+
+    def _decide(self, ordinal: int) -> bool:
+        if not self._lock.acquire(blocking=False):
+            return False
+        try:
+            now = time.monotonic()
+            tokens = min(self.burst,
+                         self._tokens + (now - self._last) * self.rate)
+            self._last = now
+            if tokens >= 1:
+                self._tokens = tokens - 1
+                return True
+            self._tokens = tokens
+            return False
+        finally:
+            self._lock.release()
+
+
+class Head(Sampler):
+    """
+    Keep the first ``n`` calls, overall or in every ``interval`` seconds.
+
+    Example:
+        >>> @log_args(sample=Head(5, interval=60))
+        ... def handler(request):
+        ...     pass  # Logs the first 5 calls of every minute
+    """
+
+    def __init__(self, n: int, interval: Optional[float] = None) -> None:
+        """
+        Args:
+            n: The number of calls kept.
+            interval: Start over every this many seconds (default: None,
+                keep only the first n calls ever).
+        """
+        if n < 0:
+            raise ValueError("n must be non-negative")
+        if interval is not None and interval <= 0:
+            raise ValueError("interval must be positive")
+        super().__init__()
+        self.n = n
+        self.interval = interval
+        self._window = CallCounter()
+        # Only read with an interval
+        self._window_end = (time.monotonic() + interval
+                            if interval is not None else 0.0)
+
+    def _decide(self, ordinal: int) -> bool:
+        if self.interval is None:
+            return ordinal <= self.n
+        now = time.monotonic()
+        if now >= self._window_end:
+            self._window_end = now + self.interval
+            self._window.reset()
+        return self._window.increment() <= self.n
+
+
+class Tail(Sampler):
+    """
+    Keep calls by their outcome: failures and calls slower than a threshold.
+
+    The decision is taken after the call, so the call is always timed; only
+    ``log_running_time`` supports tail sampling.
+
+    Example:
+        >>> @log_running_time(sample=Tail(slower_than=0.5))
+        ... def handler(request):
+        ...     pass  # Logs failed calls and calls over 500 ms
+    """
+
+    tail = True
+
+    def __init__(
+            self,
+            slower_than: Optional[float] = None,
+            errors: bool = True,
+    ) -> None:
+        """
+        Args:
+            slower_than: Keep calls that took at least this many seconds
+                (default: None, keep none for their duration).
+            errors: Keep calls that raised an exception (default: True).
+        """
+        if slower_than is not None and slower_than < 0:
+            raise ValueError("slower_than must be non-negative")
+        super().__init__()
+        self.slower_than = slower_than
+        self.errors = errors
+
+    def __call__(self) -> bool:
+        self._seen.increment()
+        return True
+
+    def _decide(self, ordinal: int) -> bool:
+        # Every call is timed; keep decides once it is over
+        return True
+
+    def keep(
+            self,
+            elapsed_time: float,
+            error: Optional[BaseException],
+    ) -> bool:
+        """
+        Decide on a completed call.
+
+        Args:
+            elapsed_time: The duration of the call in seconds.
+            error: The exception the call raised, if any.
+
+        Returns:
+            True if the call should be reported.
+        """
+        if (error is not None and self.errors) or (
+                self.slower_than is not None
+                and elapsed_time >= self.slower_than):
+            self._kept.increment()
+            return True
+        return False
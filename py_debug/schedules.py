@@ -0,0 +1,191 @@
+"""
+    Log schedules for ``log_call_counter``.
+
+    Pass a schedule as ``schedule=`` to ``log_call_counter`` instead of the
+    ``mute_after``/``log_every`` rule. A schedule is bound once per
+    decorated function, and the bound schedule decides from the call number
+    drawn from the function's counter whether that call logs a line, so the
+    decision adds no lock to the hot path.
+"""
+import time
+from abc import ABC, abstractmethod
+from threading import Lock
+from typing import Callable
+
+from ._counter import CallCounter
+
+
+class Schedule(ABC):
+    """
+    Base class of the log schedules.
+
+    Subclasses implement ``bind``.
+    """
+
+    @abstractmethod
+    def bind(self) -> Callable[[int], bool]:
+        """
+        Make the decision function for one decorated function.
+
+        Returns:
+            A function that takes the number of the current call, counting
+            from 1, and returns True if the call logs a line.
+        """
+
+
+def _is_power_of_two(call_count: int) -> bool:
+    """Decide for ``Exponential(2)`` with a single bit test."""
+    return call_count & (call_count - 1) == 0
+
+
+class Exponential(Schedule):
+    """
+    Log calls number 1, base, base ** 2, base ** 3 and so on.
+
+    Cold functions are logged on their first calls, hot ones ever more
+    rarely, at a cost of one bit test or set lookup per call.
+
+    Example:
+        >>> @log_call_counter(schedule=Exponential())
+        ... def handler(request):
+        ...     pass  # Logs calls 1, 2, 4, 8, 16, ...
+    """
+
+    def __init__(self, base: int = 2) -> None:
+        """
+        Args:
+            base: The factor between logged call numbers (default: 2).
+        """
+        if base < 2:
+            raise ValueError("base must be at least 2")
+        self.base = base
+
+    def bind(self) -> Callable[[int], bool]:
+        if self.base == 2:
+            return _is_power_of_two
+        # Every power that a 64-bit count can reach, a few dozen at most
+        powers = frozenset(self.base ** exponent for exponent in range(64)
+                           if self.base ** exponent < 2 ** 64)
+        return powers.__contains__
+
+
+class Interval(Schedule):
+    """
+    Log at most one line per function every ``seconds``.
+
+    The first call after the interval has passed logs the line. Calls racing
+    each other at that moment may rarely both log.
+
+    Example:
+        >>> @log_call_counter(schedule=Interval(60))
+        ... def handler(request):
+        ...     pass  # Logs at most once a minute
+    """
+
+    def __init__(
+            self,
+            seconds: float,
+            clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """
+        Args:
+            seconds: The least time between two lines of a function.
+            clock: The monotonic clock in seconds (default: time.monotonic).
+        """
+        if seconds <= 0:
+            raise ValueError("seconds must be positive")
+        self.seconds = seconds
+        self._clock = clock
+
+    def bind(self) -> Callable[[int], bool]:
+        seconds, clock = self.seconds, self._clock
+        next_line = [float('-inf')]
+
+        def due(call_count: int) -> bool:
+            now = clock()
+            if now < next_line[0]:
+                return False
+            next_line[0] = now + seconds
+            return True
+
+        return due
+
+
+class Budget(Schedule):
+    """
+    Share a budget of lines per minute between all functions it is bound to.
+
+    Each function logs its calls number 1, 2, 4, ... up to the current
+    ``stride``, and then every ``stride``-th call, so cold functions still
+    show up. Lines beyond the budget of the current period are dropped, and
+    at the end of a period the stride adapts to the demand: it doubles while
+    the lines asked for exceeded the budget, and halves when they used less
+    than a quarter of it. The stride is a power of two, read without a lock;
+    only the end of a period takes a lock, which a call that finds it busy
+    does not wait for.
+
+    Example:
+        >>> budget = Budget(lines_per_minute=120)
+        >>> instrument(module, decorators=[log_call_counter(schedule=budget)])
+    """
+
+    def __init__(
+            self,
+            lines_per_minute: float = 60.0,
+            period: float = 60.0,
+            clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """
+        Args:
+            lines_per_minute: The lines all bound functions may log per
+                minute together (default: 60).
+            period: How often the stride adapts, in seconds (default: 60.0).
+            clock: The monotonic clock in seconds (default: time.monotonic).
+        """
+        if lines_per_minute <= 0:
+            raise ValueError("lines_per_minute must be positive")
+        if period <= 0:
+            raise ValueError("period must be positive")
+        self.budget = max(1, int(lines_per_minute * period / 60))
+        self.period = period
+        #: Log every stride-th call once past the first ones
+        self.stride = 1
+        self._clock = clock
+        self._asked = CallCounter()
+        self._period_end = clock() + period
+        self._lock = Lock()
+
+    def bind(self) -> Callable[[int], bool]:
+        spend = self._spend
+
+        def due(call_count: int) -> bool:
+            stride = self.stride
+            if call_count % stride and (
+                    call_count > stride or call_count & (call_count - 1)):
+                return False
+            return spend()
+
+        return due
+
+    def _spend(self) -> bool:
+        """Take one line from the budget of the current period."""
+        now = self._clock()
+        if now >= self._period_end and self._lock.acquire(blocking=False):
+            try:
+                if now >= self._period_end:
+                    self._adapt(self._asked.value)
+                    self._asked.reset()
+                    self._period_end = now + self.period
+            finally:
+                self._lock.release()
+        return self._asked.increment() <= self.budget
+
+    def _adapt(self, asked: int) -> None:
+        """Set the stride of the next period from the lines asked for."""
+        stride = self.stride
+        while asked > self.budget:
+            stride *= 2
+            asked //= 2
+        if stride == self.stride and asked * 4 < self.budget and stride > 1:
+            stride //= 2
+        self.stride = stride
@@ -0,0 +1,301 @@
+"""
+    Call counters shared between processes through a memory-mapped file.
+"""
+import logging
+import mmap
+import os
+import struct
+import tempfile
+import weakref
+import zlib
+from contextlib import contextmanager
+from threading import Lock
+from typing import Callable, Dict, Iterator, List, Optional, Union
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - not on Windows
+    fcntl = None  # type: ignore[assignment]
+
+from ._registry import _get_qualified_name, _resolve_name
+
+_logger = logging.getLogger(__name__)
+
+_MAGIC = b'PYDBGCNT'
+_VERSION = 1
+_HEADER = struct.Struct('<8sIII')  # magic, version, slots, processes
+_HEADER_SIZE = 64
+_NAME_SIZE = 128  # u16 length, then up to 126 bytes of UTF-8
+_LENGTH = struct.Struct('<H')
+
+# Instances to re-attach in a forked child
+_instances: 'weakref.WeakSet[SharedCounters]' = weakref.WeakSet()
+
+
+def _after_fork() -> None:
+    """Give every instance its own row in a freshly forked child."""
+    for instance in list(_instances):
+        instance._claim_row()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_after_fork)
+
+
+def _is_alive(pid: int) -> bool:
+    """
+    Check whether a process exists; assume it does where that cannot be
+    asked.
+    """
+    if os.name != 'posix':
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def _key(name: str) -> bytes:
+    """Encode a function name to fit a slot, keeping long names distinct."""
+    key = name.encode('utf-8')
+    if len(key) > _NAME_SIZE - _LENGTH.size:
+        key = key[:_NAME_SIZE - _LENGTH.size - 9] + b'#%08x' % zlib.crc32(key)
+    return key
+
+
+class SharedCounters:
+    """
+    Call counts of every process using one memory-mapped file.
+
+    The file holds a table of ``slots`` function names and one row of
+    counters per process. A process only ever writes its own row, so the
+    processes need no lock to count; within a process, the threads counting
+    one function take the lock of its slot, so no increment is lost, and
+    each store is one aligned 8-byte write. The rows are summed when the
+    counts are read, without any round trip to the workers.
+
+    A forked child takes a row of its own automatically. A process that
+    exits leaves its counts behind, and the next process that needs a row
+    takes over the row and counts on from there, so recycled workers do not
+    lose calls. Processes started without fork (spawn, separate servers)
+    share the counts by opening the same ``path``.
+
+    Example:
+        >>> counters = SharedCounters('/tmp/app.counters')
+        >>>
+        >>> @log_call_counter(shared=counters)
+        ... def handler(request):
+        ...     pass
+        >>>
+        >>> # In the parent, after the workers handled some requests
+        >>> counters.total(handler)  # Calls in all workers
+    """
+
+    def __init__(
+            self,
+            path: Optional[str] = None,
+            slots: int = 1024,
+            processes: int = 64,
+    ) -> None:
+        """
+        Args:
+            path: The file backing the counters, created if missing (default:
+                None, a new temporary file, shared with forked children only;
+                ``unlink`` deletes it).
+            slots: The most function names the table holds (default: 1024).
+                An existing file keeps its own size.
+            processes: The most processes counting at the same time
+                (default: 64). An existing file keeps its own size.
+        """
+        if slots < 1:
+            raise ValueError("slots must be positive")
+        if processes < 1:
+            raise ValueError("processes must be positive")
+        if path is None:
+            fd, path = tempfile.mkstemp(prefix='py_debug-', suffix='.counters')
+        else:
+            fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        self.path = path
+        self._fd = fd
+        with self._locked():
+            if os.fstat(fd).st_size == 0:
+                os.ftruncate(fd, _HEADER_SIZE + slots * _NAME_SIZE
+                             + processes * (slots + 1) * 8)
+                self._mmap = mmap.mmap(fd, 0)
+                _HEADER.pack_into(self._mmap, 0, _MAGIC, _VERSION, slots,
+                                  processes)
+            elif os.fstat(fd).st_size >= _HEADER_SIZE:
+                self._mmap = mmap.mmap(fd, 0)
+            else:
+                os.close(fd)
+                raise ValueError(f"{path} is not a py_debug counter file")
+        magic, version, slots, processes = _HEADER.unpack_from(self._mmap, 0)
+        if magic != _MAGIC or version != _VERSION:
+            self._mmap.close()
+            os.close(fd)
+            raise ValueError(f"{path} is not a py_debug counter file")
+        self.slots = slots
+        self.processes = processes
+        rows_start = _HEADER_SIZE + slots * _NAME_SIZE
+        self._names = memoryview(self._mmap)[_HEADER_SIZE:rows_start]
+        self._rows = memoryview(self._mmap)[rows_start:].cast('Q')
+        self._row: Union[memoryview, List[int]] = []
+        self._slot_locks: List[Lock] = []
+        self._claim_row()
+        _instances.add(self)
+
+    @contextmanager
+    def _locked(self) -> Iterator[None]:
+        """Hold an exclusive lock on the file, where the platform has one."""
+        if fcntl is None:
+            yield
+            return
+        fcntl.flock(self._fd, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    def _claim_row(self) -> None:
+        """Take a free row, or the row of an exited process, for this one."""
+        width = self.slots + 1
+        with self._locked():
+            for start in range(0, self.processes * width, width):
+                owner = self._rows[start]
+                if owner == 0 or (owner != os.getpid()
+                                  and not _is_alive(owner)):
+                    self._rows[start] = os.getpid()
+                    self._row = self._rows[start + 1:start + width]
+                    break
+            else:
+                _logger.warning(
+                    'No free row in %s; calls in process %d are not shared.',
+                    self.path, os.getpid())
+                self._row = [0] * self.slots
+        # Locks held by other threads at a fork would never be released in
+        # the child
+        self._slot_locks = [Lock() for _ in range(self.slots)]
+
+    def _find(self, key: bytes, insert: bool) -> Optional[int]:
+        """
+        Find the slot of a name by linear probing, optionally taking a free
+        one.
+        """
+        names = self._names
+        first = zlib.crc32(key) % self.slots
+        for probe in range(self.slots):
+            slot = (first + probe) % self.slots
+            offset = slot * _NAME_SIZE
+            length, = _LENGTH.unpack_from(names, offset)
+            start = offset + _LENGTH.size
+            if length == 0:
+                if not insert:
+                    return None
+                # The name is written before its length, so readers never see
+                # half of it
+                names[start:start + len(key)] = key
+                _LENGTH.pack_into(names, offset, len(key))
+                return slot
+            if names[start:start + length] == key:
+                return slot
+        return None
+
+    def _insert(self, key: bytes) -> int:
+        """
+        Find the slot of a name, taking a free one if it has none; call with
+        the file locked.
+        """
+        slot = self._find(key, insert=True)
+        if slot is None:
+            raise ValueError(
+                f"the {self.slots} slots of {self.path} are all taken")
+        return slot
+
+    def publisher(self, name: str) -> Callable[[], None]:
+        """
+        Get the function that counts one call of a function in this process.
+
+        Args:
+            name: The full qualified name of the function.
+
+        Returns:
+            A function taking no arguments.
+        """
+        key = _key(name)
+        found = self._find(key, insert=False)
+        if found is None:
+            with self._locked():
+                found = self._insert(key)
+        slot = found
+
+        def publish() -> None:
+            # The read and the write of the cell must not interleave with
+            # another thread's
+            with self._slot_locks[slot]:
+                self._row[slot] += 1
+
+        return publish
+
+    def total(self, func: Union[str, Callable]) -> int:
+        """
+        Get the calls of a function counted by all processes.
+
+        Args:
+            func: The function, or its full qualified name
+                (``module.qualname``). As a fallback for names of earlier
+                versions, ``module.function_name`` adds up the functions of
+                that name counted by this process.
+
+        Returns:
+            The number of calls, or 0 if it was never counted.
+        """
+        name = func if isinstance(func, str) else _get_qualified_name(func)
+        slot = self._find(_key(name), insert=False)
+        if slot is None:
+            totals = self.totals()
+            return sum(totals[full_name]
+                       for full_name in _resolve_name(name, totals)
+                       if full_name != name)
+        width = self.slots + 1
+        return sum(self._rows[start + 1 + slot]
+                   for start in range(0, self.processes * width, width))
+
+    def totals(self) -> Dict[str, int]:
+        """
+        Get the calls of every function counted by all processes.
+
+        Returns:
+            The number of calls by function name.
+        """
+        width = self.slots + 1
+        result = {}
+        for slot in range(self.slots):
+            offset = slot * _NAME_SIZE
+            length, = _LENGTH.unpack_from(self._names, offset)
+            if length:
+                name_start = offset + _LENGTH.size
+                raw = self._names[name_start:name_start + length]
+                name = bytes(raw).decode('utf-8', 'replace')
+                result[name] = sum(
+                    self._rows[start + 1 + slot]
+                    for start in range(0, self.processes * width, width))
+        return result
+
+    def close(self) -> None:
+        """Unmap the file. The counters of this process stop being shared."""
+        _instances.discard(self)
+        if isinstance(self._row, memoryview):
+            self._row.release()
+        self._row = [0] * self.slots
+        self._names.release()
+        self._rows.release()
+        self._mmap.close()
+        os.close(self._fd)
+
+    def unlink(self) -> None:
+        """Close the counters and delete the backing file."""
+        self.close()
+        os.unlink(self.path)
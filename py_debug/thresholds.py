@@ -0,0 +1,147 @@
+"""
+    Slow-call thresholds for ``log_running_time(threshold=...)``.
+
+    A threshold is bound once per decorated function. The bound threshold
+    takes the duration of every timed call and returns the threshold the
+    call exceeded, or None for calls that were fast enough, which are not
+    logged.
+"""
+from abc import ABC, abstractmethod
+from typing import Callable, List, Optional, Union
+
+from .histogram import Histogram
+
+
+class Threshold(ABC):
+    """
+    Base class of the slow-call thresholds.
+
+    Subclasses implement ``bind``.
+    """
+
+    @abstractmethod
+    def bind(self) -> Callable[[int], Optional[int]]:
+        """
+        Make the check for one decorated function.
+
+        Returns:
+            A function that takes the duration of a call in nanoseconds and
+            returns the threshold it exceeded in nanoseconds, or None.
+        """
+
+
+class Fixed(Threshold):
+    """
+    Log calls slower than a fixed number of seconds.
+
+    Example:
+        >>> @log_running_time(threshold=Fixed(0.25))  # Or threshold=0.25
+        ... def handler(request):
+        ...     pass
+    """
+
+    def __init__(self, seconds: float) -> None:
+        """
+        Args:
+            seconds: The duration calls must exceed to be logged.
+        """
+        if seconds < 0:
+            raise ValueError("seconds must be non-negative")
+        self.seconds = seconds
+
+    def bind(self) -> Callable[[int], Optional[int]]:
+        limit = int(self.seconds * 1e9)
+
+        def exceeded(elapsed_ns: int) -> Optional[int]:
+            return limit if elapsed_ns > limit else None
+
+        return exceeded
+
+
+class Percentile(Threshold):
+    """
+    Log calls slower than a percentile of the function's recent calls.
+
+    Every call is recorded into a histogram of the function, and every
+    ``refresh`` calls the threshold is read from it again, so checking a
+    call is a comparison. The histogram starts over after ``window`` calls,
+    keeping the last threshold until the new window has ``refresh`` calls,
+    so the threshold follows changes of the function's speed. A call is
+    checked before it is recorded, so it never raises the threshold it is
+    checked against, and the first ``refresh`` calls are not logged.
+
+    Example:
+        >>> # Or threshold='p99.9'
+        >>> @log_running_time(threshold=Percentile(99.9))
+        ... def handler(request):
+        ...     pass
+    """
+
+    def __init__(
+            self,
+            percentile: float = 99.0,
+            window: int = 10_000,
+            refresh: int = 100,
+    ) -> None:
+        """
+        Args:
+            percentile: The percentile calls must exceed to be logged,
+                below 100 (default: 99.0).
+            window: The number of calls the threshold is computed over
+                (default: 10000).
+            refresh: How many calls apart the threshold is read from the
+                histogram (default: 100).
+        """
+        if not 0 < percentile < 100:
+            raise ValueError("percentile must be between 0 and 100")
+        if refresh < 1:
+            raise ValueError("refresh must be positive")
+        if window < refresh:
+            raise ValueError("window must be at least refresh")
+        self.percentile = percentile
+        self.window = window
+        self.refresh = refresh
+
+    def bind(self) -> Callable[[int], Optional[int]]:
+        percentile, window = self.percentile, self.window
+        refresh = self.refresh
+        histogram = Histogram()
+        limit: List[Optional[int]] = [None]
+
+        def exceeded(elapsed_ns: int) -> Optional[int]:
+            current = limit[0]
+            calls = histogram.record(elapsed_ns)
+            if calls % refresh == 0:
+                limit[0] = histogram.percentile(percentile)
+                if calls >= window:
+                    histogram.reset()
+            if current is not None and elapsed_ns > current:
+                return current
+            return None
+
+        return exceeded
+
+
+def as_threshold(threshold: Union[float, str, Threshold]) -> Threshold:
+    """
+    Resolve the shorthands of ``log_running_time(threshold=...)``.
+
+    Args:
+        threshold: A ``Threshold``, a number of seconds for ``Fixed``, or a
+            percentile such as ``'p99'`` or ``'p99.9'`` for ``Percentile``.
+
+    Returns:
+        The threshold.
+    """
+    if isinstance(threshold, Threshold):
+        return threshold
+    if isinstance(threshold, str):
+        if not threshold.startswith('p'):
+            raise ValueError(
+                "threshold strings must be percentiles such as 'p99'")
+        try:
+            return Percentile(float(threshold[1:]))
+        except ValueError:
+            raise ValueError("threshold strings must be percentiles such as "
+                             "'p99'") from None
+    return Fixed(threshold)
@@ -2,6 +2,8 @@
 import logging
 import sys
 
+import pytest
+
 
 def pytest_configure(config):
     """Configure logging for tests."""
@@ -15,6 +17,34 @@ def pytest_configure(config):
     )
 
 
+class FakeClock:
+    """
+    A clock that only moves when the test moves it.
+
+    Calling the clock reads it in seconds, like ``time.monotonic``; ``ns``
+    reads it in nanoseconds, like ``time.perf_counter_ns``.
+    """
+
+    def __init__(self):
+        self.now_ns = 0
+
+    def __call__(self):
+        return self.now_ns / 1e9
+
+    def ns(self):
+        return self.now_ns
+
+    def advance(self, seconds):
+        """Move the clock forward by the given number of seconds."""
+        self.now_ns += round(seconds * 1e9)
+
+
+@pytest.fixture
+def fake_clock():
+    """A fake clock starting at zero, for the code under test to be handed."""
+    return FakeClock()
+
+
 def pytest_runtest_setup(item):
     """Setup before each test."""
     # Optionally configure logging per test
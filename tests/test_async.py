@@ -0,0 +1,276 @@
+"""Unit tests for decorating coroutine and async generator functions."""
+import asyncio
+import inspect
+import logging
+import re
+import time
+
+import pytest
+
+from py_debug import log_running_time, log_args, log_call_counter, reset_call_counters, get_call_count, get_timing_stats
+
+DECORATORS = [log_running_time, log_args, log_call_counter]
+
+
+class TestAsyncFunctions:
+    """Test cases for decorated coroutine functions."""
+
+    def setup_method(self):
+        """Reset call counters before each test."""
+        reset_call_counters()
+
+    @pytest.mark.parametrize('decorator', DECORATORS)
+    def test_wrapper_is_coroutine_function(self, decorator):
+        """Test that the wrapper of a coroutine function is a coroutine function."""
+        @decorator()
+        async def test_func():
+            return 42
+
+        assert inspect.iscoroutinefunction(test_func)
+        assert asyncio.run(test_func()) == 42
+
+    def test_times_the_awaited_work(self, caplog):
+        """Test that log_running_time times the full await, not coroutine creation."""
+        @log_running_time()
+        async def test_func():
+            await asyncio.sleep(0.05)
+            return 42
+
+        with caplog.at_level(logging.DEBUG):
+            assert asyncio.run(test_func()) == 42
+
+        elapsed = float(re.search(r'completed in ([\d.]+)', caplog.records[-1].getMessage()).group(1))
+        assert elapsed >= 0.04
+
+    def test_exception_logged_and_reraised(self, caplog):
+        """Test that a failing coroutine is logged and the exception propagates."""
+        @log_running_time()
+        async def test_func():
+            await asyncio.sleep(0)
+            raise ValueError('Test error')
+
+        with caplog.at_level(logging.DEBUG):
+            with pytest.raises(ValueError, match='Test error'):
+                asyncio.run(test_func())
+
+        assert 'failed after' in caplog.records[-1].getMessage()
+        assert 'ValueError' in caplog.records[-1].getMessage()
+
+    def test_measure_suspension(self, caplog):
+        """Test that suspended time is separated from running time."""
+        @log_running_time(measure_suspension=True)
+        async def test_func():
+            await asyncio.sleep(0.05)
+            time.sleep(0.02)
+            return 42
+
+        with caplog.at_level(logging.DEBUG):
+            assert asyncio.run(test_func()) == 42
+
+        message = caplog.records[-1].getMessage()
+        elapsed, running, suspended = map(float, re.search(
+            r'completed in ([\d.]+) seconds \(([\d.]+) running, ([\d.]+) suspended\)', message).groups())
+        assert running >= 0.015
+        assert suspended >= 0.04
+        assert running + suspended == pytest.approx(elapsed, abs=1e-5)
+
+    def test_measure_suspension_forwards_cancellation(self):
+        """Test that cancelling a measured call cancels the inner coroutine."""
+        cancelled = []
+
+        @log_running_time(measure_suspension=True)
+        async def test_func():
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.append(True)
+                raise
+
+        async def main():
+            task = asyncio.ensure_future(test_func())
+            await asyncio.sleep(0.01)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+
+        asyncio.run(main())
+        assert cancelled == [True]
+
+    def test_log_args(self, caplog):
+        """Test that log_args logs the arguments of an awaited call."""
+        @log_args()
+        async def test_func(a, b):
+            return a + b
+
+        with caplog.at_level(logging.DEBUG):
+            assert asyncio.run(test_func(1, 2)) == 3
+
+        assert 'args = (1, 2)' in caplog.records[-1].getMessage()
+
+    def test_log_call_counter(self):
+        """Test that log_call_counter counts awaited calls."""
+        @log_call_counter()
+        async def test_func():
+            return True
+
+        async def main():
+            await asyncio.gather(*(test_func() for _ in range(5)))
+
+        asyncio.run(main())
+        assert get_call_count(test_func) == 5
+
+    def test_log_call_counter_invalid_level_on_failure(self, caplog):
+        """Test that a failed call not due a line still reports an invalid level."""
+        @log_call_counter(level=99999, mute_after=0)
+        async def test_func():
+            raise ValueError('boom')
+
+        with caplog.at_level(logging.DEBUG):
+            with pytest.raises(ValueError):
+                asyncio.run(test_func())
+
+        (record,) = [r for r in caplog.records if r.name == __name__]
+        assert 'Invalid log level' in record.getMessage()
+
+
+class TestAsyncGenerators:
+    """Test cases for decorated async generator functions."""
+
+    def setup_method(self):
+        """Reset call counters before each test."""
+        reset_call_counters()
+
+    @pytest.mark.parametrize('decorator', DECORATORS)
+    def test_wrapper_is_async_generator_function(self, decorator):
+        """Test that the wrapper of an async generator function is one too."""
+        @decorator()
+        async def test_func(n):
+            for i in range(n):
+                yield i
+
+        async def main():
+            return [item async for item in test_func(3)]
+
+        assert inspect.isasyncgenfunction(test_func)
+        assert asyncio.run(main()) == [0, 1, 2]
+
+    def test_times_full_iteration(self, caplog):
+        """Test that log_running_time times the iteration until exhaustion."""
+        @log_running_time()
+        async def test_func():
+            for i in range(3):
+                await asyncio.sleep(0.02)
+                yield i
+
+        async def main():
+            return [item async for item in test_func()]
+
+        with caplog.at_level(logging.DEBUG):
+            assert asyncio.run(main()) == [0, 1, 2]
+
+        records = [record for record in caplog.records if record.name == __name__]
+        assert len(records) == 1
+        elapsed = float(re.search(r'completed in ([\d.]+)', records[0].getMessage()).group(1))
+        assert elapsed >= 0.05
+
+    def test_asend_and_athrow_are_forwarded(self):
+        """Test that values and exceptions sent in reach the inner generator."""
+        received = []
+
+        @log_running_time()
+        async def test_func():
+            while True:
+                try:
+                    received.append((yield len(received)))
+                except KeyError:
+                    received.append('KeyError')
+
+        async def main():
+            agen = test_func()
+            assert await agen.asend(None) == 0
+            assert await agen.asend('a') == 1
+            assert await agen.athrow(KeyError()) == 2
+            await agen.aclose()
+
+        asyncio.run(main())
+        assert received == ['a', 'KeyError']
+
+    def test_close_logs_completion(self, caplog):
+        """Test that closing a generator early is logged as completed."""
+        closed = []
+
+        @log_running_time()
+        async def test_func():
+            try:
+                while True:
+                    yield 1
+            finally:
+                closed.append(True)
+
+        async def main():
+            agen = test_func()
+            await agen.__anext__()
+            await agen.aclose()
+
+        with caplog.at_level(logging.DEBUG):
+            asyncio.run(main())
+
+        assert closed == [True]
+        assert 'is completed in' in caplog.records[-1].getMessage()
+
+    def test_exception_logged(self, caplog):
+        """Test that a failing async generator is logged as failed."""
+        @log_running_time()
+        async def test_func():
+            yield 1
+            raise ValueError('Test error')
+
+        async def main():
+            return [item async for item in test_func()]
+
+        with caplog.at_level(logging.DEBUG):
+            with pytest.raises(ValueError):
+                asyncio.run(main())
+
+        assert 'failed after' in caplog.records[-1].getMessage()
+
+    def test_log_call_counter(self):
+        """Test that log_call_counter counts each iteration started."""
+        @log_call_counter()
+        async def test_func():
+            yield 1
+
+        async def main():
+            for _ in range(3):
+                async for _ in test_func():
+                    pass
+
+        asyncio.run(main())
+        assert get_call_count(test_func) == 3
+
+    def test_log_call_counter_invalid_level_on_failure(self, caplog):
+        """Test that an iteration failing without being due a line still reports an invalid level."""
+        @log_call_counter(level=99999, mute_after=0)
+        async def test_func():
+            yield 1
+            raise ValueError('boom')
+
+        async def main():
+            async for _ in test_func():
+                pass
+
+        with caplog.at_level(logging.DEBUG):
+            with pytest.raises(ValueError):
+                asyncio.run(main())
+
+        (record,) = [r for r in caplog.records if r.name == __name__]
+        assert 'Invalid log level' in record.getMessage()
+
+    def test_aggregate_mode(self):
+        """Test that aggregate mode records awaited durations."""
+        @log_running_time(aggregate=True)
+        async def test_func():
+            await asyncio.sleep(0.02)
+
+        asyncio.run(test_func())
+        assert get_timing_stats(test_func).min >= 0.015
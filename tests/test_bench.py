@@ -0,0 +1,76 @@
+"""Unit tests for the py_debug.bench benchmark suite."""
+import json
+import logging
+import threading
+
+from py_debug import get_enabled
+from py_debug.bench import Result, compare, default_cases, main, measure, run
+
+FAST = ['--repeat', '1', '--min-time', '0.001', '--threads', '2']
+
+
+class TestBench:
+    """Test cases for the benchmark suite."""
+
+    def test_measure(self):
+        """Test that measuring calls the function and returns ns/call."""
+        calls = []
+        ns = measure(lambda: calls.append(1), threads=2, repeat=2, min_time=0.001)
+        assert ns > 0
+        assert len(calls) > 100
+
+    def test_run_overhead_over_bare(self):
+        """Test that overheads are taken over the bare case of the same thread count."""
+        cases = [c for c in default_cases(threads=2) if c.name.startswith(('bare call', 'stacked'))]
+        results = run(cases, repeat=1, min_time=0.001)
+        assert list(results) == [case.name for case in cases]
+        assert results['bare call'].overhead_ns == 0.0
+        assert results['stacked, disabled level'].overhead_ns == \
+            results['stacked, disabled level'].ns_per_call - results['bare call'].ns_per_call
+        assert get_enabled()
+
+    def test_cases_built_when_run(self):
+        """Test that building the suite starts no emitter thread until a case is made."""
+        before = threading.active_count()
+        (queued,) = [c for c in default_cases(threads=2) if c.name == 'log_running_time, queued']
+        assert threading.active_count() == before
+        queued.make()
+        assert threading.active_count() == before + 1
+
+    def test_run_restores_propagation(self):
+        """Test that the bench loggers propagate again after a run."""
+        bench_logger = logging.getLogger('py_debug.bench.enabled')
+        run(default_cases(threads=2)[:1], repeat=1, min_time=0.001)
+        assert bench_logger.propagate
+
+    def test_cases_cover_every_decorator(self):
+        """Test that the suite covers each decorator and the contended cases."""
+        cases = default_cases(threads=3)
+        for prefix in ('log_running_time', 'log_args', 'log_call_counter', 'stacked', 'bare call, 3 threads'):
+            assert any(case.name.startswith(prefix) for case in cases)
+        assert sum(case.threads == 3 for case in cases) > 1
+        assert any(not case.enabled for case in cases)
+
+    def test_compare(self):
+        """Test that only cases slower than the threshold are regressions."""
+        baseline = {'results': {'a': {'ns_per_call': 100.0}, 'b': {'ns_per_call': 100.0}}}
+        results = {'a': Result(120.0, 0.0), 'b': Result(130.0, 0.0), 'c': Result(1000.0, 0.0)}
+        regressions = compare(results, baseline, threshold=0.25)
+        assert len(regressions) == 1
+        assert regressions[0].startswith('b: 130.0 ns/call')
+
+    def test_main_writes_json(self, tmp_path, capsys):
+        """Test that the command line writes a JSON report of the selected cases."""
+        path = tmp_path / 'results.json'
+        assert main(FAST + ['--filter', 'log_call_counter, muted*', '--json', str(path)]) == 0
+        results = json.loads(path.read_text())['results']
+        assert set(results) == {'bare call', 'log_call_counter, muted', 'bare call, 2 threads',
+                                'log_call_counter, muted, 2 threads'}
+        assert 'ns/call' in capsys.readouterr().out
+
+    def test_main_fails_on_regression(self, tmp_path, capsys):
+        """Test that the command line exits with 1 when a case regresses."""
+        baseline = tmp_path / 'baseline.json'
+        baseline.write_text(json.dumps({'results': {'bare call': {'ns_per_call': 1e-6}}}))
+        assert main(FAST + ['--filter', 'none', '--baseline', str(baseline)]) == 1
+        assert 'REGRESSION bare call' in capsys.readouterr().err
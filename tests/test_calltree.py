@@ -0,0 +1,207 @@
+"""Unit tests for the call tree of log_running_time(call_tree=True)."""
+import asyncio
+import io
+import threading
+import time
+
+import pytest
+
+from py_debug import (
+    log_running_time, get_call_tree, get_hotspots, print_hotspots, reset_call_tree, set_enabled,
+)
+from py_debug.calltree import CallTree, hotspots
+
+
+def child_named(node, name):
+    """Get the child of a node with the given name."""
+    (child,) = [child for child in node.children if child.name == name]
+    return child
+
+
+class TestCallTree:
+    """Test cases for CallTree."""
+
+    def test_inclusive_and_exclusive(self, fake_clock):
+        """Test that callee time is excluded from the caller's self time."""
+        tree = CallTree(clock=fake_clock.ns)
+        parent = tree.enter('parent')
+        fake_clock.now_ns += 10
+        child = tree.enter('child')
+        fake_clock.now_ns += 30
+        tree.leave(child)
+        fake_clock.now_ns += 5
+        tree.leave(parent)
+
+        root = tree.snapshot()
+        assert (root.calls, root.inclusive) == (1, 45e-9)
+        parent_node = child_named(root, 'parent')
+        assert (parent_node.calls, parent_node.inclusive, parent_node.exclusive) == (1, 45e-9, 15e-9)
+        child_node = child_named(parent_node, 'child')
+        assert (child_node.calls, child_node.inclusive, child_node.exclusive) == (1, 30e-9, 30e-9)
+
+    def test_paths_are_separate(self, fake_clock):
+        """Test that a function called from two callers gets a node per path."""
+        tree = CallTree(clock=fake_clock.ns)
+        for caller in ('first', 'second'):
+            token = tree.enter(caller)
+            inner = tree.enter('shared')
+            fake_clock.now_ns += 1
+            tree.leave(inner)
+            tree.leave(token)
+
+        root = tree.snapshot()
+        assert child_named(child_named(root, 'first'), 'shared').calls == 1
+        assert child_named(child_named(root, 'second'), 'shared').calls == 1
+
+    def test_recursion_counted_once_in_total(self, fake_clock):
+        """Test that recursive calls are not counted twice in the total time."""
+        tree = CallTree(clock=fake_clock.ns)
+        outer = tree.enter('recurse')
+        fake_clock.now_ns += 10
+        inner = tree.enter('recurse')
+        fake_clock.now_ns += 20
+        tree.leave(inner)
+        tree.leave(outer)
+
+        (spot,) = hotspots(tree.snapshot())
+        assert (spot.function, spot.calls) == ('recurse', 2)
+        assert spot.self_time == pytest.approx(30e-9)
+        assert spot.total_time == pytest.approx(30e-9)
+
+    def test_max_nodes(self, fake_clock):
+        """Test that paths beyond the limit are dropped but still excluded from the caller."""
+        tree = CallTree(max_nodes=1, clock=fake_clock.ns)
+        parent = tree.enter('parent')
+        child = tree.enter('child')
+        grandchild = tree.enter('grandchild')
+        fake_clock.now_ns += 7
+        tree.leave(grandchild)
+        tree.leave(child)
+        fake_clock.now_ns += 3
+        tree.leave(parent)
+
+        root = tree.snapshot()
+        assert tree.dropped == 2
+        assert [node.name for node in root.children] == ['parent']
+        assert root.children[0].children == []
+        assert root.children[0].exclusive == 3e-9
+
+    def test_in_flight_caller_shown(self, fake_clock):
+        """Test that completed callees of a call in flight are in the snapshot."""
+        tree = CallTree(clock=fake_clock.ns)
+        token = tree.enter('main')
+        tree.leave(tree.enter('step'))
+        main = tree.snapshot().children[0]
+        assert (main.name, main.calls) == ('main', 0)
+        assert main.children[0].calls == 1
+        tree.leave(token)
+
+    def test_reset(self, fake_clock):
+        """Test that reset forgets the tree."""
+        tree = CallTree(clock=fake_clock.ns)
+        tree.leave(tree.enter('func'))
+        tree.reset()
+        assert tree.snapshot().children == []
+
+    def test_invalid_max_nodes(self):
+        """Test that a tree needs room for a node."""
+        with pytest.raises(ValueError):
+            CallTree(max_nodes=0)
+
+
+@log_running_time(call_tree=True)
+def tree_leaf():
+    time.sleep(0.02)
+
+
+@log_running_time(call_tree=True)
+def tree_branch():
+    time.sleep(0.01)
+    tree_leaf()
+
+
+@log_running_time(call_tree=True)
+async def tree_task(delay):
+    await asyncio.sleep(delay)
+
+
+@log_running_time(call_tree=True)
+async def tree_gather():
+    await asyncio.gather(tree_task(0.02), tree_task(0.02))
+
+
+class TestLogRunningTimeCallTree:
+    """Test cases for log_running_time(call_tree=True)."""
+
+    def setup_method(self):
+        """Reset the call tree before each test."""
+        reset_call_tree()
+
+    def test_nested_calls(self):
+        """Test that nested decorated calls build the tree."""
+        tree_branch()
+        tree_leaf()
+
+        root = get_call_tree()
+        branch = child_named(root, f'{__name__}.tree_branch')
+        leaf = child_named(branch, f'{__name__}.tree_leaf')
+        assert branch.inclusive >= 0.03
+        assert branch.exclusive >= 0.01
+        assert branch.exclusive == pytest.approx(branch.inclusive - leaf.inclusive)
+        assert leaf.calls == 1 and leaf.inclusive >= 0.02
+        assert child_named(root, f'{__name__}.tree_leaf').calls == 1
+
+        spots = get_hotspots()
+        assert [spot.function for spot in spots] == [f'{__name__}.tree_leaf', f'{__name__}.tree_branch']
+        assert spots[0].calls == 2
+        assert sum(spot.self_share for spot in spots) == pytest.approx(1.0)
+
+    def test_threads_start_at_root(self):
+        """Test that calls in a new thread are top-level calls."""
+        @log_running_time(call_tree=True)
+        def tree_spawner():
+            thread = threading.Thread(target=tree_leaf)
+            thread.start()
+            thread.join()
+
+        tree_spawner()
+        root = get_call_tree()
+        assert child_named(root, f'{__name__}.tree_leaf').calls == 1
+        assert child_named(root, f'{__name__}.tree_spawner').children == []
+
+    def test_tasks_under_their_creator(self):
+        """Test that gathered tasks are callees of the call that created them."""
+        asyncio.run(tree_gather())
+
+        gather = child_named(get_call_tree(), f'{__name__}.tree_gather')
+        task = child_named(gather, f'{__name__}.tree_task')
+        assert task.calls == 2
+        # The tasks ran concurrently, so their total exceeds the caller's time
+        assert gather.exclusive == 0.0
+
+    def test_switched_off(self):
+        """Test that nothing is recorded while the decorators are switched off."""
+        set_enabled(False)
+        try:
+            tree_leaf()
+        finally:
+            set_enabled(True)
+        assert get_call_tree().children == []
+
+    def test_generators_not_tracked(self):
+        """Test that generator functions are timed but not put in the tree."""
+        @log_running_time(call_tree=True)
+        def tree_generator():
+            yield 1
+
+        assert list(tree_generator()) == [1]
+        assert get_call_tree().children == []
+
+    def test_print_hotspots(self):
+        """Test the hotspot table."""
+        tree_branch()
+        output = io.StringIO()
+        print_hotspots(1, file=output)
+        lines = output.getvalue().splitlines()
+        assert lines[0].split() == ['self', 's', 'self', '%', 'total', 's', 'calls', 'function']
+        assert len(lines) == 2 and lines[1].endswith(f'{__name__}.tree_leaf')
@@ -0,0 +1,123 @@
+"""Unit tests for the global on/off switch of the decorators."""
+import asyncio
+import logging
+import os
+import subprocess
+import sys
+
+import pytest
+
+from py_debug import (
+    log_running_time, log_args, log_call_counter, set_enabled, get_enabled,
+    reset_call_counters, get_call_count, reset_timing_stats, get_timing_stats,
+)
+
+
+class TestDisableSwitch:
+    """Test cases for set_enabled and PY_DEBUG_DISABLED."""
+
+    def setup_method(self):
+        """Reset counters and timing statistics before each test."""
+        reset_call_counters()
+        reset_timing_stats()
+
+    def teardown_method(self):
+        """Switch the decorators back on."""
+        set_enabled(True)
+
+    def test_enabled_by_default(self):
+        """Test that the decorators are on by default."""
+        assert get_enabled()
+
+    @pytest.mark.parametrize('decorator', [log_running_time(), log_args(), log_call_counter()])
+    def test_unwrap_returns_the_function(self, decorator):
+        """Test that decorating while switched off with unwrap returns the function itself."""
+        def test_func():
+            pass
+
+        set_enabled(False, unwrap=True)
+        assert decorator(test_func) is test_func
+
+    def test_unwrapped_function_stays_bare(self):
+        """Test that switching back on does not instrument unwrapped functions."""
+        set_enabled(False, unwrap=True)
+
+        @log_call_counter()
+        def switch_bare_func():
+            pass
+
+        set_enabled(True)
+        switch_bare_func()
+        assert get_call_count(switch_bare_func) == 0
+
+    def test_switch_on_restores_wrapping(self):
+        """Test that functions decorated after switching back on are wrapped."""
+        def test_func():
+            pass
+
+        set_enabled(False, unwrap=True)
+        set_enabled(True)
+        assert log_args()(test_func) is not test_func
+
+    def test_runtime_toggle(self, caplog):
+        """Test that existing wrappers stop and resume reporting."""
+        @log_running_time()
+        @log_args()
+        @log_call_counter()
+        def switch_toggle_func(x):
+            return x * 2
+
+        with caplog.at_level(logging.DEBUG):
+            set_enabled(False)
+            assert switch_toggle_func(2) == 4
+            assert caplog.records == []
+            assert get_call_count(switch_toggle_func) == 0
+
+            set_enabled(True)
+            assert switch_toggle_func(3) == 6
+            assert len(caplog.records) == 3
+            assert get_call_count(switch_toggle_func) == 1
+
+    def test_runtime_toggle_aggregate(self):
+        """Test that a switched off aggregating wrapper records nothing."""
+        @log_running_time(aggregate=True)
+        def switch_aggregate_func():
+            pass
+
+        set_enabled(False)
+        switch_aggregate_func()
+        set_enabled(True)
+        switch_aggregate_func()
+        assert get_timing_stats(switch_aggregate_func).count == 1
+
+    def test_runtime_toggle_async(self, caplog):
+        """Test that coroutine and async generator wrappers honour the switch."""
+        @log_running_time()
+        async def coroutine():
+            return 1
+
+        @log_args()
+        async def agen():
+            yield 1
+
+        async def main():
+            await coroutine()
+            return [item async for item in agen()]
+
+        set_enabled(False)
+        with caplog.at_level(logging.DEBUG, logger=__name__):
+            assert asyncio.run(main()) == [1]
+        assert [record for record in caplog.records if record.name == __name__] == []
+
+    def test_environment_variable(self):
+        """Test that PY_DEBUG_DISABLED switches the decorators off at import."""
+        code = (
+            'import py_debug\n'
+            'f = lambda: None\n'
+            'print(py_debug.get_enabled(), py_debug.log_args()(f) is f)\n'
+        )
+        env = dict(os.environ, PY_DEBUG_DISABLED='1')
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        env['PYTHONPATH'] = os.pathsep.join(filter(None, [root, env.get('PYTHONPATH')]))
+        output = subprocess.run([sys.executable, '-c', code], env=env, capture_output=True, text=True, check=True)
+        assert output.stdout.split() == ['False', 'True']
@@ -0,0 +1,196 @@
+"""Unit tests for the off-thread QueuedEmitter and its use in the decorators."""
+import logging
+import threading
+import time
+
+import pytest
+
+from py_debug import log_running_time, log_args, log_call_counter, reset_call_counters, QueuedEmitter
+
+
+class RecordingHandler(logging.Handler):
+    """Handler that keeps its records and the thread that handled them."""
+
+    def __init__(self):
+        super().__init__()
+        self.records = []
+        self.threads = []
+        #: When set, handling waits until the event is set
+        self.gate = None
+        #: Raised from emit when set
+        self.error = None
+
+    def emit(self, record):
+        if self.gate is not None:
+            self.gate.wait()
+        if self.error is not None:
+            raise self.error
+        self.records.append(record)
+        self.threads.append(threading.current_thread())
+
+
+class TestQueuedEmitter:
+    """Test cases for QueuedEmitter."""
+
+    def setup_method(self):
+        """Set up a private logger and an emitter that only flushes on demand."""
+        reset_call_counters()
+        self.handler = RecordingHandler()
+        self.logger = logging.getLogger(f'{__name__}.{id(self)}')
+        self.logger.setLevel(logging.DEBUG)
+        self.logger.propagate = False
+        self.logger.addHandler(self.handler)
+        self.emitter = QueuedEmitter(flush_interval=60)
+
+    def teardown_method(self):
+        """Close the emitter."""
+        self.emitter.close()
+
+    def test_records_are_queued_until_flushed(self):
+        """Test that the decorated call only queues its record."""
+        @log_args(logger=self.logger, emitter=self.emitter)
+        def test_func(a):
+            return a
+
+        assert test_func(1) == 1
+        assert self.emitter.pending == 1
+        assert self.handler.records == []
+
+        self.emitter.flush()
+        assert self.emitter.pending == 0
+        assert [record.getMessage() for record in self.handler.records] == [
+            f'Function {__name__}.test_func has been called with args = (1,).']
+
+    def test_record_keeps_call_time_and_level(self):
+        """Test that a record carries the time of the call, not of the flush."""
+        @log_call_counter(level=logging.INFO, logger=self.logger, emitter=self.emitter)
+        def test_func():
+            pass
+
+        before = time.time()
+        test_func()
+        time.sleep(0.05)
+        self.emitter.flush()
+
+        record = self.handler.records[0]
+        assert record.levelno == logging.INFO
+        assert record.name == self.logger.name
+        assert before <= record.created < before + 0.05
+
+    def test_disabled_level_is_not_queued(self):
+        """Test that the level is checked in the caller."""
+        self.logger.setLevel(logging.INFO)
+
+        @log_running_time(logger=self.logger, emitter=self.emitter)
+        def test_func():
+            pass
+
+        test_func()
+        assert self.emitter.pending == 0
+
+    def test_drop_on_overflow(self):
+        """Test that overflowing events are dropped and counted."""
+        emitter = QueuedEmitter(maxsize=3, flush_interval=60)
+
+        @log_args(logger=self.logger, emitter=emitter)
+        def test_func():
+            pass
+
+        for _ in range(5):
+            test_func()
+        assert emitter.pending == 3
+        assert emitter.dropped == 2
+        emitter.close()
+        assert len(self.handler.records) == 3
+
+    def test_block_on_overflow(self):
+        """Test that a full blocking queue waits for the emitter thread."""
+        emitter = QueuedEmitter(maxsize=2, overflow='block', flush_interval=60)
+
+        @log_args(logger=self.logger, emitter=emitter)
+        def test_func():
+            pass
+
+        for _ in range(10):
+            test_func()
+        emitter.close()
+        assert len(self.handler.records) == 10
+        assert emitter.dropped == 0
+
+    def test_handled_off_thread(self):
+        """Test that slow handlers run on the emitter thread, not the caller's."""
+        self.handler.gate = threading.Event()
+        emitter = QueuedEmitter(batch_size=1)
+
+        @log_running_time(logger=self.logger, emitter=emitter)
+        def test_func():
+            pass
+
+        # Handling in the caller would wait for the gate forever
+        test_func()
+        self.handler.gate.set()
+        emitter.close()
+        assert self.handler.threads[0] is not threading.current_thread()
+
+    @pytest.mark.parametrize('failure', ['handler', 'filter'])
+    def test_handling_errors_do_not_stop_the_thread(self, monkeypatch, failure):
+        """Test that a raising handler or filter is reported and later records are still handled."""
+        reported = []
+        monkeypatch.setattr(logging.Handler, 'handleError', lambda handler, record: reported.append(record))
+        emitter = QueuedEmitter(batch_size=1, flush_interval=0.01)
+
+        def failing_filter(record):
+            raise ValueError('boom')
+
+        @log_args(logger=self.logger, emitter=emitter)
+        def test_func(a):
+            return a
+
+        if failure == 'handler':
+            self.handler.error = ValueError('boom')
+        else:
+            self.logger.addFilter(failing_filter)
+        test_func(1)
+        while not reported:
+            time.sleep(0.001)
+        self.handler.error = None
+        self.logger.removeFilter(failing_filter)
+        test_func(2)
+        while not self.handler.records:
+            time.sleep(0.001)
+        emitter.close()
+        assert emitter._thread is not None
+        assert [record.args[1].args for record in reported + self.handler.records] == [(1,), (2,)]
+
+    def test_close_flushes_and_falls_back(self):
+        """Test that close flushes pending events and later records are synchronous."""
+        @log_args(logger=self.logger, emitter=self.emitter)
+        def test_func():
+            pass
+
+        test_func()
+        self.emitter.close()
+        assert len(self.handler.records) == 1
+
+        test_func()
+        assert len(self.handler.records) == 2
+        assert self.handler.threads[1] is threading.current_thread()
+
+    def test_invalid_level_warning_is_queued(self):
+        """Test that the invalid level warning goes through the emitter too."""
+        @log_args(level=99999, logger=self.logger, emitter=self.emitter)
+        def test_func():
+            pass
+
+        test_func()
+        assert self.emitter.pending == 1
+        self.emitter.flush()
+        assert self.handler.records[0].levelno == logging.WARNING
+
+    @pytest.mark.parametrize('kwargs', [
+        {'maxsize': 0}, {'overflow': 'wait'}, {'batch_size': 0}, {'flush_interval': 0},
+    ])
+    def test_invalid_options(self, kwargs):
+        """Test that invalid options are rejected."""
+        with pytest.raises(ValueError):
+            QueuedEmitter(**kwargs)
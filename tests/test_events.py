@@ -0,0 +1,221 @@
+"""Unit tests for the structured events of the decorators and EventSink."""
+import io
+import logging
+import threading
+
+import pytest
+
+from py_debug import (
+    log_running_time, log_args, log_call_counter, reset_call_counters, Event, EventSink, QueuedEmitter,
+    read_events,
+)
+
+
+def sample_events():
+    """Return events with and without their optional fields."""
+    return [
+        Event('module.func', 'call', 1500, None, None, 7, 1_700_000_000_000_000_000),
+        Event('module.func', 'call', 2500, None, 'ValueError', 7, 1_700_000_000_000_000_001),
+        Event('module.gen', 'generator', 0, 3, None, 2 ** 63 + 5, 1),
+        Event('module.ünïcode', 'count', None, 12, None, 1, 2),
+        Event('module.args', 'args', None, None, None, 1, 3),
+    ]
+
+
+class TestEventSink:
+    """Test cases for EventSink and read_events."""
+
+    @pytest.mark.parametrize('format', ['jsonl', 'binary'])
+    def test_round_trip(self, format):
+        """Test that events read back equal the events written."""
+        file = io.BytesIO()
+        sink = EventSink(file, format=format)
+        for event in sample_events():
+            sink.write(event)
+        sink.flush()
+        file.seek(0)
+        assert list(read_events(file, format)) == sample_events()
+        sink.close()
+
+    def test_long_names_cut_on_character_boundary(self):
+        """Test that a name over the binary length limit is cut before a whole character."""
+        file = io.BytesIO()
+        sink = EventSink(file, format='binary')
+        sink.write(Event('m.' + 'é' * 40_000, 'call', 1, None, None, 1, 2))
+        sink.flush()
+        file.seek(0)
+        (event,) = read_events(file, 'binary')
+        assert event.function == 'm.' + 'é' * 32_766
+        sink.close()
+
+    def test_path_round_trip(self, tmp_path):
+        """Test that a sink opened from a path appends to it and closes it."""
+        path = str(tmp_path / 'events.bin')
+        for event in sample_events():
+            with EventSink(path, format='binary') as sink:
+                sink.write(event)
+        assert list(read_events(path, 'binary')) == sample_events()
+
+    def test_buffered_until_full(self):
+        """Test that events are written in bulk once the buffer is full."""
+        file = io.BytesIO()
+        sink = EventSink(file, buffer_size=3)
+        events = sample_events()
+        sink.write(events[0])
+        sink.write(events[1])
+        assert file.getvalue() == b''
+        sink.write(events[2])
+        assert file.getvalue().count(b'\n') == 3
+        sink.close()
+
+    def test_close_flushes(self):
+        """Test that closing writes the rest, and later events go out at once."""
+        file = io.BytesIO()
+        sink = EventSink(file)
+        events = sample_events()
+        sink.write(events[0])
+        sink.close()
+        sink.write(events[1])
+        file.seek(0)
+        assert list(read_events(file)) == events[:2]
+
+    def test_threads(self):
+        """Test that no event is lost or torn when threads write at once."""
+        file = io.BytesIO()
+        sink = EventSink(file, format='binary', buffer_size=64)
+        event = sample_events()[1]
+
+        def worker():
+            for _ in range(2000):
+                sink.write(event)
+
+        threads = [threading.Thread(target=worker) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        sink.close()
+        file.seek(0)
+        assert list(read_events(file, 'binary')) == [event] * 8000
+
+    def test_invalid_arguments(self):
+        """Test that unknown formats and empty buffers are rejected."""
+        with pytest.raises(ValueError):
+            EventSink(io.BytesIO(), format='xml')
+        with pytest.raises(ValueError):
+            EventSink(io.BytesIO(), buffer_size=0)
+        with pytest.raises(ValueError):
+            list(read_events(io.BytesIO(), 'xml'))
+
+
+class TestDecoratorEvents:
+    """Test cases for the events the decorators attach and write."""
+
+    def setup_method(self):
+        """Reset call counters before each test."""
+        reset_call_counters()
+
+    def test_record_carries_event(self, caplog):
+        """Test that records carry their event as the py_debug attribute."""
+        @log_running_time()
+        def timed_func():
+            return True
+
+        @log_running_time()
+        def failing_func():
+            raise KeyError('missing')
+
+        with caplog.at_level(logging.DEBUG):
+            assert timed_func()
+            with pytest.raises(KeyError):
+                failing_func()
+
+        completed, failed = [record.py_debug for record in caplog.records]
+        assert completed.function == f'{__name__}.timed_func'
+        assert completed.kind == 'call'
+        assert completed.duration_ns >= 0
+        assert completed.exception is None
+        assert completed.thread_id == threading.get_ident()
+        assert failed.exception == 'KeyError'
+
+    def test_kinds_of_decorators(self, caplog):
+        """Test the kind and count of the events of each decorator."""
+        @log_args()
+        @log_call_counter()
+        def counted_func(value):
+            return value
+
+        @log_running_time()
+        def generator_func():
+            yield from range(3)
+
+        with caplog.at_level(logging.DEBUG):
+            counted_func(1)
+            counted_func(2)
+            assert list(generator_func()) == [0, 1, 2]
+
+        events = [record.py_debug for record in caplog.records]
+        assert [(event.kind, event.count) for event in events] == [
+            ('args', None), ('count', 1), ('args', None), ('count', 2), ('generator', 3)]
+
+    def test_aggregate_summary_event(self, caplog):
+        """Test that summaries report their call count and mean duration."""
+        @log_running_time(aggregate=True, summary_every=2)
+        def summarized_func():
+            pass
+
+        with caplog.at_level(logging.DEBUG):
+            summarized_func()
+            summarized_func()
+
+        (event,) = [record.py_debug for record in caplog.records]
+        assert event.kind == 'summary'
+        assert event.count == 2
+
+    def test_sink_replaces_logging(self, caplog):
+        """Test that a sink gets the events and the logger gets nothing."""
+        file = io.BytesIO()
+        sink = EventSink(file, format='binary')
+
+        @log_call_counter(sink=sink)
+        def sunk_func():
+            return True
+
+        with caplog.at_level(logging.CRITICAL):
+            for _ in range(3):
+                assert sunk_func()
+        sink.close()
+
+        assert caplog.records == []
+        file.seek(0)
+        assert [(event.function, event.count) for event in read_events(file, 'binary')] == [
+            (f'{__name__}.sunk_func', 1), (f'{__name__}.sunk_func', 2), (f'{__name__}.sunk_func', 3)]
+
+    def test_sink_with_emitter_rejected(self):
+        """Test that a sink cannot be combined with an emitter."""
+        emitter = QueuedEmitter()
+        try:
+            with pytest.raises(ValueError):
+                log_running_time(emitter=emitter, sink=EventSink(io.BytesIO()))
+        finally:
+            emitter.close()
+
+    def test_emitter_keeps_event(self):
+        """Test that records built on the emitter thread carry the event too."""
+        records = []
+        handler = logging.Handler()
+        handler.emit = records.append
+        logger = logging.getLogger(f'{__name__}.emitter')
+        logger.setLevel(logging.DEBUG)
+        logger.propagate = False
+        logger.addHandler(handler)
+        emitter = QueuedEmitter(flush_interval=60)
+
+        @log_running_time(logger=logger, emitter=emitter)
+        def queued_func():
+            pass
+
+        queued_func()
+        emitter.close()
+        logger.removeHandler(handler)
+        assert records[0].py_debug.function == f'{__name__}.queued_func'
@@ -0,0 +1,241 @@
+"""Unit tests for govern and its overhead governors."""
+import asyncio
+import logging
+import time
+from functools import wraps
+
+import pytest
+
+from py_debug import govern, get_downgrades, reset_governors, log_call_counter, get_call_count, set_enabled
+from py_debug._registry import _governors
+from py_debug.governor import (
+    BARE, COUNTED, COUNTING, INSTRUMENTED, OFF, PROBE, Governor, LEVELS, SAMPLED, counting_cost_ns,
+)
+
+
+def slowed_by(clock, ns):
+    """A decorator whose wrapper takes ns nanoseconds of the fake clock."""
+    def decorator(func):
+        if asyncio.iscoroutinefunction(func):
+            @wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                clock.now_ns += ns
+                return await func(*args, **kwargs)
+
+            return async_wrapper
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            clock.now_ns += ns
+            return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+@pytest.fixture
+def fake_clock(fake_clock, monkeypatch):
+    """The shared fake clock, also read by the governed functions decorated in the test."""
+    # Measured on the real clock before it is replaced
+    counting_cost_ns()
+    monkeypatch.setattr(time, 'perf_counter_ns', fake_clock.ns)
+    return fake_clock
+
+
+class TestGovernor:
+    """Test cases for the step-down decisions of Governor."""
+
+    def check(self, bare_ns, instrumented_ns, counting_ns=10, **kwargs):
+        """Record one probe and return the level reached."""
+        governor = Governor(probes=1, counting_ns=counting_ns, **kwargs)
+        governor.record(bare_ns, instrumented_ns)
+        return LEVELS[governor.step]
+
+    def test_levels(self):
+        """Test that each level is taken when the ones above it do not fit."""
+        assert self.check(1000, 1040) == 'full'
+        assert self.check(1000, 2000) == 'sampled'
+        assert self.check(1000, 100_000) == 'counting'
+        assert self.check(100, 100_000) == 'off'
+
+    def test_medians(self):
+        """Test that an outlier probe does not decide the overhead."""
+        governor = Governor(probes=3, counting_ns=10)
+        for bare, instrumented in ((1000, 1010), (1000, 1020), (900_000, 1030)):
+            governor.record(bare, instrumented)
+        assert LEVELS[governor.step] == 'full'
+        assert governor.last.overhead == pytest.approx(20e-9)
+
+    def test_only_steps_down(self):
+        """Test that a cheaper check does not restore instrumentation."""
+        governor = Governor(probes=1, counting_ns=10)
+        assert governor.record(1000, 100_000)
+        assert not governor.record(1000, 1000)
+        assert LEVELS[governor.step] == 'counting'
+        governor.reset()
+        assert LEVELS[governor.step] == 'full' and governor.last is None
+
+    def test_route(self):
+        """Test that each level routes calls to probes, instrumentation, counting or the function alone."""
+        governor = Governor(sample_every=4, probe_every=3)
+        assert [governor.route() for _ in range(4)] == [INSTRUMENTED, INSTRUMENTED, PROBE, INSTRUMENTED]
+        governor.reset()
+        governor.step = SAMPLED
+        assert [governor.route() for _ in range(4)] == [COUNTED, COUNTED, PROBE, INSTRUMENTED]
+        governor.step = COUNTING
+        assert [governor.route() for _ in range(2)] == [COUNTED, COUNTED]
+        governor.step = OFF
+        assert governor.route() == BARE
+        assert governor.calls.value == 6
+
+    def test_invalid_arguments(self):
+        """Test that invalid configurations are rejected."""
+        for kwargs in ({'budget': 0}, {'sample_every': 1}, {'probes': 0}, {'probe_every': 0}):
+            with pytest.raises(ValueError):
+                Governor(**kwargs)
+
+
+class TestGovern:
+    """Test cases for the govern decorator."""
+
+    def setup_method(self):
+        """Forget the step-downs of earlier tests."""
+        reset_governors()
+
+    def test_within_budget(self, fake_clock):
+        """Test that cheap instrumentation stays on every call, probes included."""
+        @govern(slowed_by(fake_clock, 10), log_call_counter(), budget=0.5, probe_every=2, probes=2)
+        def governed_slow():
+            fake_clock.now_ns += 1000
+
+        for _ in range(8):
+            governed_slow()
+        assert get_call_count(governed_slow) == 8
+        assert all(downgrade.function != f'{__name__}.governed_slow' for downgrade in get_downgrades())
+
+    def test_step_down_to_sampled(self, fake_clock, caplog):
+        """Test that costly instrumentation is sampled and the step down logged."""
+        @govern(slowed_by(fake_clock, 2000), budget=0.5, sample_every=10, probe_every=1, probes=2)
+        def governed_func():
+            fake_clock.now_ns += 1000
+
+        with caplog.at_level(logging.INFO):
+            for _ in range(4):
+                governed_func()
+
+        (downgrade,) = get_downgrades()
+        assert downgrade.function == f'{__name__}.{self.test_step_down_to_sampled.__qualname__}.<locals>.governed_func'
+        assert (downgrade.level, downgrade.calls) == ('sampled', 4)
+        assert downgrade.overhead == (1e-6, 2e-6, 2.0)
+        (record,) = caplog.records
+        message = record.getMessage()
+        assert message.startswith(f'Instrumentation of {__name__}.governed_func stepped down to sampled')
+        assert record.py_debug.kind == 'governor'
+
+    def test_sampled_calls(self):
+        """Test that only one call in sample_every is instrumented once sampled."""
+        instrumented = []
+
+        def tracking(func):
+            @wraps(func)
+            def wrapper():
+                instrumented.append(True)
+                return func()
+
+            return wrapper
+
+        @govern(tracking, sample_every=10, probe_every=10 ** 6)
+        def sampled_func():
+            return 'result'
+
+        governor = _governors.find(sampled_func)
+        governor.step = SAMPLED
+        assert [sampled_func() for _ in range(100)] == ['result'] * 100
+        assert len(instrumented) == 10
+        assert governor.calls.value == 100
+
+    def test_skipped_calls_counted(self):
+        """Test that calls skipping the decorators still tick their call counter."""
+        lines = []
+
+        def tracking(func):
+            @wraps(func)
+            def wrapper():
+                lines.append(True)
+                return func()
+
+            return wrapper
+
+        @govern(tracking, log_call_counter(), sample_every=10, probe_every=5)
+        def counted_func():
+            return 'result'
+
+        for _ in range(20):
+            counted_func()
+        governor = _governors.find(counted_func)
+        governor.step = SAMPLED
+        for _ in range(20):
+            counted_func()
+        governor.step = COUNTING
+        for _ in range(20):
+            counted_func()
+        # Full: every call; sampled: the probes 25, 30, 35 and 40, which cover calls 30 and 40
+        assert len(lines) == 24
+        assert get_call_count(counted_func) == 60
+
+    def test_step_down_to_counting(self, fake_clock):
+        """Test that instrumentation too costly even when sampled leaves counting."""
+        @govern(slowed_by(fake_clock, 50_000), budget=0.5, sample_every=10, probe_every=1, probes=1)
+        def counted_func():
+            fake_clock.now_ns += 1000
+
+        for _ in range(3):
+            counted_func()
+        (downgrade,) = get_downgrades()
+        assert (downgrade.level, downgrade.calls) == ('counting', 3)
+
+    def test_coroutine(self, fake_clock):
+        """Test that coroutine functions are governed when awaited."""
+        @govern(slowed_by(fake_clock, 2000), budget=0.5, sample_every=10, probe_every=1, probes=1)
+        async def async_func():
+            fake_clock.now_ns += 1000
+            await asyncio.sleep(0)
+            return 'done'
+
+        async def run():
+            return [await async_func() for _ in range(2)]
+
+        assert asyncio.run(run()) == ['done', 'done']
+        assert [downgrade.level for downgrade in get_downgrades()] == ['sampled']
+
+    def test_generators_not_governed(self):
+        """Test that generator functions are only decorated."""
+        @govern(log_call_counter())
+        def generator_func():
+            yield 1
+
+        assert list(generator_func()) == [1]
+        assert get_call_count(generator_func) == 1
+
+    def test_switched_off(self, fake_clock):
+        """Test that switched off governed functions are neither counted nor probed."""
+        @govern(slowed_by(fake_clock, 50_000), probe_every=1, probes=1)
+        def quiet_func():
+            return 1
+
+        set_enabled(False)
+        try:
+            assert quiet_func() == 1 and quiet_func() == 1
+        finally:
+            set_enabled(True)
+        assert get_downgrades() == []
+
+    def test_invalid_arguments(self):
+        """Test that invalid configurations are rejected when decorating."""
+        with pytest.raises(ValueError):
+            govern()
+        with pytest.raises(ValueError):
+            govern(log_call_counter(), probe_every=0)
+        with pytest.raises(ValueError):
+            govern(log_call_counter(), budget=-1)
@@ -0,0 +1,143 @@
+"""Unit tests for the log-linear Histogram."""
+import random
+import threading
+
+import pytest
+
+from py_debug import Histogram, TimingStats
+
+
+class TestHistogram:
+    """Test cases for Histogram."""
+
+    def test_empty(self):
+        """Test an empty histogram."""
+        histogram = Histogram()
+        assert histogram.count == 0
+        assert histogram.percentile(50) == 0
+        assert histogram.timing_stats() == TimingStats(0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0)
+
+    def test_small_values_exact(self):
+        """Test that values below the linear range are exact."""
+        histogram = Histogram(precision_bits=7)
+        for value in range(100):
+            histogram.record(value)
+        assert histogram.percentile(50) == 49
+        assert histogram.percentile(100) == 99
+        assert histogram.percentile(0) == 0
+
+    def test_bucket_bounds_round_trip(self):
+        """Test that every value falls within the bounds of its bucket."""
+        histogram = Histogram(precision_bits=4, max_value_bits=20)
+        for value in list(range(2000)) + [2 ** 19, 2 ** 20 - 1]:
+            low, high = histogram._bounds(histogram._index(value))
+            assert low <= value <= high
+
+    def test_relative_error(self):
+        """Test that percentiles are within the advertised relative error."""
+        histogram = Histogram(precision_bits=7)
+        values = sorted(random.Random(1).randint(1, 10 ** 9) for _ in range(10000))
+        for value in values:
+            histogram.record(value)
+        for percent in (50, 90, 99, 99.9):
+            exact = values[int(len(values) * percent / 100) - 1]
+            assert histogram.percentile(percent) == pytest.approx(exact, rel=2 / 128)
+
+    def test_exact_min_max_mean(self):
+        """Test that min, max and mean are exact."""
+        histogram = Histogram()
+        for value in (1000, 3000, 123456789):
+            histogram.record(value)
+        stats = histogram.timing_stats(scale=1)
+        assert stats.count == 3
+        assert stats.min == 1000
+        assert stats.max == 123456789
+        assert stats.mean == pytest.approx((1000 + 3000 + 123456789) / 3)
+
+    def test_percentiles_clamped_to_range(self):
+        """Test that percentiles never exceed the recorded maximum."""
+        histogram = Histogram()
+        histogram.record(1_000_001)
+        assert histogram.percentile(50) == 1_000_001
+        assert histogram.percentile(100) == 1_000_001
+
+    def test_values_beyond_range_share_last_bucket(self):
+        """Test that huge values do not grow the histogram."""
+        histogram = Histogram(precision_bits=4, max_value_bits=10)
+        size = len(histogram._counts)
+        histogram.record(10 ** 12)
+        assert len(histogram._counts) == size
+        assert histogram.max == 10 ** 12
+        assert histogram.percentile(100) == 10 ** 12
+
+    def test_record_returns_count(self):
+        """Test that record returns the running count."""
+        histogram = Histogram()
+        assert histogram.record(5) == 1
+        assert histogram.record(5) == 2
+
+    def test_buffered_values_visible(self):
+        """Test that values still buffered are included when reading."""
+        histogram = Histogram(batch_size=4)
+        for value in range(1, 11):
+            histogram.record(value)
+        assert histogram.count == 10
+        assert histogram.max == 10
+        assert histogram.total == 55
+
+    def test_buckets(self):
+        """Test iteration over non-empty buckets."""
+        histogram = Histogram()
+        histogram.record(3)
+        histogram.record(3)
+        histogram.record(7)
+        assert list(histogram.buckets()) == [(3, 2), (7, 1)]
+
+    def test_snapshot(self):
+        """Test that a snapshot holds buckets, count and total together."""
+        histogram = Histogram()
+        histogram.record(3)
+        histogram.record(3)
+        histogram.record(7)
+        assert histogram.snapshot() == ([(3, 2), (7, 1)], 3, 13)
+
+    def test_reset(self):
+        """Test that reset forgets everything."""
+        histogram = Histogram()
+        histogram.record(42)
+        histogram.reset()
+        assert histogram.count == 0
+        assert histogram.min is None
+        assert list(histogram.buckets()) == []
+
+    def test_thread_safe_count(self):
+        """Test that concurrent records are all counted."""
+        histogram = Histogram()
+
+        def worker():
+            for value in range(1000):
+                histogram.record(value)
+
+        threads = [threading.Thread(target=worker) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert histogram.count == 4000
+        assert sum(count for _, count in histogram.buckets()) == 4000
+
+    @pytest.mark.parametrize('kwargs', [
+        {'precision_bits': 0},
+        {'precision_bits': 8, 'max_value_bits': 8},
+        {'batch_size': 0},
+    ])
+    def test_invalid_arguments(self, kwargs):
+        """Test that invalid layouts are rejected."""
+        with pytest.raises(ValueError):
+            Histogram(**kwargs)
+
+    def test_invalid_percent(self):
+        """Test that percentiles outside 0..100 are rejected."""
+        with pytest.raises(ValueError):
+            Histogram().percentile(101)
@@ -0,0 +1,149 @@
+"""Unit tests for bulk instrumentation with instrument."""
+import logging
+import types
+
+import pytest
+
+from py_debug import instrument, log_args, log_call_counter, get_call_count, reset_call_counters
+
+SOURCE = '''
+from os.path import join
+
+
+def public_func(x):
+    return x + 1
+
+
+def _private_func():
+    return 'private'
+
+
+class Service:
+    def __init__(self, value):
+        self._value = value
+
+    def __repr__(self):
+        return 'Service()'
+
+    def method(self):
+        return self._value
+
+    @staticmethod
+    def static_method():
+        return 'static'
+
+    @classmethod
+    def class_method(cls):
+        return cls.__name__
+
+    @property
+    def value(self):
+        return self._value
+
+    @value.setter
+    def value(self, value):
+        self._value = value
+
+    class Nested:
+        def nested_method(self):
+            return 'nested'
+
+
+alias = public_func
+'''
+
+
+@pytest.fixture
+def module():
+    """A freshly executed module to instrument."""
+    module = types.ModuleType('instrumented_module')
+    exec(SOURCE, module.__dict__)
+    return module
+
+
+class TestInstrument:
+    """Test cases for instrument."""
+
+    def setup_method(self):
+        """Reset call counters before each test."""
+        reset_call_counters()
+
+    def test_module_functions_and_classes(self, module):
+        """Test that functions and classes defined in a module are decorated."""
+        handle = instrument(module, decorators=[log_call_counter()])
+        assert sorted(handle.names) == [
+            'Service.Nested.nested_method', 'Service.__init__', 'Service.class_method', 'Service.method',
+            'Service.static_method', 'Service.value', '_private_func', 'alias', 'public_func',
+        ]
+        assert module.join.__module__ != 'instrumented_module'
+        service = module.Service(3)
+        assert service.method() == 3
+        assert module.Service.static_method() == 'static'
+        assert module.Service.class_method() == 'Service'
+        assert module.Service.Nested().nested_method() == 'nested'
+        assert module.public_func(1) == 2
+        assert get_call_count(module.public_func) == 1
+        assert get_call_count(module.Service.method) == 1
+
+    def test_property_accessors(self, module):
+        """Test that property getters and setters are decorated."""
+        handle = instrument(module.Service, include='value', decorators=[log_call_counter()])
+        assert handle.names == ['value']
+        service = module.Service(1)
+        service.value = 2
+        assert service.value == 2
+        assert get_call_count(module.Service.value.fget) == 1
+        assert get_call_count(module.Service.value.fset) == 1
+
+    def test_undo_restores_originals(self, module):
+        """Test that undo puts back the exact original objects."""
+        originals = dict(vars(module))
+        class_originals = dict(vars(module.Service))
+        with instrument(module, decorators=[log_call_counter()]):
+            assert module.public_func is not originals['public_func']
+        assert dict(vars(module)) == originals
+        assert all(vars(module.Service)[name] is value for name, value in class_originals.items())
+
+    def test_undo_keeps_later_reassignments(self, module):
+        """Test that undo leaves attributes reassigned after instrumenting alone."""
+        handle = instrument(module, include='public_func', decorators=[log_call_counter()])
+
+        def replacement(x):
+            return x
+
+        module.public_func = replacement
+        handle.undo()
+        handle.undo()
+        assert module.public_func is replacement
+
+    def test_include_and_exclude(self, module):
+        """Test that globs select by qualified name."""
+        handle = instrument(module, include=['Service.*', '*_func'], exclude=['_*', '*.__init__'],
+                            decorators=[log_call_counter()])
+        assert sorted(handle.names) == [
+            'Service.Nested.nested_method', 'Service.class_method', 'Service.method',
+            'Service.static_method', 'Service.value', 'public_func',
+        ]
+
+    def test_decorator_order(self, module, caplog):
+        """Test that decorators are applied outermost first."""
+        with caplog.at_level(logging.DEBUG):
+            instrument(module, include='public_func', decorators=[log_args(), log_call_counter()])
+            module.public_func(1)
+        messages = [record.getMessage() for record in caplog.records]
+        assert messages == [
+            'Function instrumented_module.public_func has been called with args = (1,).',
+            'Function instrumented_module.public_func has been called 1 times.',
+        ]
+
+    def test_default_decorator_times_calls(self, module, caplog):
+        """Test that calls are timed by default."""
+        with caplog.at_level(logging.DEBUG):
+            with instrument(module, include='public_func'):
+                module.public_func(1)
+        assert 'The call [instrumented_module.public_func] is completed' in caplog.text
+
+    def test_invalid_target(self):
+        """Test that targets other than modules and classes are rejected."""
+        with pytest.raises(TypeError):
+            instrument(len)
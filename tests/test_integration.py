@@ -1,7 +1,6 @@
 """Integration tests for multiple decorators used together."""
 import logging
 import time
-from unittest.mock import patch
 
 import pytest
 
@@ -15,7 +14,7 @@ class TestIntegration:
         """Reset call counters before each test."""
         reset_call_counters()
 
-    def test_all_decorators_together(self):
+    def test_all_decorators_together(self, caplog):
         """Test using all three decorators on the same function."""
         @log_call_counter()
         @log_args()
@@ -23,14 +22,14 @@ class TestIntegration:
         def test_func(a, b):
             return a + b
 
-        with patch('logging.log') as mock_log:
+        with caplog.at_level(logging.DEBUG):
             result = test_func(1, 2)
             
             assert result == 3
             # Should log: running time, args, and call counter
-            assert mock_log.call_count >= 3
+            assert len(caplog.records) >= 3
 
-    def test_decorators_preserve_functionality(self):
+    def test_decorators_preserve_functionality(self, caplog):
         """Test that decorators don't interfere with each other."""
         @log_call_counter(mute_after=1, log_every=2)
         @log_args(level=logging.INFO)
@@ -38,16 +37,16 @@ class TestIntegration:
         def test_func(x):
             return x * 2
 
-        with patch('logging.log') as mock_log:
+        with caplog.at_level(logging.DEBUG):
             result1 = test_func(5)
             result2 = test_func(10)
             
             assert result1 == 10
             assert result2 == 20
             # Verify all decorators are working
-            assert mock_log.call_count >= 3
+            assert len(caplog.records) >= 3
 
-    def test_multiple_functions_with_decorators(self):
+    def test_multiple_functions_with_decorators(self, caplog):
         """Test multiple functions with different decorator combinations."""
         @log_running_time()
         def func_a(x):
@@ -61,13 +60,13 @@ class TestIntegration:
         def func_c():
             return 42
 
-        with patch('logging.log') as mock_log:
+        with caplog.at_level(logging.DEBUG):
             assert func_a(1) == 2
             assert func_b(2, 3) == 5
             assert func_c() == 42
             
             # All should have logged
-            assert mock_log.call_count >= 3
+            assert len(caplog.records) >= 3
 
     def test_nested_decorator_order(self):
         """Test that decorator order matters and works correctly."""
@@ -91,7 +90,7 @@ class TestIntegration:
         # Decorators are applied bottom-up, so execution is top-down
         assert call_order == ['counter', 'args', 'time']
 
-    def test_decorators_with_exceptions(self):
+    def test_decorators_with_exceptions(self, caplog):
         """Test that exceptions propagate correctly through multiple decorators."""
         @log_call_counter()
         @log_args()
@@ -99,7 +98,7 @@ class TestIntegration:
         def test_func():
             raise ValueError("Test error")
 
-        with patch('py_debug.logging.log'):
+        with caplog.at_level(logging.DEBUG):
             with pytest.raises(ValueError, match="Test error"):
                 test_func()
             
@@ -107,7 +106,7 @@ class TestIntegration:
             from py_debug import get_call_count
             assert get_call_count(test_func) == 1
 
-    def test_different_log_levels_together(self):
+    def test_different_log_levels_together(self, caplog):
         """Test decorators with different log levels work together."""
         @log_call_counter(level=logging.DEBUG)
         @log_args(level=logging.INFO)
@@ -115,13 +114,13 @@ class TestIntegration:
         def test_func(x):
             return x * 2
 
-        with patch('logging.log') as mock_log:
+        with caplog.at_level(logging.DEBUG):
             test_func(5)
             
             # Should have logged with different levels
-            assert mock_log.call_count >= 3
+            assert len(caplog.records) >= 3
             # Verify different levels were used
-            levels_used = [call[0][0] for call in mock_log.call_args_list]
+            levels_used = [r.levelno for r in caplog.records]
             assert logging.DEBUG in levels_used
             assert logging.INFO in levels_used
             assert logging.WARNING in levels_used
@@ -1,5 +1,6 @@
 """Unit tests for internal helper functions."""
 import logging
+import threading
 from unittest.mock import patch
 
 import pytest
@@ -8,6 +9,8 @@ import pytest
 # These are not in __all__, so we import directly from the module
 import py_debug
 from py_debug import _is_valid_log_level, _get_function_name, _format_args_info
+from py_debug import _counter
+from py_debug._counter import CallCounter
 
 
 class TestIsValidLogLevel:
@@ -110,3 +113,87 @@ class TestFormatArgsInfo:
         result = _format_args_info(([1, 2], {'nested': 'dict'}), {'key': 'value'})
         assert 'args = ' in result
         assert 'kwargs = ' in result
+
+
+class TestCallCounter:
+    """Test cases for the CallCounter cell."""
+
+    def test_starts_at_zero(self):
+        """Test that a new counter has no calls."""
+        assert CallCounter().value == 0
+
+    def test_value_does_not_consume(self):
+        """Test that reading the value does not advance the counter."""
+        counter = CallCounter()
+        assert counter.increment() == 1
+        assert counter.increment() == 2
+        assert counter.value == 2
+        assert counter.value == 2
+        assert counter.increment() == 3
+
+    def test_value_after_many(self):
+        """Test that the value follows the counter past small numbers."""
+        counter = CallCounter()
+        for _ in range(100_000):
+            counter.increment()
+        assert counter.value == 100_000
+
+    def test_reset(self):
+        """Test that reset starts numbering from one again."""
+        counter = CallCounter()
+        counter.increment()
+        counter.reset()
+        assert counter.value == 0
+        assert counter.increment() == 1
+
+    @pytest.mark.parametrize('gil', [True, False])
+    def test_threads(self, monkeypatch, gil):
+        """Test that calls from many threads are numbered once each and summed exactly."""
+        monkeypatch.setattr(_counter, '_GIL', gil)
+        counter = CallCounter()
+        numbers = [[] for _ in range(8)]
+
+        def count_calls(drawn):
+            for _ in range(5000):
+                drawn.append(counter.increment())
+
+        threads = [threading.Thread(target=count_calls, args=(drawn,)) for drawn in numbers]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert sorted(number for drawn in numbers for number in drawn) == list(range(1, 40001))
+        assert counter.value == 40000
+
+    def test_get_call_counter_reuses_cell(self):
+        """Test that one function always maps to the same counter."""
+        def same_name():
+            pass
+
+        first = py_debug._get_call_counter(same_name, 'tests.same_name')
+        second = py_debug._get_call_counter(same_name, 'tests.same_name')
+        assert first is second
+
+    def test_get_call_counter_by_identity(self):
+        """Test that functions sharing a name get counters of their own."""
+        def make():
+            def same_name():
+                pass
+            return same_name
+
+        first = py_debug._get_call_counter(make(), 'tests.same_name')
+        second = py_debug._get_call_counter(make(), 'tests.same_name')
+        assert first is not second
+
+    def test_get_call_counter_unreferenceable(self):
+        """Test that callables without weak reference support are counted too."""
+        class Slotted:
+            __slots__ = ()
+
+            def __call__(self):
+                pass
+
+        func = Slotted()
+        counter = py_debug._get_call_counter(func, 'tests.slotted')
+        assert py_debug._get_call_counter(func, 'tests.slotted') is counter
+        assert py_debug._find_call_counter(func) is counter
@@ -0,0 +1,168 @@
+"""Unit tests for per-module loggers and the disabled-level fast path."""
+import logging
+import time
+from unittest.mock import Mock, patch
+
+import pytest
+
+from py_debug import log_running_time, log_args, log_call_counter, reset_call_counters, get_call_count
+
+DECORATORS = [log_running_time, log_args, log_call_counter]
+
+
+class ReprCounter:
+    """Argument that counts how often it is repr'd."""
+
+    calls = 0
+
+    def __repr__(self):
+        ReprCounter.calls += 1
+        return 'ReprCounter()'
+
+
+class TestLoggers:
+    """Test cases for the logger the decorators report to."""
+
+    def setup_method(self):
+        """Reset call counters before each test."""
+        reset_call_counters()
+
+    @pytest.mark.parametrize('decorator', DECORATORS)
+    def test_logs_to_module_logger(self, decorator, caplog):
+        """Test that records go to the logger named after the function's module."""
+        @decorator()
+        def test_func():
+            return True
+
+        with caplog.at_level(logging.DEBUG):
+            test_func()
+
+        assert caplog.records[-1].name == __name__
+
+    @pytest.mark.parametrize('decorator', DECORATORS)
+    def test_injected_logger(self, decorator, caplog):
+        """Test that an injected logger receives the records."""
+        logger = logging.getLogger('py_debug.tests.injected')
+
+        @decorator(logger=logger)
+        def test_func():
+            return True
+
+        with caplog.at_level(logging.DEBUG):
+            test_func()
+
+        assert caplog.records[-1].name == 'py_debug.tests.injected'
+
+    def test_deferred_formatting(self, caplog):
+        """Test that records carry a template and raw arguments."""
+        @log_running_time()
+        def test_func():
+            return True
+
+        with caplog.at_level(logging.DEBUG):
+            test_func()
+
+        record = caplog.records[-1]
+        assert record.msg == 'The call [%s] is completed in %.6f seconds.'
+        assert record.args[0].endswith('.test_func')
+        assert isinstance(record.args[1], float)
+
+    def test_log_args_repr_deferred_until_emitted(self):
+        """Test that log_args only reprs arguments when a record is formatted."""
+        logger = Mock(spec=logging.Logger)
+        logger.isEnabledFor.return_value = True
+        ReprCounter.calls = 0
+
+        @log_args(logger=logger)
+        def test_func(arg):
+            return arg
+
+        test_func(ReprCounter())
+        assert ReprCounter.calls == 0
+
+        template, full_name, args_info = logger.log.call_args[0][1:]
+        assert 'ReprCounter()' in template % (full_name, args_info)
+        assert ReprCounter.calls == 1
+
+
+class TestDisabledLevel:
+    """Test cases for calls whose level is disabled on the logger."""
+
+    def setup_method(self):
+        """Reset call counters and disable DEBUG for this module's logger."""
+        reset_call_counters()
+        logging.getLogger(__name__).setLevel(logging.INFO)
+
+    def teardown_method(self):
+        """Restore this module's logger level."""
+        logging.getLogger(__name__).setLevel(logging.NOTSET)
+
+    @pytest.mark.parametrize('decorator', DECORATORS)
+    def test_nothing_logged(self, decorator, caplog):
+        """Test that no record is created when the level is disabled."""
+        logger = Mock(spec=logging.Logger)
+        logger.isEnabledFor.return_value = False
+
+        @decorator(logger=logger)
+        def test_func():
+            return True
+
+        assert test_func() is True
+        assert not logger.log.called
+
+    def test_log_args_does_not_format(self):
+        """Test that log_args neither formats nor reprs arguments when disabled."""
+        ReprCounter.calls = 0
+
+        @log_args()
+        def test_func(arg):
+            return arg
+
+        with patch('py_debug._format_args_info') as mock_format:
+            test_func(ReprCounter())
+            assert not mock_format.called
+        assert ReprCounter.calls == 0
+
+    def test_log_running_time_does_not_read_clock(self):
+        """Test that log_running_time skips the clock when disabled."""
+        with patch('time.perf_counter') as mock_clock:
+            @log_running_time()
+            def test_func():
+                return True
+
+            test_func()
+            assert not mock_clock.called
+
+    def test_log_call_counter_still_counts(self):
+        """Test that log_call_counter keeps exact counts when disabled."""
+        logger = Mock(spec=logging.Logger)
+        logger.isEnabledFor.return_value = False
+
+        @log_call_counter(logger=logger)
+        def test_func():
+            return True
+
+        for _ in range(7):
+            test_func()
+
+        assert get_call_count(test_func) == 7
+
+    def test_disabled_cost_independent_of_argument_size(self):
+        """Test that a disabled log_args costs the same for huge and tiny arguments."""
+        @log_args()
+        def test_func(arg):
+            return arg
+
+        def best_of(arg):
+            timings = []
+            for _ in range(5):
+                start = time.perf_counter()
+                for _ in range(200):
+                    test_func(arg)
+                timings.append(time.perf_counter() - start)
+            return min(timings)
+
+        tiny = best_of([1])
+        huge = best_of(list(range(100_000)))
+        # Formatting the huge list even once per call would be ~1000x slower
+        assert huge < tiny * 10
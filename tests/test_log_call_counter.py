@@ -1,10 +1,13 @@
 """Unit tests for log_call_counter decorator."""
+import gc
 import logging
-from unittest.mock import patch
+import threading
+import weakref
 
 import pytest
 
-from py_debug import log_call_counter, reset_call_counters, get_call_count
+from py_debug import log_args, log_call_counter, reset_call_counters, get_call_count
+from py_debug._registry import snapshot
 
 
 class TestLogCallCounter:
@@ -14,44 +17,44 @@ class TestLogCallCounter:
         """Reset call counters before each test."""
         reset_call_counters()
 
-    def test_counter_increments(self):
+    def test_counter_increments(self, caplog):
         """Test that the counter increments correctly."""
         @log_call_counter()
         def test_func():
             return True
 
-        with patch('logging.log') as mock_log:
+        with caplog.at_level(logging.DEBUG):
             test_func()
             test_func()
             test_func()
             
             # Should log at least once (first call)
-            assert mock_log.called
+            assert caplog.records
             # Verify counter is incremented
             assert get_call_count(test_func) == 3
 
-    def test_logs_first_calls(self):
+    def test_logs_first_calls(self, caplog):
         """Test that first calls are logged (mute_after behavior)."""
         @log_call_counter(mute_after=3)
         def test_func():
             return True
 
-        with patch('logging.log') as mock_log:
+        with caplog.at_level(logging.DEBUG):
             # First 3 calls should be logged (0, 1, 2)
             test_func()  # Call 1
             test_func()  # Call 2
             test_func()  # Call 3
             
             # Should have logged 3 times
-            assert mock_log.call_count == 3
+            assert len(caplog.records) == 3
 
-    def test_mutes_after_threshold(self):
+    def test_mutes_after_threshold(self, caplog):
         """Test that calls are muted after mute_after threshold."""
         @log_call_counter(mute_after=2, log_every=10)
         def test_func():
             return True
 
-        with patch('logging.log') as mock_log:
+        with caplog.at_level(logging.DEBUG):
             test_func()  # Call 1 - logged
             test_func()  # Call 2 - logged
             test_func()  # Call 3 - muted
@@ -59,35 +62,35 @@ class TestLogCallCounter:
             test_func()  # Call 5 - muted
             
             # Should only log first 2 calls
-            assert mock_log.call_count == 2
+            assert len(caplog.records) == 2
 
-    def test_logs_every_n_calls(self):
+    def test_logs_every_n_calls(self, caplog):
         """Test that calls are logged every log_every calls."""
         @log_call_counter(mute_after=0, log_every=5)
         def test_func():
             return True
 
-        with patch('logging.log') as mock_log:
+        with caplog.at_level(logging.DEBUG):
             # Call 5, 10, 15, 20 should be logged
             for i in range(1, 21):
                 test_func()
             
             # Should log at calls 5, 10, 15, 20
-            assert mock_log.call_count == 4
+            assert len(caplog.records) == 4
 
-    def test_combination_mute_and_log_every(self):
+    def test_combination_mute_and_log_every(self, caplog):
         """Test combination of mute_after and log_every."""
         @log_call_counter(mute_after=2, log_every=5)
         def test_func():
             return True
 
-        with patch('logging.log') as mock_log:
+        with caplog.at_level(logging.DEBUG):
             # Calls 1, 2 (mute_after), 5, 10, 15, 20 (log_every) should be logged
             for i in range(1, 21):
                 test_func()
             
             # Should log: 1, 2, 5, 10, 15, 20 = 6 times
-            assert mock_log.call_count == 6
+            assert len(caplog.records) == 6
 
     def test_returns_correct_value(self):
         """Test that the decorator returns the original function's return value."""
@@ -108,7 +111,7 @@ class TestLogCallCounter:
         assert test_func.__name__ == 'test_func'
         assert 'Test docstring' in test_func.__doc__
 
-    def test_with_different_log_levels(self):
+    def test_with_different_log_levels(self, caplog):
         """Test decorator with different logging levels."""
         levels = [logging.DEBUG, logging.INFO, logging.WARNING, logging.ERROR]
         
@@ -119,23 +122,50 @@ class TestLogCallCounter:
             def test_func():
                 return True
 
-            with patch('logging.log') as mock_log:
+            with caplog.at_level(logging.DEBUG):
                 test_func()
-                assert mock_log.called
-                assert mock_log.call_args[0][0] == level
+                assert caplog.records
+                assert caplog.records[-1].levelno == level
 
-    def test_with_invalid_log_level(self):
+    def test_with_invalid_log_level(self, caplog):
         """Test decorator with invalid log level."""
         @log_call_counter(level=99999)
         def test_func():
             return True
 
-        with patch('logging.warning') as mock_warning:
+        with caplog.at_level(logging.DEBUG):
             test_func()
-            assert mock_warning.called
-            assert 'Invalid log level' in mock_warning.call_args[0][0]
+            assert any(r.levelno == logging.WARNING for r in caplog.records)
+            assert 'Invalid log level' in caplog.records[-1].getMessage()
 
-    def test_multiple_functions_separate_counters(self):
+    def test_invalid_log_level_on_logged_calls_only(self, caplog):
+        """Test that an invalid level replaces the logged lines, and is not reported on the others."""
+        @log_call_counter(level=99999, mute_after=2, log_every=5)
+        def test_func():
+            return True
+
+        with caplog.at_level(logging.DEBUG):
+            for _ in range(6):
+                test_func()
+
+        # Calls 1, 2 and 5
+        assert len(caplog.records) == 3
+        assert all('Invalid log level' in r.getMessage() for r in caplog.records)
+
+    def test_invalid_log_level_on_failures(self, caplog):
+        """Test that an invalid level is reported once on every failed call, but not on an interrupt."""
+        @log_call_counter(level=99999, mute_after=1)
+        def test_func(error):
+            raise error
+
+        with caplog.at_level(logging.DEBUG):
+            for error in (ValueError, ValueError, KeyboardInterrupt):
+                with pytest.raises(error):
+                    test_func(error)
+
+        assert len(caplog.records) == 2
+
+    def test_multiple_functions_separate_counters(self, caplog):
         """Test that different functions have separate counters."""
         @log_call_counter()
         def func_a():
@@ -145,7 +175,7 @@ class TestLogCallCounter:
         def func_b():
             return 'b'
 
-        with patch('py_debug.logging.log'):
+        with caplog.at_level(logging.DEBUG):
             func_a()
             func_a()
             func_b()
@@ -155,32 +185,32 @@ class TestLogCallCounter:
         assert get_call_count(func_a) == 2
         assert get_call_count(func_b) == 3
 
-    def test_log_message_contains_count(self):
+    def test_log_message_contains_count(self, caplog):
         """Test that log message contains the call count."""
         @log_call_counter()
         def test_func():
             return True
 
-        with patch('logging.log') as mock_log:
+        with caplog.at_level(logging.DEBUG):
             test_func()
             test_func()
             test_func()
             
             # Check the last log message contains the count
-            log_message = mock_log.call_args[0][1]
+            log_message = caplog.records[-1].getMessage()
             assert 'has been called' in log_message
             assert '3 times' in log_message or '3' in log_message
 
-    def test_with_function_args(self):
+    def test_with_function_args(self, caplog):
         """Test decorator works with functions that have arguments."""
         @log_call_counter()
         def test_func(a, b, c=10):
             return a + b + c
 
-        with patch('logging.log') as mock_log:
+        with caplog.at_level(logging.DEBUG):
             result = test_func(1, 2, c=3)
             assert result == 6
-            assert mock_log.called
+            assert caplog.records
 
     def test_invalid_mute_after_raises_error(self):
         """Test that negative mute_after raises ValueError."""
@@ -196,42 +226,42 @@ class TestLogCallCounter:
             def test_func():
                 pass
 
-    def test_mute_after_zero(self):
+    def test_mute_after_zero(self, caplog):
         """Test log_call_counter with mute_after=0 (no initial logging)."""
         @log_call_counter(mute_after=0, log_every=3)
         def test_func():
             return True
 
-        with patch('logging.log') as mock_log:
+        with caplog.at_level(logging.DEBUG):
             # Calls 3, 6, 9 should be logged (no initial calls)
             for i in range(1, 10):
                 test_func()
             
             # Should log at calls 3, 6, 9 = 3 times
-            assert mock_log.call_count == 3
+            assert len(caplog.records) == 3
 
-    def test_boundary_mute_after(self):
+    def test_boundary_mute_after(self, caplog):
         """Test log_call_counter at mute_after boundary."""
         @log_call_counter(mute_after=3, log_every=10)
         def test_func():
             return True
 
-        with patch('logging.log') as mock_log:
+        with caplog.at_level(logging.DEBUG):
             # Calls 1, 2, 3 should be logged, 4 should not
             test_func()  # 1 - logged
             test_func()  # 2 - logged
             test_func()  # 3 - logged
             test_func()  # 4 - muted
             
-            assert mock_log.call_count == 3
+            assert len(caplog.records) == 3
 
-    def test_with_exception(self):
+    def test_with_exception(self, caplog):
         """Test that log_call_counter increments even when function raises exception."""
         @log_call_counter()
         def test_func():
             raise ValueError("Test error")
 
-        with patch('py_debug.logging.log'):
+        with caplog.at_level(logging.DEBUG):
             # First call should increment counter
             with pytest.raises(ValueError):
                 test_func()
@@ -243,40 +273,168 @@ class TestLogCallCounter:
             # Counter should be 2 even though both calls failed
             assert get_call_count(test_func) == 2
 
-    def test_exception_with_invalid_log_level(self):
+    def test_exception_with_invalid_log_level(self, caplog):
         """Test log_call_counter with exception and invalid log level."""
         @log_call_counter(level=99999, mute_after=0)
         def test_func():
             raise ValueError("Test error")
 
-        with patch('logging.warning') as mock_warning:
+        with caplog.at_level(logging.DEBUG):
             with pytest.raises(ValueError):
                 test_func()
             
             # Should log warning about invalid log level
-            assert mock_warning.called
+            assert any(r.levelno == logging.WARNING for r in caplog.records)
 
-    def test_single_call(self):
+    def test_single_call(self, caplog):
         """Test log_call_counter with a single call."""
         @log_call_counter(mute_after=5)
         def test_func():
             return True
 
-        with patch('logging.log') as mock_log:
+        with caplog.at_level(logging.DEBUG):
             test_func()
             # Single call should be logged (within mute_after)
-            assert mock_log.call_count == 1
+            assert len(caplog.records) == 1
 
-    def test_mute_after_greater_than_log_every(self):
+    def test_mute_after_greater_than_log_every(self, caplog):
         """Test log_call_counter when mute_after > log_every."""
         @log_call_counter(mute_after=10, log_every=5)
         def test_func():
             return True
 
-        with patch('logging.log') as mock_log:
+        with caplog.at_level(logging.DEBUG):
             # Calls 1-10 (mute_after), 15, 20 (log_every) should be logged
             for i in range(1, 21):
                 test_func()
             
             # Should log: 1-10 (10 times), 15, 20 (2 times) = 12 times
-            assert mock_log.call_count == 12
+            assert len(caplog.records) == 12
+
+
+class TestLogCallCounterConcurrency:
+    """Test cases for log_call_counter under concurrent calls."""
+
+    def setup_method(self):
+        """Reset call counters before each test."""
+        reset_call_counters()
+
+    def test_exact_total_across_threads(self):
+        """Test that concurrent calls from many threads are all counted."""
+        @log_call_counter(mute_after=0, log_every=10 ** 9)
+        def test_func():
+            return True
+
+        def worker():
+            for _ in range(2000):
+                test_func()
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert get_call_count(test_func) == 8 * 2000
+
+    def test_call_numbers_are_unique_across_threads(self, caplog):
+        """Test that every logged call number is issued exactly once."""
+        @log_call_counter(mute_after=0, log_every=1)
+        def test_func():
+            return True
+
+        def worker():
+            for _ in range(500):
+                test_func()
+
+        with caplog.at_level(logging.DEBUG):
+            threads = [threading.Thread(target=worker) for _ in range(4)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        counts = sorted(int(r.getMessage().split()[-2]) for r in caplog.records)
+        assert counts == list(range(1, 2001))
+
+    def test_same_name_counts_separately(self, caplog):
+        """Test that functions sharing a name have counters of their own."""
+        def make():
+            @log_call_counter()
+            def test_func():
+                return True
+            return test_func
+
+        first, second = make(), make()
+        with caplog.at_level(logging.DEBUG):
+            first()
+            second()
+            second()
+
+        assert get_call_count(first) == 1
+        assert get_call_count(second) == 2
+        assert [r.getMessage().split()[-2] for r in caplog.records] == ['1', '1', '2']
+        # Looked up by name, they add up
+        assert get_call_count(f'{__name__}.test_func') == 3
+
+    def test_methods_counted_by_qualified_name(self):
+        """Test that methods of different classes are reported under their qualified names."""
+        class First:
+            @log_call_counter()
+            def run(self):
+                return True
+
+        class Second:
+            @log_call_counter()
+            def run(self):
+                return True
+
+        First().run()
+        Second().run()
+        Second().run()
+
+        scope = f'{__name__}.{self.test_methods_counted_by_qualified_name.__qualname__}.<locals>'
+        assert get_call_count(f'{scope}.First.run') == 1
+        assert get_call_count(f'{scope}.Second.run') == 2
+        assert snapshot().calls[f'{scope}.Second.run'] == 2
+        # The name without the classes stands for both
+        assert get_call_count(f'{__name__}.run') == 3
+
+    def test_same_function_shares_counter(self):
+        """Test that wrappers of one function share its counter."""
+        def test_func():
+            return True
+
+        first, second = log_call_counter()(test_func), log_call_counter()(test_func)
+        first()
+        second()
+        assert get_call_count(first) == get_call_count(second) == get_call_count(test_func) == 2
+
+    def test_counter_lookup_through_wrappers(self):
+        """Test that the count is found through other decorators and bound methods."""
+        class Counted:
+            @log_args()
+            @log_call_counter()
+            def method(self):
+                return True
+
+        Counted().method()
+        assert get_call_count(Counted.method) == 1
+        assert get_call_count(Counted().method) == 1
+
+    def test_counter_released_with_function(self):
+        """Test that the registry does not keep dead functions alive."""
+        def make():
+            @log_call_counter()
+            def short_lived_func():
+                return True
+            return short_lived_func
+
+        func = make()
+        func()
+        ref = weakref.ref(func.__wrapped__)
+        assert get_call_count(f'{__name__}.short_lived_func') == 1
+        del func
+        gc.collect()
+        assert ref() is None
+        assert get_call_count(f'{__name__}.short_lived_func') == 0
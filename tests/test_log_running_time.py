@@ -1,32 +1,33 @@
 """Unit tests for log_running_time decorator."""
+import asyncio
+import inspect
 import logging
 import time
-from unittest.mock import patch
 
 import pytest
 
-from py_debug import log_running_time
+from py_debug import log_running_time, get_timing_stats, reset_timing_stats
 
 
 class TestLogRunningTime:
     """Test cases for log_running_time decorator."""
 
-    def test_logs_execution_time(self):
+    def test_logs_execution_time(self, caplog):
         """Test that the decorator logs execution time."""
         @log_running_time()
         def test_func():
             time.sleep(0.01)
             return 42
 
-        with patch('logging.log') as mock_log:
+        with caplog.at_level(logging.DEBUG):
             result = test_func()
             
             assert result == 42
-            assert mock_log.called
-            log_call_args = mock_log.call_args
-            assert log_call_args[0][0] == logging.DEBUG
-            assert 'is completed in' in log_call_args[0][1]
-            assert 'test_func' in log_call_args[0][1]
+            assert caplog.records
+            record = caplog.records[-1]
+            assert record.levelno == logging.DEBUG
+            assert 'is completed in' in record.getMessage()
+            assert 'test_func' in record.getMessage()
 
     def test_returns_correct_value(self):
         """Test that the decorator returns the original function's return value."""
@@ -47,7 +48,7 @@ class TestLogRunningTime:
         assert test_func.__name__ == 'test_func'
         assert 'Test docstring' in test_func.__doc__
 
-    def test_with_different_log_levels(self):
+    def test_with_different_log_levels(self, caplog):
         """Test decorator with different logging levels."""
         levels = [logging.DEBUG, logging.INFO, logging.WARNING, logging.ERROR]
         
@@ -56,54 +57,54 @@ class TestLogRunningTime:
             def test_func():
                 return True
 
-            with patch('logging.log') as mock_log:
+            with caplog.at_level(logging.DEBUG):
                 test_func()
-                assert mock_log.called
-                assert mock_log.call_args[0][0] == level
+                assert caplog.records
+                assert caplog.records[-1].levelno == level
 
-    def test_with_invalid_log_level(self):
+    def test_with_invalid_log_level(self, caplog):
         """Test decorator with invalid log level."""
         @log_running_time(level=99999)
         def test_func():
             return True
 
-        with patch('logging.warning') as mock_warning:
+        with caplog.at_level(logging.DEBUG):
             test_func()
-            assert mock_warning.called
-            assert 'Invalid log level' in mock_warning.call_args[0][0]
+            assert any(r.levelno == logging.WARNING for r in caplog.records)
+            assert 'Invalid log level' in caplog.records[-1].getMessage()
 
-    def test_with_function_args(self):
+    def test_with_function_args(self, caplog):
         """Test decorator works with functions that have arguments."""
         @log_running_time()
         def test_func(a, b):
             return a + b
 
-        with patch('logging.log') as mock_log:
+        with caplog.at_level(logging.DEBUG):
             result = test_func(1, 2)
             assert result == 3
-            assert mock_log.called
+            assert caplog.records
 
-    def test_with_function_kwargs(self):
+    def test_with_function_kwargs(self, caplog):
         """Test decorator works with functions that have keyword arguments."""
         @log_running_time()
         def test_func(x=1, y=2):
             return x * y
 
-        with patch('logging.log') as mock_log:
+        with caplog.at_level(logging.DEBUG):
             result = test_func(x=3, y=4)
             assert result == 12
-            assert mock_log.called
+            assert caplog.records
 
-    def test_time_measurement_accuracy(self):
+    def test_time_measurement_accuracy(self, caplog):
         """Test that time measurement is reasonably accurate."""
         @log_running_time()
         def test_func():
             time.sleep(0.1)
             return True
 
-        with patch('logging.log') as mock_log:
+        with caplog.at_level(logging.DEBUG):
             test_func()
-            log_message = mock_log.call_args[0][1]
+            log_message = caplog.records[-1].getMessage()
             # Extract time from log message
             import re
             time_match = re.search(r'is completed in ([\d.]+)', log_message)
@@ -112,60 +113,453 @@ class TestLogRunningTime:
                 # Should be approximately 0.1 seconds (with some tolerance)
                 assert 0.05 <= elapsed <= 0.2
 
-    def test_exception_handling(self):
+    def test_exception_handling(self, caplog):
         """Test that exceptions are logged and re-raised."""
         @log_running_time()
         def test_func():
             raise ValueError("Test error")
 
-        with patch('logging.log') as mock_log:
+        with caplog.at_level(logging.DEBUG):
             with pytest.raises(ValueError, match="Test error"):
                 test_func()
             
             # Should log the exception
-            assert mock_log.called
-            log_message = mock_log.call_args[0][1]
+            assert caplog.records
+            log_message = caplog.records[-1].getMessage()
             assert 'failed' in log_message or 'ValueError' in log_message
 
-    def test_exception_with_invalid_log_level(self):
+    def test_exception_with_invalid_log_level(self, caplog):
         """Test exception handling with invalid log level."""
         @log_running_time(level=99999)
         def test_func():
             raise ValueError("Test error")
 
-        with patch('logging.warning') as mock_warning:
+        with caplog.at_level(logging.DEBUG):
             with pytest.raises(ValueError, match="Test error"):
                 test_func()
             
             # Should log warning about invalid log level
-            assert mock_warning.called
+            assert any(r.levelno == logging.WARNING for r in caplog.records)
 
-    def test_very_fast_function(self):
+    def test_interrupt_with_invalid_log_level(self, caplog):
+        """Test that an invalid log level is not reported on a call interrupted by a BaseException."""
+        @log_running_time(level=99999)
+        def test_func():
+            raise KeyboardInterrupt
+
+        @log_running_time(level=99999)
+        async def async_func():
+            raise KeyboardInterrupt
+
+        with caplog.at_level(logging.DEBUG):
+            with pytest.raises(KeyboardInterrupt):
+                test_func()
+            with pytest.raises(KeyboardInterrupt):
+                async_func().send(None)
+        assert not caplog.records
+
+    def test_very_fast_function(self, caplog):
         """Test decorator with a very fast function."""
         @log_running_time()
         def test_func():
             return 42
 
-        with patch('logging.log') as mock_log:
+        with caplog.at_level(logging.DEBUG):
             result = test_func()
             assert result == 42
-            assert mock_log.called
-            log_message = mock_log.call_args[0][1]
+            assert caplog.records
+            log_message = caplog.records[-1].getMessage()
             assert 'completed in' in log_message
 
-    def test_exception_logs_time(self):
+    def test_exception_logs_time(self, caplog):
         """Test that log_running_time logs time even when exception occurs."""
         @log_running_time()
         def test_func():
             time.sleep(0.01)
             raise ValueError("Test error")
 
-        with patch('logging.log') as mock_log:
+        with caplog.at_level(logging.DEBUG):
             with pytest.raises(ValueError):
                 test_func()
             
             # Should log the failure with time
-            assert mock_log.called
-            log_message = mock_log.call_args[0][1]
+            assert caplog.records
+            log_message = caplog.records[-1].getMessage()
             assert 'failed' in log_message
             assert 'seconds' in log_message
+
+
+class TestAggregateMode:
+    """Test cases for log_running_time(aggregate=True)."""
+
+    def setup_method(self):
+        """Reset timing statistics before each test."""
+        reset_timing_stats()
+
+    def test_no_line_per_call(self, caplog):
+        """Test that aggregate mode does not log individual calls."""
+        @log_running_time(aggregate=True)
+        def test_func():
+            return 42
+
+        with caplog.at_level(logging.DEBUG):
+            for _ in range(10):
+                assert test_func() == 42
+
+        assert not caplog.records
+        assert get_timing_stats(test_func).count == 10
+
+    def test_stats(self):
+        """Test that the aggregated statistics reflect the durations."""
+        @log_running_time(aggregate=True)
+        def test_func(delay):
+            time.sleep(delay)
+
+        for _ in range(5):
+            test_func(0)
+        test_func(0.05)
+
+        stats = get_timing_stats(test_func)
+        assert stats.count == 6
+        assert stats.max >= 0.05
+        assert stats.min < 0.01
+        assert stats.p50 < 0.01
+        assert stats.p999 == stats.max
+        assert stats.min <= stats.mean <= stats.max
+
+    def test_failures_recorded(self):
+        """Test that failing calls are recorded too."""
+        @log_running_time(aggregate=True)
+        def test_func():
+            raise ValueError("Test error")
+
+        with pytest.raises(ValueError):
+            test_func()
+
+        assert get_timing_stats(test_func).count == 1
+
+    def test_records_when_level_disabled(self, caplog):
+        """Test that durations are recorded even when the level is disabled."""
+        @log_running_time(aggregate=True, summary_every=1)
+        def test_func():
+            pass
+
+        with caplog.at_level(logging.INFO):
+            test_func()
+
+        assert get_timing_stats(test_func).count == 1
+        assert not caplog.records
+
+    def test_summary_every(self, caplog):
+        """Test that a summary is logged every N calls."""
+        @log_running_time(aggregate=True, summary_every=5)
+        def test_func():
+            pass
+
+        with caplog.at_level(logging.DEBUG):
+            for _ in range(12):
+                test_func()
+
+        assert len(caplog.records) == 2
+        message = caplog.records[-1].getMessage()
+        assert 'over 10 calls' in message
+        assert 'p99' in message
+        assert 'test_func' in message
+
+    def test_summary_interval(self, caplog):
+        """Test that a summary is logged once the interval has passed."""
+        @log_running_time(aggregate=True, summary_interval=0.05)
+        def test_func(delay=0):
+            time.sleep(delay)
+
+        with caplog.at_level(logging.DEBUG):
+            test_func()
+            assert not caplog.records
+            test_func(0.06)
+            assert len(caplog.records) == 1
+            test_func()
+            assert len(caplog.records) == 1
+
+    def test_get_timing_stats_not_aggregated(self):
+        """Test get_timing_stats for a function that is not aggregated."""
+        @log_running_time()
+        def never_aggregated():
+            pass
+
+        assert get_timing_stats(never_aggregated) is None
+
+    def test_reset_timing_stats(self):
+        """Test that reset_timing_stats clears the histograms."""
+        @log_running_time(aggregate=True)
+        def test_func():
+            pass
+
+        test_func()
+        reset_timing_stats()
+        assert get_timing_stats(test_func).count == 0
+
+    @pytest.mark.parametrize('kwargs', [
+        {'summary_every': 10},
+        {'aggregate': True, 'summary_every': 0},
+        {'aggregate': True, 'summary_interval': 0},
+    ])
+    def test_invalid_arguments(self, kwargs):
+        """Test that invalid summary options are rejected."""
+        with pytest.raises(ValueError):
+            log_running_time(**kwargs)
+
+
+class TestGeneratorTiming:
+    """Test cases for log_running_time on generator functions."""
+
+    def setup_method(self):
+        """Reset timing statistics before each test."""
+        reset_timing_stats()
+
+    def test_active_time_excludes_consumer(self, caplog):
+        """Test that time spent by the consumer is not counted as active."""
+        @log_running_time()
+        def produce():
+            for i in range(3):
+                time.sleep(0.01)
+                yield i
+
+        with caplog.at_level(logging.DEBUG):
+            for _ in produce():
+                time.sleep(0.03)
+
+        record = caplog.records[-1]
+        assert record.getMessage().startswith(f'The generator [{__name__}.produce] produced 3 items in ')
+        name, items, active, first, rate, total = record.args
+        assert active >= 0.03
+        assert 0.01 <= first < active
+        assert rate == pytest.approx(items / active)
+        # The consumer slept at least 0.09 seconds between the items
+        assert total - active >= 0.08
+
+    def test_send_and_return_value(self):
+        """Test that send() reaches the generator and its return value is kept."""
+        @log_running_time()
+        def echo():
+            received = yield 'ready'
+            yield received * 2
+            return 'done'
+
+        generator = echo()
+        assert next(generator) == 'ready'
+        assert generator.send(21) == 42
+        with pytest.raises(StopIteration) as stop:
+            next(generator)
+        assert stop.value.value == 'done'
+
+    def test_reports_once_on_close(self, caplog):
+        """Test that closing early reports the items produced so far, once."""
+        @log_running_time()
+        def count_up():
+            i = 0
+            while True:
+                yield i
+                i += 1
+
+        with caplog.at_level(logging.DEBUG):
+            generator = count_up()
+            assert [next(generator) for _ in range(5)] == [0, 1, 2, 3, 4]
+            generator.close()
+            generator.close()
+
+        assert len(caplog.records) == 1
+        assert caplog.records[0].args[1] == 5
+
+    def test_reports_on_garbage_collection(self, caplog):
+        """Test that an abandoned generator reports when collected."""
+        @log_running_time()
+        def produce():
+            yield from range(10)
+
+        with caplog.at_level(logging.DEBUG):
+            generator = produce()
+            next(generator)
+            del generator
+
+        assert len(caplog.records) == 1
+        assert caplog.records[0].args[1] == 1
+
+    def test_never_started_is_not_reported(self, caplog):
+        """Test that a generator that never ran logs nothing."""
+        @log_running_time()
+        def produce():
+            yield 1
+
+        with caplog.at_level(logging.DEBUG):
+            produce()
+        assert not caplog.records
+
+    def test_failure(self, caplog):
+        """Test that an exception inside the generator is reported and propagated."""
+        @log_running_time()
+        def produce():
+            yield 1
+            raise ValueError('broken')
+
+        with caplog.at_level(logging.DEBUG):
+            with pytest.raises(ValueError):
+                list(produce())
+
+        message = caplog.records[-1].getMessage()
+        assert 'failed after 1 items' in message
+        assert 'ValueError: broken' in message
+
+    def test_interrupted_is_not_reported(self, caplog):
+        """Test that a generator interrupted by a BaseException logs nothing, not even an invalid level."""
+        @log_running_time(level=99999)
+        def produce():
+            yield 1
+            raise KeyboardInterrupt
+
+        with caplog.at_level(logging.DEBUG):
+            with pytest.raises(KeyboardInterrupt):
+                list(produce())
+        assert not caplog.records
+
+    def test_throw_is_forwarded(self):
+        """Test that throw() reaches the generator."""
+        @log_running_time()
+        def produce():
+            try:
+                yield 1
+            except KeyError:
+                yield 'caught'
+
+        generator = produce()
+        next(generator)
+        assert generator.throw(KeyError) == 'caught'
+
+    def test_aggregate_records_active_time(self):
+        """Test that aggregate mode records the active time of each generator."""
+        @log_running_time(aggregate=True)
+        def gen_aggregated():
+            time.sleep(0.01)
+            yield 1
+
+        for _ in range(2):
+            for _ in gen_aggregated():
+                time.sleep(0.02)
+
+        stats = get_timing_stats(gen_aggregated)
+        assert stats.count == 2
+        assert stats.min >= 0.01
+
+    def test_disabled_level_returns_plain_generator(self):
+        """Test that nothing is wrapped when the level is disabled."""
+        @log_running_time(level=logging.DEBUG)
+        def produce():
+            yield 1
+
+        logger = logging.getLogger(__name__)
+        old_level = logger.level
+        logger.setLevel(logging.INFO)
+        try:
+            assert inspect.isgenerator(produce())
+        finally:
+            logger.setLevel(old_level)
+
+
+def spin(seconds):
+    """Keep the CPU busy for about this many seconds."""
+    end = time.thread_time() + seconds
+    while time.thread_time() < end:
+        pass
+
+
+class TestCpuTime:
+    """Test cases for log_running_time(cpu=True)."""
+
+    def setup_method(self):
+        """Reset timing statistics before each test."""
+        reset_timing_stats()
+
+    def test_split_logged(self, caplog):
+        """Test that a sleeping call is off CPU and a spinning call on it."""
+        @log_running_time(cpu=True)
+        def sleeping_func():
+            time.sleep(0.05)
+
+        @log_running_time(cpu=True)
+        def spinning_func():
+            spin(0.05)
+
+        with caplog.at_level(logging.DEBUG):
+            sleeping_func()
+            spinning_func()
+
+        sleeping, spinning = [record.args for record in caplog.records]
+        assert sleeping[2] < 0.02 and sleeping[3] >= 0.04
+        # A spinning call can still be preempted, so its off-CPU time is not bounded
+        assert spinning[2] >= 0.04
+        assert spinning[4] >= 0.04
+        assert 'off CPU' in caplog.records[0].getMessage()
+
+    def test_failure_logged(self, caplog):
+        """Test that failed calls give the split too."""
+        @log_running_time(cpu=True)
+        def failing_cpu_func():
+            raise ValueError('boom')
+
+        with caplog.at_level(logging.DEBUG):
+            with pytest.raises(ValueError):
+                failing_cpu_func()
+
+        message = caplog.records[0].getMessage()
+        assert 'failed after' in message and 'off CPU' in message and message.endswith('ValueError: boom')
+
+    def test_aggregates(self, caplog):
+        """Test that CPU and off-CPU times are aggregated next to the wall time."""
+        @log_running_time(aggregate=True, cpu=True, summary_every=2)
+        def aggregated_cpu_func(sleep):
+            if sleep:
+                time.sleep(0.03)
+            else:
+                spin(0.03)
+
+        with caplog.at_level(logging.DEBUG):
+            aggregated_cpu_func(True)
+            aggregated_cpu_func(False)
+
+        wall = get_timing_stats(aggregated_cpu_func)
+        cpu = get_timing_stats(aggregated_cpu_func, clock='cpu')
+        off_cpu = get_timing_stats(aggregated_cpu_func, clock='off_cpu')
+        assert wall.count == 2 and cpu.count == 2
+        assert cpu.max >= 0.025 and cpu.min < 0.01
+        assert off_cpu.max >= 0.025
+        assert 'CPU mean' in caplog.records[0].getMessage()
+        reset_timing_stats()
+        assert get_timing_stats(aggregated_cpu_func, clock='cpu').count == 0
+
+    def test_coroutine(self, caplog):
+        """Test that coroutine functions give the split too."""
+        @log_running_time(cpu=True)
+        async def async_cpu_func():
+            await asyncio.sleep(0.03)
+
+        with caplog.at_level(logging.DEBUG):
+            asyncio.run(async_cpu_func())
+
+        (record,) = [record for record in caplog.records if record.name == __name__]
+        assert record.args[3] >= 0.02
+
+    def test_without_cpu_no_cpu_stats(self):
+        """Test that only cpu=True records the CPU clocks."""
+        @log_running_time(aggregate=True)
+        def wall_only_func():
+            pass
+
+        wall_only_func()
+        assert get_timing_stats(wall_only_func).count == 1
+        assert get_timing_stats(wall_only_func, clock='cpu') is None
+        with pytest.raises(ValueError):
+            get_timing_stats(wall_only_func, clock='gpu')
+
+    def test_rejects_measure_suspension(self):
+        """Test that cpu cannot be combined with measure_suspension."""
+        with pytest.raises(ValueError):
+            log_running_time(cpu=True, measure_suspension=True)
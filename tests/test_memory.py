@@ -0,0 +1,261 @@
+"""Unit tests for log_memory_usage and its memory measurements."""
+import asyncio
+import logging
+import tracemalloc
+
+import pytest
+
+from py_debug import (
+    log_memory_usage, get_memory_stats, reset_memory_stats, MemoryUsage, Head, Tail,
+)
+from py_debug.memory import MemoryAggregate, MemoryProbe, rss_bytes
+
+
+KEPT = []
+
+
+def allocate(size):
+    """Allocate a bytes object of about size bytes and keep it."""
+    data = bytes(size)
+    KEPT.append(data)
+    return data
+
+
+class TestMemoryProbe:
+    """Test cases for MemoryProbe."""
+
+    def teardown_method(self):
+        """Drop the kept allocations."""
+        KEPT.clear()
+
+    def test_net_and_peak(self):
+        """Test that kept bytes count as net and freed bytes only as peak."""
+        probe = MemoryProbe(rss=False)
+        state = probe.begin()
+        allocate(100_000)
+        temporary = bytes(1_000_000)
+        del temporary
+        usage = probe.end(state)
+        assert 100_000 <= usage.net < 200_000
+        assert usage.peak >= 1_000_000
+        assert usage.rss is None
+
+    def test_tracing_scoped_to_calls(self):
+        """Test that tracing is stopped after the last call in flight, unless it was on before."""
+        probe = MemoryProbe(rss=False)
+        outer = probe.begin()
+        inner = probe.begin()
+        assert tracemalloc.is_tracing()
+        probe.end(inner)
+        assert tracemalloc.is_tracing()
+        probe.end(outer)
+        assert not tracemalloc.is_tracing()
+
+        tracemalloc.start()
+        try:
+            probe.end(probe.begin())
+            assert tracemalloc.is_tracing()
+        finally:
+            tracemalloc.stop()
+
+    def test_tracing_stopped_during_call(self):
+        """Test that tracing stopped by other code is not reported, and not owned any more."""
+        probe = MemoryProbe(rss=False)
+        state = probe.begin()
+        tracemalloc.stop()
+        assert probe.end(state).net is None
+
+        tracemalloc.start()
+        try:
+            probe.end(probe.begin())
+            assert tracemalloc.is_tracing()
+        finally:
+            tracemalloc.stop()
+
+    @pytest.mark.skipif(not hasattr(tracemalloc, 'reset_peak'), reason='needs tracemalloc.reset_peak (3.9+)')
+    def test_nested_peak(self):
+        """Test that a nested call keeps the outer call's earlier peak."""
+        probe = MemoryProbe(rss=False)
+        outer = probe.begin()
+        temporary = bytes(1_000_000)
+        del temporary
+        inner = probe.begin()
+        allocate(1000)
+        inner_usage = probe.end(inner)
+        outer_usage = probe.end(outer)
+        assert inner_usage.peak < 1_000_000
+        assert outer_usage.peak >= 1_000_000
+
+    def test_rss_only(self):
+        """Test that tracing can be left off."""
+        probe = MemoryProbe(trace=False)
+        usage = probe.end(probe.begin())
+        assert usage.net is None and usage.peak is None
+        assert (usage.rss is None) == (rss_bytes is None)
+        assert not tracemalloc.is_tracing()
+
+    def test_str(self):
+        """Test the rendering of a usage in log lines."""
+        assert str(MemoryUsage(10, 20, 4096)) == '10 bytes net, 20 bytes peak, RSS +4096 bytes'
+        assert str(MemoryUsage(None, None, -4096)) == 'RSS -4096 bytes'
+
+    def test_aggregate(self):
+        """Test the totals and maxima of an aggregate."""
+        totals = MemoryAggregate()
+        totals.record(MemoryUsage(-10, 5, 0))
+        totals.record(MemoryUsage(-30, 50, 4096))
+        stats = totals.stats()
+        assert (stats.count, stats.net_total, stats.net_mean, stats.net_max, stats.peak_max, stats.rss_total) == (
+            2, -40, -20.0, -10, 50, 4096)
+        totals.reset()
+        assert totals.stats().count == 0
+
+
+class TestLogMemoryUsage:
+    """Test cases for the log_memory_usage decorator."""
+
+    def setup_method(self):
+        """Reset memory totals before each test."""
+        reset_memory_stats()
+
+    def teardown_method(self):
+        """Drop the kept allocations."""
+        KEPT.clear()
+
+    def test_logs_usage(self, caplog):
+        """Test that each call logs its usage and attaches the event."""
+        @log_memory_usage(rss=False)
+        def allocating_func():
+            return len(allocate(50_000))
+
+        with caplog.at_level(logging.DEBUG):
+            assert allocating_func() == 50_000
+
+        (record,) = caplog.records
+        message = record.getMessage()
+        assert message.startswith(f'The call [{__name__}.allocating_func] used memory: ')
+        assert 'bytes peak' in message
+        assert record.py_debug.kind == 'memory'
+        assert record.py_debug.count >= 50_000
+        assert not tracemalloc.is_tracing()
+
+    def test_failure(self, caplog):
+        """Test that failed calls are reported and tracing still stops."""
+        @log_memory_usage()
+        def failing_func():
+            raise ValueError('boom')
+
+        with caplog.at_level(logging.DEBUG):
+            with pytest.raises(ValueError):
+                failing_func()
+
+        assert 'failed: ValueError: boom (memory: ' in caplog.records[0].getMessage()
+        assert caplog.records[0].py_debug.exception == 'ValueError'
+        assert not tracemalloc.is_tracing()
+
+    def test_disabled_level_not_measured(self, caplog):
+        """Test that nothing is measured when the level is disabled."""
+        @log_memory_usage(level=logging.DEBUG)
+        def quiet_func():
+            assert not tracemalloc.is_tracing()
+
+        with caplog.at_level(logging.INFO):
+            quiet_func()
+
+        assert caplog.records == []
+
+    def test_sampled(self, caplog):
+        """Test that only the sampled calls are measured."""
+        traced = []
+
+        @log_memory_usage(sample=Head(2))
+        def sampled_func():
+            traced.append(tracemalloc.is_tracing())
+
+        with caplog.at_level(logging.DEBUG):
+            for _ in range(6):
+                sampled_func()
+
+        assert traced.count(True) == 2
+        assert len(caplog.records) == 2
+
+    def test_aggregate(self, caplog):
+        """Test that aggregate mode keeps totals and logs summaries."""
+        @log_memory_usage(aggregate=True, summary_every=2, rss=False)
+        def aggregated_func():
+            allocate(10_000)
+
+        with caplog.at_level(logging.DEBUG):
+            for _ in range(3):
+                aggregated_func()
+
+        stats = get_memory_stats(aggregated_func)
+        assert stats.count == 3
+        assert stats.net_total >= 30_000
+        assert len(caplog.records) == 1
+        assert caplog.records[0].getMessage().startswith(f'Memory of [{__name__}.aggregated_func] over 2 calls')
+        reset_memory_stats()
+        assert get_memory_stats(aggregated_func).count == 0
+
+    def test_generator(self, caplog):
+        """Test that generators are measured over their iteration, also when closed early."""
+        @log_memory_usage(rss=False)
+        def generator_func():
+            for _ in range(3):
+                yield allocate(10_000)
+
+        with caplog.at_level(logging.DEBUG):
+            assert len(list(generator_func())) == 3
+            generator = generator_func()
+            next(generator)
+            generator.close()
+
+        assert len(caplog.records) == 2
+        assert caplog.records[0].py_debug.count >= 30_000
+        assert not tracemalloc.is_tracing()
+
+    def test_coroutine(self, caplog):
+        """Test that coroutine functions are measured until they complete."""
+        @log_memory_usage(rss=False)
+        async def async_func():
+            await asyncio.sleep(0)
+            return len(allocate(20_000))
+
+        with caplog.at_level(logging.DEBUG):
+            assert asyncio.run(async_func()) == 20_000
+
+        (record,) = [record for record in caplog.records if record.name == __name__]
+        assert record.py_debug.count >= 20_000
+        assert not tracemalloc.is_tracing()
+
+    def test_async_generator(self, caplog):
+        """Test that async generator functions are measured over their iteration."""
+        @log_memory_usage(rss=False)
+        async def async_gen_func():
+            yield allocate(20_000)
+
+        async def consume():
+            return [item async for item in async_gen_func()]
+
+        with caplog.at_level(logging.DEBUG):
+            assert len(asyncio.run(consume())) == 1
+
+        (record,) = [record for record in caplog.records if record.name == __name__]
+        assert record.py_debug.count >= 20_000
+        assert not tracemalloc.is_tracing()
+
+    def test_not_decorated(self):
+        """Test that functions without totals have no stats."""
+        def plain_func():
+            pass
+
+        assert get_memory_stats(plain_func) is None
+
+    def test_invalid_arguments(self):
+        """Test that invalid configurations are rejected."""
+        with pytest.raises(ValueError):
+            log_memory_usage(summary_every=10)
+        with pytest.raises(ValueError):
+            log_memory_usage(aggregate=True, summary_every=0)
+        with pytest.raises(ValueError):
+            log_memory_usage(sample=Tail(slower_than=1.0))
@@ -0,0 +1,149 @@
+"""Unit tests for the OpenMetrics exposition."""
+import urllib.request
+
+import pytest
+
+from py_debug import (
+    log_running_time, log_call_counter, reset_call_counters, reset_timing_stats,
+    render_openmetrics, serve_metrics, SharedCounters,
+)
+from py_debug.metrics import CONTENT_TYPE
+
+
+def samples(text, metric):
+    """Get the `{labels: value}` samples of one metric from an exposition."""
+    result = {}
+    for line in text.splitlines():
+        if line.startswith(metric + '{'):
+            labels, value = line[len(metric) + 1:].rsplit('} ', 1)
+            result[labels] = float(value)
+    return result
+
+
+class TestRenderOpenMetrics:
+    """Test cases for render_openmetrics."""
+
+    def setup_method(self):
+        """Reset counters and timing statistics before each test."""
+        reset_call_counters()
+        reset_timing_stats()
+
+    def test_call_counts(self):
+        """Test that call counts are exported per function."""
+        @log_call_counter()
+        def metrics_counted_func():
+            pass
+
+        for _ in range(3):
+            metrics_counted_func()
+
+        text = render_openmetrics()
+        assert '# TYPE py_debug_calls counter' in text
+        assert samples(text, 'py_debug_calls_total')[f'function="{__name__}.{metrics_counted_func.__qualname__}"'] == 3
+        assert text.endswith('# EOF\n')
+
+    def test_errors_and_histogram(self):
+        """Test that aggregated durations and failed calls are exported."""
+        @log_running_time(aggregate=True)
+        def metrics_timed_func(fail):
+            if fail:
+                raise ValueError('boom')
+
+        for fail in [False, True, False, True, True]:
+            try:
+                metrics_timed_func(fail)
+            except ValueError:
+                pass
+
+        text = render_openmetrics(buckets=(1e-9, 10.0))
+        label = f'function="{__name__}.{metrics_timed_func.__qualname__}"'
+        assert samples(text, 'py_debug_call_errors_total')[label] == 3
+        buckets = samples(text, 'py_debug_call_duration_seconds_bucket')
+        assert buckets[f'{label},le="1e-09"'] == 0
+        assert buckets[f'{label},le="10.0"'] == 5
+        assert buckets[f'{label},le="+Inf"'] == 5
+        assert samples(text, 'py_debug_call_duration_seconds_count')[label] == 5
+        assert 0 < samples(text, 'py_debug_call_duration_seconds_sum')[label] < 1
+        assert '# UNIT py_debug_call_duration_seconds seconds' in text
+
+    def test_buckets_are_cumulative(self):
+        """Test that every bucket counts the values of the buckets below it."""
+        @log_running_time(aggregate=True)
+        def metrics_cumulative_func():
+            pass
+
+        for _ in range(10):
+            metrics_cumulative_func()
+
+        text = render_openmetrics()
+        label = f'function="{__name__}.{metrics_cumulative_func.__qualname__}"'
+        values = [value for labels, value in samples(text, 'py_debug_call_duration_seconds_bucket').items()
+                  if labels.startswith(label + ',')]
+        assert values == sorted(values)
+        assert values[-1] == 10
+
+    def test_label_escaping(self):
+        """Test that quotes and backslashes in names are escaped."""
+        def func():
+            pass
+
+        func.__qualname__ = 'odd"name\\'
+        log_call_counter()(func)()
+        assert f'function="{__name__}.odd\\"name\\\\"' in render_openmetrics()
+
+    def test_namespace(self):
+        """Test that metric names take the namespace."""
+        assert '# TYPE app_calls counter' in render_openmetrics(namespace='app')
+
+    def test_shared_counters(self, tmp_path):
+        """Test that shared counters are exported as their own metric."""
+        counters = SharedCounters(str(tmp_path / 'counters'), slots=8, processes=1)
+
+        @log_call_counter(shared=counters)
+        def metrics_shared_func():
+            pass
+
+        metrics_shared_func()
+        text = render_openmetrics(shared=counters)
+        assert samples(text, 'py_debug_shared_calls_total')[f'function="{__name__}.{metrics_shared_func.__qualname__}"'] == 1
+        counters.unlink()
+
+    @pytest.mark.parametrize('buckets', [(), (1.0, 0.5), (1.0, 1.0)])
+    def test_invalid_buckets(self, buckets):
+        """Test that unordered or empty buckets are rejected."""
+        with pytest.raises(ValueError):
+            render_openmetrics(buckets=buckets)
+
+
+    def test_cpu_histograms(self):
+        """Test that CPU and off-CPU times are exported when measured."""
+        @log_running_time(aggregate=True, cpu=True)
+        def metrics_cpu_func():
+            pass
+
+        metrics_cpu_func()
+        text = render_openmetrics(buckets=(10.0,))
+        label = f'function="{__name__}.{metrics_cpu_func.__qualname__}"'
+        assert samples(text, 'py_debug_call_cpu_seconds_count')[label] == 1
+        assert samples(text, 'py_debug_call_off_cpu_seconds_count')[label] == 1
+
+
+class TestServeMetrics:
+    """Test cases for the HTTP endpoint."""
+
+    def test_scrape(self):
+        """Test that the endpoint serves a fresh exposition."""
+        server = serve_metrics(port=0)
+        try:
+            url = f'http://127.0.0.1:{server.server_address[1]}/metrics'
+            with urllib.request.urlopen(url, timeout=5) as response:
+                assert response.headers['Content-Type'] == CONTENT_TYPE
+                assert response.read().decode('utf-8').endswith('# EOF\n')
+        finally:
+            server.shutdown()
+            server.server_close()
+
+    def test_invalid_options_fail_early(self):
+        """Test that invalid rendering options are rejected before serving."""
+        with pytest.raises(ValueError):
+            serve_metrics(port=0, buckets=())
@@ -0,0 +1,190 @@
+"""Unit tests for the sys.monitoring Monitor backend."""
+import sys
+import threading
+
+import pytest
+
+from py_debug import (
+    Monitor, log_call_counter, get_call_count, get_timing_stats, reset_call_counters, reset_timing_stats,
+    render_openmetrics,
+)
+
+pytestmark = pytest.mark.skipif(not hasattr(sys, 'monitoring'), reason='needs sys.monitoring (Python 3.12+)')
+
+
+def monitored_func(x):
+    return x * 2
+
+
+def monitored_failing_func():
+    raise ValueError("boom")
+
+
+def monitored_recursive_func(n):
+    return 0 if n == 0 else 1 + monitored_recursive_func(n - 1)
+
+
+def monitored_generator_func():
+    yield 1
+    yield 2
+
+
+class MonitoredClass:
+    def method(self):
+        return 1
+
+    @staticmethod
+    def static_method():
+        return 2
+
+
+class TestMonitor:
+    """Test cases for Monitor."""
+
+    def setup_method(self):
+        """Reset the registries before each test."""
+        reset_call_counters()
+        reset_timing_stats()
+
+    def test_counts_and_times_calls(self):
+        """Test that calls are counted and timed into the shared registries."""
+        monitor = Monitor()
+        monitor.add(monitored_func)
+        with monitor:
+            for i in range(5):
+                assert monitored_func(i) == i * 2
+        assert get_call_count(monitored_func) == 5
+        assert get_timing_stats(monitored_func).count == 5
+
+    def test_nothing_recorded_while_disabled(self):
+        """Test that calls outside enable/disable are not recorded."""
+        monitor = Monitor()
+        monitor.add(monitored_func)
+        monitored_func(1)
+        monitor.enable()
+        monitored_func(1)
+        monitor.disable()
+        monitored_func(1)
+        assert not monitor.enabled
+        assert get_call_count(monitored_func) == 1
+
+    def test_reenable_without_redecorating(self):
+        """Test that a monitor can be switched on and off repeatedly."""
+        monitor = Monitor()
+        monitor.add(monitored_func)
+        for _ in range(3):
+            with monitor:
+                monitored_func(1)
+        assert get_call_count(monitored_func) == 3
+
+    def test_add_and_remove_while_enabled(self):
+        """Test that functions can be selected and deselected at runtime."""
+        with Monitor() as monitor:
+            monitored_func(1)
+            monitor.add(monitored_func)
+            monitored_func(1)
+            monitor.remove(monitored_func)
+            monitored_func(1)
+        assert get_call_count(monitored_func) == 1
+
+    def test_failed_calls(self):
+        """Test that raising calls are timed and counted as errors."""
+        monitor = Monitor()
+        monitor.add(monitored_failing_func)
+        with monitor:
+            for _ in range(3):
+                with pytest.raises(ValueError):
+                    monitored_failing_func()
+        assert get_timing_stats(monitored_failing_func).count == 3
+        assert f'py_debug_call_errors_total{{function="{__name__}.monitored_failing_func"}} 3' \
+            in render_openmetrics()
+
+    def test_recursion(self):
+        """Test that recursive calls are each counted and timed."""
+        monitor = Monitor()
+        monitor.add(monitored_recursive_func)
+        with monitor:
+            monitored_recursive_func(4)
+        assert get_call_count(monitored_recursive_func) == 5
+        assert get_timing_stats(monitored_recursive_func).count == 5
+
+    def test_generator_counted_not_timed(self):
+        """Test that generator functions are counted but not timed."""
+        monitor = Monitor()
+        monitor.add(monitored_generator_func)
+        with monitor:
+            assert list(monitored_generator_func()) == [1, 2]
+        assert get_call_count(monitored_generator_func) == 1
+        assert get_timing_stats(monitored_generator_func) is None
+
+    def test_count_only(self):
+        """Test that timing can be left out."""
+        def count_only_func():
+            pass
+
+        monitor = Monitor(timing=False)
+        monitor.add(count_only_func)
+        with monitor:
+            count_only_func()
+        assert get_call_count(count_only_func) == 1
+        assert get_timing_stats(count_only_func) is None
+
+    def test_methods(self):
+        """Test that methods and static methods can be selected."""
+        monitor = Monitor(timing=False)
+        monitor.add(MonitoredClass().method, MonitoredClass.__dict__['static_method'])
+        with monitor:
+            MonitoredClass().method()
+            MonitoredClass.static_method()
+        assert get_call_count(MonitoredClass.method) == 1
+        assert get_call_count(MonitoredClass.static_method) == 1
+
+    def test_shares_counter_with_decorator(self):
+        """Test that the monitor counts into the counter log_call_counter uses."""
+        @log_call_counter()
+        def shared_counter_func():
+            pass
+
+        monitor = Monitor(timing=False)
+        monitor.add(shared_counter_func)
+        shared_counter_func()
+        with monitor:
+            shared_counter_func()
+        # The decorator counts both calls, the monitor the second one again
+        assert get_call_count(shared_counter_func) == 3
+
+    def test_threads(self):
+        """Test that calls from several threads are all recorded."""
+        monitor = Monitor()
+        monitor.add(monitored_func)
+
+        def worker():
+            for i in range(1000):
+                monitored_func(i)
+
+        with monitor:
+            threads = [threading.Thread(target=worker) for _ in range(4)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        assert get_call_count(monitored_func) == 4000
+        assert get_timing_stats(monitored_func).count == 4000
+
+    def test_tool_ids_released(self):
+        """Test that disabling gives the tool id back."""
+        monitor = Monitor(tool_id=5)
+        with monitor:
+            assert sys.monitoring.get_tool(5) == 'py_debug'
+            with pytest.raises(ValueError):
+                Monitor(tool_id=5).enable()
+        assert sys.monitoring.get_tool(5) is None
+
+    def test_invalid_arguments(self):
+        """Test that invalid arguments are rejected."""
+        with pytest.raises(ValueError):
+            Monitor(count=False, timing=False)
+        with pytest.raises(ValueError):
+            Monitor(tool_id=6)
+        with pytest.raises(TypeError):
+            Monitor().add(len)
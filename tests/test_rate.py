@@ -0,0 +1,151 @@
+"""Unit tests for RateWindow and log_call_counter(rate_window=...)."""
+import logging
+import threading
+from functools import partial
+
+import pytest
+
+import py_debug
+from py_debug import RateWindow, RateStats, log_call_counter, get_call_rate, reset_call_counters
+
+
+class TestRateWindow:
+    """Test cases for RateWindow."""
+
+    def test_rates_per_bucket(self, fake_clock):
+        """Test the rate, peak and window count over a few buckets."""
+        window = RateWindow(buckets=4, width=1.0, clock=fake_clock)
+        for _ in range(10):
+            window.record()
+        fake_clock.advance(1)
+        for _ in range(30):
+            window.record()
+        fake_clock.advance(1)
+        stats = window.stats()
+        assert stats.rate == 30.0
+        assert stats.peak == 30.0
+        assert stats.calls == 40
+
+    def test_record_reports_new_bucket(self, fake_clock):
+        """Test that only the first call of a bucket reports the rotation."""
+        window = RateWindow(buckets=4, clock=fake_clock)
+        assert not window.record()
+        fake_clock.advance(1)
+        assert window.record()
+        assert not window.record()
+
+    def test_old_buckets_leave_the_window(self, fake_clock):
+        """Test that calls older than the window are forgotten."""
+        window = RateWindow(buckets=4, width=0.5, clock=fake_clock)
+        for _ in range(8):
+            window.record()
+        fake_clock.advance(1.0)
+        assert window.stats().calls == 8
+        fake_clock.advance(1.0)
+        stats = window.stats()
+        assert stats.calls == 0
+        assert stats.rate == 0.0
+        assert stats.peak == 0.0
+
+    def test_long_idle_gap(self, fake_clock):
+        """Test that a gap much longer than the window clears it."""
+        window = RateWindow(buckets=3, clock=fake_clock)
+        window.record()
+        fake_clock.advance(10 ** 6)
+        window.record()
+        assert window.stats().calls == 1
+
+    def test_ewma(self, fake_clock):
+        """Test that the moving average approaches a steady rate and decays when idle."""
+        window = RateWindow(buckets=10, width=1.0, ewma_period=2.0, clock=fake_clock)
+        for _ in range(20):
+            for _ in range(50):
+                window.record()
+            fake_clock.advance(1)
+        window.record()
+        assert window.stats().ewma == pytest.approx(50.0, rel=0.01)
+        fake_clock.advance(10)
+        assert window.stats().ewma < 1.0
+
+    def test_reset(self, fake_clock):
+        """Test that reset forgets all calls."""
+        window = RateWindow(clock=fake_clock)
+        window.record()
+        window.reset()
+        assert window.stats() == RateStats(0.0, 0.0, 0.0, 0)
+
+    def test_threads(self, fake_clock):
+        """Test that concurrent calls within a bucket are all counted."""
+        window = RateWindow(clock=fake_clock)
+
+        def worker():
+            for _ in range(5000):
+                window.record()
+
+        threads = [threading.Thread(target=worker) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert window.stats().calls == 20000
+
+    def test_invalid_arguments(self):
+        """Test that invalid windows are rejected."""
+        with pytest.raises(ValueError):
+            RateWindow(buckets=1)
+        with pytest.raises(ValueError):
+            RateWindow(width=0)
+        with pytest.raises(ValueError):
+            RateWindow(ewma_period=0)
+
+
+class TestLogCallCounterRate:
+    """Test cases for the call rate window of log_call_counter."""
+
+    def setup_method(self):
+        """Reset call counters and rate windows before each test."""
+        reset_call_counters()
+
+    def test_get_call_rate(self):
+        """Test that decorated functions expose their window."""
+        @log_call_counter(rate_window=60)
+        def rate_func():
+            return True
+
+        @log_call_counter()
+        def no_rate_func():
+            return True
+
+        for _ in range(5):
+            assert rate_func()
+        assert get_call_rate(rate_func).calls == 5
+        assert get_call_rate(no_rate_func) is None
+        reset_call_counters()
+        assert get_call_rate(rate_func).calls == 0
+
+    def test_threshold_crossings_logged(self, caplog, fake_clock, monkeypatch):
+        """Test that crossing the threshold is logged up and down once each."""
+        monkeypatch.setattr(py_debug, 'RateWindow', partial(RateWindow, clock=fake_clock))
+
+        @log_call_counter(mute_after=0, log_every=10 ** 9, rate_window=10, rate_resolution=0.05,
+                          rate_threshold=100.0)
+        def hot_func():
+            return True
+
+        with caplog.at_level(logging.DEBUG):
+            for _ in range(50):
+                hot_func()
+            fake_clock.advance(0.05)
+            hot_func()
+            fake_clock.advance(0.12)
+            hot_func()
+
+        messages = [record.getMessage() for record in caplog.records]
+        assert len(messages) == 2
+        assert 'rose to' in messages[0] and 'above 100.0' in messages[0]
+        assert 'fell to 0.0 calls/s, below 100.0' in messages[1]
+
+    def test_threshold_requires_window(self):
+        """Test that a threshold without a window is rejected."""
+        with pytest.raises(ValueError):
+            log_call_counter(rate_threshold=10.0)
@@ -0,0 +1,159 @@
+"""Unit tests for the bounded argument renderer used by log_args."""
+import array
+import logging
+import time
+from collections import OrderedDict, deque, namedtuple
+
+import pytest
+
+from py_debug import log_args, ArgRenderer, _format_args_info
+
+
+Point = namedtuple('Point', 'x y')
+
+
+class ArrayLike:
+    """Stand-in for a NumPy array: only shape, dtype and size, and a repr that must not run."""
+
+    shape = (1000, 3)
+    dtype = 'float64'
+    size = 3000
+
+    def __repr__(self):
+        raise AssertionError('repr of an array-like must not be built')
+
+
+class Sized:
+    """Container of an unknown type whose repr must not run."""
+
+    def __len__(self):
+        return 10 ** 9
+
+    def __repr__(self):
+        raise AssertionError('repr of a large object must not be built')
+
+
+class TestArgRenderer:
+    """Test cases for ArgRenderer."""
+
+    def setup_method(self):
+        """Set up a renderer with small limits."""
+        self.renderer = ArgRenderer(max_arg_length=80, max_length=200, max_depth=2, max_items=3)
+
+    def test_small_values_match_repr(self):
+        """Test that values within the limits render like repr."""
+        renderer = ArgRenderer()
+        for value in [1, 'text', b'raw', [1, 2], (1,), {'a': 1}, {1, 2}, None, 1.5]:
+            assert renderer.render(value) == repr(value)
+
+    def test_render_call_shapes(self):
+        """Test that a call renders like a tuple and a dict."""
+        assert self.renderer.render_call((1,), {}) == ('(1,)', '{}')
+        assert self.renderer.render_call((1, 2), {'a': 'b'}) == ('(1, 2)', "{'a': 'b'}")
+
+    def test_large_sequence_summary(self):
+        """Test that long sequences show their type, length and first items."""
+        assert self.renderer.render(list(range(1000))) == '<list len=1000: [0, 1, 2, ...]>'
+        assert self.renderer.render(tuple(range(5))) == '<tuple len=5: (0, 1, 2, ...)>'
+
+    def test_large_dict_and_set_in_iteration_order(self):
+        """Test that long dicts and sets are not sorted before truncation."""
+        assert self.renderer.render({3: 'c', 1: 'a', 2: 'b', 0: ''}) == \
+            "<dict len=4: {3: 'c', 1: 'a', 2: 'b', ...}>"
+        assert self.renderer.render(set(range(100))).startswith('<set len=100: {')
+
+    def test_depth_limit(self):
+        """Test that nesting beyond max_depth is elided."""
+        assert self.renderer.render([[[1]]]) == '[[[...]]]'
+
+    def test_argument_length_cap(self):
+        """Test that one argument never renders longer than max_arg_length."""
+        text = self.renderer.render('x' * 10000)
+        assert len(text) <= 80
+
+    def test_total_length_cap(self):
+        """Test that arguments past max_length are not rendered."""
+        args_text, kwargs_text = self.renderer.render_call(('x' * 100,) * 10, {'key': Sized()})
+        assert args_text.endswith('...)')
+        assert kwargs_text == '{...}'
+        assert len(args_text) < 300
+
+    def test_bytes_summary(self):
+        """Test that long bytes show their length and first bytes only."""
+        assert self.renderer.render(b'\x01' * 10 ** 6) == "<bytes len=1000000: b'\\x01\\x01\\x01\\x01\\x01\\x01\\x01\\x01'...>"
+        assert self.renderer.render(bytearray(100)).startswith('<bytearray len=100: ')
+
+    def test_memoryview_summary(self):
+        """Test that memoryviews show their size, format and shape."""
+        view = memoryview(array.array('d', range(10)))
+        assert self.renderer.render(view) == "<memoryview nbytes=80 format='d' shape=(10,)>"
+
+    def test_array_like_summary(self):
+        """Test that array-likes show their shape and dtype without a repr."""
+        assert self.renderer.render(ArrayLike()) == '<ArrayLike shape=(1000, 3) dtype=float64>'
+
+    def test_large_unknown_container_summary(self):
+        """Test that large objects of unknown types are not repr'd."""
+        assert self.renderer.render(Sized()) == '<Sized len=1000000000>'
+
+    def test_huge_int_summary(self):
+        """Test that huge integers are not converted to decimal."""
+        assert self.renderer.render(1 << 100000) == '<int bits=100001>'
+
+    def test_subclasses(self):
+        """Test that subclasses of builtin containers are bounded too."""
+        assert self.renderer.render(Point(1, 2)) == 'Point(x=1, y=2)'
+        assert self.renderer.render(OrderedDict(a=1)) == "OrderedDict({'a': 1})"
+        assert self.renderer.render(deque(range(10))) == '<deque len=10: deque([0, 1, 2, ...])>'
+
+    def test_failing_repr(self):
+        """Test that an exception in __repr__ does not escape."""
+        class Broken:
+            def __repr__(self):
+                raise RuntimeError
+
+        assert self.renderer.render(Broken()).startswith('<Broken instance at ')
+
+    @pytest.mark.parametrize('kwargs', [
+        {'max_arg_length': 4}, {'max_length': 10}, {'max_depth': 0}, {'max_items': 0},
+    ])
+    def test_invalid_options(self, kwargs):
+        """Test that invalid limits are rejected."""
+        with pytest.raises(ValueError):
+            ArgRenderer(**kwargs)
+
+
+class TestBoundedLogArgs:
+    """Test cases for log_args with large arguments."""
+
+    def test_large_payload_is_cheap(self, caplog):
+        """Test that a large payload is logged quickly and briefly."""
+        @log_args()
+        def handler(payload, rows):
+            return len(payload)
+
+        payload = bytes(50 * 1024 * 1024)
+        rows = [{'id': i, 'tags': ['a', 'b']} for i in range(100000)]
+        with caplog.at_level(logging.DEBUG):
+            start = time.perf_counter()
+            handler(payload, rows=rows)
+            message = caplog.records[-1].getMessage()
+            assert time.perf_counter() - start < 0.5
+        assert len(message) < 1200
+        assert '<bytes len=52428800: ' in message
+        assert '<list len=100000: ' in message
+
+    def test_custom_renderer(self, caplog):
+        """Test that log_args uses the renderer it is given."""
+        @log_args(renderer=ArgRenderer(max_items=2))
+        def test_func(items):
+            return items
+
+        with caplog.at_level(logging.DEBUG):
+            test_func([1, 2, 3])
+        assert caplog.records[-1].getMessage().endswith('with args = (<list len=3: [1, 2, ...]>,).')
+
+    def test_format_args_info_uses_default_renderer(self):
+        """Test that the helper bounds its output without a renderer."""
+        assert _format_args_info((list(range(100)),), {}) == \
+            'with args = (<list len=100: [0, 1, 2, 3, 4, 5, 6, 7, 8, 9, ...]>,)'
@@ -0,0 +1,219 @@
+"""Unit tests for sampling policies and their use in the decorators."""
+import logging
+import random
+import time
+from unittest.mock import patch
+
+import pytest
+
+from py_debug import (
+    log_running_time, log_args, log_call_counter, reset_call_counters, get_call_count,
+    get_timing_stats, reset_timing_stats, OneInN, TokenBucket, Head, Tail,
+)
+from py_debug.sampling import Sampler
+
+
+class ReprCounter:
+    """Argument that counts how often it is repr'd."""
+
+    calls = 0
+
+    def __repr__(self):
+        ReprCounter.calls += 1
+        return 'ReprCounter()'
+
+
+class TestPolicies:
+    """Test cases for the sampling policies themselves."""
+
+    def test_one_in_n(self):
+        """Test that OneInN keeps about one call in n."""
+        sampler = OneInN(10, rng=random.Random(0))
+        kept = sum(sampler() for _ in range(10000))
+        assert 800 < kept < 1200
+        assert sampler.seen == 10000
+        assert sampler.kept == kept
+
+    def test_one_in_one_keeps_everything(self):
+        """Test that OneInN(1) keeps every call."""
+        sampler = OneInN(1)
+        assert all(sampler() for _ in range(100))
+
+    def test_token_bucket_burst(self):
+        """Test that TokenBucket keeps a burst, then limits to its rate."""
+        sampler = TokenBucket(rate=5, burst=3)
+        assert [sampler() for _ in range(5)] == [True, True, True, False, False]
+
+    def test_token_bucket_refills(self):
+        """Test that TokenBucket refills over time."""
+        sampler = TokenBucket(rate=100, burst=1)
+        assert sampler()
+        assert not sampler()
+        time.sleep(0.02)
+        assert sampler()
+
+    def test_token_bucket_never_blocks(self):
+        """Test that a busy bucket rejects instead of waiting."""
+        sampler = TokenBucket(rate=100)
+        with sampler._lock:
+            assert not sampler()
+
+    def test_head(self):
+        """Test that Head keeps the first n calls."""
+        sampler = Head(3)
+        assert [sampler() for _ in range(5)] == [True, True, True, False, False]
+        assert sampler.seen == 5
+        assert sampler.kept == 3
+
+    def test_head_interval(self):
+        """Test that Head starts over every interval."""
+        sampler = Head(1, interval=0.02)
+        assert [sampler() for _ in range(3)] == [True, False, False]
+        time.sleep(0.03)
+        assert sampler()
+
+    def test_tail(self):
+        """Test that Tail keeps failures and slow calls."""
+        sampler = Tail(slower_than=0.1)
+        assert sampler()
+        assert not sampler.keep(0.01, None)
+        assert sampler.keep(0.2, None)
+        assert sampler.keep(0.01, ValueError())
+        assert not Tail(errors=False).keep(0.01, ValueError())
+        assert sampler.kept == 2
+
+    def test_reset(self):
+        """Test that reset clears the counts."""
+        sampler = Head(1)
+        sampler()
+        sampler.reset()
+        assert sampler.seen == 0
+        assert sampler.kept == 0
+        assert sampler()
+
+    def test_base_class_is_abstract(self):
+        """Test that a policy must decide on calls."""
+        with pytest.raises(TypeError):
+            Sampler()
+
+    @pytest.mark.parametrize('factory', [
+        lambda: OneInN(0),
+        lambda: TokenBucket(0),
+        lambda: TokenBucket(1, burst=0.5),
+        lambda: Head(-1),
+        lambda: Head(1, interval=0),
+        lambda: Tail(slower_than=-1),
+    ])
+    def test_invalid_arguments(self, factory):
+        """Test that invalid policy arguments are rejected."""
+        with pytest.raises(ValueError):
+            factory()
+
+
+class TestSampledDecorators:
+    """Test cases for decorators with a sampling policy."""
+
+    def setup_method(self):
+        """Reset counters before each test."""
+        reset_call_counters()
+        reset_timing_stats()
+
+    def test_log_args_sampled_out_not_formatted(self, caplog):
+        """Test that sampled-out calls never repr their arguments."""
+        ReprCounter.calls = 0
+
+        @log_args(sample=Head(2))
+        def test_func(arg):
+            return arg
+
+        with caplog.at_level(logging.DEBUG):
+            test_func(ReprCounter())
+            test_func(ReprCounter())
+            formatted = ReprCounter.calls
+            for _ in range(8):
+                test_func(ReprCounter())
+
+        assert len(caplog.records) == 2
+        assert ReprCounter.calls == formatted
+
+    def test_log_running_time_sampled_out_no_clock(self):
+        """Test that sampled-out calls do not read the clock."""
+        with patch('time.perf_counter') as mock_clock:
+            @log_running_time(sample=Head(0))
+            def test_func():
+                return True
+
+            test_func()
+            assert not mock_clock.called
+
+    def test_totals_stay_exact(self, caplog):
+        """Test that the policy counts every call, kept or not."""
+        sampler = OneInN(4, rng=random.Random(0))
+
+        @log_running_time(sample=sampler)
+        def test_func():
+            return True
+
+        with caplog.at_level(logging.DEBUG):
+            for _ in range(100):
+                test_func()
+
+        assert sampler.seen == 100
+        assert sampler.kept == len(caplog.records)
+
+    def test_log_call_counter_counts_everything(self, caplog):
+        """Test that sampling log_call_counter only limits its lines."""
+        @log_call_counter(mute_after=0, log_every=1, sample=Head(3))
+        def test_func():
+            return True
+
+        with caplog.at_level(logging.DEBUG):
+            for _ in range(10):
+                test_func()
+
+        assert len(caplog.records) == 3
+        assert get_call_count(test_func) == 10
+
+    def test_aggregate_records_sampled_calls(self):
+        """Test that aggregate mode only records the sampled calls."""
+        sampler = Head(4)
+
+        @log_running_time(aggregate=True, sample=sampler)
+        def test_func():
+            return True
+
+        for _ in range(10):
+            test_func()
+
+        assert get_timing_stats(test_func).count == 4
+        assert sampler.seen == 10
+
+    def test_tail_sampling(self, caplog):
+        """Test that tail sampling logs only failed and slow calls."""
+        @log_running_time(sample=Tail(slower_than=0.03))
+        def test_func(delay=0, fail=False):
+            time.sleep(delay)
+            if fail:
+                raise ValueError('Test error')
+
+        with caplog.at_level(logging.DEBUG):
+            test_func()
+            test_func(delay=0.05)
+            with pytest.raises(ValueError):
+                test_func(fail=True)
+
+        messages = [record.getMessage() for record in caplog.records]
+        assert len(messages) == 2
+        assert 'is completed in' in messages[0]
+        assert 'failed after' in messages[1]
+
+    @pytest.mark.parametrize('decorator', [log_args, log_call_counter])
+    def test_tail_rejected_without_outcome(self, decorator):
+        """Test that decorators without a call outcome reject tail sampling."""
+        with pytest.raises(ValueError, match='tail sampling'):
+            decorator(sample=Tail(slower_than=1))
+
+    def test_tail_rejected_with_aggregate(self):
+        """Test that tail sampling cannot be combined with aggregate mode."""
+        with pytest.raises(ValueError, match='tail sampling'):
+            log_running_time(aggregate=True, sample=Tail(slower_than=1))
@@ -0,0 +1,162 @@
+"""Unit tests for the log schedules of log_call_counter."""
+import logging
+
+import pytest
+
+from py_debug import log_call_counter, reset_call_counters, get_call_count, Exponential, Interval, Budget
+from py_debug.schedules import Schedule
+
+
+def due_calls(due, calls):
+    """Return the call numbers from 1 to calls that the bound schedule logs."""
+    return [call_count for call_count in range(1, calls + 1) if due(call_count)]
+
+
+class TestSchedule:
+    """Test cases for the Schedule base class."""
+
+    def test_is_abstract(self):
+        """Test that a schedule must be bindable."""
+        with pytest.raises(TypeError):
+            Schedule()
+
+
+class TestExponential:
+    """Test cases for Exponential."""
+
+    def test_powers_of_two(self):
+        """Test that powers of two are logged."""
+        assert due_calls(Exponential().bind(), 100) == [1, 2, 4, 8, 16, 32, 64]
+
+    def test_other_base(self):
+        """Test that powers of another base are logged."""
+        assert due_calls(Exponential(10).bind(), 10 ** 4) == [1, 10, 100, 1000, 10000]
+
+    def test_invalid_base(self):
+        """Test that bases below 2 are rejected."""
+        with pytest.raises(ValueError):
+            Exponential(1)
+
+
+class TestInterval:
+    """Test cases for Interval."""
+
+    def test_one_line_per_interval(self, fake_clock):
+        """Test that at most one call per interval is logged."""
+        due = Interval(10, clock=fake_clock).bind()
+        assert due(1)
+        assert not due(2)
+        fake_clock.advance(9.9)
+        assert not due(3)
+        fake_clock.advance(0.1)
+        assert due(4)
+        assert not due(5)
+
+    def test_functions_are_independent(self, fake_clock):
+        """Test that every bound function has an interval of its own."""
+        schedule = Interval(10, clock=fake_clock)
+        first, second = schedule.bind(), schedule.bind()
+        assert first(1)
+        assert second(1)
+
+    def test_invalid_interval(self):
+        """Test that non-positive intervals are rejected."""
+        with pytest.raises(ValueError):
+            Interval(0)
+
+
+class TestBudget:
+    """Test cases for Budget."""
+
+    def test_within_budget_logs_every_call(self, fake_clock):
+        """Test that all calls are logged while demand is within the budget."""
+        due = Budget(lines_per_minute=100, clock=fake_clock).bind()
+        assert due_calls(due, 50) == list(range(1, 51))
+
+    def test_budget_caps_lines_per_period(self, fake_clock):
+        """Test that lines beyond the budget of a period are dropped."""
+        schedule = Budget(lines_per_minute=10, clock=fake_clock)
+        first, second = schedule.bind(), schedule.bind()
+        assert len(due_calls(first, 8)) + len(due_calls(second, 8)) == 10
+
+    def test_stride_adapts_to_demand(self, fake_clock):
+        """Test that the stride grows with demand and shrinks when it drops."""
+        schedule = Budget(lines_per_minute=10, period=60, clock=fake_clock)
+        due = schedule.bind()
+        due_calls(due, 100)
+        fake_clock.advance(60)
+        due(101)
+        assert schedule.stride == 16
+        # Powers of two up to the stride, then its multiples, until the budget runs out
+        assert due_calls(due, 200) == [1, 2, 4, 8, 16, 32, 48, 64, 80]
+        for _ in range(6):
+            fake_clock.advance(60)
+            due(1)
+        assert schedule.stride == 1
+
+    def test_invalid_budget(self):
+        """Test that invalid budgets are rejected."""
+        with pytest.raises(ValueError):
+            Budget(lines_per_minute=0)
+        with pytest.raises(ValueError):
+            Budget(period=0)
+
+
+class TestLogCallCounterSchedule:
+    """Test cases for log_call_counter(schedule=...)."""
+
+    def setup_method(self):
+        """Reset call counters before each test."""
+        reset_call_counters()
+
+    def test_schedule_replaces_mute_after(self, caplog):
+        """Test that a schedule decides which calls are logged."""
+        @log_call_counter(schedule=Exponential())
+        def scheduled_func():
+            return True
+
+        with caplog.at_level(logging.DEBUG):
+            for _ in range(20):
+                assert scheduled_func()
+
+        assert [record.getMessage() for record in caplog.records] == [
+            f'Function {__name__}.scheduled_func has been called 1 times, 1 since the last line.',
+            f'Function {__name__}.scheduled_func has been called 2 times, 1 since the last line.',
+            f'Function {__name__}.scheduled_func has been called 4 times, 2 since the last line.',
+            f'Function {__name__}.scheduled_func has been called 8 times, 4 since the last line.',
+            f'Function {__name__}.scheduled_func has been called 16 times, 8 since the last line.',
+        ]
+        assert get_call_count(scheduled_func) == 20
+
+    def test_schedule_bound_per_function(self, caplog):
+        """Test that one decorator gives each function its own schedule."""
+        decorator = log_call_counter(schedule=Interval(3600))
+
+        @decorator
+        def first_func():
+            pass
+
+        @decorator
+        def second_func():
+            pass
+
+        with caplog.at_level(logging.DEBUG):
+            for _ in range(3):
+                first_func()
+                second_func()
+
+        assert len(caplog.records) == 2
+
+    def test_schedule_with_invalid_level(self, caplog):
+        """Test that an invalid level is reported in place of the scheduled lines."""
+        @log_call_counter(level=999, schedule=Exponential())
+        def invalid_level_func():
+            pass
+
+        with caplog.at_level(logging.DEBUG):
+            for _ in range(5):
+                invalid_level_func()
+
+        # Calls 1, 2 and 4
+        assert len(caplog.records) == 3
+        assert all('Invalid log level' in record.getMessage() for record in caplog.records)
@@ -0,0 +1,162 @@
+"""Unit tests for the cross-process SharedCounters."""
+import multiprocessing
+import os
+import threading
+
+import pytest
+
+from py_debug import log_call_counter, get_call_count, reset_call_counters, SharedCounters
+
+fork = pytest.mark.skipif(
+    'fork' not in multiprocessing.get_all_start_methods(), reason='needs the fork start method')
+
+
+def call_in_child(func, times):
+    """Call func `times` times in a forked child process and wait for it."""
+    def target():
+        for _ in range(times):
+            func()
+
+    process = multiprocessing.get_context('fork').Process(target=target)
+    process.start()
+    process.join()
+    assert process.exitcode == 0
+
+
+class TestSharedCounters:
+    """Test cases for SharedCounters and log_call_counter(shared=...)."""
+
+    def setup_method(self):
+        """Reset the in-process counters before each test."""
+        reset_call_counters()
+
+    def test_counts_in_this_process(self, tmp_path):
+        """Test that shared counts match the in-process count."""
+        counters = SharedCounters(str(tmp_path / 'counters'), slots=16, processes=4)
+
+        @log_call_counter(shared=counters)
+        def shared_local_func():
+            return True
+
+        for _ in range(7):
+            assert shared_local_func() is True
+        assert counters.total(shared_local_func) == 7
+        assert get_call_count(shared_local_func) == 7
+        assert counters.totals() == {f'{__name__}.{shared_local_func.__qualname__}': 7}
+        counters.unlink()
+
+    def test_counts_from_threads(self, tmp_path):
+        """Test that concurrent calls in one process lose no increment."""
+        counters = SharedCounters(str(tmp_path / 'counters'), slots=16, processes=1)
+        publish = counters.publisher('module.func')
+
+        def count_calls():
+            for _ in range(5000):
+                publish()
+
+        threads = [threading.Thread(target=count_calls) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert counters.total('module.func') == 40000
+        counters.unlink()
+
+    @fork
+    def test_counts_across_forked_children(self, tmp_path):
+        """Test that the parent sees the calls made in forked children."""
+        counters = SharedCounters(str(tmp_path / 'counters'), slots=16, processes=8)
+
+        @log_call_counter(shared=counters)
+        def shared_forked_func():
+            pass
+
+        shared_forked_func()
+        for _ in range(3):
+            call_in_child(shared_forked_func, 5)
+        assert counters.total(shared_forked_func) == 16
+        assert get_call_count(shared_forked_func) == 1
+        counters.unlink()
+
+    @fork
+    def test_rows_of_exited_processes_are_reused(self, tmp_path):
+        """Test that a recycled worker takes over a row without losing counts."""
+        counters = SharedCounters(str(tmp_path / 'counters'), slots=16, processes=2)
+
+        @log_call_counter(shared=counters)
+        def shared_recycled_func():
+            pass
+
+        for _ in range(4):
+            call_in_child(shared_recycled_func, 10)
+        assert counters.total(shared_recycled_func) == 40
+        counters.unlink()
+
+    def test_reopen_by_path(self, tmp_path):
+        """Test that a second instance on the same file counts in its own row."""
+        path = str(tmp_path / 'counters')
+        first = SharedCounters(path, slots=16, processes=4)
+        second = SharedCounters(path)
+        assert (second.slots, second.processes) == (16, 4)
+
+        first.publisher('module.func')()
+        second.publisher('module.func')()
+        second.publisher('module.func')()
+        assert first.total('module.func') == 3
+        second.close()
+        first.unlink()
+
+    def test_full_row_table_falls_back_to_local(self, tmp_path):
+        """Test that a process without a row still works, unshared."""
+        path = str(tmp_path / 'counters')
+        first = SharedCounters(path, slots=4, processes=1)
+        second = SharedCounters(path)
+        second.publisher('module.func')()
+        assert first.total('module.func') == 0
+        second.close()
+        first.unlink()
+
+    def test_full_slot_table(self, tmp_path):
+        """Test that running out of name slots is reported."""
+        counters = SharedCounters(str(tmp_path / 'counters'), slots=2, processes=1)
+        counters.publisher('a')
+        counters.publisher('b')
+        counters.publisher('a')
+        with pytest.raises(ValueError):
+            counters.publisher('c')
+        counters.unlink()
+
+    def test_long_names_stay_distinct(self, tmp_path):
+        """Test that names too long for a slot do not collide."""
+        counters = SharedCounters(str(tmp_path / 'counters'), slots=8, processes=1)
+        prefix = 'x' * 200
+        counters.publisher(prefix + 'a')()
+        assert counters.total(prefix + 'a') == 1
+        assert counters.total(prefix + 'b') == 0
+        counters.unlink()
+
+    def test_unknown_function(self, tmp_path):
+        """Test that a function never counted has a total of 0."""
+        counters = SharedCounters(str(tmp_path / 'counters'), slots=8, processes=1)
+        assert counters.total('module.unknown') == 0
+        counters.unlink()
+
+    def test_temporary_file(self):
+        """Test that counters without a path get a temporary file."""
+        counters = SharedCounters(slots=8, processes=1)
+        assert os.path.exists(counters.path)
+        counters.unlink()
+        assert not os.path.exists(counters.path)
+
+    def test_not_a_counter_file(self, tmp_path):
+        """Test that a foreign file is rejected."""
+        path = tmp_path / 'other'
+        path.write_bytes(b'x' * 100)
+        with pytest.raises(ValueError):
+            SharedCounters(str(path))
+
+    @pytest.mark.parametrize('kwargs', [{'slots': 0}, {'processes': 0}])
+    def test_invalid_options(self, kwargs, tmp_path):
+        """Test that invalid sizes are rejected."""
+        with pytest.raises(ValueError):
+            SharedCounters(str(tmp_path / 'counters'), **kwargs)
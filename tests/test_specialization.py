@@ -0,0 +1,76 @@
+"""Unit tests for decoration-time specialization of the wrappers."""
+import logging
+from unittest.mock import Mock, patch
+
+import pytest
+
+from py_debug import log_running_time, log_args, log_call_counter, reset_call_counters, get_call_count
+
+DECORATORS = [log_running_time, log_args, log_call_counter]
+
+
+class TestSpecialization:
+    """Test cases for work resolved once at decoration time."""
+
+    def setup_method(self):
+        """Reset call counters before each test."""
+        reset_call_counters()
+
+    @pytest.mark.parametrize('decorator', DECORATORS)
+    def test_no_per_call_name_resolution(self, decorator, caplog):
+        """Test that wrappers do not resolve the function name per call."""
+        @decorator()
+        def test_func():
+            return True
+
+        with patch('py_debug._get_function_name') as mock_name, caplog.at_level(logging.DEBUG):
+            test_func()
+            test_func()
+            assert not mock_name.called
+
+    @pytest.mark.parametrize('decorator', DECORATORS)
+    def test_no_per_call_level_validation(self, decorator, caplog):
+        """Test that wrappers do not validate the log level per call."""
+        @decorator()
+        def test_func():
+            return True
+
+        with patch('py_debug._is_valid_log_level') as mock_valid, caplog.at_level(logging.DEBUG):
+            test_func()
+            test_func()
+            assert not mock_valid.called
+
+    @pytest.mark.parametrize('decorator', DECORATORS)
+    def test_level_validated_at_decoration(self, decorator):
+        """Test that the log level is validated when the decorator is applied."""
+        with patch('py_debug._is_valid_log_level', return_value=True) as mock_valid:
+            @decorator(level=logging.INFO)
+            def test_func():
+                return True
+
+            mock_valid.assert_called_once_with(logging.INFO)
+
+    def test_invalid_level_counter_still_counts(self):
+        """Test that the invalid level path of log_call_counter keeps counting."""
+        @log_call_counter(level=99999)
+        def test_func():
+            return True
+
+        test_func()
+        test_func()
+
+        assert get_call_count(test_func) == 2
+
+    def test_invalid_level_running_time_warns_after_call(self):
+        """Test that the invalid level path of log_running_time warns after the call."""
+        events = []
+        logger = Mock(spec=logging.Logger)
+        logger.warning.side_effect = lambda *args: events.append('warning')
+
+        @log_running_time(level=99999, logger=logger)
+        def test_func():
+            events.append('call')
+
+        test_func()
+
+        assert events == ['call', 'warning']
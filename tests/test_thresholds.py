@@ -0,0 +1,193 @@
+"""Unit tests for the slow-call thresholds of log_running_time."""
+import asyncio
+import logging
+import threading
+import time
+
+import pytest
+
+from py_debug import log_running_time, Fixed, Percentile, Tail
+from py_debug.thresholds import Threshold, as_threshold
+
+
+class TestThresholds:
+    """Test cases for the thresholds themselves."""
+
+    def test_fixed(self):
+        """Test that only durations above a fixed threshold exceed it."""
+        exceeded = Fixed(0.5).bind()
+        assert exceeded(500_000_000) is None
+        assert exceeded(500_000_001) == 500_000_000
+
+    def test_percentile_warmup(self):
+        """Test that nothing exceeds a percentile before the first refresh."""
+        exceeded = Percentile(50, window=100, refresh=10).bind()
+        assert [exceeded(1_000_000 * i) for i in range(1, 10)] == [None] * 9
+
+    def test_percentile_refresh(self):
+        """Test that the threshold is read from the recent calls."""
+        exceeded = Percentile(90, window=1000, refresh=100).bind()
+        for _ in range(100):
+            exceeded(1000)
+        assert exceeded(1000) is None
+        limit = exceeded(10_000_000)
+        assert limit is not None and limit < 10_000_000
+
+    def test_percentile_refresh_call(self):
+        """Test that the refreshing call is checked before it is recorded."""
+        exceeded = Percentile(50, window=100, refresh=10).bind()
+        for _ in range(9):
+            exceeded(1000)
+        # No threshold yet, and this call does not set the one it is checked against
+        assert exceeded(10_000_000) is None
+        assert exceeded(10_000_000) is not None
+
+    def test_percentile_window(self):
+        """Test that the threshold follows the function when it slows down."""
+        exceeded = Percentile(50, window=20, refresh=10).bind()
+        for _ in range(20):
+            exceeded(1000)
+        for _ in range(20):
+            exceeded(1_000_000)
+        assert exceeded(1_000_000) is None
+
+    def test_shorthands(self):
+        """Test the numbers and strings accepted for a threshold."""
+        assert as_threshold(0.25).seconds == 0.25
+        assert as_threshold('p99.9').percentile == 99.9
+        threshold = Fixed(1.0)
+        assert as_threshold(threshold) is threshold
+
+    def test_is_abstract(self):
+        """Test that a threshold must be bindable."""
+        with pytest.raises(TypeError):
+            Threshold()
+
+    def test_invalid(self):
+        """Test that invalid thresholds are rejected."""
+        for threshold in ('99', 'pmax', 'p100', -1.0):
+            with pytest.raises(ValueError):
+                as_threshold(threshold)
+        with pytest.raises(ValueError):
+            Percentile(window=10, refresh=100)
+
+
+@pytest.fixture
+def fake_clock(fake_clock, monkeypatch):
+    """The shared fake clock, also timing the functions decorated in the test."""
+    monkeypatch.setattr(time, 'perf_counter_ns', fake_clock.ns)
+    monkeypatch.setattr(time, 'perf_counter', fake_clock)
+    return fake_clock
+
+
+@pytest.fixture
+def maybe_slow(fake_clock):
+    """A function taking delay seconds of the fake clock, under a threshold of 0.01."""
+    @log_running_time(threshold=0.01)
+    def maybe_slow(delay, label='call'):
+        fake_clock.advance(delay)
+        return label
+
+    return maybe_slow
+
+
+class TestLogRunningTimeThreshold:
+    """Test cases for log_running_time(threshold=...)."""
+
+    def test_fast_calls_silent(self, caplog, maybe_slow):
+        """Test that calls under the threshold are not logged."""
+        with caplog.at_level(logging.DEBUG):
+            assert maybe_slow(0) == 'call'
+            assert maybe_slow(0.01) == 'call'
+        assert caplog.records == []
+
+    def test_slow_call_logged(self, caplog, maybe_slow):
+        """Test that slow calls log their duration, thread and arguments."""
+        with caplog.at_level(logging.DEBUG):
+            assert maybe_slow(0.02, label='slow') == 'slow'
+
+        (record,) = caplog.records
+        message = record.getMessage()
+        assert message.startswith(f'The call [{__name__}.maybe_slow] took 0.020000 seconds')
+        assert 'over the threshold of 0.010000' in message
+        assert f'in thread {threading.current_thread().name}' in message
+        assert message.endswith("args = (0.02,) and kwargs = {'label': 'slow'}.")
+        assert record.py_debug.duration_ns == 20_000_000
+
+    def test_arguments_rendered_lazily(self, caplog, maybe_slow):
+        """Test that the arguments of fast calls are never rendered."""
+        class Loud:
+            def __repr__(self):
+                raise AssertionError('rendered')
+
+        with caplog.at_level(logging.DEBUG):
+            maybe_slow(0, label=Loud())
+
+    def test_failure(self, caplog):
+        """Test that slow failing calls log the exception."""
+        @log_running_time(threshold=0.0)
+        def failing_func(value):
+            raise ValueError('boom')
+
+        with caplog.at_level(logging.DEBUG):
+            with pytest.raises(ValueError):
+                failing_func(7)
+
+        message = caplog.records[0].getMessage()
+        assert message.endswith(', with args = (7,): ValueError: boom')
+
+    def test_coroutine(self, caplog, fake_clock):
+        """Test that coroutine functions are checked when they complete."""
+        @log_running_time(threshold=0.01)
+        async def async_func(delay):
+            await asyncio.sleep(0)
+            fake_clock.advance(delay)
+
+        async def run():
+            await async_func(0)
+            await async_func(0.02)
+
+        with caplog.at_level(logging.DEBUG):
+            asyncio.run(run())
+
+        (record,) = [record for record in caplog.records if record.name == __name__]
+        assert record.getMessage().endswith('with args = (0.02,).')
+
+    def test_generator(self, caplog, fake_clock):
+        """Test that generator functions are checked on their active time."""
+        @log_running_time(threshold=0.01)
+        def generator_func(delay):
+            fake_clock.advance(delay)
+            yield 1
+
+        with caplog.at_level(logging.DEBUG):
+            list(generator_func(0))
+            generator = generator_func(0.02)
+            next(generator)
+            # Time between items is not active time
+            fake_clock.advance(1.0)
+            list(generator)
+
+        (record,) = caplog.records
+        assert record.py_debug.duration_ns == 20_000_000
+
+    def test_percentile(self, caplog, fake_clock):
+        """Test that a percentile threshold only logs the outliers."""
+        @log_running_time(threshold=Percentile(90, refresh=20))
+        def outlier_func(delay):
+            fake_clock.advance(delay)
+
+        with caplog.at_level(logging.DEBUG):
+            for _ in range(20):
+                outlier_func(0.001)
+            outlier_func(0.02)
+
+        (record,) = caplog.records
+        assert record.getMessage().endswith('with args = (0.02,).')
+
+    def test_invalid_combinations(self):
+        """Test that thresholds are rejected with the modes they do not fit."""
+        for kwargs in ({'aggregate': True}, {'cpu': True}, {'measure_suspension': True},
+                       {'sample': Tail(slower_than=1.0)}):
+            with pytest.raises(ValueError):
+                log_running_time(threshold=0.1, **kwargs)
@@ -0,0 +1,96 @@
+"""Unit tests for timed blocks: timed and BlockTimer."""
+import threading
+import time
+
+import pytest
+
+from py_debug import (
+    timed, BlockTimer, get_timing_stats, reset_timing_stats, log_running_time, set_enabled,
+)
+from py_debug._registry import snapshot
+
+
+class TestTimed:
+    """Test cases for timed and BlockTimer."""
+
+    def setup_method(self):
+        """Reset the timing histograms before each test."""
+        reset_timing_stats()
+
+    def test_context_manager(self):
+        """Test that blocks are recorded under their name."""
+        for _ in range(3):
+            with timed('test_timed.rows'):
+                time.sleep(0.005)
+
+        stats = get_timing_stats('test_timed.rows')
+        assert stats.count == 3
+        assert stats.min >= 0.005
+
+    def test_manual(self):
+        """Test start and stop, which returns the duration."""
+        timer = BlockTimer('test_timed.manual')
+        timer.start()
+        time.sleep(0.01)
+        elapsed = timer.stop()
+        assert elapsed >= 0.01
+        assert get_timing_stats('test_timed.manual').max == pytest.approx(elapsed, rel=0.1)
+
+    def test_nested(self, fake_clock, monkeypatch):
+        """Test that a timer nests in itself."""
+        monkeypatch.setattr(time, 'perf_counter_ns', fake_clock.ns)
+        timer = BlockTimer('test_timed.nested')
+        with timer:
+            fake_clock.advance(0.01)
+            with timer:
+                fake_clock.advance(0.001)
+
+        stats = get_timing_stats('test_timed.nested')
+        assert stats.count == 2
+        assert stats.min < 0.01 <= stats.max
+
+    def test_failure_counted(self):
+        """Test that blocks raising an exception are timed and counted as failed."""
+        with pytest.raises(ValueError):
+            with timed('test_timed.failing'):
+                raise ValueError('boom')
+
+        assert get_timing_stats('test_timed.failing').count == 1
+        assert snapshot().errors['test_timed.failing'] == 1
+
+    def test_shared_with_decorator(self):
+        """Test that a block named like an aggregated function shares its histogram."""
+        @log_running_time(aggregate=True)
+        def shared_func():
+            pass
+
+        shared_func()
+        with timed(f'{__name__}.{shared_func.__qualname__}'):
+            pass
+        assert get_timing_stats(shared_func).count == 2
+
+    def test_reused(self):
+        """Test that timed returns one timer per name and thread."""
+        timer = timed('test_timed.reused')
+        assert timed('test_timed.reused') is timer
+        other = []
+        thread = threading.Thread(target=lambda: other.append(timed('test_timed.reused')))
+        thread.start()
+        thread.join()
+        assert other[0] is not timer and other[0].name == 'test_timed.reused'
+
+    def test_stop_without_start(self):
+        """Test that stopping a timer that was not started is an error."""
+        with pytest.raises(RuntimeError):
+            BlockTimer('test_timed.unstarted').stop()
+
+    def test_switched_off(self):
+        """Test that blocks started while switched off are not recorded."""
+        timer = BlockTimer('test_timed.off')
+        set_enabled(False)
+        try:
+            timer.start()
+        finally:
+            set_enabled(True)
+        assert timer.stop() is None
+        assert get_timing_stats('test_timed.off').count == 0